@@ -7,6 +7,8 @@ Provides unified API for multi-client portfolio data access.
 from .client_config import get_client_config, ClientConfig
 from .tools.data_access import (
     query_bigquery,
+    query_bigquery_async,
+    get_bigquery_client,
     fetch_credentials_from_auth_mcp,
     setup_bigquery_credentials,
     get_client_database_registry
@@ -21,11 +23,13 @@ from .tools.transactions import (
 )
 from .tools.cloudflare_d1 import (
     get_orca_url,
+    D1Client,
     get_watchlist,
     get_watchlist_complete,
     get_holdings,
     get_holdings_summary,
     get_analytics,
+    iter_analytics,
     get_analytics_batch,
     get_period_prices,
     get_transactions as get_transactions_d1,
@@ -46,6 +50,8 @@ __all__ = [
     "get_orca_url",
     # BigQuery (background sync only)
     "query_bigquery",
+    "query_bigquery_async",
+    "get_bigquery_client",
     "fetch_credentials_from_auth_mcp",
     "setup_bigquery_credentials",
     "get_client_database_registry",
@@ -57,11 +63,13 @@ __all__ = [
     "delete_transaction",
     "clear_staging_portfolio",
     # D1 Edge Database (fast user queries)
+    "D1Client",
     "get_watchlist",
     "get_watchlist_complete",
     "get_holdings",
     "get_holdings_summary",
     "get_analytics",
+    "iter_analytics",
     "get_analytics_batch",
     "get_period_prices",
     "get_transactions_d1",
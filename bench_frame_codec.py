@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark cached-DataFrame serialization: JSON records vs Arrow IPC
+
+Builds a synthetic agg_analysis_data-shaped universe (30k rows by default)
+and times the encode (cache write) and decode (cache hit) paths.
+
+Usage:
+    python bench_frame_codec.py [rows]
+"""
+
+import sys
+import os
+import json
+import time
+import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from orca_mcp.tools.frame_codec import encode_frame, decode_frame
+
+
+def make_universe(rows: int = 30000) -> pd.DataFrame:
+    """Synthetic universe with the column types BigQuery returns"""
+    rng = np.random.default_rng(42)
+    countries = np.array(["Mexico", "Brazil", "Chile", "Romania", "Saudi Arabia", "Indonesia", "Peru"])
+    ratings = np.array(["AA", "A+", "A", "BBB+", "BBB", "BBB-", "BB+", "BB"])
+    base = datetime.date(2025, 1, 1)
+    return pd.DataFrame({
+        "isin": [f"XS{i:010d}" for i in range(rows)],
+        "ticker": [f"TCK{i % 900}" for i in range(rows)],
+        "description": [f"ISSUER {i % 900} {4 + i % 5}.{i % 100:02d} {2030 + i % 20}" for i in range(rows)],
+        "country": rng.choice(countries, rows),
+        "rating": rng.choice(ratings, rows),
+        "bpdate": [base + datetime.timedelta(days=int(d)) for d in rng.integers(0, 300, rows)],
+        "maturity": pd.to_datetime("2030-01-01") + pd.to_timedelta(rng.integers(0, 7000, rows), unit="D"),
+        "price": rng.uniform(70, 110, rows),
+        "ytw": rng.uniform(3, 9, rows),
+        "oad": rng.uniform(1, 15, rows),
+        "spread": rng.uniform(50, 600, rows),
+        "return_ytw": rng.uniform(2, 8, rows),
+        "coupon": [Decimal(f"{c:.3f}") for c in rng.uniform(2, 8, rows)],
+    })
+
+
+def timed(fn, repeat: int = 5):
+    """Best-of-N wall time in ms and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    df = make_universe(rows)
+    print(f"Universe: {rows} rows x {len(df.columns)} columns")
+    print(f"{'codec':<14}{'bytes':>12}{'encode ms':>12}{'decode ms':>12}  lossless")
+    print("-" * 62)
+
+    # Previous cache path: records -> json.dumps(default=str) -> loads -> DataFrame
+    enc_ms, payload = timed(lambda: json.dumps(df.to_dict(orient="records"), default=str).encode())
+    dec_ms, out = timed(lambda: pd.DataFrame(json.loads(payload)))
+    lossless = out.dtypes.equals(df.dtypes) and out.equals(df)
+    print(f"{'json':<14}{len(payload):>12,}{enc_ms:>12.1f}{dec_ms:>12.1f}  {lossless}")
+
+    for compression in (None, "lz4", "zstd"):
+        enc_ms, payload = timed(lambda: encode_frame(df, compression=compression))
+        dec_ms, out = timed(lambda: decode_frame(payload))
+        lossless = out.dtypes.equals(df.dtypes) and out.equals(df)
+        name = f"arrow+{compression}" if compression else "arrow"
+        print(f"{name:<14}{len(payload):>12,}{enc_ms:>12.1f}{dec_ms:>12.1f}  {lossless}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,317 @@ Orca MCP Client Helper
 
 Simple interface for calling Orca MCP from Streamlit or other applications.
 Hides MCP complexity and provides clean async/sync APIs.
+
+Stdio sessions are pooled: the first call spawns `python3 server.py`, later
+calls reuse the warm child process instead of paying a cold start each time.
+With a server_url (or ORCA_MCP_URL) calls go over HTTP to mcp_sse_server's
+/call endpoint on a pooled keep-alive connection instead.
 """
 
 import os
 import json
+import time
 import asyncio
+import logging
+import threading
 from typing import Any, Dict, List, Optional
 from contextlib import asynccontextmanager
 
+import anyio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSession:
+    """
+    One long-lived stdio MCP session.
+
+    The stdio transport and ClientSession are async context managers backed by
+    anyio task groups, which must be entered and exited in the same task. Each
+    pooled session therefore lives in its own background task that keeps the
+    contexts open until close() is called; callers use `session` from any task.
+    """
+
+    def __init__(self, server_params: StdioServerParameters):
+        self.server_params = server_params
+        self.session: Optional[ClientSession] = None
+        self.last_used = time.monotonic()
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Spawn the child process and run the MCP handshake"""
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self):
+        try:
+            async with stdio_client(self.server_params) as (read, write):
+                relay_send, relay_read = anyio.create_memory_object_stream(0)
+                async with anyio.create_task_group() as tg:
+                    tg.start_soon(self._relay, read, relay_send)
+                    async with ClientSession(relay_read, write) as session:
+                        await session.initialize()
+                        self.session = session
+                        self._ready.set()
+                        await self._closing.wait()
+                    tg.cancel_scope.cancel()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def _relay(self, read, relay_send):
+        """Forward server messages, shutting the session down when the child's stdout closes"""
+        try:
+            async with relay_send:
+                async for message in read:
+                    await relay_send.send(message)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            pass
+        finally:
+            self.session = None
+            self._closing.set()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def request(self, coro):
+        """
+        Await a request on this session, failing fast if the child exits.
+
+        A request written to a child that has already died never gets a
+        response, so the call is raced against the session shutting down.
+        """
+        call = asyncio.ensure_future(coro)
+        closed = asyncio.ensure_future(self._closing.wait())
+        try:
+            await asyncio.wait({call, closed}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            closed.cancel()
+        if call.done():
+            return call.result()
+        call.cancel()
+        raise ConnectionError("Orca MCP server process exited")
+
+    async def ping(self, timeout: float) -> bool:
+        """Health check the child process with an MCP ping"""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.request(self.session.send_ping()), timeout=timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"Orca MCP session failed health check: {e!r}")
+            return False
+
+    async def close(self):
+        """Shut down the session and its child process"""
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except BaseException:
+                pass
+
+
+def _close_on_own_loop(resource, what: str):
+    """
+    Close a pool/transport left behind on another event loop.
+
+    Its sessions and connections belong to that loop, so close() has to run
+    there: on a background thread when the loop is idle (Streamlit reruns
+    leave their loop open but stopped), threadsafe when it is still running.
+    A closed loop needs nothing: asyncio.run() cancels leftover tasks before
+    closing, which already shut the sessions down.
+    """
+    loop = resource.loop
+    if loop.is_closed():
+        return
+    logger.info(f"Closing the previous Orca MCP {what}")
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(resource.close(), loop)
+        return
+
+    def run():
+        try:
+            loop.run_until_complete(resource.close())
+        except Exception as e:
+            logger.warning(f"Closing the previous Orca MCP {what} failed: {e!r}")
+
+    threading.Thread(target=run, name=f"orca-close-{what.replace(' ', '-')}", daemon=True).start()
+
+
+class _SessionPool:
+    """
+    Bounded pool of warm stdio MCP sessions.
+
+    Sessions are created lazily up to `size`, handed out one caller at a time,
+    health checked when they have been idle longer than `health_check_interval`
+    and replaced when the child process has died.
+    """
+
+    def __init__(self, server_params: StdioServerParameters, size: int = 2,
+                 health_check_interval: float = 30.0, health_check_timeout: float = 5.0):
+        self.server_params = server_params
+        self.size = max(1, size)
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.loop = asyncio.get_running_loop()
+
+        self._idle: List[_PooledSession] = []
+        self._all: List[_PooledSession] = []
+        self._available = asyncio.Condition()
+        self._closed = False
+
+    async def _discard(self, pooled: _PooledSession):
+        if pooled in self._all:
+            self._all.remove(pooled)
+        await pooled.close()
+
+    async def acquire(self) -> _PooledSession:
+        """Get an idle healthy session, spawning one if the pool has room"""
+        while True:
+            async with self._available:
+                if self._closed:
+                    raise RuntimeError("Orca MCP session pool is closed")
+                while not self._idle and len(self._all) >= self.size:
+                    await self._available.wait()
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    pooled = _PooledSession(self.server_params)
+                    self._all.append(pooled)
+                    fresh = True
+                else:
+                    fresh = False
+
+            if fresh:
+                try:
+                    await pooled.start()
+                except BaseException:
+                    await self._discard(pooled)
+                    async with self._available:
+                        self._available.notify()
+                    raise
+                return pooled
+
+            idle_for = time.monotonic() - pooled.last_used
+            healthy = pooled.alive
+            if healthy and idle_for > self.health_check_interval:
+                healthy = await pooled.ping(self.health_check_timeout)
+            if healthy:
+                return pooled
+
+            logger.info("Replacing dead Orca MCP session")
+            await self._discard(pooled)
+
+    async def release(self, pooled: _PooledSession, broken: bool = False):
+        """Return a session to the pool, or drop it if the call broke it"""
+        pooled.last_used = time.monotonic()
+        if broken or not pooled.alive or self._closed:
+            await self._discard(pooled)
+        else:
+            self._idle.append(pooled)
+        async with self._available:
+            self._available.notify()
+
+    async def close(self):
+        """Close every session in the pool"""
+        self._closed = True
+        sessions, self._all, self._idle = list(self._all), [], []
+        for pooled in sessions:
+            await pooled.close()
+        async with self._available:
+            self._available.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "open": len(self._all),
+            "idle": len(self._idle),
+            "in_use": len(self._all) - len(self._idle),
+        }
+
+
+class _HttpTransport:
+    """
+    Keep-alive HTTP transport to a remote Orca (mcp_sse_server.py).
+
+    One pooled httpx.AsyncClient per event loop, so notebooks and Streamlit
+    pages pay the TLS handshake once rather than once per tool call.
+    """
+
+    def __init__(self, server_url: str, timeout: float = 120.0, max_connections: int = 10):
+        if httpx is None:
+            raise RuntimeError("httpx is required for the HTTP transport. Install with: pip install httpx")
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+
+        self.server_url = server_url.rstrip("/")
+        self.loop = asyncio.get_running_loop()
+        self.client = httpx.AsyncClient(
+            base_url=self.server_url,
+            http2=http2,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0
+            ),
+            headers={"User-Agent": "Orca-MCP-Client", "Accept": "application/json"}
+        )
+        self._batch_supported = True
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """POST /call and return the parsed tool result"""
+        response = await self.client.post("/call", json={"tool": tool_name, "args": arguments})
+        return self._parse(response)
+
+    async def call_many(self, calls: List[Dict[str, Any]]) -> List[Any]:
+        """POST /call/batch, falling back to concurrent /call on older servers"""
+        if self._batch_supported:
+            response = await self.client.post("/call/batch", json={"calls": calls})
+            if response.status_code not in (404, 405):
+                payload = self._parse(response)
+                if response.is_error or not isinstance(payload, dict) or "results" not in payload:
+                    # The whole batch failed (e.g. 500 {"error": ...}, 422 {"detail": ...})
+                    message = payload.get("error") or payload.get("detail") if isinstance(payload, dict) else None
+                    raise RuntimeError(f"Orca /call/batch failed ({response.status_code}): {message or payload}")
+                return payload["results"]
+            logger.info("Remote Orca has no /call/batch - falling back to concurrent /call")
+            self._batch_supported = False
+
+        return list(await asyncio.gather(*[self.call(c["tool"], c["args"]) for c in calls]))
+
+    @staticmethod
+    def _parse(response) -> Any:
+        # /call reports tool failures as a JSON {"error": ...} body (status 500);
+        # return those like the stdio path returns error text
+        try:
+            return response.json()
+        except ValueError:
+            response.raise_for_status()
+            return response.text
+
+    async def close(self):
+        await self.client.aclose()
+
 
 class OrcaClient:
     """
@@ -33,7 +333,9 @@ class OrcaClient:
         self,
         client_id: Optional[str] = None,
         server_path: Optional[str] = None,
-        server_url: Optional[str] = None
+        server_url: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        health_check_interval: float = 30.0
     ):
         """
         Initialize Orca client
@@ -42,51 +344,114 @@ class OrcaClient:
             client_id: Client identifier (defaults to env var CLIENT_ID)
             server_path: Path to orca_mcp/server.py (for local stdio)
             server_url: URL for remote Orca service (for HTTP calls)
+            pool_size: Max warm stdio sessions / HTTP connections (defaults to env var ORCA_MCP_POOL_SIZE or 2)
+            health_check_interval: Ping idle sessions older than this many seconds before reuse
         """
         self.client_id = client_id or os.getenv("CLIENT_ID", "guinness")
         self.server_path = server_path or self._find_server_path()
         self.server_url = server_url or os.getenv("ORCA_MCP_URL")
+        self.pool_size = pool_size or int(os.getenv("ORCA_MCP_POOL_SIZE", "2"))
+        self.health_check_interval = health_check_interval
 
-        self._session = None
-        self._read = None
-        self._write = None
+        self._pool: Optional[_SessionPool] = None
+        self._http: Optional[_HttpTransport] = None
 
     def _find_server_path(self) -> str:
         """Find orca_mcp/server.py relative to this file"""
         from pathlib import Path
         return str(Path(__file__).parent / "server.py")
 
+    def _get_pool(self) -> _SessionPool:
+        """Get the stdio session pool for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._pool.loop is not loop:
+            if self._pool is not None:
+                # Sessions are bound to the loop that spawned them: shut the
+                # old pool's server.py children down instead of leaking them
+                _close_on_own_loop(self._pool, "session pool")
+            server_params = StdioServerParameters(
+                command="python3",
+                args=[self.server_path],
+                env={"CLIENT_ID": self.client_id}
+            )
+            self._pool = _SessionPool(
+                server_params,
+                size=self.pool_size,
+                health_check_interval=self.health_check_interval
+            )
+        return self._pool
+
+    def _get_http(self) -> _HttpTransport:
+        """Get the keep-alive HTTP transport for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.loop is not loop:
+            if self._http is not None:
+                # Don't drop the old client's sockets / HTTP/2 connections
+                _close_on_own_loop(self._http, "HTTP transport")
+            self._http = _HttpTransport(self.server_url, max_connections=max(self.pool_size, 4))
+        return self._http
+
     @asynccontextmanager
     async def _get_session(self):
-        """Get MCP session (stdio or HTTP)"""
-        if self.server_url:
-            # TODO: Implement HTTP client for remote Orca
-            raise NotImplementedError("HTTP client not yet implemented")
-
-        # Use stdio client
-        server_params = StdioServerParameters(
-            command="python3",
-            args=[self.server_path],
-            env={"CLIENT_ID": self.client_id}
-        )
-
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                yield session
+        """Check out a pooled stdio MCP session"""
+        pool = self._get_pool()
+        pooled = await pool.acquire()
+        broken = False
+        try:
+            yield pooled
+        except BaseException as e:
+            # Drop the session if the child died mid-call; tool errors leave it alive
+            broken = not pooled.alive or self._is_connection_error(e)
+            raise
+        finally:
+            await pool.release(pooled, broken=broken)
 
     async def __aenter__(self):
         """Async context manager entry"""
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        pass
+        """Async context manager exit - shuts down pooled sessions"""
+        await self.aclose()
+
+    async def aclose(self):
+        """Close all pooled sessions, their child processes and HTTP connections"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    def close(self):
+        """Sync version of aclose"""
+        if self._pool is not None or self._http is not None:
+            self._run_async(self.aclose())
+
+    def _close_detached(self):
+        """Close the pool and transport from outside their event loop (see _close_on_own_loop)"""
+        pool, http = self._pool, self._http
+        self._pool = self._http = None
+        if pool is not None:
+            _close_on_own_loop(pool, "session pool")
+        if http is not None:
+            _close_on_own_loop(http, "HTTP transport")
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Current stdio session pool usage"""
+        if self._pool is None:
+            return {"size": self.pool_size, "open": 0, "idle": 0, "in_use": 0}
+        return self._pool.stats()
 
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """
         Call an Orca MCP tool
 
+        Reuses a warm pooled session. If the session's child process had
+        already crashed (the request could not be sent), the call is retried
+        once on a freshly spawned session. A child dying mid-call is not
+        retried since the tool may already have run.
+
         Args:
             tool_name: Name of the tool to call
             arguments: Tool arguments
@@ -94,17 +459,93 @@ class OrcaClient:
         Returns:
             Parsed JSON response
         """
-        async with self._get_session() as session:
-            result = await session.call_tool(tool_name, arguments=arguments)
+        if self.server_url:
+            return await self._get_http().call(tool_name, self._http_args(arguments))
+
+        for attempt in range(2):
+            try:
+                async with self._get_session() as pooled:
+                    result = await pooled.request(
+                        pooled.session.call_tool(tool_name, arguments=arguments)
+                    )
+                break
+            except Exception as e:
+                if attempt == 0 and self._is_send_error(e):
+                    logger.warning(f"Orca MCP session lost during {tool_name} ({e}) - reconnecting")
+                    continue
+                raise
+
+        if result.content:
+            text = result.content[0].text
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                return text
+
+        return None
+
+    async def call_many(self, calls: List[Any]) -> List[Any]:
+        """
+        Call several Orca MCP tools in one round trip
 
-            if result.content:
-                text = result.content[0].text
-                try:
-                    return json.loads(text)
-                except json.JSONDecodeError:
-                    return text
+        Over HTTP the calls are sent as a single /call/batch request and run
+        concurrently server-side. Over stdio they run concurrently across the
+        session pool.
 
-            return None
+        Args:
+            calls: List of {"tool": name, "args": {...}} dicts or (name, args) tuples
+
+        Returns:
+            Parsed results in the same order as `calls`
+
+        Usage:
+            holdings, txns = await orca.call_many([
+                ("get_client_holdings", {"portfolio_id": "wnbf"}),
+                ("get_client_transactions", {"portfolio_id": "wnbf"}),
+            ])
+        """
+        normalized = []
+        for call in calls:
+            if isinstance(call, dict):
+                normalized.append({"tool": call["tool"], "args": call.get("args") or {}})
+            else:
+                tool_name, arguments = call
+                normalized.append({"tool": tool_name, "args": arguments or {}})
+
+        if not normalized:
+            return []
+
+        if self.server_url:
+            for call in normalized:
+                call["args"] = self._http_args(call["args"])
+            return await self._get_http().call_many(normalized)
+
+        return list(await asyncio.gather(
+            *[self.call_tool(call["tool"], call["args"]) for call in normalized]
+        ))
+
+    def _http_args(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        # The remote server is shared, so the client is identified per call
+        # (the stdio child gets it via the CLIENT_ID env var instead)
+        return {"client_id": self.client_id, **(arguments or {})}
+
+    @staticmethod
+    def _is_send_error(error: BaseException) -> bool:
+        """Whether the request failed before reaching a (dead) stdio child"""
+        return isinstance(error, (
+            anyio.ClosedResourceError,
+            anyio.BrokenResourceError,
+            BrokenPipeError,
+        ))
+
+    @classmethod
+    def _is_connection_error(cls, error: BaseException) -> bool:
+        """Whether an error means the stdio child went away (vs a tool failure)"""
+        from mcp.shared.exceptions import McpError
+        from mcp.types import CONNECTION_CLOSED
+        if isinstance(error, McpError):
+            return error.error.code == CONNECTION_CLOSED
+        return cls._is_send_error(error) or isinstance(error, (ConnectionError, EOFError))
 
     # Convenience methods for common operations
 
@@ -166,6 +607,10 @@ class OrcaClient:
 
         return loop.run_until_complete(coro)
 
+    def call_many_sync(self, calls: List[Any]) -> List[Any]:
+        """Sync version of call_many"""
+        return self._run_async(self.call_many(calls))
+
     def get_client_info_sync(self) -> Dict:
         """Sync version of get_client_info"""
         return self._run_async(self.get_client_info())
@@ -214,6 +659,9 @@ def get_orca_client(client_id: Optional[str] = None) -> OrcaClient:
     global _orca_instance
 
     if _orca_instance is None or (client_id and client_id != _orca_instance.client_id):
+        if _orca_instance is not None:
+            # Don't leak the previous client's server.py children
+            _orca_instance._close_detached()
         _orca_instance = OrcaClient(client_id=client_id)
 
     return _orca_instance
@@ -138,13 +138,12 @@ def get_holdings_from_d1(portfolio_id: str = 'wnbf', staging_id: int = 1) -> lis
     Get portfolio holdings from Cloudflare D1 (fast edge database)
     """
     url = f"{D1_API_URL}/api/holdings?portfolio_id={portfolio_id}&staging_id={staging_id}"
-    req = urllib.request.Request(url)
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            holdings = data.get('holdings', [])
-            logger.info(f"Fetched {len(holdings)} holdings from D1 (staging_id={staging_id})")
-            return holdings
+        response = get_http_client().get(url, timeout=10)
+        response.raise_for_status()
+        holdings = response.json().get('holdings', [])
+        logger.info(f"Fetched {len(holdings)} holdings from D1 (staging_id={staging_id})")
+        return holdings
     except Exception as e:
         logger.error(f"Failed to fetch holdings from D1: {e}")
         return []
@@ -155,12 +154,12 @@ def get_holdings_summary_from_d1(portfolio_id: str = 'wnbf', staging_id: int = 1
     Get portfolio summary stats from Cloudflare D1
     """
     url = f"{D1_API_URL}/api/holdings/summary?portfolio_id={portfolio_id}&staging_id={staging_id}"
-    req = urllib.request.Request(url)
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            logger.info(f"Fetched portfolio summary from D1 (staging_id={staging_id})")
-            return data
+        response = get_http_client().get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        logger.info(f"Fetched portfolio summary from D1 (staging_id={staging_id})")
+        return data
     except Exception as e:
         logger.error(f"Failed to fetch holdings summary from D1: {e}")
         return {}
@@ -171,7 +170,7 @@ from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from mcp.server import Server
 from mcp.server.sse import SseServerTransport
 from mcp.types import Tool, TextContent
@@ -183,9 +182,16 @@ class CallToolRequest(BaseModel):
     tool: str = Field(..., description="Name of the tool to call")
     args: Dict[str, Any] = Field(default_factory=dict, description="Tool arguments")
 
+
+class BatchCallRequest(BaseModel):
+    """Request model for /call/batch endpoint"""
+    calls: List[CallToolRequest] = Field(..., description="Tool invocations to run concurrently")
+
 # Import tool implementations
 try:
-    from tools.data_access import query_bigquery
+    from tools.data_access import query_bigquery, query_bigquery_async, warm_bigquery_clients
+    from tools.http_pool import get_http_client, get_async_http_client, aclose_http_clients
+    from tools.resilience import get_endpoint_health
     from tools.imf_gateway import (
         fetch_imf_data,
         get_available_indicators,
@@ -226,6 +232,7 @@ try:
         get_holdings_display_async,
         get_dashboard_complete_async,
         get_ratings_display_async,
+        get_compliance_display_async,
     )
     from tools.external_mcps import (
         get_nfa_rating,
@@ -295,7 +302,9 @@ try:
     )
     from client_config import get_client_config
 except ImportError:
-    from orca_mcp.tools.data_access import query_bigquery
+    from orca_mcp.tools.data_access import query_bigquery, query_bigquery_async, warm_bigquery_clients
+    from orca_mcp.tools.http_pool import get_http_client, get_async_http_client, aclose_http_clients
+    from orca_mcp.tools.resilience import get_endpoint_health
     from orca_mcp.tools.imf_gateway import (
         fetch_imf_data,
         get_available_indicators,
@@ -336,6 +345,7 @@ except ImportError:
         get_holdings_display_async,
         get_dashboard_complete_async,
         get_ratings_display_async,
+        get_compliance_display_async,
     )
     from orca_mcp.tools.external_mcps import (
         get_nfa_rating,
@@ -1522,13 +1532,15 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             if limit != -1:
                 df = df.head(limit)
 
-            records = json.loads(df.to_json(orient='records', date_format='iso')) if not df.empty else []
+            # D1 dates arrive as datetime64; keep them as plain YYYY-MM-DD in the output
+            from tools.d1_schema import frame_to_records
+            records = frame_to_records(df)
             return [TextContent(type="text", text=json.dumps(records, indent=2, default=str))]
 
         elif name == "get_portfolio_cash":
             portfolio_id = arguments.get("portfolio_id", "wnbf")
             sql = f"SELECT * FROM portfolio_summary WHERE portfolio_id = '{portfolio_id}'"
-            df = query_bigquery(sql, client_id)
+            df = await query_bigquery_async(sql, client_id)
             if df.empty:
                 return [TextContent(type="text", text=json.dumps({"error": "No summary found"}))]
             return [TextContent(type="text", text=json.dumps(df.to_dict(orient='records')[0], indent=2, default=str))]
@@ -1629,7 +1641,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             ORDER BY {sort_column} DESC
             LIMIT {limit}
             """
-            df = query_bigquery(sql, client_id)
+            df = await query_bigquery_async(sql, client_id)
             result = {"bonds": df.to_dict(orient='records'), "count": len(df)}
             return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
 
@@ -1969,7 +1981,8 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
 
         elif name == "calculate_trade_settlement":
-            result = calculate_trade_settlement(
+            result = await asyncio.to_thread(
+                calculate_trade_settlement,
                 isin=arguments["isin"],
                 face_value=arguments["face_value"],
                 price=arguments["price"],
@@ -1981,7 +1994,8 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
         elif name == "get_transactions_display":
             portfolio_id = arguments.get("portfolio_id", "wnbf")
-            result = get_transactions_display(
+            result = await asyncio.to_thread(
+                get_transactions_display,
                 portfolio_id=portfolio_id,
                 transaction_type=arguments.get("transaction_type", "ALL"),
                 status=arguments.get("status", "ALL"),
@@ -1994,7 +2008,8 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
         elif name == "check_trade_compliance":
             portfolio_id = arguments.get("portfolio_id", "wnbf")
-            result = check_trade_compliance(
+            result = await asyncio.to_thread(
+                check_trade_compliance,
                 portfolio_id=portfolio_id,
                 ticker=arguments["ticker"],
                 country=arguments["country"],
@@ -2007,12 +2022,12 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         elif name == "get_cashflows_display":
             portfolio_id = arguments.get("portfolio_id", "wnbf")
             months_ahead = arguments.get("months_ahead", 12)
-            result = get_cashflows_display(portfolio_id, months_ahead, client_id)
+            result = await asyncio.to_thread(get_cashflows_display, portfolio_id, months_ahead, client_id)
             return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
 
         elif name == "get_compliance_display":
             portfolio_id = arguments.get("portfolio_id", "wnbf")
-            result = get_compliance_display(portfolio_id, client_id)
+            result = await get_compliance_display_async(portfolio_id, client_id)
             return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
 
         elif name == "get_pnl_display":
@@ -2020,7 +2035,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             period = arguments.get("period", "Since Inception")
             start_date = arguments.get("start_date")
             end_date = arguments.get("end_date")
-            result = get_pnl_display(portfolio_id, period, start_date, end_date, client_id)
+            result = await asyncio.to_thread(get_pnl_display, portfolio_id, period, start_date, end_date, client_id)
             return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
 
         elif name == "get_ratings_display":
@@ -2031,13 +2046,13 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
         elif name == "get_issuer_exposure":
             portfolio_id = arguments.get("portfolio_id", "wnbf")
-            result = get_issuer_exposure(portfolio_id, client_id)
+            result = await asyncio.to_thread(get_issuer_exposure, portfolio_id, client_id)
             return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
 
         elif name == "get_cash_event_horizon":
             portfolio_id = arguments.get("portfolio_id", "wnbf")
             future_days = arguments.get("future_days", 90)
-            result = get_cash_event_horizon(portfolio_id, future_days, client_id)
+            result = await asyncio.to_thread(get_cash_event_horizon, portfolio_id, future_days, client_id)
             return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
 
         # ============================================================================
@@ -2227,6 +2242,19 @@ app.add_middleware(
 sse = SseServerTransport("/messages/")
 
 
+@app.on_event("startup")
+async def warm_up_clients():
+    """Create the shared BigQuery client off the event loop before the first query."""
+    if os.getenv("ORCA_BQ_WARMUP", "true").lower() in ("1", "true", "yes"):
+        asyncio.get_running_loop().run_in_executor(None, warm_bigquery_clients)
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    """Close the pooled HTTP connections to the Cloudflare Worker."""
+    await aclose_http_clients()
+
+
 @app.get("/", tags=["Health"])
 @app.get("/health", tags=["Health"])
 async def health_check():
@@ -2242,6 +2270,7 @@ async def health_check():
         "transport": "sse",
         "claude_desktop_url": "/sse",
         "http_call_url": "/call",
+        "http_batch_call_url": "/call/batch",
         "docs_url": "/docs",
         "data_source": "Cloudflare D1 (edge) + External MCPs",
         "exposed_tools": 1,
@@ -2255,6 +2284,19 @@ async def health_check():
     }
 
 
+@app.get("/health/endpoints", tags=["Health"])
+async def endpoint_health():
+    """
+    Circuit breaker state and latency percentiles per outbound endpoint
+    (D1 Worker routes and external MCP services) since startup.
+    """
+    endpoints = get_endpoint_health()
+    return {
+        "open_circuits": [name for name, e in endpoints.items() if e["state"] != "closed"],
+        "endpoints": endpoints,
+    }
+
+
 @app.post("/call", tags=["Tools"])
 async def handle_call(request: CallToolRequest):
     """
@@ -2277,11 +2319,7 @@ async def handle_call(request: CallToolRequest):
 
         # Extract text from TextContent
         if result and len(result) > 0:
-            text = result[0].text
-            try:
-                return json.loads(text)
-            except json.JSONDecodeError:
-                return {"result": text}
+            return _tool_result_payload(result)
 
         return JSONResponse({"error": "No result"}, status_code=500)
 
@@ -2290,6 +2328,47 @@ async def handle_call(request: CallToolRequest):
         return JSONResponse({"error": str(e)}, status_code=500)
 
 
+def _tool_result_payload(result: list) -> Any:
+    """Parse the first TextContent of a tool result the way /call returns it."""
+    if not result:
+        return {"error": "No result"}
+    text = result[0].text
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return {"result": text}
+
+
+@app.post("/call/batch", tags=["Tools"])
+async def handle_call_batch(request: BatchCallRequest):
+    """
+    Call several tools in one HTTP round trip.
+
+    Calls run concurrently; results come back in request order, each shaped
+    exactly like a /call response. A failing call yields {"error": ...} in
+    its slot without affecting the others.
+
+    Example:
+    ```json
+    {
+        "calls": [
+            {"tool": "get_client_holdings", "args": {"portfolio_id": "wnbf"}},
+            {"tool": "get_portfolio_summary", "args": {"portfolio_id": "wnbf"}}
+        ]
+    }
+    ```
+    """
+    async def run_one(call: CallToolRequest) -> Any:
+        try:
+            return _tool_result_payload(await call_tool(call.tool, call.args))
+        except Exception as e:
+            logger.error(f"Error in /call/batch ({call.tool}): {e}", exc_info=True)
+            return {"error": str(e)}
+
+    results = await asyncio.gather(*[run_one(call) for call in request.calls])
+    return {"results": results, "count": len(results)}
+
+
 @app.get("/tools", tags=["Tools"])
 async def list_available_tools():
     """
@@ -2357,21 +2436,18 @@ async def proxy_to_worker(service: str, path: str, request: Request):
         target_url += f"?{request.query_params}"
     try:
         body = await request.body() if request.method in ("POST", "PUT") else None
-        req = urllib.request.Request(
+        resp = await get_async_http_client().request(
+            request.method,
             target_url,
-            data=body,
+            content=body,
             headers=_proxy_headers(request),
-            method=request.method
+            timeout=30
+        )
+        return Response(
+            content=resp.content,
+            status_code=resp.status_code,
+            media_type=resp.headers.get("Content-Type", "application/json")
         )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            resp_body = resp.read()
-            return Response(
-                content=resp_body,
-                status_code=resp.status,
-                media_type=resp.headers.get("Content-Type", "application/json")
-            )
-    except urllib.error.HTTPError as e:
-        return Response(content=e.read(), status_code=e.code, media_type="application/json")
     except Exception as e:
         logger.error(f"Proxy error /{service}/{path}: {e}")
         return JSONResponse({"error": str(e)}, status_code=502)
@@ -2385,21 +2461,18 @@ async def proxy_api_to_worker(path: str, request: Request):
         target_url += f"?{request.query_params}"
     try:
         body = await request.body() if request.method in ("POST", "PUT") else None
-        req = urllib.request.Request(
+        resp = await get_async_http_client().request(
+            request.method,
             target_url,
-            data=body,
+            content=body,
             headers=_proxy_headers(request),
-            method=request.method
+            timeout=30
+        )
+        return Response(
+            content=resp.content,
+            status_code=resp.status_code,
+            media_type=resp.headers.get("Content-Type", "application/json")
         )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            resp_body = resp.read()
-            return Response(
-                content=resp_body,
-                status_code=resp.status,
-                media_type=resp.headers.get("Content-Type", "application/json")
-            )
-    except urllib.error.HTTPError as e:
-        return Response(content=e.read(), status_code=e.code, media_type="application/json")
     except Exception as e:
         logger.error(f"Proxy API error /api/{path}: {e}")
         return JSONResponse({"error": str(e)}, status_code=502)
@@ -29,11 +29,12 @@ Usage:
 """
 
 import os
+import asyncio
 import sys
 import json
 import logging
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -44,7 +45,10 @@ from mcp.types import Tool, TextContent
 import mcp.server.stdio
 
 from orca_mcp.client_config import get_client_config
-from orca_mcp.tools.data_access import query_bigquery, fetch_credentials_from_auth_mcp
+from orca_mcp.tools.data_access import (
+    query_bigquery, query_bigquery_async, fetch_credentials_from_auth_mcp,
+    get_bigquery_client, warm_bigquery_clients
+)
 from orca_mcp.tools.data_upload import (
     upload_table,
     delete_records,
@@ -107,6 +111,13 @@ from orca_mcp.tools.external_mcps import (
 )
 from orca_mcp.tools.query_router import route_query, detect_complexity, ORCA_QUERY_TOOL_DESCRIPTION
 from orca_mcp.tools.cloudflare_d1 import get_watchlist, get_watchlist_complete
+from orca_mcp.tools.universe_snapshot import get_universe_snapshot_async
+from orca_mcp.tools.local_replica import mark_replica_dirty
+from orca_mcp.tools.cache_manager import CacheManager, invalidate_cache_tags
+from orca_mcp.tools.portfolio_summary import refresh_portfolio_summaries_async, missing_portfolios
+from orca_mcp.tools.id_allocator import allocate_transaction_ids_async
+from orca_mcp.tools.staging_allocations import add_staging_allocations_bulk
+from orca_mcp.tools.bond_screener import get_bond_screener, get_nfa_stars_async
 from orca_mcp.tools.sovereign_reports import (
     list_available_countries as sovereign_list_countries,
     get_sovereign_report,
@@ -461,6 +472,48 @@ async def list_tools() -> list[Tool]:
                 "required": ["cash_to_raise"]
             }
         ),
+        Tool(
+            name="add_staging_allocations_bulk",
+            description="Stage BUY transactions for a whole basket of bonds in one call. Prices every ISIN at once, sizes each position with proper sizing (min $200k, $50k increments) and writes all rows in a single insert. Returns per-bond sizing plus a combined cash report. Use dry_run to size without writing.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "allocations": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "isin": {"type": "string"},
+                                "target_pct": {"type": "number"}
+                            },
+                            "required": ["isin", "target_pct"]
+                        },
+                        "description": "Bonds and target allocation percentages, e.g. [{\"isin\": \"XS1234567890\", \"target_pct\": 3.0}]"
+                    },
+                    "portfolio_id": {
+                        "type": "string",
+                        "description": "Portfolio ID (default: 'wnbf')"
+                    },
+                    "min_size": {
+                        "type": "number",
+                        "description": "Minimum par amount (default: 200000)"
+                    },
+                    "increment": {
+                        "type": "number",
+                        "description": "Par amount increment (default: 50000)"
+                    },
+                    "dry_run": {
+                        "type": "boolean",
+                        "description": "Size and report only, don't create transactions (default: false)"
+                    },
+                    "client_id": {
+                        "type": "string",
+                        "description": "Client identifier (optional)"
+                    }
+                },
+                "required": ["allocations"]
+            }
+        ),
         Tool(
             name="get_portfolio_cash",
             description="Get current cash position and portfolio summary from the portfolio_summary table. Returns both settled cash (current) and total cash (including staging transactions).",
@@ -489,6 +542,11 @@ async def list_tools() -> list[Tool]:
                         "type": "string",
                         "description": "Portfolio ID (default: 'wnbf')"
                     },
+                    "portfolio_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Refresh several portfolios in one call (overrides portfolio_id)"
+                    },
                     "client_id": {
                         "type": "string",
                         "description": "Client identifier (optional)"
@@ -1674,7 +1732,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         elif name == "query_client_data":
             sql = arguments["sql"]
 
-            df = query_bigquery(sql, client_id)
+            df = await query_bigquery_async(sql, client_id)
             result = df.to_dict(orient='records')
 
             return [TextContent(
@@ -1685,7 +1743,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         elif name == "get_client_portfolios":
             sql = "SELECT DISTINCT portfolio_id FROM transactions ORDER BY portfolio_id"
 
-            df = query_bigquery(sql, client_id)
+            df = await query_bigquery_async(sql, client_id)
             result = df.to_dict(orient='records')
 
             return [TextContent(
@@ -1719,7 +1777,8 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             if limit != -1:
                 df = df.head(limit)
 
-            result = df.to_dict(orient='records') if not df.empty else []
+            from tools.d1_schema import frame_to_records
+            result = frame_to_records(df)
 
             return [TextContent(
                 type="text",
@@ -1747,7 +1806,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             ORDER BY total_market_value DESC
             """
 
-            df = query_bigquery(sql, client_id)
+            df = await query_bigquery_async(sql, client_id)
             result = df.to_dict(orient='records')
 
             return [TextContent(
@@ -1829,7 +1888,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             ORDER BY country, ticker
             """
 
-            df = query_bigquery(sql, client_id)
+            df = await query_bigquery_async(sql, client_id)
             holdings = df.to_dict(orient='records')
 
             result = {
@@ -1865,7 +1924,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             LIMIT {limit}
             """
 
-            df = query_bigquery(sql, client_id)
+            df = await query_bigquery_async(sql, client_id)
             batches = df.to_dict(orient='records')
 
             result = {
@@ -1892,7 +1951,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 AND status = 'staging'
                 AND transaction_type = 'BUY'
             """
-            staging_df = query_bigquery(staging_sql, client_id)
+            staging_df = await query_bigquery_async(staging_sql, client_id)
 
             # Get actual holdings (status='settled')
             actual_sql = f"""
@@ -1910,7 +1969,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             SELECT * FROM holdings_agg
             WHERE par_amount > 0
             """
-            actual_df = query_bigquery(actual_sql, client_id)
+            actual_df = await query_bigquery_async(actual_sql, client_id)
 
             # Get cash position
             cash_sql = f"""
@@ -1920,7 +1979,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 AND status = 'settled'
                 AND ticker = 'CASH'
             """
-            cash_df = query_bigquery(cash_sql, client_id)
+            cash_df = await query_bigquery_async(cash_sql, client_id)
             cash_position = float(cash_df.iloc[0]['cash']) if not cash_df.empty else 0.0
 
             # Find differences
@@ -1971,7 +2030,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 AND ticker = 'CASH'
                 AND transaction_type = 'INITIAL'
             """
-            portfolio_df = query_bigquery(portfolio_sql, client_id)
+            portfolio_df = await query_bigquery_async(portfolio_sql, client_id)
             if portfolio_df.empty:
                 return [TextContent(
                     type="text",
@@ -1979,20 +2038,13 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 )]
             portfolio_value = float(portfolio_df.iloc[0]['portfolio_value'])
 
-            # Get current bond price and data from agg_analysis_data
-            bond_sql = f"""
-            WITH latest AS (
-                SELECT isin, MAX(bpdate) as max_date
-                FROM agg_analysis_data
-                WHERE isin = '{isin}'
-                GROUP BY isin
+            # Get current bond price and data (latest agg_analysis_data row)
+            universe = await get_universe_snapshot_async(client_id)
+            bond_df = universe.lookup(
+                [isin],
+                columns=['isin', 'ticker', 'description', 'country',
+                         'price', 'accrued_interest', 'ytw', 'oad', 'notches']
             )
-            SELECT a.isin, a.ticker, a.description, a.country,
-                   a.price, a.accrued_interest, a.ytw, a.oad, a.notches
-            FROM agg_analysis_data a
-            JOIN latest l ON a.isin = l.isin AND a.bpdate = l.max_date
-            """
-            bond_df = query_bigquery(bond_sql, client_id)
             if bond_df.empty:
                 return [TextContent(
                     type="text",
@@ -2022,20 +2074,10 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             market_value = (dirty_price * par_amount) / 100
             actual_pct = (market_value / portfolio_value) * 100
 
-            # Get next transaction_id
-            next_id_sql = """
-            SELECT COALESCE(MAX(transaction_id), 0) + 1 as next_id
-            FROM transactions
-            """
-            next_id_df = query_bigquery(next_id_sql, client_id)
-            next_id = int(next_id_df.iloc[0]['next_id'])
+            # Get next transaction_id (from a reserved block, no table scan)
+            next_id = (await allocate_transaction_ids_async(1, client_id))[0]
 
             # Create staging transaction
-            from google.cloud import bigquery
-            from orca_mcp.tools.data_access import setup_bigquery_credentials
-            setup_bigquery_credentials()
-            bq_client = bigquery.Client(project="future-footing-414610")
-
             insert_sql = f"""
             INSERT INTO `future-footing-414610.portfolio_data.transactions`
             (transaction_id, portfolio_id, transaction_date, settlement_date,
@@ -2052,8 +2094,12 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
              FORMAT_TIMESTAMP('%Y-%m-%d %H:%M:%S', CURRENT_TIMESTAMP()))
             """
 
-            query_job = bq_client.query(insert_sql)
-            query_job.result()
+            # Off the event loop: client setup and the insert both block
+            await asyncio.to_thread(
+                lambda: get_bigquery_client("future-footing-414610").query(insert_sql).result()
+            )
+            mark_replica_dirty("transactions", client_id)
+            invalidate_cache_tags([CacheManager.table_tag("transactions", client_id)])
 
             result = {
                 "success": True,
@@ -2086,6 +2132,21 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 text=json.dumps(result, indent=2, default=str)
             )]
 
+        elif name == "add_staging_allocations_bulk":
+            result = await add_staging_allocations_bulk(
+                portfolio_id=arguments.get("portfolio_id", "wnbf"),
+                allocations=arguments["allocations"],
+                client_id=client_id,
+                min_size=arguments.get("min_size", 200000),
+                increment=arguments.get("increment", 50000),
+                dry_run=arguments.get("dry_run", False)
+            )
+
+            return [TextContent(
+                type="text",
+                text=json.dumps(result, indent=2, default=str)
+            )]
+
         elif name == "add_staging_sell":
             isin = arguments.get("isin")
             country = arguments.get("country")
@@ -2122,7 +2183,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 ORDER BY a.return_ytw ASC
                 LIMIT 1
                 """
-                select_df = query_bigquery(select_sql, client_id)
+                select_df = await query_bigquery_async(select_sql, client_id)
                 if select_df.empty:
                     return [TextContent(
                         type="text",
@@ -2152,7 +2213,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 AND status = 'settled'
                 AND transaction_type = 'BUY'
             """
-            holdings_df = query_bigquery(holdings_sql, client_id)
+            holdings_df = await query_bigquery_async(holdings_sql, client_id)
             if holdings_df.empty or holdings_df.iloc[0]['current_par'] is None:
                 return [TextContent(
                     type="text",
@@ -2173,7 +2234,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             FROM agg_analysis_data a
             JOIN latest l ON a.isin = l.isin AND a.bpdate = l.max_date
             """
-            bond_df = query_bigquery(bond_sql, client_id)
+            bond_df = await query_bigquery_async(bond_sql, client_id)
             if bond_df.empty:
                 return [TextContent(
                     type="text",
@@ -2210,20 +2271,10 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             # Calculate actual cash raised
             market_value = (dirty_price * par_amount) / 100
 
-            # Get next transaction_id
-            next_id_sql = """
-            SELECT COALESCE(MAX(transaction_id), 0) + 1 as next_id
-            FROM transactions
-            """
-            next_id_df = query_bigquery(next_id_sql, client_id)
-            next_id = int(next_id_df.iloc[0]['next_id'])
+            # Get next transaction_id (from a reserved block, no table scan)
+            next_id = (await allocate_transaction_ids_async(1, client_id))[0]
 
             # Create staging SELL transaction
-            from google.cloud import bigquery
-            from orca_mcp.tools.data_access import setup_bigquery_credentials
-            setup_bigquery_credentials()
-            bq_client = bigquery.Client(project="future-footing-414610")
-
             insert_sql = f"""
             INSERT INTO `future-footing-414610.portfolio_data.transactions`
             (transaction_id, portfolio_id, transaction_date, settlement_date,
@@ -2240,8 +2291,12 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
              FORMAT_TIMESTAMP('%Y-%m-%d %H:%M:%S', CURRENT_TIMESTAMP()))
             """
 
-            query_job = bq_client.query(insert_sql)
-            query_job.result()
+            # Off the event loop: client setup and the insert both block
+            await asyncio.to_thread(
+                lambda: get_bigquery_client("future-footing-414610").query(insert_sql).result()
+            )
+            mark_replica_dirty("transactions", client_id)
+            invalidate_cache_tags([CacheManager.table_tag("transactions", client_id)])
 
             result = {
                 "success": True,
@@ -2287,7 +2342,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             FROM portfolio_summary
             WHERE portfolio_id = '{portfolio_id}'
             """
-            summary_df = query_bigquery(summary_sql, client_id)
+            summary_df = await query_bigquery_async(summary_sql, client_id)
 
             if summary_df.empty:
                 return [TextContent(
@@ -2325,122 +2380,38 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             )]
 
         elif name == "refresh_portfolio_summary":
-            portfolio_id = arguments.get("portfolio_id", "wnbf")
-
-            # Calculate summary values
-            # Get starting cash
-            starting_cash_sql = f"""
-            SELECT SUM(market_value) as starting_cash
-            FROM transactions
-            WHERE portfolio_id = '{portfolio_id}'
-                AND transaction_type = 'INITIAL'
-                AND ticker = 'CASH'
-            """
-            starting_cash_df = query_bigquery(starting_cash_sql, client_id)
-            starting_cash = float(starting_cash_df.iloc[0]['starting_cash']) if not starting_cash_df.empty else 0.0
-
-            # Get settled bonds
-            settled_sql = f"""
-            SELECT
-                COALESCE(SUM(market_value), 0) as settled_bonds_value,
-                COUNT(*) as num_settled_bonds
-            FROM transactions
-            WHERE portfolio_id = '{portfolio_id}'
-                AND status = 'settled'
-                AND transaction_type = 'BUY'
-            """
-            settled_df = query_bigquery(settled_sql, client_id)
-            settled_bonds_value = float(settled_df.iloc[0]['settled_bonds_value'])
-            num_settled_bonds = int(settled_df.iloc[0]['num_settled_bonds'])
-
-            # Get staging BUY
-            staging_buy_sql = f"""
-            SELECT COALESCE(SUM(market_value), 0) as staging_buy_value
-            FROM transactions
-            WHERE portfolio_id = '{portfolio_id}'
-                AND status = 'staging'
-                AND transaction_type = 'BUY'
-            """
-            staging_buy_df = query_bigquery(staging_buy_sql, client_id)
-            staging_buy_value = float(staging_buy_df.iloc[0]['staging_buy_value'])
-
-            # Get staging SELL
-            staging_sell_sql = f"""
-            SELECT COALESCE(SUM(market_value), 0) as staging_sell_value
-            FROM transactions
-            WHERE portfolio_id = '{portfolio_id}'
-                AND status = 'staging'
-                AND transaction_type = 'SELL'
-            """
-            staging_sell_df = query_bigquery(staging_sell_sql, client_id)
-            staging_sell_value = float(staging_sell_df.iloc[0]['staging_sell_value'])
-
-            # Get counts
-            staging_count_sql = f"""
-            SELECT COUNT(*) as num_staging
-            FROM transactions
-            WHERE portfolio_id = '{portfolio_id}'
-                AND status = 'staging'
-            """
-            staging_count_df = query_bigquery(staging_count_sql, client_id)
-            num_staging = int(staging_count_df.iloc[0]['num_staging'])
-
-            last_txn_sql = f"""
-            SELECT MAX(transaction_id) as last_id
-            FROM transactions
-            WHERE portfolio_id = '{portfolio_id}'
-            """
-            last_txn_df = query_bigquery(last_txn_sql, client_id)
-            last_transaction_id = int(last_txn_df.iloc[0]['last_id']) if last_txn_df.iloc[0]['last_id'] else 0
-
-            # Calculate cash
-            settled_cash = starting_cash - settled_bonds_value
-            total_cash = settled_cash - staging_buy_value + staging_sell_value
-
-            # Update portfolio_summary table
-            from google.cloud import bigquery
-            from orca_mcp.tools.data_access import setup_bigquery_credentials
-            setup_bigquery_credentials()
-            bq_client = bigquery.Client(project="future-footing-414610")
-
-            # Delete existing
-            delete_sql = f"""
-            DELETE FROM `future-footing-414610.portfolio_data.portfolio_summary`
-            WHERE portfolio_id = '{portfolio_id}'
-            """
-            query_job = bq_client.query(delete_sql)
-            query_job.result()
-
-            # Insert new
-            insert_sql = f"""
-            INSERT INTO `future-footing-414610.portfolio_data.portfolio_summary`
-            (portfolio_id, starting_cash, settled_bonds_value, staging_buy_value, staging_sell_value,
-             settled_cash, total_cash, num_settled_bonds, num_staging_transactions,
-             last_transaction_id, updated_at)
-            VALUES
-            ('{portfolio_id}', {starting_cash}, {settled_bonds_value}, {staging_buy_value},
-             {staging_sell_value}, {settled_cash}, {total_cash}, {num_settled_bonds},
-             {num_staging}, {last_transaction_id}, CURRENT_TIMESTAMP())
-            """
-            query_job = bq_client.query(insert_sql)
-            query_job.result()
+            portfolio_ids = arguments.get("portfolio_ids") or [arguments.get("portfolio_id", "wnbf")]
+
+            # One BigQuery job: conditional-aggregation scan + MERGE + read-back
+            summary_df = await refresh_portfolio_summaries_async(portfolio_ids, client_id)
+
+            summaries = []
+            for _, row in summary_df.iterrows():
+                summaries.append({
+                    "success": True,
+                    "portfolio_id": row['portfolio_id'],
+                    "cash": {
+                        "settled_cash": float(row['settled_cash']),
+                        "total_cash": float(row['total_cash'])
+                    },
+                    "summary": {
+                        "starting_cash": float(row['starting_cash']),
+                        "settled_bonds_value": float(row['settled_bonds_value']),
+                        "staging_buy_value": float(row['staging_buy_value']),
+                        "staging_sell_value": float(row['staging_sell_value']),
+                        "num_settled_bonds": int(row['num_settled_bonds']),
+                        "num_staging_transactions": int(row['num_staging_transactions'])
+                    }
+                })
+            not_found = missing_portfolios(portfolio_ids, summary_df)
 
-            result = {
-                "success": True,
-                "portfolio_id": portfolio_id,
-                "cash": {
-                    "settled_cash": settled_cash,
-                    "total_cash": total_cash
-                },
-                "summary": {
-                    "starting_cash": starting_cash,
-                    "settled_bonds_value": settled_bonds_value,
-                    "staging_buy_value": staging_buy_value,
-                    "staging_sell_value": staging_sell_value,
-                    "num_settled_bonds": num_settled_bonds,
-                    "num_staging_transactions": num_staging
+            if len(portfolio_ids) == 1:
+                result = summaries[0] if summaries else {
+                    "success": False,
+                    "error": f"No transactions found for portfolio '{portfolio_ids[0]}'"
                 }
-            }
+            else:
+                result = {"success": True, "portfolios": summaries, "not_found": not_found}
 
             return [TextContent(
                 type="text",
@@ -2637,7 +2608,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             )
             SELECT * FROM net_holdings
             """
-            holdings_df = query_bigquery(holdings_sql, client_id)
+            holdings_df = await query_bigquery_async(holdings_sql, client_id)
 
             # Get cash
             cash_sql = f"""
@@ -2649,7 +2620,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 (SELECT COALESCE(SUM(market_value), 0) FROM transactions
                  WHERE portfolio_id = '{portfolio_id}' AND status = 'settled' AND transaction_type = 'SELL') as net_cash
             """
-            cash_df = query_bigquery(cash_sql, client_id)
+            cash_df = await query_bigquery_async(cash_sql, client_id)
             net_cash = float(cash_df.iloc[0]['net_cash']) if not cash_df.empty else 0.0
 
             # Run compliance check
@@ -2733,7 +2704,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             )
             SELECT * FROM net_holdings
             """
-            holdings_df = query_bigquery(holdings_sql, client_id)
+            holdings_df = await query_bigquery_async(holdings_sql, client_id)
 
             # Get cash
             cash_sql = f"""
@@ -2745,7 +2716,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 (SELECT COALESCE(SUM(market_value), 0) FROM transactions
                  WHERE portfolio_id = '{portfolio_id}' AND status = 'settled' AND transaction_type = 'SELL') as net_cash
             """
-            cash_df = query_bigquery(cash_sql, client_id)
+            cash_df = await query_bigquery_async(cash_sql, client_id)
             net_cash = float(cash_df.iloc[0]['net_cash']) if not cash_df.empty else 0.0
 
             # Run impact check
@@ -2816,129 +2787,32 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             exclude_portfolio = arguments.get("exclude_portfolio", True)
             portfolio_id = arguments.get("portfolio_id", "wnbf")
 
-            # Map sort_by to SQL columns
-            sort_map = {
-                'expected_return': 'return_ytw',
-                'yield': 'ytw',
-                'spread': 'oas',
-                'duration': 'oad'
-            }
-            sort_column = sort_map.get(sort_by, 'return_ytw')
-
-            # Known quasi-sovereign tickers by country for issuer_type filtering
-            quasi_sovereigns = {
-                'PEMEX', 'CFE', 'NAFIN',  # Mexico
-                'CDEL', 'ENAPCL', 'BMETR', 'BCHILE',  # Chile
-                'PETBRA', 'BNDES',  # Brazil
-                'ECOPET',  # Colombia
-                'KSA', 'ARAMCO',  # Saudi Arabia (ARAMCO is quasi)
-                'QATAEN', 'QNBK',  # Qatar
-                'KUWSOV', 'KPC',  # Kuwait
-                'ADSOVR',  # Abu Dhabi
-                'PERULN', 'COFIDE',  # Peru
-                'INDON', 'PLNIJ',  # Indonesia
-                'MLAY', 'PETMK',  # Malaysia
-            }
-
-            # Build WHERE conditions
-            conditions = []
-
-            if country:
-                # Use CAST to handle both STRING and INT64 country columns
-                # Also handle case-insensitive matching
-                conditions.append(f"LOWER(CAST(a.country AS STRING)) = LOWER('{country}')")
-
-            if ticker_pattern:
-                conditions.append(f"UPPER(a.ticker) LIKE UPPER('%{ticker_pattern}%')")
-
-            if issuer_type == 'sovereign':
-                # Sovereigns typically have country name as ticker or specific sovereign tickers
-                quasi_list = "', '".join(quasi_sovereigns)
-                conditions.append(f"UPPER(a.ticker) NOT IN ('{quasi_list}')")
-            elif issuer_type == 'quasi-sovereign':
-                quasi_list = "', '".join(quasi_sovereigns)
-                conditions.append(f"UPPER(a.ticker) IN ('{quasi_list}')")
-
-            if min_expected_return is not None:
-                conditions.append(f"a.return_ytw >= {min_expected_return}")
-
-            if max_duration is not None:
-                conditions.append(f"a.oad <= {max_duration}")
-
-            if min_rating:
-                # Convert letter rating to numeric for comparison
-                # Standard S&P scale: AAA=21, AA+=20, AA=19, ... BBB-=12, BB+=11, etc.
-                rating_scale = {
-                    'AAA': 21, 'AA+': 20, 'AA': 19, 'AA-': 18,
-                    'A+': 17, 'A': 16, 'A-': 15,
-                    'BBB+': 14, 'BBB': 13, 'BBB-': 12,
-                    'BB+': 11, 'BB': 10, 'BB-': 9,
-                    'B+': 8, 'B': 7, 'B-': 6,
-                    'CCC+': 5, 'CCC': 4, 'CCC-': 3,
-                    'CC': 2, 'C': 1, 'D': 0
-                }
-                min_rating_upper = min_rating.upper()
-                if min_rating_upper in rating_scale:
-                    min_numeric = rating_scale[min_rating_upper]
-                    # Build rating comparison - check both S&P and Moody's, take best
-                    rating_conditions = []
-                    for r, n in rating_scale.items():
-                        if n >= min_numeric:
-                            rating_conditions.append(f"UPPER(a.rating_sp) = '{r}'")
-                    if rating_conditions:
-                        conditions.append(f"({' OR '.join(rating_conditions)})")
-
-            # Build exclusion subquery if needed
-            exclusion_sql = ""
+            # Screen the in-memory universe: every filter is a boolean mask,
+            # the sort is an argpartition top-k
+            universe = await get_universe_snapshot_async(client_id)
+            screener = get_bond_screener(universe)
+
+            held = None
             if exclude_portfolio:
-                exclusion_sql = f"""
-                AND a.isin NOT IN (
+                held_df = await query_bigquery_async(f"""
                     SELECT DISTINCT isin FROM transactions
                     WHERE portfolio_id = '{portfolio_id}'
                     AND status = 'settled'
                     AND isin != 'CASH'
-                )
-                """
-
-            where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-            sql = f"""
-            WITH latest AS (
-                SELECT isin, MAX(bpdate) as max_date
-                FROM agg_analysis_data
-                GROUP BY isin
+                """, client_id)
+                held = screener.portfolio_bitmap(held_df['isin'].tolist())
+
+            mask = screener.mask(
+                country=country,
+                ticker=ticker_pattern,
+                issuer_type=issuer_type,
+                min_expected_return=min_expected_return,
+                max_duration=max_duration,
+                min_rating=min_rating,
+                exclude=held,
             )
-            SELECT
-                a.isin,
-                a.ticker,
-                a.description,
-                a.country,
-                a.ytw as yield_pct,
-                a.oas as spread_bp,
-                a.oad as duration,
-                a.return_ytw as expected_return,
-                a.price,
-                a.coupon,
-                a.maturity,
-                a.rating_sp,
-                a.rating_moody,
-                CASE
-                    WHEN UPPER(a.ticker) IN ('{"', '".join(quasi_sovereigns)}') THEN 'quasi-sovereign'
-                    ELSE 'sovereign'
-                END as issuer_type
-            FROM agg_analysis_data a
-            JOIN latest l ON a.isin = l.isin AND a.bpdate = l.max_date
-            WHERE {where_clause}
-                AND a.return_ytw IS NOT NULL
-                AND a.ytw IS NOT NULL
-                {exclusion_sql}
-            ORDER BY {sort_column} DESC
-            LIMIT {limit}
-            """
 
-            df = query_bigquery(sql, client_id)
-
-            if df.empty:
+            if not mask.any():
                 return [TextContent(
                     type="text",
                     text=json.dumps({
@@ -2948,28 +2822,15 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                     }, indent=2)
                 )]
 
-            # Post-filter by NFA rating if requested
+            # NFA threshold (country ratings fetched concurrently, cached)
             nfa_filter_applied = False
-            if min_nfa_rating and not df.empty:
-                # Get unique countries from results
-                unique_countries = df['country'].dropna().unique().tolist()
-                if unique_countries:
-                    # Fetch NFA ratings for these countries
-                    country_nfa = {}
-                    for c in unique_countries:
-                        try:
-                            nfa_result = get_nfa_rating(str(c))
-                            if 'nfa_star_rating' in nfa_result:
-                                country_nfa[c] = nfa_result['nfa_star_rating']
-                        except Exception as e:
-                            logger.warning(f"Could not get NFA for {c}: {e}")
-
-                    # Filter dataframe to only include countries meeting NFA threshold
-                    if country_nfa:
-                        df = df[df['country'].apply(
-                            lambda x: country_nfa.get(x, 0) >= min_nfa_rating
-                        )]
-                        nfa_filter_applied = True
+            if min_nfa_rating:
+                country_nfa = await get_nfa_stars_async(screener.countries(mask))
+                if country_nfa:
+                    mask &= screener.nfa_stars(country_nfa) >= min_nfa_rating
+                    nfa_filter_applied = True
+
+            df = screener.top(mask, sort_by, limit)
 
             if df.empty:
                 return [TextContent(
@@ -3039,26 +2900,11 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             if len(isins) > 50:
                 isins = isins[:50]
 
-            isin_list = ", ".join(f"'{isin}'" for isin in isins)
-
-            sql = f"""
-            WITH latest AS (
-                SELECT isin, MAX(bpdate) as max_date
-                FROM agg_analysis_data
-                GROUP BY isin
-            )
-            SELECT
-                a.isin, a.ticker, a.description, a.country,
-                a.ytw as yield_pct, a.oas as spread_bp, a.oad as duration,
-                a.return_ytw as expected_return,
-                a.price, a.coupon, a.maturity,
-                a.rating_sp, a.rating_moody, a.bpdate
-            FROM agg_analysis_data a
-            JOIN latest l ON a.isin = l.isin AND a.bpdate = l.max_date
-            WHERE a.isin IN ({isin_list})
-            """
-
-            df = query_bigquery(sql, client_id)
+            universe = await get_universe_snapshot_async(client_id)
+            df = universe.lookup(isins).rename(columns={
+                'ytw': 'yield_pct', 'oas': 'spread_bp', 'oad': 'duration',
+                'return_ytw': 'expected_return'
+            })
 
             # Build result keyed by ISIN for easy cross-referencing
             bonds = {}
@@ -3104,37 +2950,29 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
             # Get holdings with analytics (expected_return, duration, yield, spread)
             holdings_sql = f"""
-            WITH net_holdings AS (
-                SELECT
-                    t.isin, t.ticker, t.description, t.country,
-                    SUM(CASE WHEN t.transaction_type = 'BUY' THEN t.par_amount ELSE 0 END) -
-                    SUM(CASE WHEN t.transaction_type = 'SELL' THEN t.par_amount ELSE 0 END) as par_amount,
-                    SUM(CASE WHEN t.transaction_type = 'BUY' THEN t.market_value ELSE 0 END) -
-                    SUM(CASE WHEN t.transaction_type = 'SELL' THEN t.market_value ELSE 0 END) as market_value
-                FROM transactions t
-                WHERE t.portfolio_id = '{portfolio_id}'
-                    AND t.status = 'settled'
-                    AND t.isin != 'CASH'
-                GROUP BY t.isin, t.ticker, t.description, t.country
-                HAVING par_amount > 0
-            ),
-            latest_analytics AS (
-                SELECT isin, MAX(bpdate) as max_date
-                FROM agg_analysis_data
-                GROUP BY isin
-            )
             SELECT
-                h.isin, h.ticker, h.description, h.country,
-                h.par_amount, h.market_value,
-                COALESCE(a.return_ytw, 0) as expected_return,
-                COALESCE(a.ytw, 0) as yield,
-                COALESCE(a.oad, 0) as duration,
-                COALESCE(a.oas, 0) as spread
-            FROM net_holdings h
-            LEFT JOIN latest_analytics l ON h.isin = l.isin
-            LEFT JOIN agg_analysis_data a ON h.isin = a.isin AND a.bpdate = l.max_date
+                t.isin, t.ticker, t.description, t.country,
+                SUM(CASE WHEN t.transaction_type = 'BUY' THEN t.par_amount ELSE 0 END) -
+                SUM(CASE WHEN t.transaction_type = 'SELL' THEN t.par_amount ELSE 0 END) as par_amount,
+                SUM(CASE WHEN t.transaction_type = 'BUY' THEN t.market_value ELSE 0 END) -
+                SUM(CASE WHEN t.transaction_type = 'SELL' THEN t.market_value ELSE 0 END) as market_value
+            FROM transactions t
+            WHERE t.portfolio_id = '{portfolio_id}'
+                AND t.status = 'settled'
+                AND t.isin != 'CASH'
+            GROUP BY t.isin, t.ticker, t.description, t.country
+            HAVING par_amount > 0
             """
-            holdings_df = query_bigquery(holdings_sql, client_id)
+            holdings_df = await query_bigquery_async(holdings_sql, client_id)
+
+            # Join latest analytics from the in-memory universe snapshot
+            universe = await get_universe_snapshot_async(client_id)
+            analytics_cols = {'return_ytw': 'expected_return', 'ytw': 'yield', 'oad': 'duration', 'oas': 'spread'}
+            analytics_df = universe.lookup(
+                holdings_df['isin'].tolist(), columns=['isin'] + list(analytics_cols)
+            ).rename(columns=analytics_cols)
+            holdings_df = holdings_df.merge(analytics_df, on='isin', how='left')
+            holdings_df[list(analytics_cols.values())] = holdings_df[list(analytics_cols.values())].fillna(0)
 
             # Get cash position
             cash_sql = f"""
@@ -3146,7 +2984,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 (SELECT COALESCE(SUM(market_value), 0) FROM transactions
                  WHERE portfolio_id = '{portfolio_id}' AND status = 'settled' AND transaction_type = 'SELL') as net_cash
             """
-            cash_df = query_bigquery(cash_sql, client_id)
+            cash_df = await query_bigquery_async(cash_sql, client_id)
             net_cash = float(cash_df.iloc[0]['net_cash']) if not cash_df.empty else 0.0
 
             # Calculate portfolio metrics
@@ -3227,26 +3065,31 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             avg_country_weight = 100 / len(country_weights) if country_weights else 0
             underweight_countries = {k: v for k, v in country_weights.items() if v < avg_country_weight * 0.5 and v > 0}
 
+            # Buy candidates are screened in-memory against the universe snapshot,
+            # excluding anything the portfolio has ever settled
+            held_isins = None
+            candidate_cols = {'return_ytw': 'expected_return', 'ytw': 'yield', 'oad': 'duration'}
+
+            async def buy_candidates(rows, k):
+                nonlocal held_isins
+                if held_isins is None:
+                    held_df = await query_bigquery_async(
+                        f"SELECT DISTINCT isin FROM transactions WHERE portfolio_id = '{portfolio_id}' AND status = 'settled'",
+                        client_id
+                    )
+                    held_isins = held_df['isin'].tolist()
+                rows = universe.exclude(rows, held_isins)
+                return universe.frame(
+                    universe.top(rows, 'return_ytw', k),
+                    columns=['isin', 'ticker', 'description', 'country'] + list(candidate_cols)
+                ).rename(columns=candidate_cols)
+
             # Get high-return bonds from watchlist for underweight countries
             if focus in ['diversification', 'all'] and underweight_countries:
-                watchlist_sql = f"""
-                WITH latest AS (
-                    SELECT isin, MAX(bpdate) as max_date
-                    FROM agg_analysis_data
-                    GROUP BY isin
-                )
-                SELECT a.isin, a.ticker, a.description, a.country,
-                       a.return_ytw as expected_return, a.ytw as yield, a.oad as duration
-                FROM agg_analysis_data a
-                JOIN latest l ON a.isin = l.isin AND a.bpdate = l.max_date
-                WHERE a.country IN ({','.join([f"'{c}'" for c in underweight_countries.keys()])})
-                    AND a.return_ytw > 0
-                    AND a.isin NOT IN (SELECT DISTINCT isin FROM transactions WHERE portfolio_id = '{portfolio_id}' AND status = 'settled')
-                ORDER BY a.return_ytw DESC
-                LIMIT 10
-                """
                 try:
-                    watchlist_df = query_bigquery(watchlist_sql, client_id)
+                    rows = universe.country_rows(underweight_countries.keys())
+                    rows = rows[universe.col('return_ytw')[rows] > 0]
+                    watchlist_df = await buy_candidates(rows, 10)
                     for _, bond in watchlist_df.head(3).iterrows():
                         current_country_weight = country_weights.get(bond['country'], 0)
                         headroom = 20 - current_country_weight
@@ -3265,23 +3108,9 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
             # 2. High return opportunities from watchlist (if cash available)
             if focus in ['returns', 'all'] and net_cash > 200000:
-                high_return_sql = f"""
-                WITH latest AS (
-                    SELECT isin, MAX(bpdate) as max_date
-                    FROM agg_analysis_data
-                    GROUP BY isin
-                )
-                SELECT a.isin, a.ticker, a.description, a.country,
-                       a.return_ytw as expected_return, a.ytw as yield, a.oad as duration
-                FROM agg_analysis_data a
-                JOIN latest l ON a.isin = l.isin AND a.bpdate = l.max_date
-                WHERE a.return_ytw > 5.0
-                    AND a.isin NOT IN (SELECT DISTINCT isin FROM transactions WHERE portfolio_id = '{portfolio_id}' AND status = 'settled')
-                ORDER BY a.return_ytw DESC
-                LIMIT 5
-                """
                 try:
-                    high_return_df = query_bigquery(high_return_sql, client_id)
+                    rows = universe.where(universe.col('return_ytw') > 5.0)
+                    high_return_df = await buy_candidates(rows, 5)
                     for _, bond in high_return_df.head(2).iterrows():
                         current_country_weight = country_weights.get(bond['country'], 0)
                         if current_country_weight < 18:  # Room to add
@@ -3519,6 +3348,11 @@ async def main():
     client_id = os.getenv("CLIENT_ID", "guinness")
     logger.info(f"Starting Orca MCP Server for client: {client_id}")
 
+    # Build the shared BigQuery client in the background so the first
+    # query doesn't pay for credentials, TLS and token setup
+    if os.getenv("ORCA_BQ_WARMUP", "true").lower() in ("1", "true", "yes"):
+        asyncio.get_running_loop().run_in_executor(None, warm_bigquery_clients, client_id)
+
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized bond screener behind search_bonds_rvm (no BigQuery needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from orca_mcp.tools.universe_snapshot import UniverseSnapshot
+from orca_mcp.tools.bond_screener import BondScreener, rating_rank
+
+
+def make_screener() -> BondScreener:
+    df = pd.DataFrame({
+        "isin": ["MX0000000001", "MX0000000002", "BR0000000001", "CL0000000001", "CL0000000002"],
+        "ticker": ["PEMEX", "MEX", "BRAZIL", "CHILE", "CDEL"],
+        "description": ["PEMEX 7 31", "MEX 5 35", "BRAZIL 6 33", "CHILE 4 30", "CDEL 6 34"],
+        "country": ["Mexico", "Mexico", "Brazil", "Chile", "Chile"],
+        "ytw": [7.5, 5.6, 6.0, 4.4, 6.9],
+        "oas": [350, 180, 250, 90, 200],
+        "oad": [6.0, 8.0, 5.0, 4.0, 7.0],
+        "return_ytw": [7.1, 5.2, 6.1, 4.0, 6.3],
+        "rating_sp": ["BBB", "BBB", "BB", "A", "A-"],
+    })
+    return BondScreener(UniverseSnapshot(df, version=1))
+
+
+def test_rating_ranks_and_masks():
+    """Rating filter uses numeric ranks; issuer_type, ticker and exclusion compose as one mask"""
+    assert rating_rank("AAA") > rating_rank("BBB-") > rating_rank("BB+") > rating_rank(None)
+
+    screener = make_screener()
+    ig = screener.top(screener.mask(min_rating="BBB-"), limit=10)
+    assert ig["isin"].tolist() == ["MX0000000001", "CL0000000002", "MX0000000002", "CL0000000001"]
+
+    quasi = screener.top(screener.mask(issuer_type="quasi-sovereign"), limit=10)
+    assert set(quasi["ticker"]) == {"PEMEX", "CDEL"}
+    assert set(quasi["issuer_type"]) == {"quasi-sovereign"}
+
+    held = screener.portfolio_bitmap(["MX0000000001"])
+    mexico = screener.top(screener.mask(ticker="me", exclude=held), sort_by="duration", limit=10)
+    assert mexico["isin"].tolist() == ["MX0000000002"]
+    assert mexico["duration"].iloc[0] == 8.0
+    print("✅ rating ranks / masks")
+
+
+def test_nfa_filter_before_limit():
+    """NFA stars broadcast per country and are applied before top-k"""
+    screener = make_screener()
+    mask = screener.mask()
+    assert screener.countries(mask) == ["Brazil", "Chile", "Mexico"]
+
+    df = screener.screen(limit=2, min_nfa_rating=4, nfa_ratings={"Chile": 5, "Mexico": 3, "Brazil": 2})
+    assert df["isin"].tolist() == ["CL0000000002", "CL0000000001"]
+    print("✅ NFA filter")
+
+
+if __name__ == "__main__":
+    test_rating_ranks_and_masks()
+    test_nfa_filter_before_limit()
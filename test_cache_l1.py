@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test the in-process L1 DataFrame cache (no Redis needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from orca_mcp.tools.cache_manager import CacheManager, FrameLRU, FrameEntry
+
+
+def test_lru_byte_bound():
+    """Oldest entries are evicted once the byte budget is exceeded"""
+    df = pd.DataFrame({"isin": ["XS0000000000"] * 100, "price": range(100)})
+    size = int(df.memory_usage(index=True, deep=True).sum())
+    lru = FrameLRU(max_bytes=size * 2, max_ttl=60)
+
+    for key in ("a", "b", "c"):
+        lru.put(key, df, ttl=60)
+
+    assert lru.get("a") is None
+    assert lru.get("c") is not None
+    assert lru.stats()["evictions"] == 1
+    print("✅ byte bound")
+
+
+def test_invalidation_is_coherent():
+    """Pattern and tag invalidation drop L1 entries even without Redis"""
+    cache = CacheManager(redis_url="")
+    cache.l1.max_bytes = 10 * 1024 * 1024
+    df = pd.DataFrame({"isin": ["XS0000000000"], "price": [99.5]})
+
+    tags = cache.query_tags("SELECT * FROM agg_analysis_data", "guinness")
+    cache.set_frame("query:guinness:abc", df, 300, tags=tags)
+    cache.set_frame("holdings:guinness:all", df, 300)
+
+    hit = cache.get_frame("query:guinness:abc")
+    hit["price"] = 0.0
+    assert cache.get_frame("query:guinness:abc")["price"].iloc[0] == 99.5  # copies are returned
+
+    cache.invalidate_table("agg_analysis_data")
+    assert cache.get_frame("query:guinness:abc") is None
+
+    cache.invalidate("holdings:guinness:*")
+    assert cache.get_frame("holdings:guinness:all") is None
+
+    stats = cache.get_stats()
+    assert stats["l1"]["hits"] == 2 and stats["l1"]["misses"] == 2
+    print("✅ coherent invalidation")
+
+
+def test_upload_invalidates_l1_without_redis():
+    """A write to transactions drops that client's L1 frames even with Redis disabled"""
+    from orca_mcp.tools import data_upload
+
+    cache = CacheManager(redis_url="")
+    cache.l1.max_bytes = 10 * 1024 * 1024
+    df = pd.DataFrame({"isin": ["XS0000000000"], "par_amount": [200000.0]})
+    cache.set_frame("query:guinness:txns", df, 300, tags=cache.query_tags("SELECT * FROM transactions", "guinness"))
+
+    original = data_upload.get_cache_manager
+    data_upload.get_cache_manager = lambda: cache
+    try:
+        assert data_upload._invalidate_cache_for_table("transactions", "guinness") == 0  # no Redis keys
+    finally:
+        data_upload.get_cache_manager = original
+    assert cache.get_frame("query:guinness:txns") is None
+    print("✅ upload invalidates L1")
+
+
+def test_stale_policies_and_early_refresh():
+    """Stale windows come from TTL classes; XFetch favours expensive values near expiry"""
+    cache = CacheManager(redis_url="")
+    assert cache.policy_for("universe:all:full").stale_ttl == CacheManager.TTL_UNIVERSE
+    assert cache.policy_for("query:guinness:abc", CacheManager.TTL_TRANSACTIONS).stale_ttl == 300
+    assert cache.policy_for("query:guinness:abc", 42).stale_ttl == 0
+
+    now = 1_000_000.0
+    assert FrameEntry(None, soft_expiry=now - 1).should_refresh(now)
+    assert not FrameEntry(None, soft_expiry=now + 60, delta=0.0).should_refresh(now)
+
+    cheap = sum(FrameEntry(None, now + 10, delta=0.1).should_refresh(now) for _ in range(1000))
+    costly = sum(FrameEntry(None, now + 10, delta=10.0).should_refresh(now) for _ in range(1000))
+    assert cheap < 5 and costly > 200
+    print("✅ stale policies / early refresh")
+
+
+if __name__ == "__main__":
+    test_lru_byte_bound()
+    test_invalidation_is_coherent()
+    test_upload_invalidates_l1_without_redis()
+    test_stale_policies_and_early_refresh()
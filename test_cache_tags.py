@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test cache tag extraction used for query cache invalidation
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from orca_mcp.tools.cache_manager import CacheManager
+
+
+class _FakeRedis:
+    """Just the commands the tag index uses (strings, sorted sets, pipelines)"""
+
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.ttls = {}
+        self.on_zscan = None  # called after each ZSCAN page (to interleave writes)
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        expired = [m for m, score in zset.items() if score <= high]
+        for member in expired:
+            del zset[member]
+        return len(expired)
+
+    def zscan(self, key, cursor, count=10):
+        page = sorted(self.zsets.get(key, {}).items())  # small sets come back in one page
+        if self.on_zscan:
+            self.on_zscan()
+        return 0, page
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    def ttl(self, key):
+        return self.ttls.get(key, -1)
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def unlink(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis, self.calls = redis, []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def _cache() -> CacheManager:
+    cache = CacheManager(enabled=False)
+    cache.enabled, cache.redis_client = True, _FakeRedis()
+    return cache
+
+
+def test_extract_tables():
+    """Tables are found in FROM/JOIN clauses; CTE names are ignored"""
+    sql = """
+    WITH holdings AS (
+        SELECT DISTINCT isin FROM transactions WHERE portfolio_id = 'wnbf'
+    ),
+    latest_prices AS (
+        SELECT isin, MAX(bpdate) as max_date FROM agg_analysis_data GROUP BY isin
+    )
+    SELECT * FROM holdings h
+    JOIN latest_prices l ON h.isin = l.isin
+    JOIN `future-footing-414610.portfolio_data.agg_analysis_data` a ON h.isin = a.isin
+    """
+    assert CacheManager.extract_tables(sql) == ["agg_analysis_data", "transactions"]
+
+    assert CacheManager.extract_tables("INSERT INTO staging_holdings (id) VALUES (1)") == ["staging_holdings"]
+    assert CacheManager.extract_tables("SELECT 1") == []
+    print("✅ extract_tables")
+
+
+def test_query_tags():
+    """Each cached query is tagged by client, table and client+table"""
+    cache = CacheManager(enabled=False)
+    tags = cache.query_tags("SELECT * FROM transactions", "guinness")
+    assert tags == ["client:guinness", "table:transactions", "client:guinness:table:transactions"]
+    print("✅ query_tags")
+
+
+def test_tag_sets_prune_expired_keys():
+    """Registering a key drops members whose TTL has passed"""
+    cache = _cache()
+    redis = cache.redis_client
+    redis.zadd("tags:table:transactions", {"query:old": time.time() - 1})
+    cache.set("query:new", [1], ttl=60, tags=["table:transactions"])
+    assert list(redis.zsets["tags:table:transactions"]) == ["query:new"]
+    assert redis.ttls["tags:table:transactions"] == 60
+    print("✅ tag sets pruned")
+
+
+def test_keys_registered_during_invalidation_stay_reachable():
+    """Invalidation only deregisters the keys it read; later writers stay indexed"""
+    cache = _cache()
+    redis = cache.redis_client
+    for i in range(3):
+        cache.set(f"query:{i}", [i], tags=["table:transactions"])
+
+    def write_during_scan():
+        redis.on_zscan = None
+        cache.set("query:late", ["late"], tags=["table:transactions"])
+
+    redis.on_zscan = write_during_scan
+    assert cache.invalidate_tags(["table:transactions"]) == 3
+    assert not any(f"query:{i}" in redis.values for i in range(3))
+
+    # Written after the tag set was read: still cached, still registered
+    assert list(redis.zsets["tags:table:transactions"]) == ["query:late"]
+    assert cache.invalidate_tags(["table:transactions"]) == 1
+    assert "query:late" not in redis.values
+    assert not redis.zsets["tags:table:transactions"]
+    print("✅ concurrent registration survives invalidation")
+
+
+if __name__ == "__main__":
+    test_extract_tables()
+    test_query_tags()
+    test_tag_sets_prune_expired_keys()
+    test_keys_registered_during_invalidation_stay_reachable()
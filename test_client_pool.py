@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test the pooled stdio sessions of OrcaClient against a tiny stand-in MCP server
+(no BigQuery / D1 needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import signal
+import asyncio
+import tempfile
+
+from orca_mcp import client
+from orca_mcp.client import OrcaClient, get_orca_client
+
+FAKE_SERVER = '''
+import os
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("fake-orca")
+
+
+@mcp.tool()
+def pid() -> dict:
+    return {"pid": os.getpid()}
+
+
+mcp.run()
+'''
+
+
+def _exited(pid: int) -> bool:
+    """Gone, or a zombie waiting to be reaped"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except FileNotFoundError:
+        return True
+
+
+def _wait_exited(pid: int, timeout: float = 15.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if _exited(pid):
+            return True
+        time.sleep(0.1)
+    return False
+
+
+async def _await_exited(pid: int, timeout: float = 15.0) -> bool:
+    """_wait_exited without blocking the loop (so the pool sees the child go)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if _exited(pid):
+            await asyncio.sleep(0.2)
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+
+def _client(tmp: str) -> OrcaClient:
+    path = os.path.join(tmp, "fake_server.py")
+    with open(path, "w") as f:
+        f.write(FAKE_SERVER)
+    return OrcaClient(client_id="test", server_path=path, server_url="", pool_size=1)
+
+
+def test_session_reuse_and_recovery():
+    """Calls share one warm child; a killed child is replaced transparently"""
+    with tempfile.TemporaryDirectory() as tmp:
+        orca = _client(tmp)
+
+        async def run():
+            try:
+                first = (await orca.call_tool("pid", {}))["pid"]
+                assert (await orca.call_tool("pid", {}))["pid"] == first
+                assert orca.pool_stats()["open"] == 1
+
+                os.kill(first, signal.SIGKILL)
+                assert await _await_exited(first)
+                replacement = (await orca.call_tool("pid", {}))["pid"]
+                assert replacement != first
+                assert orca.pool_stats()["open"] == 1
+                return replacement
+            finally:
+                await orca.aclose()
+
+        last = asyncio.run(run())
+        assert _wait_exited(last)
+    print("✅ session reuse and recovery")
+
+
+def test_loop_change_closes_old_pool():
+    """A new event loop (e.g. a Streamlit rerun) shuts down the old loop's children"""
+    with tempfile.TemporaryDirectory() as tmp:
+        orca = _client(tmp)
+        first_loop, second_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            first = first_loop.run_until_complete(orca.call_tool("pid", {}))["pid"]
+            second = second_loop.run_until_complete(orca.call_tool("pid", {}))["pid"]
+            assert second != first
+            assert _wait_exited(first), "old pool's server process leaked"
+            assert not _exited(second)
+            second_loop.run_until_complete(orca.aclose())
+            assert _wait_exited(second)
+        finally:
+            second_loop.close()
+            # The old loop is closed by the background close; wait for it
+            deadline = time.monotonic() + 15
+            while first_loop.is_running() and time.monotonic() < deadline:
+                time.sleep(0.1)
+            first_loop.close()
+    print("✅ loop change")
+
+
+def test_switching_client_closes_old_instance():
+    """get_orca_client for another client_id shuts down the previous client's children"""
+    with tempfile.TemporaryDirectory() as tmp:
+        loop = asyncio.new_event_loop()
+        client._orca_instance = _client(tmp)
+        try:
+            old = loop.run_until_complete(get_orca_client().call_tool("pid", {}))["pid"]
+            switched = get_orca_client("other")
+            assert switched.client_id == "other"
+            assert _wait_exited(old), "previous client's server process leaked"
+        finally:
+            client._orca_instance = None
+            deadline = time.monotonic() + 15
+            while loop.is_running() and time.monotonic() < deadline:
+                time.sleep(0.1)
+            loop.close()
+    print("✅ client switch")
+
+
+if __name__ == "__main__":
+    test_session_reuse_and_recovery()
+    test_loop_change_closes_old_pool()
+    test_switching_client_closes_old_instance()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test D1Client and its sync wrappers against a local fake Worker (no network needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from orca_mcp.tools import cloudflare_d1
+from orca_mcp.tools.cloudflare_d1 import D1Client, STAGING_COLUMNS
+
+
+class _Worker(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+    failed_once = set()
+    page_cap = None   # rows per /api/analytics page the Worker returns at most
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        _Worker.requests.append(("GET", url.path, query, self.headers.get("X-Client-ID")))
+        if url.path == "/api/holdings":
+            self._reply(200, {"holdings": [{"isin": "XS0000000001", "par_amount": 200000}]})
+        elif url.path == "/api/cashflows":
+            self._reply(200, {"cashflows": [{"date": "2027-01-15", "amount": 5000}]})
+        elif url.path == "/api/analytics":
+            offset, limit = int(query["offset"]), int(query["limit"])
+            limit = min(limit, _Worker.page_cap or limit)
+            rows = [{"isin": f"XS{i:010d}", "ytw": None if 5 <= i < 10 else 5.0 + i}
+                    for i in range(offset, min(offset + limit, 23))]
+            self._reply(200, {"analytics": rows})
+        elif url.path == "/api/staging/transactions":
+            self._reply(404, {"error": "none"})
+        else:
+            self._reply(500, {"error": "boom"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        _Worker.requests.append(("POST", self.path, payload, self.headers.get("X-Client-ID")))
+        first = payload["isins"][0]
+        if first.startswith("FLAKY") and first not in _Worker.failed_once:
+            _Worker.failed_once.add(first)
+            return self._reply(503, {"error": "overloaded"})
+        self._reply(200, {"analytics": [{"isin": i, "ytw": 5.0} for i in payload["isins"]
+                                        if not i.startswith("MISSING")]})
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Worker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_async_methods_run_concurrently():
+    """Independent endpoints can be gathered; error conventions are kept"""
+    server, base = _serve()
+    _Worker.requests.clear()
+    d1 = D1Client(base_url=base)
+
+    async def run():
+        return await asyncio.gather(
+            d1.get_holdings("wnbf"),
+            d1.get_cashflows("wnbf"),
+            d1.get_analytics_batch(["XS0000000001", "XS0000000002"]),
+            d1.get_holdings_summary("wnbf"),
+        )
+
+    try:
+        holdings, cashflows, analytics, summary = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert len(holdings) == 1
+    assert cashflows["payment_date"].dt.strftime("%Y-%m-%d").tolist() == ["2027-01-15"]
+    assert len(analytics) == 2
+    assert summary == {}  # 500 -> empty, as before
+    print("✅ concurrent D1Client calls")
+
+
+def test_sync_wrappers():
+    """Module functions route through D1Client, inside or outside an event loop"""
+    server, base = _serve()
+    _Worker.requests.clear()
+    os.environ["ORCA_URL"] = base
+    try:
+        holdings = cloudflare_d1.get_holdings("wnbf", staging_id=2)
+        staging = cloudflare_d1.get_staging_transactions("wnbf", client_id="guinness")
+
+        async def inside_loop():
+            return cloudflare_d1.get_analytics_batch(["XS0000000003"])
+
+        analytics = asyncio.run(inside_loop())
+    finally:
+        del os.environ["ORCA_URL"]
+        server.shutdown()
+
+    assert len(holdings) == 1
+    assert ("GET", "/api/holdings", {"portfolio_id": "wnbf", "staging_id": "2"}, None) in _Worker.requests
+    assert staging.empty and list(staging.columns) == STAGING_COLUMNS
+    assert _Worker.requests[1][3] == "guinness"
+    assert analytics["isin"].tolist() == ["XS0000000003"]
+    print("✅ sync wrappers")
+
+
+def test_analytics_batch_chunks_and_retries():
+    """Large ISIN lists are chunked, a 503 chunk is retried, missing ISINs reported"""
+    server, base = _serve()
+    _Worker.requests.clear()
+    cloudflare_d1.D1_RETRY_BACKOFF = 0.01
+    # 26 unique ISINs -> 3 chunks of 10; FLAKY leads the second chunk
+    isins = ([f"XS{i:010d}" for i in range(10)] + ["FLAKY0000001"]
+             + [f"XS{i:010d}" for i in range(10, 23)] + ["MISSING00001", "MISSING00002"])
+    try:
+        df = asyncio.run(D1Client(base_url=base).get_analytics_batch(isins + isins[:3], chunk_size=10))
+    finally:
+        server.shutdown()
+
+    posts = [r for r in _Worker.requests if r[0] == "POST"]
+    assert len(posts) == 4  # 3 chunks + 1 retry
+    assert len(df) == 24 and df["ytw"].dtype == "float64"
+    assert df.attrs["missing_isins"] == ["MISSING00001", "MISSING00002"]
+    print("✅ chunked analytics batch")
+
+
+def test_iter_analytics_prefetch():
+    """Pages stream in order with a fixed schema; an empty page ends the table"""
+    server, base = _serve()
+    _Worker.requests.clear()
+    os.environ["ORCA_URL"] = base
+    try:
+        async def stream():
+            pages = D1Client().iter_analytics(page_size=5, prefetch=3)
+            chunks = [chunk async for chunk in pages]
+            return pages, chunks
+
+        pages, chunks = asyncio.run(stream())
+        universe = cloudflare_d1.iter_analytics(page_size=5, prefetch=3).collect()
+    finally:
+        del os.environ["ORCA_URL"]
+        server.shutdown()
+
+    assert [len(c) for c in chunks] == [5, 5, 5, 5, 3]
+    assert pages.rows == 23 and pages.pages == 5
+    assert chunks[1]["ytw"].isna().all() and chunks[1]["ytw"].dtype == "float64"  # all-null page keeps the schema
+    assert len(universe) == 23 and universe["ytw"].dtype == "float64"
+    assert universe["isin"].is_unique
+    print("✅ iter_analytics")
+
+
+def test_iter_analytics_worker_cap():
+    """A Worker capping pages below page_size doesn't truncate the universe"""
+    server, base = _serve()
+    os.environ["ORCA_URL"] = base
+    _Worker.page_cap = 4
+    try:
+        stream = cloudflare_d1.iter_analytics(page_size=10, prefetch=3)
+        universe = stream.collect()
+    finally:
+        _Worker.page_cap = None
+        del os.environ["ORCA_URL"]
+        server.shutdown()
+
+    assert universe["isin"].tolist() == [f"XS{i:010d}" for i in range(23)]
+    assert stream.page_size <= 4
+    print("✅ iter_analytics under a Worker page cap")
+
+
+if __name__ == "__main__":
+    test_async_methods_run_concurrently()
+    test_sync_wrappers()
+    test_analytics_batch_chunks_and_retries()
+    test_iter_analytics_prefetch()
+    test_iter_analytics_worker_cap()
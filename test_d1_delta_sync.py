@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test content-hash delta sync against a local fake Worker (no network needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+from orca_mcp.tools import cloudflare_d1, d1_delta_sync
+from orca_mcp.tools.d1_delta_sync import ANALYTICS_SYNC, DeltaState, plan_delta
+
+
+class _Worker(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    posts = []
+    fail_isin = None
+    can_delete = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        _Worker.posts.append((self.path, payload))
+        rows = payload.get("analytics", payload.get("holdings", []))
+        if self.path.endswith("/delete") and not _Worker.can_delete:
+            status = 404
+        elif any(r.get("isin") == _Worker.fail_isin for r in rows):
+            status = 400  # not retried
+        else:
+            status = 200
+        body = json.dumps({"upserted": len(rows)}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _analytics(n, bumped=()):
+    return pd.DataFrame([{"isin": f"XS{i:010d}", "ytw": 5.0 + (0.1 if i in bumped else 0), "country": "Chile"}
+                         for i in range(n)])
+
+
+def _sync(df, **kwargs):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Worker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["ORCA_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    _Worker.posts.clear()
+    try:
+        return cloudflare_d1.sync_analytics_to_d1(df, **kwargs)
+    finally:
+        del os.environ["ORCA_URL"]
+        server.shutdown()
+
+
+def test_plan_delta():
+    """Inserts, updates, deletes and unchanged rows are told apart by hash"""
+    state = DeltaState(Path("unused.json"))
+    first = plan_delta(ANALYTICS_SYNC, _analytics(3).to_dict("records"), state)
+    state.hashes = {key: digest for key, digest, _, _ in first.upserts}
+
+    second = plan_delta(ANALYTICS_SYNC, _analytics(4, bumped={1}).iloc[1:].to_dict("records"), state)
+    assert (second.inserted, second.updated, second.unchanged) == (1, 1, 1)
+    assert second.deletes == ["XS0000000000"]
+    assert second.delete_keys() == [{"isin": "XS0000000000"}]
+    assert sum(len(c) for c in second.chunks(max_rows=1)) == 2
+    print("✅ plan_delta")
+
+
+def test_second_sync_sends_only_changes():
+    """Unchanged rows are not re-sent; failed chunks are re-sent next run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        d1_delta_sync.STATE_DIR = Path(tmp)
+        d1_delta_sync.CHUNK_ROWS = 4
+        cloudflare_d1.D1_RETRY_BACKOFF = 0.01
+        _Worker.can_delete, _Worker.fail_isin = True, None
+
+        first = _sync(_analytics(50))
+        assert first["inserted"] == 50 and first["bytes_saved"] == 0
+
+        # Row 0 dropped, row 7 changed, rows 50-51 new
+        report = _sync(_analytics(52, bumped={7}).iloc[1:])
+        upserted = [r["isin"] for path, body in _Worker.posts if path == "/api/analytics/sync" for r in body["analytics"]]
+        assert sorted(upserted) == ["XS0000000007", "XS0000000050", "XS0000000051"]
+        assert ("/api/analytics/delete", {"keys": [{"isin": "XS0000000000"}]}) in _Worker.posts
+        assert (report["inserted"], report["updated"], report["deleted"], report["unchanged"]) == (2, 1, 1, 48)
+        assert report["bytes_saved"] > 10 * report["bytes_sent"]
+
+        # Nothing changed: nothing sent
+        assert _sync(_analytics(52, bumped={7}).iloc[1:])["requests"] == 0 and not _Worker.posts
+
+        # A rejected chunk raises, but its rows go again on the next run
+        _Worker.fail_isin = "XS0000000060"
+        try:
+            _sync(_analytics(61, bumped={7}).iloc[1:])
+            raise AssertionError("expected RuntimeError")
+        except RuntimeError:
+            pass
+        _Worker.fail_isin = None
+        retry = _sync(_analytics(61, bumped={7}).iloc[1:])
+        assert retry["inserted"] == 1  # XS..52-59 were accepted in other chunks
+        d1_delta_sync.CHUNK_ROWS = 500
+    print("✅ delta sync")
+
+
+def test_clear_first_and_missing_delete_endpoint():
+    """clear_first re-sends everything; without a delete endpoint deletes stay pending"""
+    with tempfile.TemporaryDirectory() as tmp:
+        d1_delta_sync.STATE_DIR = Path(tmp)
+        _Worker.can_delete, _Worker.fail_isin = False, None
+
+        _sync(_analytics(5))
+        report = _sync(_analytics(5).iloc[1:])
+        assert report["deletes_pending"] == 1 and report["deleted"] == 0
+        assert _sync(_analytics(5).iloc[1:])["deletes_pending"] == 1  # still remembered
+
+        full = _sync(_analytics(5).iloc[1:], clear_first=True)
+        assert full["inserted"] == 4 and full["deletes_pending"] == 0
+        assert _Worker.posts[0][1]["clear_first"] is True
+    print("✅ clear_first and pending deletes")
+
+
+if __name__ == "__main__":
+    test_plan_delta()
+    test_second_sync_sends_only_changes()
+    test_clear_first_and_missing_delete_endpoint()
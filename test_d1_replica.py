@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the local SQLite D1 mirror, offline and against a fake Worker (no network needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from orca_mcp.tools import cloudflare_d1
+from orca_mcp.tools.cloudflare_d1 import D1Client
+from orca_mcp.tools.d1_replica import D1Replica, install_d1_replica
+
+ANALYTICS = [
+    {"isin": "XS0000000001", "ytw": 5.1, "country": "Chile", "updated_at": "2026-01-01T04:00:00Z"},
+    {"isin": "XS0000000002", "ytw": 6.2, "country": "Peru", "updated_at": "2026-01-01T04:00:00Z"},
+]
+
+
+class _Worker(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        _Worker.requests.append((url.path, query))
+        status, payload = 200, None
+        if url.path == "/api/holdings":
+            payload = {"holdings": [{"isin": "XS0000000001", "par_amount": 200000, "market_value": 199000.0}]}
+        elif url.path == "/watchlist":
+            payload = {"watchlist": [{"isin": "XS0000000001", "ticker": "CHILE"}]}
+        elif url.path == "/api/analytics":
+            since = query.get("updated_since", "")
+            payload = {"analytics": [r for r in ANALYTICS if r["updated_at"] > since][int(query["offset"]):]}
+        else:
+            status, payload = 404, {"error": "Not found"}
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_offline_stand_in():
+    """A seeded replica answers the D1 reads without any Worker"""
+    replica = D1Replica()
+    replica.load_records("holdings", [{"isin": "XS0000000001", "par_amount": 200000, "market_value": 199000}],
+                         scope=("wnbf", 1))
+    replica.load_records("analytics", ANALYTICS)
+    replica.load_records("price_history", [
+        {"isin": "XS0000000001", "price_date": "2025-12-31", "price": 98.0, "accrued_interest": 1.0},
+        {"isin": "XS0000000001", "price_date": "2026-01-30", "price": 99.5, "accrued_interest": 1.5},
+        {"isin": "XS0000000001", "date": "2026-02-02", "price": 101.0, "accrued_interest": 0.1},
+    ])
+    install_d1_replica(replica)
+    d1 = D1Client(base_url="http://127.0.0.1:9")  # nothing listens here
+    try:
+        holdings = cloudflare_d1.run_sync(d1.get_holdings("wnbf", 1))
+        analytics = cloudflare_d1.run_sync(d1.get_analytics_batch(["XS0000000002", "XS0000000404"]))
+        prices = cloudflare_d1.run_sync(d1.get_period_prices("2026-01-01", "2026-01-31"))
+    finally:
+        install_d1_replica(None)
+
+    assert holdings["market_value"].dtype == "float64" and "_portfolio_id" not in holdings.columns
+    assert analytics["isin"].tolist() == ["XS0000000002"]
+    assert analytics.attrs["missing_isins"] == ["XS0000000404"]
+    row = prices.iloc[0]
+    assert (row["begin_price"], row["end_price"], row["end_accrued"]) == (98.0, 99.5, 1.5)
+    assert str(row["end_date"].date()) == "2026-01-30"
+    print("✅ offline stand-in")
+
+
+def test_sync_write_through_and_staleness():
+    """Incremental pulls by updated_at; fetched holdings are reused; writes route reads to the Worker"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Worker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["GA10_PRICING_URL"] = base
+    _Worker.requests.clear()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        replica = D1Replica(D1Client(base_url=base), path=os.path.join(tmp, "d1.sqlite"))
+        install_d1_replica(replica)
+        d1 = D1Client(base_url=base)
+        try:
+            replica.sync()
+            assert replica.info()["tables"]["price_history"]["supported"] is False  # 404 remembered
+            assert replica._state("analytics")["watermark"] == "2026-01-01T04:00:00Z"
+            assert cloudflare_d1.run_sync(d1.get_watchlist())["ticker"].tolist() == ["CHILE"]
+
+            ANALYTICS.append({"isin": "XS0000000003", "ytw": 7.0, "updated_at": "2026-01-02T04:00:00Z"})
+            replica.sync()
+            assert ("/api/analytics", {"limit": "5000", "offset": "0",
+                                       "updated_since": "2026-01-01T04:00:00Z"}) in _Worker.requests
+            assert len(cloudflare_d1.run_sync(d1.get_analytics_batch(["XS0000000001", "XS0000000003"]))) == 2
+
+            # Holdings: Worker once, then the mirror
+            for _ in range(3):
+                assert len(cloudflare_d1.run_sync(d1.get_holdings("wnbf", 2))) == 1
+            assert [p for p, _ in _Worker.requests].count("/api/holdings") == 1
+
+            # A D1 write makes the scope stale until it is fetched again
+            replica.mark_dirty("holdings", ("wnbf", 2))
+            assert replica.read("holdings", ("wnbf", 2)) is None
+            cloudflare_d1.run_sync(d1.get_holdings("wnbf", 2))
+            assert replica.read("holdings", ("wnbf", 2)) is not None
+        finally:
+            install_d1_replica(None)
+            del os.environ["GA10_PRICING_URL"]
+            server.shutdown()
+            ANALYTICS.pop()
+    print("✅ sync, write-through and staleness")
+
+
+if __name__ == "__main__":
+    test_offline_stand_in()
+    test_sync_write_through_and_staleness()
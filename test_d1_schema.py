@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test typed frames built from D1 rows (no network needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import asyncio
+
+import pandas as pd
+
+from orca_mcp.tools.d1_schema import frame_to_records, loads, records_to_frame
+from orca_mcp.tools.cloudflare_d1 import cashflows_frame
+from orca_mcp.tools.portfolio_bundle import cash_from_transactions
+
+
+def test_declared_columns_are_typed():
+    """Numbers, dates and labels land in float64/datetime64/category; nulls included"""
+    rows = loads(b'''[
+        {"transaction_id": 1, "transaction_date": "2025-01-15", "transaction_type": "INITIAL",
+         "status": "settled", "market_value": 1000000, "settlement_amount": null, "notes": "seed"},
+        {"transaction_id": 2, "transaction_date": "2025-02-03T10:00:00Z", "transaction_type": "BUY",
+         "status": "settled", "market_value": "900000.5", "settlement_amount": null, "notes": null},
+        {"transaction_id": 3, "transaction_date": "", "transaction_type": "BUY",
+         "status": "staging", "market_value": 50000, "settlement_amount": null, "extra": 7}
+    ]''')
+    df = records_to_frame(rows, "transactions")
+
+    assert list(df.columns) == ["transaction_id", "transaction_date", "transaction_type", "status",
+                                "market_value", "settlement_amount", "notes", "extra"]
+    assert df["transaction_id"].dtype == "int64"
+    assert df["market_value"].tolist() == [1000000.0, 900000.5, 50000.0]
+    assert df["settlement_amount"].dtype == "float64" and df["settlement_amount"].isna().all()
+    assert str(df["transaction_date"].dtype) == "datetime64[ns]"
+    assert df["transaction_date"][1] == pd.Timestamp("2025-02-03 10:00") and pd.isna(df["transaction_date"][2])
+    assert df["transaction_type"].dtype == "category"
+    assert df["extra"].tolist()[2] == 7  # undeclared columns still inferred
+    assert cash_from_transactions(df) == 1000000.0 - 900000.5
+    print("✅ typed transactions")
+
+
+def test_cashflows_and_empty():
+    """Cashflow dates are real datetimes (payment_date alias kept); no rows -> empty frame"""
+    df = cashflows_frame([{"date": "2027-01-15", "amount": 5000, "payment_type": "COUPON"}])
+    assert df["payment_date"].dt.strftime("%Y-%m-%d").tolist() == ["2027-01-15"]
+    assert df["amount"].dtype == "float64"
+    assert records_to_frame([], "holdings").empty
+    print("✅ cashflows and empty")
+
+
+def test_transactions_tool_dates():
+    """Both servers print transaction dates as the Worker sent them (no time part, null for missing)"""
+    from orca_mcp import server, mcp_sse_server
+    import tools.cloudflare_d1 as d1  # the module the tool handlers import from
+
+    df = records_to_frame([
+        {"transaction_id": 1, "transaction_date": "2025-01-15", "settlement_date": None, "status": "settled"},
+    ], "transactions")
+    assert frame_to_records(df) == [
+        {"transaction_id": 1, "transaction_date": "2025-01-15", "settlement_date": None, "status": "settled"}
+    ]
+
+    async def transactions_async(portfolio_id, client_id=None):
+        return df
+
+    originals = d1.get_transactions, d1.get_transactions_async
+    d1.get_transactions, d1.get_transactions_async = lambda portfolio_id, client_id=None: df, transactions_async
+    try:
+        for handler in (server.call_tool, mcp_sse_server.call_tool):
+            content = asyncio.run(handler("get_client_transactions", {"portfolio_id": "wnbf"}))
+            rows = json.loads(content[0].text)
+            assert rows[0]["transaction_date"] == "2025-01-15", (handler.__module__, rows)
+            assert rows[0]["settlement_date"] is None
+    finally:
+        d1.get_transactions, d1.get_transactions_async = originals
+    print("✅ transaction tool dates")
+
+
+if __name__ == "__main__":
+    test_declared_columns_are_typed()
+    test_cashflows_and_empty()
+    test_transactions_tool_dates()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test Arrow IPC serialization of cached DataFrames
+"""
+
+import sys
+import os
+import datetime
+from decimal import Decimal
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from orca_mcp.tools.frame_codec import (
+    FrameCodecError, encode_frame, decode_frame, is_frame_payload, MAGIC
+)
+
+
+def test_round_trip_preserves_types():
+    """Dates, Decimals, timestamps and NaN survive the cache unchanged"""
+    df = pd.DataFrame({
+        "isin": ["XS1234567890", "US9876543210"],
+        "bpdate": [datetime.date(2025, 11, 20), datetime.date(2025, 11, 21)],
+        "maturity": pd.to_datetime(["2031-03-15", "2045-06-01"]),
+        "coupon": [Decimal("4.125"), Decimal("6.750")],
+        "ytw": [5.43, np.nan],
+    })
+
+    for compression in (None, "zstd"):
+        payload = encode_frame(df, compression=compression)
+        assert is_frame_payload(payload)
+        out = decode_frame(payload)
+        assert out.dtypes.equals(df.dtypes)
+        assert out.equals(df)
+    print("✅ round trip")
+
+
+def test_rejects_foreign_payloads():
+    """Legacy JSON and future format versions are not decoded as frames"""
+    assert not is_frame_payload(b'[{"isin": "XS1234567890"}]')
+
+    payload = bytearray(encode_frame(pd.DataFrame({"a": [1]})))
+    payload[len(MAGIC)] = 99
+    try:
+        decode_frame(bytes(payload))
+        assert False, "expected FrameCodecError"
+    except FrameCodecError:
+        pass
+    print("✅ foreign payloads rejected")
+
+
+if __name__ == "__main__":
+    test_round_trip_preserves_types()
+    test_rejects_foreign_payloads()
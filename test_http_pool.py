@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the pooled HTTP clients against a local server (no network needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from orca_mcp.tools import http_pool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = set()
+
+    def do_GET(self):
+        _Handler.connections.add(self.client_address)
+        body = json.dumps({"path": self.path, "ua": self.headers.get("User-Agent")}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_sync_pool_reuses_connection():
+    """Repeated calls share one keep-alive connection and the Orca User-Agent"""
+    server, base = _serve()
+    _Handler.connections.clear()
+    try:
+        for _ in range(5):
+            response = http_pool.get_http_client().get(f"{base}/api/holdings", timeout=5)
+        assert response.json()["ua"] == "Orca-MCP/3.2"
+        assert len(_Handler.connections) == 1
+        assert http_pool.get_http_client() is http_pool.get_http_client()
+    finally:
+        http_pool.close_http_clients()
+        server.shutdown()
+    print("✅ sync pool")
+
+
+def test_run_sync_shares_one_loop():
+    """run_sync works with or without a running loop and reuses the runner's pool"""
+    server, base = _serve()
+    _Handler.connections.clear()
+
+    async def fetch(path):
+        response = await http_pool.get_async_http_client().get(f"{base}{path}")
+        return response.json()
+
+    async def from_async_code():
+        return http_pool.run_sync(fetch("/inside-loop"))
+
+    try:
+        assert http_pool.run_sync(fetch("/a"))["path"] == "/a"
+        assert asyncio.run(from_async_code())["path"] == "/inside-loop"
+        assert len(_Handler.connections) == 1
+    finally:
+        http_pool.close_http_clients()
+        server.shutdown()
+    print("✅ run_sync")
+
+
+def test_async_pool_per_loop():
+    """Each event loop gets its own client; shutdown closes it"""
+    server, base = _serve()
+
+    async def fetch():
+        client = http_pool.get_async_http_client()
+        assert client is http_pool.get_async_http_client()
+        response = await client.get(f"{base}/api/transactions")
+        await http_pool.aclose_http_clients()
+        return client, response.json()
+
+    try:
+        first, data = asyncio.run(fetch())
+        second, _ = asyncio.run(fetch())
+        assert data["path"] == "/api/transactions"
+        assert first is not second
+        assert first.is_closed and second.is_closed
+    finally:
+        server.shutdown()
+    print("✅ async pool per loop")
+
+
+if __name__ == "__main__":
+    test_sync_pool_reuses_connection()
+    test_run_sync_shares_one_loop()
+    test_async_pool_per_loop()
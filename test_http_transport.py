@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the HTTP tool endpoints (/call, /call/batch) and OrcaClient's keep-alive
+transport (no BigQuery / D1 needed: tools are stubbed at call_tool)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+from orca_mcp import mcp_sse_server
+from orca_mcp.client import OrcaClient, _HttpTransport
+from orca_mcp.mcp_sse_server import _tool_result_payload
+
+
+async def _fake_call_tool(name, args):
+    if name == "boom":
+        raise ValueError("tool failed")
+    if name == "text":
+        return [SimpleNamespace(text="plain answer")]
+    return [SimpleNamespace(text=f'{{"tool": "{name}", "portfolio_id": "{args.get("portfolio_id")}"}}')]
+
+
+def test_tool_result_payload():
+    """JSON text is parsed, other text is wrapped, empty results are errors"""
+    assert _tool_result_payload([SimpleNamespace(text='{"a": 1}')]) == {"a": 1}
+    assert _tool_result_payload([SimpleNamespace(text="not json")]) == {"result": "not json"}
+    assert _tool_result_payload([]) == {"error": "No result"}
+    print("✅ tool result payload")
+
+
+def test_call_batch():
+    """Results come back in request order; a failing call only fills its own slot"""
+    original = mcp_sse_server.call_tool
+    mcp_sse_server.call_tool = _fake_call_tool
+
+    async def post():
+        transport = httpx.ASGITransport(app=mcp_sse_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://orca") as client:
+            batch = await client.post("/call/batch", json={"calls": [
+                {"tool": "get_client_holdings", "args": {"portfolio_id": "wnbf"}},
+                {"tool": "boom"},
+                {"tool": "text", "args": {}},
+            ]})
+            single = await client.post("/call", json={"tool": "get_client_holdings", "args": {"portfolio_id": "x"}})
+            return batch, single
+
+    try:
+        response, single = asyncio.run(post())
+    finally:
+        mcp_sse_server.call_tool = original
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 3
+    assert body["results"] == [
+        {"tool": "get_client_holdings", "portfolio_id": "wnbf"},
+        {"error": "tool failed"},
+        {"result": "plain answer"},
+    ]
+    assert single.json() == {"tool": "get_client_holdings", "portfolio_id": "x"}  # same shape as a batch slot
+    print("✅ /call/batch")
+
+
+def test_loop_change_closes_old_http_client():
+    """A new event loop closes the previous loop's keep-alive client"""
+    orca = OrcaClient(client_id="test", server_url="http://127.0.0.1:9")
+    first_loop, second_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+
+    async def transport():
+        return orca._get_http()
+
+    try:
+        first = first_loop.run_until_complete(transport())
+        second = second_loop.run_until_complete(transport())
+        assert second is not first
+        deadline = time.monotonic() + 5
+        while not first.client.is_closed and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert first.client.is_closed and not second.client.is_closed
+        second_loop.run_until_complete(orca.aclose())
+    finally:
+        while first_loop.is_running():
+            time.sleep(0.05)
+        first_loop.close()
+        second_loop.close()
+    print("✅ HTTP transport loop change")
+
+
+def test_call_batch_error_body():
+    """A whole-batch failure raises with the server's message instead of a KeyError"""
+    failing = httpx.MockTransport(lambda request: httpx.Response(500, json={"error": "database unavailable"}))
+    validating = httpx.ASGITransport(app=mcp_sse_server.app)  # the real 422 {"detail": [...]} body
+
+    async def post(mock):
+        transport = _HttpTransport("http://orca")
+        await transport.client.aclose()
+        transport.client = httpx.AsyncClient(transport=mock, base_url="http://orca")
+        try:
+            return await transport.call_many([{"args": {}}])
+        finally:
+            await transport.close()
+
+    for mock, expected in ((failing, "(500): database unavailable"), (validating, "(422): [{")):
+        try:
+            asyncio.run(post(mock))
+            raise AssertionError("expected RuntimeError")
+        except RuntimeError as e:
+            assert str(e).startswith(f"Orca /call/batch failed {expected}"), e
+    print("✅ /call/batch error body")
+
+
+if __name__ == "__main__":
+    test_tool_result_payload()
+    test_call_batch()
+    test_call_batch_error_body()
+    test_loop_change_closes_old_http_client()
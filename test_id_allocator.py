@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test block-reserved transaction ids (no Redis / BigQuery needed)
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orca_mcp.tools import id_allocator
+from orca_mcp.tools.id_allocator import IdAllocator
+
+
+class _FakeRedis:
+    """Just the sequence commands IdAllocator uses (the Lua reserve script, SET NX)"""
+
+    def __init__(self):
+        self.values = {}
+
+    def eval(self, script, numkeys, key, floor, count):
+        if key not in self.values:
+            return -1
+        self.values[key] = max(self.values[key], int(floor)) + int(count)
+        return self.values[key]
+
+    def set(self, key, value, nx=False):
+        if not (nx and key in self.values):
+            self.values[key] = int(value)
+
+
+class _Cache:
+    enabled = True
+
+    def __init__(self):
+        self.redis_client = _FakeRedis()
+
+
+def make_allocator(max_id: int = 84, block_size: int = 20) -> IdAllocator:
+    allocator = IdAllocator(client_id="test", block_size=block_size)
+    allocator._max_id = lambda: max_id  # table MAX(transaction_id), normally one BigQuery scan
+    return allocator
+
+
+def test_blocks_from_redis_counter():
+    """With Redis, one reservation serves a whole block; the counter is seeded past the table"""
+    cache = _Cache()
+    original = id_allocator.get_cache_manager
+    id_allocator.get_cache_manager = lambda: cache
+    try:
+        allocator = make_allocator()
+        seed = 84 + id_allocator.RESEED_GAP
+        assert allocator.allocate() == [seed + 1]
+        assert allocator.allocate(3) == [seed + 2, seed + 3, seed + 4]
+        assert allocator.available() == 16
+
+        bulk = allocator.allocate(30)  # larger than a block: one reservation
+        assert bulk == list(range(seed + 5, seed + 35))
+        assert allocator.stats["blocks"] == 2
+    finally:
+        id_allocator.get_cache_manager = original
+    print("✅ blocks")
+
+
+def test_concurrent_allocations_are_unique():
+    """Threads allocating at once never share an id"""
+    allocator = make_allocator(block_size=7)
+    results = []
+
+    def worker():
+        for _ in range(20):
+            results.extend(allocator.allocate(3))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == len(set(results)) == 8 * 20 * 3
+    assert min(results) == 85
+    print("✅ concurrent uniqueness")
+
+
+def test_without_redis_each_allocation_rereads_max():
+    """Two processes (no shared counter) see each other's inserts between calls"""
+    table = {"max": 84}
+
+    def process():
+        allocator = IdAllocator(client_id="test")
+        allocator._max_id = lambda: table["max"]
+        return allocator
+
+    a, b = process(), process()
+    first = a.allocate(2)
+    table["max"] = max(first)           # a inserts its rows
+    second = b.allocate()
+    table["max"] = max(second)          # b inserts
+    third = a.allocate()
+
+    assert (first, second, third) == ([85, 86], [87], [88])
+    assert a.available() == 0           # nothing reserved ahead without Redis
+    print("✅ no-Redis allocation across processes")
+
+
+if __name__ == "__main__":
+    test_blocks_from_redis_counter()
+    test_concurrent_allocations_are_unique()
+    test_without_redis_each_allocation_rereads_max()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test the local DuckDB replica (no BigQuery needed; skipped without duckdb)
+"""
+
+import sys
+import os
+import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from orca_mcp.tools import local_replica, transactions
+from orca_mcp.tools.local_replica import LocalReplica, DUCKDB_AVAILABLE, install_local_replica
+
+
+def make_transactions() -> pd.DataFrame:
+    return pd.DataFrame({
+        "transaction_id": [1, 2, 3],
+        "portfolio_id": ["wnbf"] * 3,
+        "isin": ["MX0000000001", "BR0000000001", "CL0000000001"],
+        "transaction_type": ["BUY", "BUY", "BUY"],
+        "market_value": [100.0, 200.0, 50.0],
+        "status": ["settled", "settled", "staging"],
+        "transaction_date": [datetime.date(2025, 11, 20)] * 3,
+    })
+
+
+def test_offline_replica_routing():
+    """Seeded replicas answer reads over their tables and nothing else"""
+    if not DUCKDB_AVAILABLE:
+        print("⏭️  duckdb not installed")
+        return
+    replica = LocalReplica("guinness")
+    replica.load_frame("transactions", make_transactions())
+
+    df = replica.try_query("""
+        SELECT status, SUM(market_value) AS total
+        FROM transactions WHERE portfolio_id = 'wnbf'
+        GROUP BY status ORDER BY status
+    """)
+    assert df["total"].tolist() == [300.0, 50.0]
+    assert isinstance(replica.try_query("SELECT transaction_date FROM transactions").iloc[0, 0], datetime.date)
+
+    assert replica.try_query("SELECT * FROM portfolio_summary") is None           # not replicated
+    assert replica.try_query("DELETE FROM transactions WHERE status = 'staging'") is None  # not a read
+    assert replica.try_query("SELECT SAFE_DIVIDE(1, 0) FROM transactions") is None  # BigQuery-only SQL
+    print("✅ offline routing")
+
+
+def test_incremental_sync():
+    """New ids, edited staging rows and deletes all reach the replica"""
+    if not DUCKDB_AVAILABLE:
+        print("⏭️  duckdb not installed")
+        return
+    remote = LocalReplica("remote")
+    remote.load_frame("transactions", make_transactions())
+    fetched = []
+
+    def fetch(sql):
+        fetched.append(sql)
+        return remote.query(sql)
+
+    replica = LocalReplica("guinness", fetch=fetch, tables=["transactions"])
+    replica.sync()
+    assert replica.is_fresh("transactions") and replica.stats["full_loads"] == 1
+
+    # Staging row settled, a new staging row added
+    updated = make_transactions()
+    updated.loc[2, "status"] = "settled"
+    updated.loc[3] = [4, "wnbf", "PE0000000001", "SELL", 75.0, "staging", datetime.date(2025, 11, 21)]
+    remote.load_frame("transactions", updated)
+
+    replica.mark_dirty("transactions")
+    assert not replica.is_fresh("transactions")
+    fetched.clear()
+    replica.sync()
+    assert replica.stats["full_loads"] == 1  # incremental
+    assert "transaction_id > 3" in fetched[0]
+    df = replica.query("SELECT transaction_id, status FROM transactions ORDER BY transaction_id")
+    assert df["status"].tolist() == ["settled", "settled", "settled", "staging"]
+
+    # A settled row deleted remotely: caught by the row-count check
+    remote.load_frame("transactions", updated[updated["transaction_id"] != 1])
+    replica.sync()
+    assert replica.query("SELECT COUNT(*) AS n FROM transactions")["n"].iloc[0] == 3
+    assert replica.info()["tables"]["transactions"]["watermark"] == "4"
+    print("✅ incremental sync")
+
+
+def test_update_of_settled_row_reaches_replica():
+    """update_transaction forces a reload: the edit moves neither watermark nor row count"""
+    if not DUCKDB_AVAILABLE:
+        print("⏭️  duckdb not installed")
+        return
+    remote = LocalReplica("remote")
+    remote.load_frame("transactions", make_transactions())
+
+    class _BigQuery:
+        def query(self, sql):
+            # UPDATE `project.dataset.transactions` SET ... -> the fake remote table
+            remote.query(sql.replace("`future-footing-414610.portfolio_data.transactions`", "transactions"))
+            return self
+
+        def result(self):
+            return None
+
+    replica = LocalReplica("guinness", fetch=remote.query, tables=["transactions"])
+    replica.sync()
+    install_local_replica(replica)
+    original = transactions.get_bigquery_client
+    transactions.get_bigquery_client = lambda project: _BigQuery()
+    try:
+        result = transactions.update_transaction(1, {"market_value": 125.0}, client_id="guinness")
+        assert result["success"], result
+        assert not replica.is_fresh("transactions")  # reads go to BigQuery until synced
+
+        replica.sync()
+        assert replica.stats["full_loads"] == 2
+        df = replica.try_query("SELECT market_value FROM transactions WHERE transaction_id = 1")
+        assert df["market_value"].iloc[0] == 125.0
+    finally:
+        transactions.get_bigquery_client = original
+        local_replica._replicas.pop("guinness", None)
+    print("✅ settled-row update")
+
+
+if __name__ == "__main__":
+    test_offline_replica_routing()
+    test_incremental_sync()
+    test_update_of_settled_row_reaches_replica()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test get_portfolio_bundle against a local fake Worker (no network needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from orca_mcp.tools import portfolio_bundle
+from orca_mcp.tools.portfolio_bundle import get_portfolio_bundle, cash_from_transactions
+
+HOLDINGS = [{"isin": "XS0000000001", "market_value": 900000.0, "country": "Chile"}]
+TRANSACTIONS = [
+    {"transaction_type": "INITIAL", "status": "settled", "market_value": 1000000.0},
+    {"transaction_type": "BUY", "status": "settled", "market_value": 900000.0, "settlement_amount": 905000.0},
+    {"transaction_type": "BUY", "status": "staging", "market_value": 50000.0},
+]
+
+
+class _Worker(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    paths = []
+    bundle_supported = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        _Worker.paths.append(url.path)
+        status, payload = 200, None
+        if url.path == "/api/portfolio/bundle":
+            if _Worker.bundle_supported:
+                parts = query["parts"].split(",")
+                payload = {p: v for p, v in (("holdings", HOLDINGS), ("summary", {"cash": 0})) if p in parts}
+            else:
+                status, payload = 404, {"error": "Not found"}
+        elif url.path == "/api/holdings":
+            payload = {"holdings": HOLDINGS}
+        elif url.path == "/api/holdings/summary":
+            payload = {"cash": 0}
+        elif url.path == "/api/transactions":
+            payload = {"transactions": TRANSACTIONS}
+        elif url.path == "/api/cashflows":
+            payload = {"cashflows": [{"date": "2027-01-15", "amount": 5000.0}]}
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _run(coro, bundle_supported):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Worker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["ORCA_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    _Worker.paths.clear()
+    _Worker.bundle_supported = bundle_supported
+    portfolio_bundle._bundle_unsupported_until = 0.0
+    try:
+        return asyncio.run(coro())
+    finally:
+        del os.environ["ORCA_URL"]
+        server.shutdown()
+
+
+def test_cash_from_transactions():
+    """Settled INITIAL minus settled BUY at settlement amount; staging ignored"""
+    assert cash_from_transactions(pd.DataFrame(TRANSACTIONS)) == 95000.0
+    assert cash_from_transactions(pd.DataFrame()) == 0.0
+    print("✅ cash from transactions")
+
+
+def test_bundle_endpoint_then_cash_fallback():
+    """One bundle call; transactions only because the summary has no cash"""
+    bundle = _run(lambda: get_portfolio_bundle("wnbf", ["holdings", "summary"]), bundle_supported=True)
+    assert bundle.source == "bundle"
+    assert _Worker.paths == ["/api/portfolio/bundle", "/api/transactions"]
+    assert bundle.bond_value == 900000.0
+    assert bundle.cash_balance == 95000.0
+    print("✅ bundle endpoint")
+
+
+def test_fan_out_when_worker_lacks_endpoint():
+    """404 falls back to concurrent calls and stops asking the Worker"""
+    async def twice():
+        first = await get_portfolio_bundle("wnbf", ["holdings", "summary"], cash_fallback=False)
+        second = await get_portfolio_bundle("wnbf", ["holdings", "cashflows"], cash_fallback=False)
+        return first, second
+
+    first, second = _run(twice, bundle_supported=False)
+    assert first.source == second.source == "fanout"
+    assert _Worker.paths.count("/api/portfolio/bundle") == 1
+    assert sorted(_Worker.paths[1:3]) == ["/api/holdings", "/api/holdings/summary"]
+    assert len(first.holdings) == 1 and first.transactions is None
+    assert second.cashflows["payment_date"].dt.strftime("%Y-%m-%d").tolist() == ["2027-01-15"]
+    print("✅ fan-out fallback")
+
+
+if __name__ == "__main__":
+    test_cash_from_transactions()
+    test_bundle_endpoint_then_cash_fallback()
+    test_fan_out_when_worker_lacks_endpoint()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the single-scan portfolio summary (runs the SQL on DuckDB; no BigQuery needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from orca_mcp.tools.portfolio_summary import summary_sql, refresh_sql, missing_portfolios
+from orca_mcp.tools.local_replica import LocalReplica, DUCKDB_AVAILABLE
+
+
+def make_transactions() -> pd.DataFrame:
+    rows = [
+        # id, portfolio, type, ticker, status, market_value
+        (1, "wnbf", "INITIAL", "CASH", "settled", 1000.0),
+        (2, "wnbf", "BUY", "PEMEX", "settled", 300.0),
+        (3, "wnbf", "BUY", "CHILE", "settled", 200.0),
+        (4, "wnbf", "BUY", "MEX", "staging", 150.0),
+        (5, "wnbf", "SELL", "CHILE", "staging", 100.0),
+        (6, "alt", "INITIAL", "CASH", "settled", 500.0),
+        (7, "other", "BUY", "BRAZIL", "settled", 999.0),
+    ]
+    return pd.DataFrame(rows, columns=["transaction_id", "portfolio_id", "transaction_type",
+                                       "ticker", "status", "market_value"])
+
+
+def test_single_scan_matches_per_metric_queries():
+    """One grouped scan gives the numbers the six separate queries gave"""
+    if not DUCKDB_AVAILABLE:
+        print("⏭️  duckdb not installed")
+        return
+    db = LocalReplica("guinness")
+    db.load_frame("transactions", make_transactions())
+
+    df = db.query(summary_sql(["wnbf", "alt", "empty"]) + " ORDER BY portfolio_id")
+    assert df["portfolio_id"].tolist() == ["alt", "wnbf"]
+
+    wnbf = df.set_index("portfolio_id").loc["wnbf"]
+    assert wnbf["starting_cash"] == 1000.0
+    assert wnbf["settled_bonds_value"] == 500.0 and wnbf["num_settled_bonds"] == 2
+    assert wnbf["staging_buy_value"] == 150.0 and wnbf["staging_sell_value"] == 100.0
+    assert wnbf["num_staging_transactions"] == 2 and wnbf["last_transaction_id"] == 5
+    assert wnbf["settled_cash"] == 500.0 and wnbf["total_cash"] == 450.0
+
+    alt = df.set_index("portfolio_id").loc["alt"]
+    assert alt["settled_bonds_value"] == 0 and alt["total_cash"] == 500.0
+
+    assert missing_portfolios(["wnbf", "alt", "empty"], df) == ["empty"]
+    print("✅ single scan")
+
+
+def test_refresh_is_one_script():
+    """MERGE and read-back go out as one statement batch; ids are validated"""
+    sql = refresh_sql(["wnbf", "alt"])
+    assert sql.count("MERGE portfolio_summary") == 1
+    assert sql.count("FROM transactions") == 1
+    assert "WHEN NOT MATCHED THEN" in sql
+
+    try:
+        refresh_sql(["wnbf'; DROP TABLE transactions; --"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✅ refresh script")
+
+
+if __name__ == "__main__":
+    test_single_scan_matches_per_metric_queries()
+    test_refresh_is_one_script()
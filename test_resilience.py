@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test retries, hedging and circuit breakers against a local fake Worker (no network needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from orca_mcp.tools import cloudflare_d1, resilience
+from orca_mcp.tools.cloudflare_d1 import D1Client
+from orca_mcp.tools.resilience import CircuitOpenError, endpoint_name, get_endpoint_health, reset_endpoints
+
+
+class _Worker(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = []
+    fail_next = 0       # answer this many requests with 503
+    slow_next = 0       # delay this many requests by 1s
+
+    def _reply(self):
+        path = urlparse(self.path).path
+        _Worker.hits.append((self.command, path))
+        if _Worker.slow_next > 0:
+            _Worker.slow_next -= 1
+            time.sleep(1.0)
+        if _Worker.fail_next > 0:
+            _Worker.fail_next -= 1
+            status, payload = 503, {"error": "overloaded"}
+        else:
+            status, payload = 200, {"holdings": [{"isin": "XS0000000001", "market_value": 100.0}]}
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Worker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _Worker.hits.clear()
+    _Worker.fail_next = _Worker.slow_next = 0
+    reset_endpoints()
+    cloudflare_d1.D1_RETRY_BACKOFF = 0.01
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_endpoint_name():
+    """Ids in paths share one breaker"""
+    assert endpoint_name("patch", "https://w.dev/api/transactions/42?x=1") == "PATCH w.dev/api/transactions/{id}"
+    assert endpoint_name("GET", "https://w.dev/api/holdings") == "GET w.dev/api/holdings"
+    print("✅ endpoint names")
+
+
+def test_retries_only_idempotent_calls():
+    """GETs ride out 503s; a failed POST is not repeated"""
+    server, base = _serve()
+    d1 = D1Client(base_url=base)
+    try:
+        _Worker.fail_next = 2
+        assert len(cloudflare_d1.run_sync(d1.get_holdings("wnbf"))) == 1
+        assert len(_Worker.hits) == 3
+
+        _Worker.hits.clear()
+        _Worker.fail_next = 1
+        try:
+            cloudflare_d1.run_sync(d1._request("POST", f"{base}/api/holdings/sync", json_body={}))
+            raise AssertionError("expected D1HTTPError")
+        except cloudflare_d1.D1HTTPError as e:
+            assert e.code == 503
+        assert len(_Worker.hits) == 1
+    finally:
+        server.shutdown()
+
+    health = get_endpoint_health()[endpoint_name("GET", f"{base}/api/holdings")]
+    assert (health["retries"], health["successes"], health["state"]) == (2, 1, "closed")
+    assert health["latency_ms"]["samples"] == 1
+    print("✅ jittered retries")
+
+
+def test_hedge_after_p95():
+    """A request stuck past the endpoint's p95 is raced by a duplicate"""
+    server, base = _serve()
+    d1 = D1Client(base_url=base)
+    resilience.HEDGE_MIN_SAMPLES = 5
+    try:
+        for _ in range(10):
+            cloudflare_d1.run_sync(d1.get_holdings("wnbf"))
+        _Worker.hits.clear()
+        _Worker.slow_next = 1
+
+        started = time.perf_counter()
+        assert len(cloudflare_d1.run_sync(d1.get_holdings("wnbf"))) == 1
+        assert time.perf_counter() - started < 0.8
+        assert len(_Worker.hits) == 2
+    finally:
+        resilience.HEDGE_MIN_SAMPLES = 20
+        server.shutdown()
+
+    health = get_endpoint_health()[endpoint_name("GET", f"{base}/api/holdings")]
+    assert (health["hedges"], health["hedge_wins"]) == (1, 1)
+    print("✅ hedged request")
+
+
+def test_breaker_fails_fast_and_recovers():
+    """Consecutive failures open the breaker; after the cooldown one probe closes it"""
+    server, base = _serve()
+    d1 = D1Client(base_url=base)
+    resilience.BREAKER_FAILURES = 3
+    try:
+        _Worker.fail_next = 100
+        first = cloudflare_d1.run_sync(d1.get_holdings("wnbf"))  # 3 failed attempts
+        assert first.empty and first.attrs["error"].startswith("503")
+        name = endpoint_name("GET", f"{base}/api/holdings")
+        assert get_endpoint_health()[name]["state"] == "open"
+
+        _Worker.hits.clear()
+        second = cloudflare_d1.run_sync(d1.get_holdings("wnbf"))
+        assert second.empty and "Circuit open" in second.attrs["error"]
+        assert not _Worker.hits  # failed fast, Worker untouched
+        assert get_endpoint_health()[name]["rejected"] == 1
+
+        _Worker.fail_next = 0
+        resilience.get_endpoint(name).opened_at -= resilience.BREAKER_COOLDOWN
+        assert len(cloudflare_d1.run_sync(d1.get_holdings("wnbf"))) == 1
+        assert get_endpoint_health()[name]["state"] == "closed"
+    finally:
+        resilience.BREAKER_FAILURES = 5
+        server.shutdown()
+
+    try:
+        resilience.call_sync("svc", lambda: 1 / 0, idempotent=True, retryable=lambda e: False)
+    except ZeroDivisionError:
+        pass
+    assert get_endpoint_health()["svc"]["failures"] == 0  # non-transient errors don't trip the breaker
+    print("✅ circuit breaker")
+
+
+def test_cancelled_call_is_not_a_success():
+    """Cancellation neither resets the failure streak nor closes a half-open breaker"""
+    reset_endpoints()
+
+    async def fail():
+        raise ConnectionError("down")
+
+    async def cancelled():
+        task = asyncio.ensure_future(resilience.call("svc", lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def run():
+        for _ in range(4):
+            try:
+                await resilience.call("svc", fail)
+            except ConnectionError:
+                pass
+        await cancelled()
+        endpoint = resilience.get_endpoint("svc")
+        assert (endpoint.consecutive_failures, endpoint.counts["successes"], endpoint.state) == (4, 0, "closed")
+
+        # Half-open: a cancelled probe hands the breaker back instead of closing it
+        endpoint.state, endpoint.opened_at = "open", time.monotonic() - resilience.BREAKER_COOLDOWN
+        await cancelled()
+        assert endpoint.state == "open" and endpoint.consecutive_failures == 4
+        assert await resilience.call("svc", lambda: asyncio.sleep(0, "ok")) == "ok"  # the next probe is admitted
+        assert endpoint.state == "closed"
+
+    asyncio.run(run())
+    print("✅ cancelled calls")
+
+
+if __name__ == "__main__":
+    test_endpoint_name()
+    test_retries_only_idempotent_calls()
+    test_hedge_after_p95()
+    test_breaker_fails_fast_and_recovers()
+    test_cancelled_call_is_not_a_success()
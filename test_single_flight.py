@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test single-flight coalescing of concurrent cache misses
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from orca_mcp.tools import data_access
+from orca_mcp.tools.cache_manager import CacheManager
+from orca_mcp.tools.single_flight import SingleFlight
+
+
+class _Job:
+    job_id = "job-1"
+
+    def __init__(self):
+        self.finish = threading.Event()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.finish.set()
+
+    def to_dataframe(self):
+        self.finish.wait(10)
+        if self.cancelled:
+            raise RuntimeError("Job cancelled")
+        return pd.DataFrame({"n": [1]})
+
+
+class _BigQuery:
+    def __init__(self):
+        self.jobs = []
+
+    def query(self, sql):
+        self.jobs.append(_Job())
+        return self.jobs[-1]
+
+
+def _wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_threads_share_one_call():
+    """Eight threads missing the same key run the query once"""
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def slow_query():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"rows": 42}
+
+    def worker():
+        results.append(flight.do("query:guinness:abc", slow_query))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(result == {"rows": 42} and shared for result, shared in results)
+    assert flight.in_flight() == 0
+    print("✅ threads coalesced")
+
+
+def test_errors_reach_followers():
+    """A failing leader raises in every waiting thread, then the key is free again"""
+    flight = SingleFlight()
+    calls = []
+    outcomes = []
+
+    def failing_query():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("BigQuery unavailable")
+
+    def worker():
+        try:
+            outcomes.append(flight.do("query:guinness:abc", failing_query))
+        except RuntimeError as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(isinstance(o, RuntimeError) for o in outcomes) and len(outcomes) == 5
+    assert flight.do("query:guinness:abc", lambda: "fresh") == ("fresh", False)
+    print("✅ errors propagated")
+
+
+def test_timed_out_leader_keeps_job_for_followers():
+    """An async leader giving up leaves the shared job running for a sync follower"""
+    bq = _BigQuery()
+    patched = {"get_bigquery_client": lambda project=None, client_id=None: bq,
+               "get_cache_manager": lambda: CacheManager(enabled=False)}
+    originals = {name: getattr(data_access, name) for name in patched}
+    for name, fn in patched.items():
+        setattr(data_access, name, fn)
+    sql = "SELECT COUNT(*) AS n FROM transactions"
+    outcomes = {}
+
+    def leader():
+        try:
+            asyncio.run(data_access.query_bigquery_async(sql, "guinness", timeout=0.3))
+        except TimeoutError as e:
+            outcomes["leader"] = e
+
+    def follower():
+        outcomes["follower"] = data_access.query_bigquery(sql, "guinness")
+
+    try:
+        threads = [threading.Thread(target=leader)]
+        threads[0].start()
+        _wait_until(lambda: bq.jobs)
+        threads.append(threading.Thread(target=follower))
+        threads[1].start()
+        _wait_until(lambda: any(c.waiters for c in data_access._query_flight._calls.values()))
+
+        threads[0].join(5)
+        assert isinstance(outcomes["leader"], TimeoutError)
+        assert not bq.jobs[0].cancelled
+
+        bq.jobs[0].finish.set()
+        threads[1].join(5)
+        assert outcomes["follower"]["n"].tolist() == [1] and len(bq.jobs) == 1
+
+        # Alone, a caller that gives up does cancel its job
+        outcomes.clear()
+        threads = [threading.Thread(target=leader)]
+        threads[0].start()
+        threads[0].join(5)
+        assert isinstance(outcomes["leader"], TimeoutError)
+        _wait_until(lambda: bq.jobs[1].cancelled)
+    finally:
+        for job in bq.jobs:
+            job.finish.set()
+        for name, fn in originals.items():
+            setattr(data_access, name, fn)
+    print("✅ shared job outlives a timed-out leader")
+
+
+if __name__ == "__main__":
+    test_threads_share_one_call()
+    test_errors_reach_followers()
+    test_timed_out_leader_keeps_job_for_followers()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test bulk staging sizing and the single-insert SQL (no BigQuery needed)
+"""
+
+import sys
+import os
+import math
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from orca_mcp.tools.staging_allocations import size_positions, insert_sql
+
+
+def scalar_par(target_pct, price, accrued, portfolio_value, min_size=200000, increment=50000):
+    """add_staging_allocation's per-bond rule"""
+    par_needed = (portfolio_value * target_pct / 100.0) / (price + accrued) * 100
+    if par_needed < min_size:
+        return min_size
+    return math.ceil((par_needed - min_size) / increment) * increment + min_size
+
+
+def test_vectorized_sizing_matches_single_bond_rule():
+    """Every basket position gets exactly the par the one-bond tool would give"""
+    bonds = pd.DataFrame({
+        "isin": ["A", "B", "C", "D"],
+        "target_pct": [3.0, 0.5, 2.25, 10.0],
+        "price": [98.5, 101.2, 87.0, 100.0],
+        "accrued_interest": [1.2, None, 0.4, 0.0],
+    })
+    sized = size_positions(bonds, portfolio_value=20_000_000)
+
+    for row in sized.itertuples():
+        accrued = 0.0 if pd.isna(bonds.loc[row.Index, "accrued_interest"]) else bonds.loc[row.Index, "accrued_interest"]
+        assert row.par_amount == scalar_par(row.target_pct, row.price, accrued, 20_000_000)
+        assert math.isclose(row.market_value, row.dirty_price * row.par_amount / 100)
+    assert sized.loc[1, "par_amount"] == 200000  # below min size
+    print("✅ vectorized sizing")
+
+
+def test_single_insert_escapes_values():
+    """All rows go in one INSERT; quotes in descriptions can't break the SQL"""
+    rows = pd.DataFrame({
+        "transaction_id": [101, 102],
+        "isin": ["XS0000000001", "XS0000000002"],
+        "ticker": ["CDEL", "PEMEX"],
+        "description": ["CDEL 3 1/2 01/15/31", "PEMEX 6 O'NEIL"],
+        "country": ["Chile", "Mexico"],
+        "par_amount": [250000.0, 200000.0],
+        "price": [95.0, 88.0],
+        "accrued_interest": [0.5, 1.0],
+        "dirty_price": [95.5, 89.0],
+        "market_value": [238750.0, 178000.0],
+        "ytw": [5.1, float("nan")],
+        "oad": [6.2, 4.0],
+        "target_pct": [1.2, 0.9],
+    })
+    sql = insert_sql("wnbf", rows)
+    assert sql.count("INSERT INTO transactions") == 1
+    assert sql.count("'staging'") == 2
+    assert "O\\'NEIL" in sql
+    print("✅ single insert")
+
+
+if __name__ == "__main__":
+    test_vectorized_sizing_matches_single_bond_rule()
+    test_single_insert_escapes_values()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory latest-universe snapshot (no BigQuery needed)
+"""
+
+import sys
+import os
+import datetime
+import time
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from orca_mcp.tools import universe_snapshot
+from orca_mcp.tools.universe_snapshot import UniverseSnapshot, mark_universe_stale
+
+
+def make_snapshot() -> UniverseSnapshot:
+    df = pd.DataFrame({
+        "isin": ["MX0000000001", "MX0000000002", "BR0000000001", "CL0000000001", "CL0000000002"],
+        "ticker": ["PEMEX", "MEX", "BRAZIL", "CHILE", "CDEL"],
+        "country": ["Mexico", "Mexico", "Brazil", "Chile", "Chile"],
+        "bpdate": [datetime.date(2025, 11, 20)] * 4 + [datetime.date(2025, 11, 21)],
+        "return_ytw": [7.1, 5.2, None, 4.0, 6.3],
+        "ytw": [7.5, 5.6, 6.0, 4.4, 6.9],
+    })
+    return UniverseSnapshot(df, version=1)
+
+
+def test_lookup_and_indexes():
+    """ISIN lookups keep request order; country/ticker indexes are case-insensitive"""
+    snap = make_snapshot()
+    positions, not_found = snap.rows(["CL0000000002", "XX0000000000", "MX0000000001"])
+    assert snap.frame(positions)["ticker"].tolist() == ["CDEL", "PEMEX"]
+    assert not_found == ["XX0000000000"]
+
+    assert snap.frame(snap.country_rows(["mexico"]))["isin"].tolist() == ["MX0000000001", "MX0000000002"]
+    assert snap.frame(snap.ticker_rows(["pemex", "cdel"]))["country"].tolist() == ["Mexico", "Chile"]
+    assert str(snap.as_of) == "2025-11-21"
+    print("✅ lookup / indexes")
+
+
+def test_screen_top_k():
+    """Masks, exclusions and top-k reproduce ORDER BY ... DESC LIMIT k"""
+    snap = make_snapshot()
+    rows = snap.where(snap.col("return_ytw") > 5.0)
+    rows = snap.exclude(rows, ["MX0000000002"])
+    top = snap.frame(snap.top(rows, "return_ytw", 1))
+    assert top["isin"].tolist() == ["MX0000000001"]
+
+    # NaN sorts last, full ordering when k >= rows
+    ordered = snap.frame(snap.top(snap.all_rows(), "return_ytw", 10))
+    assert ordered["isin"].tolist()[-1] == "BR0000000001"
+    assert np.isnan(ordered["return_ytw"].iloc[-1])
+    print("✅ top-k screen")
+
+
+def test_background_refresh_loses_to_newer_reload():
+    """A background load that started before an upload never replaces the post-upload snapshot"""
+    holder = universe_snapshot._holder("race-test")
+    holder.snapshot = make_snapshot()
+    loading, release = threading.Event(), threading.Event()
+    loads = []
+
+    def load(probe=None):
+        version = len(loads) + 2
+        loads.append(version)
+        if threading.current_thread().name == "universe-refresh":
+            loading.set()
+            release.wait(5)
+        return UniverseSnapshot(make_snapshot().frame(), version=version, probe=probe)
+
+    holder._probe = lambda: ("2025-11-22", 5)
+    holder._load = load
+    try:
+        holder._refresh_in_background()
+        assert loading.wait(5)
+
+        mark_universe_stale("race-test")  # upload lands mid-load
+        fresh = holder.get()  # synchronous reload
+        assert fresh.version == 3
+
+        release.set()
+        while holder._refreshing:
+            time.sleep(0.01)
+        assert holder.snapshot is fresh and not holder.stale
+    finally:
+        release.set()
+        universe_snapshot._holders.pop("race-test", None)
+    print("✅ stale background refresh discarded")
+
+
+if __name__ == "__main__":
+    test_lookup_and_indexes()
+    test_screen_top_k()
+    test_background_refresh_loses_to_newer_reload()
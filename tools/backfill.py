@@ -15,9 +15,8 @@ import pandas as pd
 
 from ..client_config import get_client_config
 from .cloudflare_d1 import get_watchlist
-from .data_access import setup_bigquery_credentials, query_bigquery
+from .data_access import setup_bigquery_credentials, get_bigquery_client, query_bigquery
 from .cache_manager import invalidate_cache
-from google.cloud import bigquery
 
 # GA10 Configuration - URLs from environment variables
 import os
@@ -152,12 +151,11 @@ def _insert_bond_analytics(isin: str, analytics: Dict, bpdate: str, price: float
         price: Bond price
         client_id: Client identifier
     """
-    setup_bigquery_credentials()
     config = get_client_config(client_id)
     bq_service = config.get_service('bigquery')
     dataset = config.get_bigquery_dataset()
 
-    client = bigquery.Client(project=bq_service['project'])
+    client = get_bigquery_client(bq_service['project'])
     table_id = f"{bq_service['project']}.{dataset}.bond_analytics_daily"
 
     # Extract analytics fields
@@ -546,7 +544,7 @@ def refresh_bond_analytics(isins: Optional[List[str]] = None, client_id: str = '
     bq_service = config.get_service('bigquery')
     dataset = config.get_bigquery_dataset()
 
-    bq_client = bigquery.Client(project=bq_service['project'])
+    bq_client = get_bigquery_client(bq_service['project'])
     table_id = f"{bq_service['project']}.{dataset}.bond_analytics_daily"
 
     rows_to_insert = []
@@ -0,0 +1,251 @@
+"""
+Vectorized Bond Screener for Orca MCP
+
+Screens the latest-universe snapshot (see universe_snapshot) with boolean
+masks instead of SQL. Per snapshot version it precomputes:
+
+- rating_rank: S&P rating as an integer (AAA=21 ... D=0, unrated=-1)
+- is_quasi: quasi-sovereign issuer flag (ticker in QUASI_SOVEREIGNS)
+- ticker codes: distinct upper-case tickers, so a substring filter tests
+  each distinct ticker once and broadcasts with one take()
+
+Per call it adds NFA stars per row (country ratings cached for
+NFA_CACHE_TTL seconds) and a portfolio-membership bitmap, combines every
+filter into one mask and picks the result with argpartition top-k.
+
+Usage:
+    screener = get_bond_screener(snapshot)
+    df = screener.screen(country="Mexico", min_rating="BBB-", limit=10)
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .universe_snapshot import UniverseSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Standard S&P scale
+RATING_SCALE = {
+    'AAA': 21, 'AA+': 20, 'AA': 19, 'AA-': 18,
+    'A+': 17, 'A': 16, 'A-': 15,
+    'BBB+': 14, 'BBB': 13, 'BBB-': 12,
+    'BB+': 11, 'BB': 10, 'BB-': 9,
+    'B+': 8, 'B': 7, 'B-': 6,
+    'CCC+': 5, 'CCC': 4, 'CCC-': 3,
+    'CC': 2, 'C': 1, 'D': 0
+}
+
+# Known quasi-sovereign tickers by country for issuer_type filtering
+QUASI_SOVEREIGNS = frozenset({
+    'PEMEX', 'CFE', 'NAFIN',  # Mexico
+    'CDEL', 'ENAPCL', 'BMETR', 'BCHILE',  # Chile
+    'PETBRA', 'BNDES',  # Brazil
+    'ECOPET',  # Colombia
+    'KSA', 'ARAMCO',  # Saudi Arabia (ARAMCO is quasi)
+    'QATAEN', 'QNBK',  # Qatar
+    'KUWSOV', 'KPC',  # Kuwait
+    'ADSOVR',  # Abu Dhabi
+    'PERULN', 'COFIDE',  # Peru
+    'INDON', 'PLNIJ',  # Indonesia
+    'MLAY', 'PETMK',  # Malaysia
+})
+
+# Tool sort_by -> snapshot column (always descending, as the SQL version did)
+SORT_COLUMNS = {
+    'expected_return': 'return_ytw',
+    'yield': 'ytw',
+    'spread': 'oas',
+    'duration': 'oad',
+}
+
+# Output columns, named as search_bonds_rvm formats them
+RESULT_COLUMNS = {
+    'isin': 'isin', 'ticker': 'ticker', 'description': 'description', 'country': 'country',
+    'ytw': 'yield_pct', 'oas': 'spread_bp', 'oad': 'duration', 'return_ytw': 'expected_return',
+    'price': 'price', 'coupon': 'coupon', 'maturity': 'maturity',
+    'rating_sp': 'rating_sp', 'rating_moody': 'rating_moody',
+}
+
+NFA_CACHE_TTL = float(os.getenv("ORCA_NFA_CACHE_TTL", "21600"))  # NFA data is annual
+
+
+def rating_rank(rating) -> int:
+    """Integer rank of an S&P rating string (-1 if unrated/unknown)"""
+    if not isinstance(rating, str):
+        return -1
+    return RATING_SCALE.get(rating.strip().upper(), -1)
+
+
+class BondScreener:
+    """Mask-based screens over one UniverseSnapshot version"""
+
+    def __init__(self, snapshot: UniverseSnapshot):
+        self.snapshot = snapshot
+        n = snapshot.size
+
+        tickers = snapshot.columns.get('ticker', np.full(n, None, dtype=object))
+        upper = np.array([t.upper() if isinstance(t, str) else '' for t in tickers], dtype=object)
+        self.ticker_names, self.ticker_codes = np.unique(upper, return_inverse=True)
+        quasi_names = np.fromiter((t in QUASI_SOVEREIGNS for t in self.ticker_names), dtype=bool,
+                                  count=len(self.ticker_names))
+        self.is_quasi = quasi_names[self.ticker_codes] if n else np.zeros(0, dtype=bool)
+
+        ratings = snapshot.columns.get('rating_sp', np.full(n, None, dtype=object))
+        self.rating_rank = np.fromiter((rating_rank(r) for r in ratings), dtype=np.int8, count=n)
+
+        countries = snapshot.columns.get('country', np.full(n, None, dtype=object))
+        # Country codes so NFA stars broadcast with one take()
+        keys = [str(c) if c is not None and c == c else '' for c in countries]
+        self.country_names, self.country_codes = np.unique(np.array(keys, dtype=object), return_inverse=True)
+
+        self.valid = ~np.isnan(snapshot.columns['return_ytw']) & ~np.isnan(snapshot.columns['ytw'])
+
+    # ------------------------------------------------------------------
+    # Per-call arrays
+    # ------------------------------------------------------------------
+
+    def portfolio_bitmap(self, isins: Iterable[str]) -> np.ndarray:
+        """Boolean array: True where the row's ISIN is in isins"""
+        bitmap = np.zeros(self.snapshot.size, dtype=bool)
+        positions, _ = self.snapshot.rows(isins)
+        bitmap[positions] = True
+        return bitmap
+
+    def nfa_stars(self, nfa_ratings: Dict[str, float]) -> np.ndarray:
+        """NFA star rating per row (0 where unknown)"""
+        per_country = np.array([float(nfa_ratings.get(c, 0) or 0) for c in self.country_names])
+        return per_country[self.country_codes] if len(per_country) else np.zeros(0)
+
+    def countries(self, mask: np.ndarray) -> List[str]:
+        """Distinct countries among masked rows"""
+        codes = np.unique(self.country_codes[mask])
+        return [c for c in self.country_names[codes] if c]
+
+    # ------------------------------------------------------------------
+    # Screening
+    # ------------------------------------------------------------------
+
+    def mask(self,
+             country: Optional[str] = None,
+             ticker: Optional[str] = None,
+             issuer_type: str = 'all',
+             min_expected_return: Optional[float] = None,
+             max_duration: Optional[float] = None,
+             min_rating: Optional[str] = None,
+             exclude: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Combined boolean mask for every filter except NFA
+
+        Args mirror search_bonds_rvm. exclude is a portfolio bitmap.
+        """
+        snap = self.snapshot
+        m = self.valid.copy()
+
+        if country:
+            country_mask = np.zeros(snap.size, dtype=bool)
+            country_mask[snap.country_rows([country])] = True
+            m &= country_mask
+
+        if ticker:
+            pattern = ticker.upper()
+            matches = np.fromiter((pattern in t for t in self.ticker_names), dtype=bool,
+                                  count=len(self.ticker_names))
+            m &= matches[self.ticker_codes]
+
+        if issuer_type == 'sovereign':
+            m &= ~self.is_quasi
+        elif issuer_type == 'quasi-sovereign':
+            m &= self.is_quasi
+
+        if min_expected_return is not None:
+            m &= snap.columns['return_ytw'] >= min_expected_return
+
+        if max_duration is not None:
+            m &= snap.columns['oad'] <= max_duration
+
+        if min_rating and min_rating.upper() in RATING_SCALE:
+            m &= self.rating_rank >= RATING_SCALE[min_rating.upper()]
+
+        if exclude is not None:
+            m &= ~exclude
+
+        return m
+
+    def top(self, mask: np.ndarray, sort_by: str = 'expected_return', limit: int = 10) -> pd.DataFrame:
+        """Top `limit` rows of the mask by sort_by (descending), as a result frame"""
+        snap = self.snapshot
+        rows = snap.top(np.flatnonzero(mask), SORT_COLUMNS.get(sort_by, 'return_ytw'), limit)
+        df = snap.frame(rows, columns=[c for c in RESULT_COLUMNS if c in snap.columns])
+        df = df.rename(columns=RESULT_COLUMNS)
+        df['issuer_type'] = np.where(self.is_quasi[rows], 'quasi-sovereign', 'sovereign')
+        return df
+
+    def screen(self, sort_by: str = 'expected_return', limit: int = 10,
+               min_nfa_rating: Optional[float] = None,
+               nfa_ratings: Optional[Dict[str, float]] = None, **filters) -> pd.DataFrame:
+        """
+        mask() + optional NFA threshold + top-k in one call
+
+        NFA is only applied when nfa_ratings has data for at least one country.
+        """
+        m = self.mask(**filters)
+        if min_nfa_rating and nfa_ratings:
+            m &= self.nfa_stars(nfa_ratings) >= min_nfa_rating
+        return self.top(m, sort_by, limit)
+
+
+# ----------------------------------------------------------------------
+# Caches
+# ----------------------------------------------------------------------
+
+_screener: Optional[BondScreener] = None
+_screener_lock = threading.Lock()
+
+_nfa_cache: Dict[str, tuple] = {}  # country -> (stars, fetched_at)
+
+
+def get_bond_screener(snapshot: UniverseSnapshot) -> BondScreener:
+    """Screener for the snapshot, rebuilt only when the snapshot changes"""
+    global _screener
+    screener = _screener
+    if screener is not None and screener.snapshot is snapshot:
+        return screener
+    with _screener_lock:
+        if _screener is None or _screener.snapshot is not snapshot:
+            start = time.perf_counter()
+            _screener = BondScreener(snapshot)
+            logger.info(f"Bond screener built for universe v{snapshot.version} "
+                        f"({snapshot.size} bonds) in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return _screener
+
+
+async def get_nfa_stars_async(countries: Iterable[str]) -> Dict[str, float]:
+    """
+    NFA star ratings for countries, fetched concurrently and cached
+
+    Returns:
+        Dict country -> stars for countries with data
+    """
+    from .external_mcps import get_nfa_batch_async
+
+    now = time.monotonic()
+    countries = [c for c in countries if c]
+    missing = [c for c in countries
+               if c not in _nfa_cache or now - _nfa_cache[c][1] > NFA_CACHE_TTL]
+
+    if missing:
+        results = await get_nfa_batch_async(missing)
+        for country, data in results.items():
+            if isinstance(data, dict) and 'nfa_star_rating' in data:
+                _nfa_cache[country] = (data['nfa_star_rating'], now)
+            else:
+                logger.warning(f"Could not get NFA for {country}: {data.get('error') if isinstance(data, dict) else data}")
+
+    return {c: _nfa_cache[c][0] for c in countries if c in _nfa_cache}
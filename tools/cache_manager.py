@@ -9,19 +9,50 @@ Cache Strategy:
 - Transactions: 15 min TTL
 - RVM analytics: 30 min TTL
 
+Stale-While-Revalidate:
+- Frames carry a soft expiry (the TTL above) and a hard expiry (TTL plus
+  the class's stale window, see TTL_POLICIES)
+- Between the two, the stale value is served and refreshed in the background
+- Before the soft expiry, XFetch recomputes early with a probability that
+  rises as expiry nears, scaled by how long the value took to compute
+
+Tiers:
+- L1: in-process LRU of ready-built DataFrames (bounded by bytes and TTL)
+- L2: Redis, shared between processes (DataFrames as Arrow IPC, see frame_codec)
+
 Key Patterns:
 - universe:all:full → agg_analysis_data
 - holdings:{client_id}:all → current_holdings
 - transactions:{client_id}:{year} → filtered transactions
 - rvm:{client_id}:latest → RVM analytics
-- query:{query_hash} → arbitrary queries
+- query:{client_id}:{query_hash} → arbitrary queries
+
+Tag Index (sorted sets, member = cached key, score = its expiry time):
+- tags:table:{table} → keys of queries reading {table} (any client)
+- tags:client:{client_id} → keys cached for {client_id}
+- tags:client:{client_id}:table:{table} → keys of {client_id} queries reading {table}
+
+Query keys are hashes, so they can't be found by pattern. query_bigquery
+registers each key under these tags and writers invalidate by tag.
+Expired members are pruned on every registration, so a hot tag that is
+never invalidated stays bounded by its live keys.
 """
 
 import os
 import json
+import re
+import math
+import time
+import uuid
+import random
+import struct
+import fnmatch
 import hashlib
 import logging
-from typing import Any, Dict, Optional, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, List
 from datetime import timedelta
 
 try:
@@ -31,8 +62,156 @@ except ImportError:
     REDIS_AVAILABLE = False
     logging.warning("Redis not installed - caching disabled")
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from .frame_codec import FrameCodecError, encode_frame, decode_frame, is_frame_payload
+
 logger = logging.getLogger(__name__)
 
+# Table references in FROM / JOIN / INTO / UPDATE / MERGE clauses; names may be
+# backtick-quoted and project/dataset qualified.
+_TABLE_REF_RE = re.compile(
+    r"\b(?:FROM|JOIN|INTO|UPDATE|MERGE(?:\s+INTO)?)\s+`?([A-Za-z_][\w\-]*(?:\.[\w\-]+)*)`?",
+    re.IGNORECASE,
+)
+# CTE names ("WITH latest AS (", ", ranked AS (") are not real tables
+_CTE_NAME_RE = re.compile(r"(?:\bWITH|,)\s*(?:RECURSIVE\s+)?([A-Za-z_]\w*)\s+AS\s*\(", re.IGNORECASE)
+
+
+class FrameLRU:
+    """
+    In-process LRU of DataFrames bounded by total bytes and per-entry TTL
+
+    Thread-safe. Entries carry the same tags as their Redis counterpart so
+    CacheManager invalidation can drop them coherently.
+    """
+
+    def __init__(self, max_bytes: int, max_ttl: int):
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (df, nbytes, expires_at, tags)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[2] <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, df, ttl: int, tags: Optional[Iterable[str]] = None):
+        ttl = min(ttl, self.max_ttl)
+        if ttl <= 0 or self.max_bytes <= 0:
+            return
+        try:
+            nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        except Exception:
+            return
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (df, nbytes, time.monotonic() + ttl, frozenset(tags or ()))
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def invalidate_pattern(self, pattern: str) -> int:
+        """Drop keys matching a Redis glob pattern"""
+        with self._lock:
+            keys = [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]
+            for k in keys:
+                self._drop(k)
+        return len(keys)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Drop keys registered under any of the tags"""
+        tags = set(tags)
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if entry[3] & tags]
+            for k in keys:
+                self._drop(k)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_ttl": self.max_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate_percent": round(self.hits / total * 100, 2) if total else 0,
+            }
+
+
+class TTLPolicy(NamedTuple):
+    """Freshness policy for a TTL class"""
+    ttl: int            # soft expiry: served as fresh until then
+    stale_ttl: int = 0  # extra seconds a stale value may be served while refreshing
+    beta: float = 1.0   # XFetch aggressiveness (0 disables early refresh)
+
+
+class FrameEntry:
+    """A cached DataFrame with its soft expiry and recompute cost"""
+
+    __slots__ = ("df", "soft_expiry", "delta", "beta")
+
+    def __init__(self, df, soft_expiry: float, delta: float = 0.0, beta: float = 1.0):
+        self.df = df
+        self.soft_expiry = soft_expiry  # epoch seconds
+        self.delta = delta              # seconds the value took to compute
+        self.beta = beta
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) >= self.soft_expiry
+
+    def should_refresh(self, now: Optional[float] = None) -> bool:
+        """Stale, or chosen for early recomputation (XFetch)"""
+        now = now or time.time()
+        if now >= self.soft_expiry:
+            return True
+        if self.delta <= 0 or self.beta <= 0:
+            return False
+        # -log(U) is Exp(1): expensive values refresh earlier, cheap ones rarely
+        return now - self.delta * self.beta * math.log(1.0 - random.random()) >= self.soft_expiry
+
+
+# Envelope around L2 frame payloads: magic | soft expiry | delta | payload
+_ENVELOPE_MAGIC = b"ORCE"
+_ENVELOPE_HEADER = struct.Struct("<dd")
+
 
 class CacheManager:
     """Redis-based cache manager with intelligent TTL and invalidation"""
@@ -44,6 +223,25 @@ class CacheManager:
     TTL_RVM = 1800       # 30 minutes
     TTL_DEFAULT = 300    # 5 minutes
 
+    # Stale windows per TTL class (override with ORCA_CACHE_STALE_<CLASS>).
+    # Writes invalidate by tag, so a stale window only covers time-based
+    # expiry, never data known to have changed.
+    TTL_POLICIES = {
+        "universe": TTLPolicy(TTL_UNIVERSE, stale_ttl=TTL_UNIVERSE),
+        "rvm": TTLPolicy(TTL_RVM, stale_ttl=TTL_RVM),
+        "transactions": TTLPolicy(TTL_TRANSACTIONS, stale_ttl=300),
+        "holdings": TTLPolicy(TTL_HOLDINGS, stale_ttl=60),
+        "default": TTLPolicy(TTL_DEFAULT, stale_ttl=0),
+    }
+
+    # Key prefixes bound to a TTL class; other keys are classed by their TTL
+    KEY_PREFIX_CLASSES = {
+        "universe:": "universe",
+        "rvm:": "rvm",
+        "transactions:": "transactions",
+        "holdings:": "holdings",
+    }
+
     def __init__(self, redis_url: Optional[str] = None, enabled: bool = True):
         """
         Initialize cache manager
@@ -54,6 +252,31 @@ class CacheManager:
         """
         self.enabled = enabled and REDIS_AVAILABLE
         self.redis_client = None
+        self.binary_client = None  # Same server, raw bytes (frame payloads)
+        # "arrow" (default) or "json" to store frames as JSON records
+        self.frame_format = os.getenv('ORCA_CACHE_FRAME_FORMAT', 'arrow').lower()
+        self.frame_compression = os.getenv('ORCA_CACHE_COMPRESSION', 'default').lower()
+        if self.frame_compression in ('none', ''):
+            self.frame_compression = None
+
+        # L1 frame cache. Its TTL cap bounds how long another process's
+        # invalidation can go unseen here.
+        self.l1 = FrameLRU(
+            max_bytes=int(float(os.getenv('ORCA_L1_CACHE_MB', '256')) * 1024 * 1024) if enabled else 0,
+            max_ttl=int(os.getenv('ORCA_L1_CACHE_TTL', '60')),
+        )
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+
+        self.ttl_policies = {
+            name: policy._replace(stale_ttl=int(os.getenv(f"ORCA_CACHE_STALE_{name.upper()}", policy.stale_ttl)))
+            for name, policy in self.TTL_POLICIES.items()
+        }
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
 
         if not REDIS_AVAILABLE:
             logger.warning("Redis not available - caching disabled")
@@ -81,6 +304,13 @@ class CacheManager:
                 socket_timeout=5
             )
 
+            self.binary_client = redis.from_url(
+                redis_url,
+                decode_responses=False,
+                socket_connect_timeout=5,
+                socket_timeout=5
+            )
+
             # Test connection
             self.redis_client.ping()
             logger.info("✓ Redis connection established")
@@ -90,6 +320,7 @@ class CacheManager:
             logger.warning("Falling back to no-cache mode")
             self.enabled = False
             self.redis_client = None
+            self.binary_client = None
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -117,7 +348,7 @@ class CacheManager:
             logger.error(f"Cache read error for {key}: {e}")
             return None
 
-    def set(self, key: str, data: Any, ttl: int = TTL_DEFAULT):
+    def set(self, key: str, data: Any, ttl: int = TTL_DEFAULT, tags: Optional[Iterable[str]] = None):
         """
         Cache data with TTL
 
@@ -125,6 +356,7 @@ class CacheManager:
             key: Cache key
             data: Data to cache (will be JSON serialized)
             ttl: Time-to-live in seconds (default: 5 min)
+            tags: Tags to register the key under for invalidate_tags() (optional)
         """
         if not self.enabled or not self.redis_client:
             return
@@ -132,38 +364,492 @@ class CacheManager:
         try:
             serialized = json.dumps(data, default=str)  # default=str for datetimes
             self.redis_client.setex(key, ttl, serialized)
+            if tags:
+                self._add_tags(key, tags, ttl)
             logger.debug(f"Cached: {key} (TTL: {ttl}s)")
 
         except Exception as e:
             logger.error(f"Cache write error for {key}: {e}")
 
-    def invalidate(self, pattern: str) -> int:
+    # ------------------------------------------------------------------
+    # DataFrame tiers (L1 in-process, L2 Redis)
+    # ------------------------------------------------------------------
+
+    def policy_for(self, key: str, ttl: Optional[int] = None) -> TTLPolicy:
         """
-        Invalidate all keys matching pattern
+        Resolve the freshness policy for a key
 
         Args:
-            pattern: Redis pattern (e.g., "universe:*", "holdings:client001:*")
+            key: Cache key (prefix selects the TTL class)
+            ttl: Requested TTL; for unprefixed keys it selects the class whose
+                TTL it equals and overrides the class TTL
 
         Returns:
-            Number of keys deleted
+            TTLPolicy
+        """
+        for prefix, name in self.KEY_PREFIX_CLASSES.items():
+            if key.startswith(prefix):
+                policy = self.ttl_policies[name]
+                return policy._replace(ttl=ttl) if ttl else policy
+
+        if ttl is None:
+            return self.ttl_policies["default"]
+        for policy in self.ttl_policies.values():
+            if policy.ttl == ttl:
+                return policy
+        return TTLPolicy(ttl, stale_ttl=0)
+
+    def get_frame_entry(self, key: str, tags: Optional[Iterable[str]] = None) -> Optional[FrameEntry]:
+        """
+        Get a cached DataFrame with its freshness metadata
+
+        L1 only holds fresh values; a stale value can only come from Redis
+        during the stale window.
+
+        Args:
+            key: Cache key
+            tags: Tags of the entry, used when promoting an L2 hit into L1
+
+        Returns:
+            FrameEntry (df is a copy, safe to mutate) or None if miss
+        """
+        df = self.l1.get(key)
+        if df is not None:
+            return FrameEntry(df.copy(), soft_expiry=float("inf"))
+
+        if not self.enabled or not self.binary_client or pd is None:
+            return None
+
+        try:
+            pipe = self.binary_client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.ttl(key)
+            data, remaining = pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache read error for {key}: {e}")
+            return None
+
+        if not data:
+            self.l2_misses += 1
+            return None
+
+        now = time.time()
+        soft_expiry = now + max(remaining or 0, 0)
+        delta = 0.0
+        try:
+            if data[:len(_ENVELOPE_MAGIC)] == _ENVELOPE_MAGIC:
+                offset = len(_ENVELOPE_MAGIC)
+                soft_expiry, delta = _ENVELOPE_HEADER.unpack_from(data, offset)
+                data = memoryview(data)[offset + _ENVELOPE_HEADER.size:]
+            if is_frame_payload(data):
+                df = decode_frame(data)
+            else:
+                # Legacy / fallback JSON records
+                df = pd.DataFrame(json.loads(bytes(data)))
+        except Exception as e:
+            logger.error(f"Cache deserialization error for {key}: {e}")
+            self.l2_misses += 1
+            return None
+
+        self.l2_hits += 1
+        entry = FrameEntry(df, soft_expiry, delta, self.policy_for(key).beta)
+        if entry.is_stale(now):
+            self.stale_hits += 1
+        else:
+            self.l1.put(key, df, int(soft_expiry - now), tags)
+        entry.df = df.copy()
+        return entry
+
+    def get_frame(self, key: str, tags: Optional[Iterable[str]] = None):
+        """
+        Get a cached DataFrame, checking the in-process L1 before Redis
+
+        Args:
+            key: Cache key
+            tags: Tags of the entry, used when promoting an L2 hit into L1
+
+        Returns:
+            DataFrame (a copy, safe to mutate) or None if miss. May be stale
+            within the key's stale window; use get_frame_entry() to tell.
+        """
+        entry = self.get_frame_entry(key, tags=tags)
+        return entry.df if entry is not None else None
+
+    def set_frame(self, key: str, df, ttl: int = TTL_DEFAULT, tags: Optional[Iterable[str]] = None,
+                  delta: float = 0.0, stale_ttl: Optional[int] = None):
+        """
+        Cache a DataFrame in both tiers
+
+        Redis keeps the value for ttl plus the stale window.
+
+        Args:
+            key: Cache key
+            df: DataFrame to cache
+            ttl: Seconds the value is fresh
+            tags: Tags for invalidate_tags() (optional)
+            delta: Seconds it took to compute (drives early refresh)
+            stale_ttl: Stale window (default: from policy_for(key, ttl))
+        """
+        tags = list(tags or ())
+        self.l1.put(key, df.copy(), ttl, tags)
+
+        if not self.enabled or not self.binary_client:
+            return
+
+        if stale_ttl is None:
+            stale_ttl = self.policy_for(key, ttl).stale_ttl
+        hard_ttl = ttl + stale_ttl
+        payload = None
+        if self.frame_format == 'arrow':
+            try:
+                payload = encode_frame(df, compression=self.frame_compression)
+            except FrameCodecError as e:
+                logger.debug(f"Arrow encode failed for {key}, storing JSON: {e}")
+        if payload is None:
+            try:
+                payload = json.dumps(df.to_dict(orient='records'), default=str).encode()
+            except Exception as e:
+                logger.error(f"Cache write error for {key}: {e}")
+                return
+
+        envelope = _ENVELOPE_MAGIC + _ENVELOPE_HEADER.pack(time.time() + ttl, delta) + payload
+        try:
+            self.binary_client.setex(key, hard_ttl, envelope)
+            if tags:
+                self._add_tags(key, tags, hard_ttl)
+            logger.debug(f"Cached frame: {key} ({len(envelope)} bytes, TTL: {ttl}s + {hard_ttl - ttl}s stale)")
+        except Exception as e:
+            logger.error(f"Cache write error for {key}: {e}")
+
+    def refresh_in_background(self, key: str, compute: Callable[[], Any], ttl: int,
+                              tags: Optional[Iterable[str]] = None,
+                              stale_ttl: Optional[int] = None) -> bool:
+        """
+        Recompute a frame off the request path and store it
+
+        At most one refresh per key runs in this process, and a Redis lock
+        keeps other workers from refreshing the same key at the same time.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument function returning the new DataFrame
+            ttl: Fresh TTL for the new value
+            tags: Tags for the new value
+            stale_ttl: Stale window for the new value
+
+        Returns:
+            True if a refresh was scheduled
+        """
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+        tags = list(tags or ())
+
+        def run():
+            token = self.acquire_lock(key) if self.enabled else None
+            try:
+                if self.enabled and token is None:
+                    return  # another worker is refreshing it
+                start = time.perf_counter()
+                df = compute()
+                self.set_frame(key, df, ttl, tags=tags, delta=time.perf_counter() - start, stale_ttl=stale_ttl)
+                self.refreshes += 1
+                logger.debug(f"Refreshed {key} in background")
+            except Exception as e:
+                logger.error(f"Background refresh failed for {key}: {e}")
+            finally:
+                if token:
+                    self.release_lock(key, token)
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(run)
+        return True
+
+    def wait_for_frame(self, key: str, timeout: float, tags: Optional[Iterable[str]] = None):
+        """
+        Poll for a frame another worker is computing
+
+        Args:
+            key: Cache key
+            timeout: Seconds to wait before giving up
+            tags: Tags for L1 promotion
+
+        Returns:
+            DataFrame, or None if it did not appear in time
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while time.monotonic() < deadline:
+            time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            df = self.get_frame(key, tags=tags)
+            if df is not None:
+                return df
+            delay = min(delay * 2, 0.5)
+        return None
+
+    # ------------------------------------------------------------------
+    # Cross-worker locks (single-flight between processes)
+    # ------------------------------------------------------------------
+
+    LOCK_PREFIX = "lock:"
+
+    # Delete the lock only if we still own it
+    _RELEASE_LOCK_LUA = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def acquire_lock(self, name: str, ttl_ms: int = 30000) -> Optional[str]:
+        """
+        Try to take a short-lived Redis lock (SET NX PX)
+
+        Args:
+            name: Lock name (usually the cache key being computed)
+            ttl_ms: Lock expiry, so a crashed holder can't block others for long
+
+        Returns:
+            Owner token to pass to release_lock(), or None if held elsewhere
+            or Redis is unavailable
         """
         if not self.enabled or not self.redis_client:
+            return None
+
+        token = uuid.uuid4().hex
+        try:
+            if self.redis_client.set(f"{self.LOCK_PREFIX}{name}", token, nx=True, px=ttl_ms):
+                return token
+        except Exception as e:
+            logger.error(f"Cache lock error for {name}: {e}")
+        return None
+
+    def release_lock(self, name: str, token: str) -> bool:
+        """
+        Release a lock taken with acquire_lock()
+
+        Returns:
+            True if the lock was still ours and has been released
+        """
+        if not self.enabled or not self.redis_client or not token:
+            return False
+
+        try:
+            return bool(self.redis_client.eval(self._RELEASE_LOCK_LUA, 1, f"{self.LOCK_PREFIX}{name}", token))
+        except Exception as e:
+            logger.error(f"Cache unlock error for {name}: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Tag index
+    # ------------------------------------------------------------------
+
+    TAG_PREFIX = "tags:"  # "tag:" held plain sets; a new name keeps ZADD off them
+    SEQUENCE_PREFIX = "seq:"
+
+    @staticmethod
+    def extract_tables(sql: str) -> List[str]:
+        """
+        Extract the (unqualified, lower-case) table names a SQL statement reads or writes
+
+        `project.dataset.transactions` and `transactions` both yield
+        "transactions"; CTE names are ignored.
+
+        Args:
+            sql: SQL statement
+
+        Returns:
+            Sorted list of table names
+        """
+        ctes = {name.lower() for name in _CTE_NAME_RE.findall(sql)}
+        tables = set()
+        for ref in _TABLE_REF_RE.findall(sql):
+            name = ref.split('.')[-1].lower()
+            if name and name not in ctes:
+                tables.add(name)
+        return sorted(tables)
+
+    @staticmethod
+    def table_tag(table: str, client_id: Optional[str] = None) -> str:
+        """Tag for queries reading `table` (for one client if client_id is given)"""
+        if client_id:
+            return f"client:{client_id}:table:{table.lower()}"
+        return f"table:{table.lower()}"
+
+    @staticmethod
+    def client_tag(client_id: str) -> str:
+        """Tag for everything cached on behalf of `client_id`"""
+        return f"client:{client_id}"
+
+    def query_tags(self, sql: str, client_id: str) -> List[str]:
+        """
+        Build the tag set for a cached query result
+
+        Args:
+            sql: SQL query (before table-name rewriting is fine)
+            client_id: Client the result belongs to
+
+        Returns:
+            List of tags: client, table and client+table
+        """
+        tags = [self.client_tag(client_id)]
+        for table in self.extract_tables(sql):
+            tags.append(self.table_tag(table))
+            tags.append(self.table_tag(table, client_id))
+        return tags
+
+    def _add_tags(self, key: str, tags: Iterable[str], ttl: int):
+        """Register key in each tag set, pruning expired members; a tag set never expires before its members"""
+        tag_keys = [f"{self.TAG_PREFIX}{tag}" for tag in tags]
+        now = time.time()
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.zadd(tag_key, {key: now + ttl})
+            pipe.zremrangebyscore(tag_key, "-inf", now)
+            pipe.ttl(tag_key)
+        results = pipe.execute()
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        stale = False
+        for tag_key, remaining in zip(tag_keys, results[2::3]):
+            # -1 = no expiry yet (just created), otherwise extend if shorter
+            if remaining is not None and remaining < ttl:
+                pipe.expire(tag_key, ttl)
+                stale = True
+        if stale:
+            pipe.execute()
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Invalidate every key registered under any of the given tags
+
+        Each tag set is walked with ZSCAN in batches; a batch is removed
+        from the set (ZREM) before its keys are unlinked. Keys registered
+        while this runs are left in the set, so they stay reachable by the
+        next invalidation instead of being orphaned.
+
+        Args:
+            tags: Tags (e.g. "table:transactions", "client:guinness")
+
+        Returns:
+            Number of cached keys deleted
+        """
+        tags = list(tags)
+        self.l1.invalidate_tags(tags)
+        if not self.enabled or not self.redis_client:
+            return 0
+
+        tag_keys = [f"{self.TAG_PREFIX}{tag}" for tag in tags]
+        if not tag_keys:
             return 0
 
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                count = self.redis_client.delete(*keys)
-                logger.info(f"Invalidated {count} keys matching '{pattern}'")
-                return count
-            else:
-                logger.debug(f"No keys found matching '{pattern}'")
-                return 0
+            count = 0
+            for tag_key in tag_keys:
+                cursor = 0
+                while True:
+                    cursor, members = self.redis_client.zscan(tag_key, cursor, count=self.SCAN_COUNT)
+                    keys = [member for member, _ in members]
+                    if keys:
+                        self.redis_client.zrem(tag_key, *keys)
+                        count += self._unlink_keys(keys)
+                    if not cursor:
+                        break
+            logger.info(f"Invalidated {count} keys for tags {tags}")
+            return count
 
         except Exception as e:
-            logger.error(f"Cache invalidation error for {pattern}: {e}")
+            logger.error(f"Cache tag invalidation error for {tag_keys}: {e}")
             return 0
 
+    def invalidate_table(self, table: str, client_id: Optional[str] = None) -> int:
+        """
+        Invalidate cached queries that read `table`
+
+        Args:
+            table: Table name (qualified names are reduced to the last part)
+            client_id: Only this client's queries (default: all clients)
+
+        Returns:
+            Number of cached keys deleted
+        """
+        table = table.split('.')[-1].strip('`')
+        return self.invalidate_tags([self.table_tag(table, client_id)])
+
+    # SCAN page size hint and keys per UNLINK command. Both bound how long any
+    # single Redis command runs, so invalidating a large client never blocks
+    # other clients' reads the way KEYS + one huge DELETE did.
+    SCAN_COUNT = 1000
+    UNLINK_BATCH = 200
+
+    def _unlink_keys(self, keys: List[str]) -> int:
+        """UNLINK keys in bounded batches, one pipeline round trip per call"""
+        if not keys:
+            return 0
+        pipe = self.redis_client.pipeline(transaction=False)
+        for i in range(0, len(keys), self.UNLINK_BATCH):
+            pipe.unlink(*keys[i:i + self.UNLINK_BATCH])
+        return sum(pipe.execute())
+
+    def invalidate_with_stats(self, pattern: str) -> Dict[str, Any]:
+        """
+        Invalidate all keys matching pattern, reporting count and duration
+
+        Walks the keyspace incrementally with SCAN and removes matches with
+        batched UNLINK (memory is reclaimed in a Redis background thread).
+
+        Args:
+            pattern: Redis pattern (e.g., "universe:*", "holdings:client001:*")
+
+        Returns:
+            Dictionary with pattern, keys_deleted and duration_ms
+        """
+        stats = {"pattern": pattern, "keys_deleted": 0, "duration_ms": 0.0}
+        stats["l1_keys_deleted"] = self.l1.invalidate_pattern(pattern)
+        if not self.enabled or not self.redis_client:
+            return stats
+
+        start = time.perf_counter()
+        pending: List[str] = []
+        deleted = 0
+        try:
+            for key in self.redis_client.scan_iter(match=pattern, count=self.SCAN_COUNT):
+                pending.append(key)
+                if len(pending) >= self.SCAN_COUNT:
+                    deleted += self._unlink_keys(pending)
+                    pending = []
+            deleted += self._unlink_keys(pending)
+
+        except Exception as e:
+            logger.error(f"Cache invalidation error for {pattern}: {e}")
+            stats["error"] = str(e)
+
+        stats["keys_deleted"] = deleted
+        stats["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        if deleted:
+            logger.info(f"Invalidated {deleted} keys matching '{pattern}' in {stats['duration_ms']}ms")
+        else:
+            logger.debug(f"No keys found matching '{pattern}' ({stats['duration_ms']}ms)")
+        return stats
+
+    def invalidate(self, pattern: str) -> int:
+        """
+        Invalidate all keys matching pattern
+
+        Args:
+            pattern: Redis pattern (e.g., "universe:*", "holdings:client001:*")
+
+        Returns:
+            Number of keys deleted
+        """
+        return self.invalidate_with_stats(pattern)["keys_deleted"]
+
     def invalidate_client(self, client_id: str):
         """
         Invalidate all cached data for a specific client
@@ -175,29 +861,45 @@ class CacheManager:
             f"holdings:{client_id}:*",
             f"transactions:{client_id}:*",
             f"rvm:{client_id}:*",
-            f"query:*{client_id}*"  # Queries mentioning this client
         ]
 
-        total = 0
+        # Hashed query keys are found through the tag index
+        start = time.perf_counter()
+        total = self.invalidate_tags([self.client_tag(client_id)])
         for pattern in patterns:
             total += self.invalidate(pattern)
 
-        logger.info(f"Invalidated {total} keys for client {client_id}")
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"Invalidated {total} keys for client {client_id} in {duration_ms}ms")
         return total
 
     def flush_all(self) -> bool:
         """
         Flush entire cache (use with caution!)
 
+        ID sequences (see id_allocator) live in the same database and are
+        kept: every other key is unlinked instead of FLUSHDB, so a
+        concurrent INCRBY on a sequence is never rolled back.
+
         Returns:
             True if successful
         """
+        self.l1.clear()
         if not self.enabled or not self.redis_client:
             return False
 
         try:
-            self.redis_client.flushdb()
-            logger.warning("⚠️  Flushed entire cache")
+            pending, deleted = [], 0
+            for key in self.redis_client.scan_iter(count=self.SCAN_COUNT):
+                name = key.decode() if isinstance(key, bytes) else key
+                if name.startswith(self.SEQUENCE_PREFIX):
+                    continue
+                pending.append(key)
+                if len(pending) >= self.SCAN_COUNT:
+                    deleted += self._unlink_keys(pending)
+                    pending = []
+            deleted += self._unlink_keys(pending)
+            logger.warning(f"⚠️  Flushed entire cache ({deleted} keys)")
             return True
 
         except Exception as e:
@@ -235,8 +937,20 @@ class CacheManager:
         Returns:
             Dictionary with cache stats (hits, misses, memory, etc.)
         """
+        l2_total = self.l2_hits + self.l2_misses
+        tiers = {
+            "l1": self.l1.stats(),
+            "l2": {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "hit_rate_percent": round(self.l2_hits / l2_total * 100, 2) if l2_total else 0,
+                "stale_hits": self.stale_hits,
+                "background_refreshes": self.refreshes,
+            },
+        }
+
         if not self.enabled or not self.redis_client:
-            return {"enabled": False}
+            return {"enabled": False, **tiers}
 
         try:
             info = self.redis_client.info('stats')
@@ -258,12 +972,13 @@ class CacheManager:
                 "keyspace_hits": hits,
                 "keyspace_misses": misses,
                 "hit_rate_percent": round(hit_rate, 2),
-                "memory_used": self.redis_client.info('memory').get('used_memory_human', 'N/A')
+                "memory_used": self.redis_client.info('memory').get('used_memory_human', 'N/A'),
+                **tiers,
             }
 
         except Exception as e:
             logger.error(f"Error getting cache stats: {e}")
-            return {"enabled": True, "error": str(e)}
+            return {"enabled": True, "error": str(e), **tiers}
 
     def health_check(self) -> bool:
         """
@@ -317,6 +1032,11 @@ def invalidate_cache(pattern: str) -> int:
     return get_cache_manager().invalidate(pattern)
 
 
+def invalidate_cache_tags(tags: List[str]) -> int:
+    """Invalidate keys registered under any of the tags"""
+    return get_cache_manager().invalidate_tags(tags)
+
+
 def get_cache_stats() -> Dict[str, Any]:
     """Get cache statistics"""
     return get_cache_manager().get_stats()
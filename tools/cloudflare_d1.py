@@ -3,15 +3,30 @@ Cloudflare D1 Tools for Orca MCP
 
 Handles staging transactions stored in Cloudflare D1 edge database.
 Provides fast, globally-distributed storage for hypothetical/sandbox trades.
+
+Every Worker endpoint is an async method on D1Client; the module-level
+functions are thin sync/async wrappers kept for existing callers. All
+requests share the keep-alive pools in http_pool and go through the
+per-endpoint retries, hedging and circuit breakers in resilience.py;
+failed reads return an empty frame with the reason in df.attrs['error'].
+
+Usage:
+    d1 = D1Client(client_id="guinness")
+    holdings, summary = await asyncio.gather(d1.get_holdings("wnbf"), d1.get_holdings_summary("wnbf"))
+
+    df = get_holdings("wnbf")   # sync wrapper
 """
 
+import os
 import json
 import urllib.request
 import urllib.error
 import urllib.parse
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
 import pandas as pd
 import sys
+import time
 from pathlib import Path
 import asyncio
 import logging
@@ -31,21 +46,50 @@ try:
 except ImportError:
     from client_config import get_client_config
 
+from .http_pool import DEFAULT_HEADERS, get_async_http_client, run_sync
+from .d1_schema import loads, records_to_frame
+from .d1_replica import get_d1_replica, mark_d1_replica_dirty
+from .resilience import call, endpoint_name
+from . import d1_delta_sync
+from .d1_delta_sync import (
+    HOLDINGS_SYNC, ANALYTICS_SYNC, PRICE_HISTORY_SYNC,
+    SyncTable, DeltaState, plan_delta, resolve_key,
+)
+
+logger = logging.getLogger(__name__)
+
+# ISINs per POST /api/analytics (D1 caps bound parameters per query)
+ANALYTICS_CHUNK_SIZE = int(os.getenv("ORCA_D1_ANALYTICS_CHUNK", "250"))
+# Rows the Worker returns at most per /api/analytics page (AnalyticsStream clamps to it)
+ANALYTICS_PAGE_CAP = int(os.getenv("ORCA_D1_ANALYTICS_PAGE_CAP", "5000"))
+# Concurrent requests per multi-request D1Client call
+D1_MAX_CONCURRENCY = int(os.getenv("ORCA_D1_CONCURRENCY", "4"))
+# Retries for idempotent requests on 429/5xx and transport errors (jittered, see resilience.py)
+D1_RETRIES = int(os.getenv("ORCA_D1_RETRIES", "2"))
+D1_RETRY_BACKOFF = 0.5
+
+_TRANSIENT_ERRORS = (asyncio.TimeoutError, OSError) + ((httpx.TransportError,) if httpx is not None else ())
+
 
 # Cloudflare bot protection blocks Python-urllib default User-Agent (error 1010).
 # All urllib requests must use this header set.
-_URLLIB_HEADERS = {
-    "User-Agent": "Orca-MCP/3.2",
-    "Accept": "application/json",
-}
+_URLLIB_HEADERS = DEFAULT_HEADERS
 
+STAGING_COLUMNS = [
+    'transaction_id', 'portfolio_id', 'transaction_date', 'settlement_date',
+    'transaction_type', 'isin', 'ticker', 'description', 'country',
+    'par_amount', 'price', 'accrued_interest', 'dirty_price', 'market_value',
+    'ytm', 'duration', 'spread', 'notes', 'created_at', 'created_by'
+]
 
-def _make_request(url: str, data: bytes = None, method: str = None) -> urllib.request.Request:
-    """Create a urllib Request with headers that pass Cloudflare bot protection."""
-    req = urllib.request.Request(url, data=data, method=method)
-    for k, v in _URLLIB_HEADERS.items():
-        req.add_header(k, v)
-    return req
+
+class D1HTTPError(Exception):
+    """Worker answered with a 4xx/5xx status"""
+
+    def __init__(self, code: int, body: str = ""):
+        super().__init__(f"{code} - {body}")
+        self.code = code
+        self.body = body
 
 
 def get_orca_url() -> str:
@@ -72,6 +116,987 @@ def get_orca_url() -> str:
 _get_d1_api_url = get_orca_url
 
 
+def _get_pricing_url() -> str:
+    import os
+    return os.getenv('GA10_PRICING_URL', 'https://ga10-pricing.urbancanary.workers.dev')
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """DataFrame rows as JSON-ready dicts (NaN -> None)"""
+    records = df.to_dict(orient='records')
+    for record in records:
+        for key, value in record.items():
+            if pd.isna(value):
+                record[key] = None
+    return records
+
+
+def cashflows_frame(cashflows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Cashflow records as a DataFrame with a payment_date column"""
+    df = records_to_frame(cashflows, 'cashflows')
+    # Normalise: Worker returns 'date' (aliased from payment_date), display code expects 'payment_date'
+    if 'date' in df.columns and 'payment_date' not in df.columns:
+        df['payment_date'] = df['date']
+    return df
+
+
+def _failed_frame(what: str, e: Exception) -> pd.DataFrame:
+    """Empty frame for a failed read, with the reason in df.attrs['error'] (unlike a genuinely empty result)"""
+    error = f"{e.code} - {e.body}" if isinstance(e, D1HTTPError) else str(e) or type(e).__name__
+    print(f"❌ Failed to {what}: {error}")
+    df = pd.DataFrame()
+    df.attrs['error'] = error
+    return df
+
+
+def _is_transient(e: BaseException) -> bool:
+    """429/5xx and transport errors: retried, and counted by the endpoint's circuit breaker"""
+    if isinstance(e, D1HTTPError):
+        return e.code == 429 or e.code >= 500
+    return isinstance(e, _TRANSIENT_ERRORS)
+
+
+def _write_through(replica, table: str, rows: List[Dict[str, Any]], scope=(), fetched_at: float = None):
+    """Store rows just fetched from the Worker in the local mirror (best effort)"""
+    try:
+        replica.load_records(table, rows, scope=scope, fetched_at=fetched_at)
+    except Exception as e:
+        logger.warning(f"D1 replica write-through of {table} failed: {e}")
+
+
+def _urllib_request(method: str, url: str, params: Optional[Dict] = None, json_body: Any = None,
+                    headers: Optional[Dict[str, str]] = None, timeout: float = 10.0) -> Any:
+    """Blocking fallback for D1Client when httpx isn't installed"""
+    if params:
+        url = f"{url}?{urllib.parse.urlencode(params)}"
+    data = json.dumps(json_body).encode('utf-8') if json_body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    for k, v in {**_URLLIB_HEADERS, **(headers or {})}.items():
+        req.add_header(k, v)
+    if data is not None:
+        req.add_header('Content-Type', 'application/json')
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return loads(response.read())
+    except urllib.error.HTTPError as e:
+        raise D1HTTPError(e.code, e.read().decode() if e.fp else "")
+
+
+class AnalyticsStream:
+    """
+    Pages of /api/analytics as DataFrames, with `prefetch` pages in flight
+
+    The first non-empty page fixes the schema (column order and dtypes);
+    later pages are aligned to it. Iterate with `async for` (inside a loop)
+    or plain `for` (sync code, driven through http_pool.run_sync).
+
+    page_size is clamped to ANALYTICS_PAGE_CAP. A short page is not taken
+    as the end of the table (the Worker may cap pages lower still): the
+    stream shrinks page_size to what came back and probes the next offset,
+    ending only on an empty page.
+    """
+
+    def __init__(self, client: "D1Client", page_size: int = 5000, prefetch: int = 4):
+        if page_size <= 0 or prefetch <= 0:
+            raise ValueError("page_size and prefetch must be positive")
+        self.client = client
+        self.page_size = min(page_size, ANALYTICS_PAGE_CAP)
+        self.prefetch = prefetch
+        self.schema: Optional[pd.Series] = None  # column -> dtype
+        self.pages = 0
+        self.rows = 0
+
+    async def _fetch(self, offset: int) -> List[Dict[str, Any]]:
+        try:
+            data = await self.client._request_with_retry(
+                'GET', f"{self.client.base_url}/api/analytics",
+                params={'limit': self.page_size, 'offset': offset}, timeout=15.0)
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to fetch analytics page at offset {offset}: {e.code} - {e.body}")
+        return data.get('analytics', [])
+
+    def _frame(self, records: List[Dict[str, Any]]) -> pd.DataFrame:
+        df = records_to_frame(records, 'analytics')
+        if self.schema is None:
+            self.schema = df.dtypes
+            return df
+        df = df.reindex(columns=self.schema.index)
+        # All-null columns in a page come back as object; restore the schema
+        for column, dtype in self.schema.items():
+            if df[column].dtype != dtype:
+                try:
+                    df[column] = df[column].astype(dtype)
+                except (TypeError, ValueError):
+                    pass
+        return df
+
+    async def __aiter__(self) -> AsyncIterator[pd.DataFrame]:
+        in_flight: deque = deque()  # (offset, task)
+        next_offset = 0
+
+        def schedule():
+            nonlocal next_offset
+            while len(in_flight) < self.prefetch:
+                in_flight.append((next_offset, asyncio.ensure_future(self._fetch(next_offset))))
+                next_offset += self.page_size
+
+        schedule()
+        try:
+            while in_flight:
+                offset, task = in_flight.popleft()
+                records = await task
+                if not records:
+                    break
+                self.pages += 1
+                self.rows += len(records)
+                yield self._frame(records)
+                if len(records) < self.page_size:
+                    # Last page, or the Worker capped it: drop the pages
+                    # prefetched at the old stride and probe right after it
+                    self.page_size = len(records)
+                    for _, pending in in_flight:
+                        pending.cancel()
+                    in_flight.clear()
+                    next_offset = offset + len(records)
+                    in_flight.append((next_offset, asyncio.ensure_future(self._fetch(next_offset))))
+                    next_offset += self.page_size
+                    continue
+                schedule()
+        finally:
+            # Pages past the end (or left behind by an early exit)
+            for _, task in in_flight:
+                task.cancel()
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        pages = self.__aiter__()
+        try:
+            while True:
+                try:
+                    yield run_sync(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            run_sync(pages.aclose())
+
+    def _concat(self, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        print(f"✅ Fetched {len(df)} bonds from D1 analytics in {self.pages} pages")
+        return df
+
+    async def acollect(self) -> pd.DataFrame:
+        """Every page concatenated into one frame with the fixed schema"""
+        return self._concat([frame async for frame in self])
+
+    def collect(self) -> pd.DataFrame:
+        """Sync collect()"""
+        return self._concat(list(self))
+
+
+class D1Client:
+    """
+    Async access to every Cloudflare D1 Worker endpoint
+
+    Methods keep the return/error conventions of the module functions: reads
+    return an empty DataFrame/dict/list on failure, writes raise RuntimeError.
+    Independent calls can be awaited concurrently.
+    """
+
+    def __init__(self, client_id: Optional[str] = None, base_url: Optional[str] = None):
+        self.client_id = client_id
+        self._base_url = base_url
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url or _get_d1_api_url()
+
+    def _staging_client_id(self) -> str:
+        return get_client_config(self.client_id).client_id
+
+    async def _request(self, method: str, url: str, params: Optional[Dict] = None, json_body: Any = None,
+                       client_id: Optional[str] = None, timeout: float = 10.0,
+                       idempotent: Optional[bool] = None, retries: int = D1_RETRIES) -> Any:
+        """
+        One Worker call over the shared pool, through the endpoint's resilience layer
+
+        Idempotent calls (GETs by default) are retried with jittered backoff
+        on 429/5xx and transport errors, and GETs are hedged past the
+        endpoint's p95 latency. Every call goes through the endpoint's
+        circuit breaker (see tools/resilience.py).
+
+        Args:
+            method: HTTP method
+            url: Full endpoint URL
+            params: Query parameters
+            json_body: JSON payload (POST/PATCH)
+            client_id: Sent as X-Client-ID when given
+            timeout: Request timeout in seconds per attempt
+            idempotent: Safe to repeat (default: GET only)
+            retries: Extra attempts for idempotent calls
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            D1HTTPError: on 4xx/5xx responses
+            CircuitOpenError: the endpoint's breaker is open
+        """
+        headers = {'X-Client-ID': client_id} if client_id else {}
+
+        async def send() -> Any:
+            if httpx is None:
+                return await asyncio.to_thread(_urllib_request, method, url, params, json_body, headers, timeout)
+            response = await get_async_http_client().request(
+                method, url, params=params, json=json_body, headers=headers, timeout=timeout
+            )
+            if response.is_error:
+                raise D1HTTPError(response.status_code, response.text)
+            return loads(response.content)
+
+        return await call(endpoint_name(method, url), send,
+                          idempotent=method == 'GET' if idempotent is None else idempotent,
+                          hedge=method == 'GET', retryable=_is_transient,
+                          retries=retries, backoff=D1_RETRY_BACKOFF)
+
+    async def _request_with_retry(self, method: str, url: str, retries: int = D1_RETRIES, **kwargs) -> Any:
+        """_request for non-GET calls that are safe to repeat (read-only POSTs, upserts)"""
+        return await self._request(method, url, idempotent=True, retries=retries, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Staging transactions
+    # ------------------------------------------------------------------
+
+    async def save_staging_transaction(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Save a staging transaction; returns the Worker result with transaction_id"""
+        client_id = self._staging_client_id()
+        transaction_data['portfolio_id'] = transaction_data.get('portfolio_id', client_id)
+        try:
+            result = await self._request('POST', f"{self.base_url}/api/staging/transactions",
+                                         json_body=transaction_data, client_id=client_id)
+            print(f"✅ Saved staging transaction: {result.get('transaction_id')}")
+            mark_d1_replica_dirty('holdings')
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to save staging transaction: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to save staging transaction: {str(e)}")
+
+    async def get_staging_transactions(self, portfolio_id: str) -> pd.DataFrame:
+        """Staging transactions for a portfolio (empty frame with STAGING_COLUMNS if none)"""
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/staging/transactions",
+                                       params={'portfolio_id': portfolio_id},
+                                       client_id=self._staging_client_id())
+        except D1HTTPError as e:
+            if e.code == 404:
+                # No staging transactions found - return empty DataFrame
+                return pd.DataFrame(columns=STAGING_COLUMNS)
+            raise RuntimeError(f"Failed to fetch staging transactions: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch staging transactions: {str(e)}")
+
+        transactions = data.get('transactions', [])
+        if not transactions:
+            return pd.DataFrame(columns=STAGING_COLUMNS)
+
+        df = pd.DataFrame(transactions)
+        print(f"✅ Fetched {len(df)} staging transactions from D1")
+        return df
+
+    async def delete_staging_transaction(self, transaction_id: int) -> Dict[str, Any]:
+        """Delete one staging transaction"""
+        try:
+            result = await self._request('DELETE', f"{self.base_url}/api/staging/transactions/{transaction_id}",
+                                         client_id=self._staging_client_id())
+            print(f"✅ Deleted staging transaction: {transaction_id}")
+            mark_d1_replica_dirty('holdings')
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to delete staging transaction: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete staging transaction: {str(e)}")
+
+    async def update_transaction(self, transaction_id: int, status: str) -> Dict[str, Any]:
+        """Set a transaction's status (errors are returned, not raised)"""
+        try:
+            result = await self._request('PATCH', f"{self.base_url}/api/transactions/{transaction_id}",
+                                         json_body={'status': status}, client_id=self._staging_client_id())
+            print(f"✅ Updated transaction {transaction_id} to {status}")
+            mark_d1_replica_dirty('holdings')
+            return result
+        except D1HTTPError as e:
+            return {'success': False, 'transaction_id': transaction_id, 'error': f"HTTP {e.code}: {e.body}"}
+        except Exception as e:
+            return {'success': False, 'transaction_id': transaction_id, 'error': str(e)}
+
+    async def clear_all_staging_transactions(self, portfolio_id: str) -> Dict[str, Any]:
+        """Delete every staging transaction of a portfolio"""
+        try:
+            result = await self._request('DELETE', f"{self.base_url}/api/staging/transactions/clear",
+                                         params={'portfolio_id': portfolio_id},
+                                         client_id=self._staging_client_id())
+            print(f"✅ Cleared {result.get('count', 0)} staging transactions")
+            mark_d1_replica_dirty('holdings')
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to clear staging transactions: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to clear staging transactions: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Portfolio reads
+    # ------------------------------------------------------------------
+
+    async def get_holdings(self, portfolio_id: str = 'wnbf', staging_id: int = 1) -> pd.DataFrame:
+        """Holdings (staging_id 1=live, 2=staging)"""
+        replica = get_d1_replica()
+        if replica is not None:
+            df = replica.read('holdings', (portfolio_id, staging_id))
+            if df is not None:
+                print(f"✅ Fetched {len(df)} holdings from local D1 replica (staging_id={staging_id})")
+                return df
+        fetched_at = time.time()
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/holdings",
+                                       params={'portfolio_id': portfolio_id, 'staging_id': staging_id})
+        except Exception as e:
+            return _failed_frame("fetch holdings from D1", e)
+
+        holdings = data.get('holdings', [])
+        if not holdings:
+            print(f"⚠️ No holdings found in D1 for {portfolio_id} staging_id={staging_id}")
+            return pd.DataFrame()
+
+        if replica is not None:
+            _write_through(replica, 'holdings', holdings, (portfolio_id, staging_id), fetched_at)
+        df = records_to_frame(holdings, 'holdings')
+        print(f"✅ Fetched {len(df)} holdings from D1 (staging_id={staging_id})")
+        return df
+
+    async def get_holdings_summary(self, portfolio_id: str = 'wnbf', staging_id: int = 1) -> Dict[str, Any]:
+        """Summary stats and country breakdown"""
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/holdings/summary",
+                                       params={'portfolio_id': portfolio_id, 'staging_id': staging_id})
+            print(f"✅ Fetched portfolio summary from D1 (staging_id={staging_id})")
+            return data
+        except D1HTTPError as e:
+            print(f"❌ Failed to fetch holdings summary from D1: {e.code} - {e.body}")
+            return {}
+        except Exception as e:
+            print(f"❌ Failed to fetch holdings summary from D1: {str(e)}")
+            return {}
+
+    async def get_transactions(self, portfolio_id: str = 'wnbf') -> pd.DataFrame:
+        """Historical transactions"""
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/transactions",
+                                       params={'portfolio_id': portfolio_id}, timeout=15.0)
+        except Exception as e:
+            return _failed_frame("fetch transactions from D1", e)
+
+        transactions = data.get('transactions', [])
+        if not transactions:
+            print(f"⚠️ No transactions found in D1 for {portfolio_id}")
+            return pd.DataFrame()
+
+        df = records_to_frame(transactions, 'transactions')
+        print(f"✅ Fetched {len(df)} transactions from D1")
+        return df
+
+    async def get_cashflows(self, portfolio_id: str = 'wnbf') -> pd.DataFrame:
+        """Future coupon/principal payments"""
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/cashflows",
+                                       params={'portfolio_id': portfolio_id}, timeout=15.0)
+        except Exception as e:
+            return _failed_frame("fetch cashflows from D1", e)
+
+        cashflows = data.get('cashflows', [])
+        if not cashflows:
+            print(f"⚠️ No cashflows found in D1 for {portfolio_id}")
+            return pd.DataFrame()
+
+        df = cashflows_frame(cashflows)
+        print(f"✅ Fetched {len(df)} cashflows from D1")
+        return df
+
+    async def get_portfolio_bundle(self, portfolio_id: str, parts: List[str], staging_id: int = 1) -> Dict[str, Any]:
+        """
+        Several portfolio reads in one Worker call
+
+        Unlike the other reads this raises, so callers can tell an older
+        Worker without the endpoint (404) from an empty portfolio.
+
+        Args:
+            portfolio_id: Portfolio identifier
+            parts: Any of holdings, staging_holdings, summary, transactions, cashflows
+            staging_id: staging_id used for "holdings"
+
+        Returns:
+            Dict keyed by part (records lists, summary dict); missing parts are omitted
+
+        Raises:
+            D1HTTPError: on 4xx/5xx responses
+        """
+        return await self._request('GET', f"{self.base_url}/api/portfolio/bundle",
+                                   params={'portfolio_id': portfolio_id, 'staging_id': staging_id,
+                                           'parts': ','.join(parts)},
+                                   timeout=15.0)
+
+    # ------------------------------------------------------------------
+    # Universe / analytics
+    # ------------------------------------------------------------------
+
+    async def get_watchlist(self) -> pd.DataFrame:
+        """Watchlist ISINs and metadata (ga10-pricing Worker)"""
+        replica = get_d1_replica()
+        if replica is not None:
+            df = replica.read('watchlist')
+            if df is not None:
+                print(f"✅ Fetched {len(df)} bonds from local D1 replica watchlist")
+                return df
+        fetched_at = time.time()
+        try:
+            data = await self._request('GET', f"{_get_pricing_url()}/watchlist", timeout=15.0)
+        except Exception as e:
+            return _failed_frame("fetch watchlist", e)
+
+        # API returns 'watchlist' not 'bonds'
+        watchlist = data.get('watchlist', [])
+        if not watchlist:
+            print("⚠️ No bonds found in watchlist")
+            return pd.DataFrame()
+
+        if replica is not None:
+            _write_through(replica, 'watchlist', watchlist, fetched_at=fetched_at)
+        df = pd.DataFrame(watchlist)
+        print(f"✅ Fetched {len(df)} bonds from watchlist D1 API")
+        return df
+
+    async def get_analytics(self, limit: int = 5000, offset: int = 0) -> pd.DataFrame:
+        """One page of the analytics universe"""
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/analytics",
+                                       params={'limit': limit, 'offset': offset}, timeout=15.0)
+        except Exception as e:
+            return _failed_frame("fetch analytics from D1", e)
+
+        analytics = data.get('analytics', [])
+        if not analytics:
+            print(f"⚠️ No analytics found in D1")
+            return pd.DataFrame()
+
+        df = records_to_frame(analytics, 'analytics')
+        print(f"✅ Fetched {len(df)} bonds from D1 analytics")
+        return df
+
+    def iter_analytics(self, page_size: int = 5000, prefetch: int = 4) -> AnalyticsStream:
+        """Whole analytics table as a stream of pages (see AnalyticsStream)"""
+        return AnalyticsStream(self, page_size, prefetch)
+
+    async def get_analytics_batch(self, isins: List[str], chunk_size: int = ANALYTICS_CHUNK_SIZE) -> pd.DataFrame:
+        """
+        Analytics for specific ISINs
+
+        Large lists are split into chunk_size POSTs, D1_MAX_CONCURRENCY in
+        flight, each retried on transient errors. Rows from all chunks are
+        built into one frame so dtypes are inferred once. ISINs that came
+        back without a row (not in D1, or their chunk failed) are listed in
+        df.attrs['missing_isins'].
+        """
+        isins = list(dict.fromkeys(isins or []))
+        if not isins:
+            return pd.DataFrame()
+
+        replica = get_d1_replica()
+        df = replica.read_by_isin('analytics', isins) if replica is not None else None
+        if df is not None:
+            found = set(df['isin']) if 'isin' in df.columns else set()
+            df.attrs['missing_isins'] = [isin for isin in isins if isin not in found]
+            print(f"✅ Fetched analytics for {len(df)}/{len(isins)} ISINs from local D1 replica")
+            return df
+
+        url = f"{self.base_url}/api/analytics"
+        chunks = [isins[i:i + chunk_size] for i in range(0, len(isins), chunk_size)]
+        semaphore = asyncio.Semaphore(D1_MAX_CONCURRENCY)
+
+        async def fetch(chunk: List[str]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                # Read-only POST: safe to retry
+                data = await self._request_with_retry('POST', url, json_body={"isins": chunk}, timeout=15.0)
+                return data.get('analytics', [])
+
+        results = await asyncio.gather(*(fetch(chunk) for chunk in chunks), return_exceptions=True)
+
+        analytics: List[Dict[str, Any]] = []
+        failed = 0
+        for result in results:
+            if isinstance(result, D1HTTPError):
+                failed += 1
+                print(f"❌ Failed to fetch analytics batch from D1: {result.code} - {result.body}")
+            elif isinstance(result, BaseException):
+                failed += 1
+                print(f"❌ Failed to fetch analytics batch from D1: {str(result)}")
+            else:
+                analytics.extend(result)
+
+        if not analytics:
+            if not failed:
+                print(f"⚠️ No analytics found for {len(isins)} ISINs in D1")
+            df = pd.DataFrame()
+            df.attrs['missing_isins'] = isins
+            if failed:
+                df.attrs['error'] = f"{failed}/{len(chunks)} analytics chunks failed"
+            return df
+
+        df = records_to_frame(analytics, 'analytics')
+        found = set(df['isin']) if 'isin' in df.columns else set()
+        missing = [isin for isin in isins if isin not in found]
+        df.attrs['missing_isins'] = missing
+
+        chunk_note = f" in {len(chunks)} chunks" if len(chunks) > 1 else ""
+        print(f"✅ Fetched analytics for {len(df)}/{len(isins)} ISINs from D1{chunk_note}")
+        if missing:
+            failed_note = f", {failed}/{len(chunks)} chunks failed" if failed else ""
+            print(f"⚠️ {len(missing)} ISINs missing from D1 analytics{failed_note}")
+        return df
+
+    async def search_bonds(self, country: Optional[str] = None, maturity_year: Optional[int] = None,
+                           ticker: Optional[str] = None, coupon: Optional[float] = None,
+                           limit: int = 20) -> pd.DataFrame:
+        """Filtered analytics search (at least one filter required)"""
+        # Need at least one filter
+        if not any([country, maturity_year, ticker, coupon]):
+            print("⚠️ search_bonds requires at least one filter")
+            return pd.DataFrame()
+
+        params = {}
+        if country:
+            params['country'] = country
+        if maturity_year:
+            params['maturity_year'] = maturity_year
+        if ticker:
+            params['ticker'] = ticker
+        if coupon:
+            params['coupon'] = coupon
+        params['limit'] = limit
+
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/analytics/search",
+                                       params=params, timeout=15.0)
+        except Exception as e:
+            return _failed_frame("search bonds in D1", e)
+
+        analytics = data.get('analytics', [])
+        if not analytics:
+            filters = data.get('filters', {})
+            print(f"⚠️ No bonds found matching filters: {filters}")
+            return pd.DataFrame()
+
+        df = records_to_frame(analytics, 'analytics')
+        print(f"✅ Found {len(df)} bonds matching search criteria")
+        return df
+
+    async def match_bond(self, query: str, source: str = "analytics", top_n: int = 5,
+                         portfolio_id: str = "wnbf", bonds: List[Dict] = None) -> Dict[str, Any]:
+        """Server-side natural language bond matching"""
+        payload = {
+            "query": query,
+            "source": source,
+            "top_n": top_n,
+            "portfolio_id": portfolio_id
+        }
+        if bonds:
+            payload["bonds"] = bonds
+
+        try:
+            data = await self._request('POST', f"{self.base_url}/api/bond_match",
+                                       json_body=payload, timeout=15.0)
+        except D1HTTPError as e:
+            print(f"❌ Bond match failed: {e.code} - {e.body}")
+            return {"error": f"HTTP {e.code}: {e.body}", "intent": None, "matches": [], "confident_match": None}
+        except Exception as e:
+            print(f"❌ Bond match failed: {str(e)}")
+            return {"error": str(e), "intent": None, "matches": [], "confident_match": None}
+
+        # Log result summary
+        matches = data.get('matches', [])
+        confident = data.get('confident_match')
+        if confident:
+            print(f"✅ Confident match: {confident.get('ticker')} {confident.get('description')}")
+        elif matches:
+            print(f"📊 Found {len(matches)} potential matches (best score: {matches[0].get('score', 0)})")
+        else:
+            print(f"⚠️ No matches found for: {query}")
+        return data
+
+    async def get_watchlist_complete(self) -> pd.DataFrame:
+        """Watchlist joined with full D1 analytics"""
+        watchlist_df = await self.get_watchlist()
+
+        if watchlist_df.empty:
+            print("⚠️ No watchlist bonds found")
+            return pd.DataFrame()
+
+        isins = watchlist_df['isin'].unique().tolist()
+        print(f"📊 Fetching complete data for {len(isins)} watchlist bonds from D1...")
+
+        # Get full analytics from D1 (already synced from BigQuery)
+        analytics_df = await self.get_analytics_batch(isins)
+
+        if analytics_df.empty:
+            print("⚠️ No analytics found in D1 - returning watchlist-only data")
+            print("   Ensure analytics sync job has run: python scripts/sync_analytics_to_d1.py")
+            return watchlist_df
+
+        missing = analytics_df.attrs.get('missing_isins', [])
+
+        # Rename columns to match expected format
+        column_mapping = {
+            'yield': 'ytw',
+            'duration': 'duration',  # same
+            'spread': 'spread',      # same
+        }
+        analytics_df = analytics_df.rename(columns=column_mapping)
+
+        # Join watchlist metadata with analytics
+        complete_df = watchlist_df.merge(analytics_df, on='isin', how='left')
+        complete_df.attrs['missing_isins'] = missing
+
+        print(f"✅ Fetched complete data for {len(complete_df)} watchlist bonds from D1")
+        return complete_df
+
+    async def get_period_prices(self, start_date: str, end_date: str, isins: List[str] = None) -> pd.DataFrame:
+        """Begin/end prices per ISIN for a P&L period"""
+        replica = get_d1_replica()
+        df = replica.read_period_prices(start_date, end_date, isins) if replica is not None else None
+        if df is not None and not df.empty:
+            print(f"✅ Fetched period prices for {len(df)} bonds from local D1 replica")
+            return df
+
+        params = {
+            'start_date': start_date,
+            'end_date': end_date
+        }
+        if isins:
+            params['isins'] = ','.join(isins)
+
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/price_history/period",
+                                       params=params, timeout=15.0)
+        except Exception as e:
+            return _failed_frame("fetch period prices from D1", e)
+
+        period_prices = data.get('period_prices', [])
+        if not period_prices:
+            print(f"⚠️ No price history found for period {start_date} to {end_date}")
+            return pd.DataFrame()
+
+        df = records_to_frame(period_prices, 'period_prices')
+        print(f"✅ Fetched period prices for {len(df)} bonds from D1")
+        return df
+
+    # ------------------------------------------------------------------
+    # Sync jobs (BigQuery -> D1)
+    # ------------------------------------------------------------------
+
+    async def _delta_sync(self, table: SyncTable, df: pd.DataFrame, scope: str = "", full: bool = False,
+                          payload: Optional[Dict[str, Any]] = None, first_payload: Optional[Dict[str, Any]] = None,
+                          server_deleted: Optional[Callable[[str], bool]] = None,
+                          replica_scope: Optional[tuple] = None, timeout: float = 120.0) -> Dict[str, Any]:
+        """
+        Upload only the rows whose content hash changed since the last sync
+
+        Args:
+            table: Table being synced (see d1_delta_sync)
+            df: Full current contents
+            scope: Separate state per scope (e.g. one portfolio's holdings)
+            full: Ignore the last sync and upload every row
+            payload: Extra fields sent with every upsert request
+            first_payload: Extra fields for the first request only, which is
+                sent (even with no rows) before the rest go out concurrently
+            server_deleted: Row keys the first request deletes server-side
+            replica_scope: Scope of the local mirror to invalidate (default: whole table)
+            timeout: Per-request timeout in seconds
+
+        Returns:
+            Report with inserted/updated/deleted/unchanged rows and bytes_sent/bytes_saved
+
+        Raises:
+            RuntimeError: if any request failed (accepted chunks are recorded,
+                so the next run only re-sends the rest)
+        """
+        table = resolve_key(table, df.columns)
+        state = DeltaState.load(table, scope)
+        plan = plan_delta(table, _records(df), state, full=full)
+
+        hashes = {} if full else dict(state.hashes)
+        if server_deleted:
+            hashes = {key: digest for key, digest in hashes.items() if not server_deleted(key)}
+            plan.deletes = [key for key in plan.deletes if not server_deleted(key)]
+
+        chunks = ([plan.upserts] if plan.upserts else []) if table.replace else list(plan.chunks())
+        if first_payload and not chunks:
+            chunks = [[]]
+
+        url = f"{self.base_url}{table.upsert_path}"
+        semaphore = asyncio.Semaphore(D1_MAX_CONCURRENCY)
+
+        async def upload(chunk, extra):
+            body = {**(payload or {}), **extra, table.payload_field: [row[2] for row in chunk]}
+            async with semaphore:
+                # Upserts (and whole-set replaces) are idempotent: safe to retry
+                await self._request_with_retry('POST', url, json_body=body, timeout=timeout)
+            return chunk
+
+        results: List[Any] = []
+        if first_payload:
+            try:
+                results.append(await upload(chunks[0], first_payload))
+            except D1HTTPError as e:
+                raise RuntimeError(f"Failed to sync {table.name} to D1: {e.code} - {e.body}")
+            except Exception as e:
+                raise RuntimeError(f"Failed to sync {table.name} to D1: {str(e)}")
+            chunks = chunks[1:]
+        results += await asyncio.gather(*(upload(chunk, {}) for chunk in chunks), return_exceptions=True)
+
+        errors, bytes_sent = [], 0
+        for result in results:
+            if isinstance(result, BaseException):
+                errors.append(f"{result.code} - {result.body}" if isinstance(result, D1HTTPError) else str(result))
+                continue
+            for key, digest, _, size in result:
+                hashes[key] = digest
+                bytes_sent += size
+
+        deleted, deletes_pending = 0, 0
+        if plan.deletes and table.replace:
+            if not errors:
+                # Gone from the replaced set
+                for key in plan.deletes:
+                    hashes.pop(key, None)
+                deleted = len(plan.deletes)
+        elif plan.deletes and table.delete_path:
+            keys = plan.delete_keys()
+            step = d1_delta_sync.CHUNK_ROWS
+            for i in range(0, len(keys), step):
+                batch = plan.deletes[i:i + step]
+                try:
+                    await self._request_with_retry('POST', f"{self.base_url}{table.delete_path}",
+                                                   json_body={"keys": keys[i:i + step]}, timeout=timeout)
+                except D1HTTPError as e:
+                    if e.code in (404, 405, 501):
+                        # Worker can't delete rows of this table; keep them in state and retry next run
+                        deletes_pending = len(plan.deletes) - deleted
+                        print(f"⚠️ D1 has no {table.delete_path}: {deletes_pending} {table.name} rows left in place")
+                        break
+                    errors.append(f"delete: {e.code} - {e.body}")
+                    continue
+                except Exception as e:
+                    errors.append(f"delete: {str(e)}")
+                    continue
+                for key in batch:
+                    hashes.pop(key, None)
+                deleted += len(batch)
+        else:
+            deletes_pending = len(plan.deletes)
+
+        state.hashes = hashes
+        state.save()
+        if results or deleted:
+            mark_d1_replica_dirty(table.name, replica_scope)
+
+        report = {
+            "success": not errors,
+            "table": table.name,
+            "rows": plan.inserted + plan.updated + plan.unchanged,
+            "inserted": plan.inserted,
+            "updated": plan.updated,
+            "unchanged": plan.unchanged,
+            "deleted": deleted,
+            "deletes_pending": deletes_pending,
+            "requests": len(results),
+            "failed_requests": len(errors),
+            "bytes_sent": bytes_sent,
+            "bytes_saved": plan.total_bytes - bytes_sent,
+        }
+        if errors:
+            raise RuntimeError(f"Failed to sync {table.name} to D1 ({len(errors)} requests failed, "
+                               f"accepted rows recorded): {errors[0]}")
+        if not plan.changed and not first_payload:
+            print(f"✅ {table.name} unchanged since last D1 sync ({report['rows']} rows, nothing sent)")
+        else:
+            print(f"✅ Delta-synced {table.name} to D1: {plan.inserted} inserted, {plan.updated} updated, "
+                  f"{deleted} deleted, {plan.unchanged} unchanged "
+                  f"({bytes_sent / 1024:,.0f} KB sent, {report['bytes_saved'] / 1024:,.0f} KB saved)")
+        return report
+
+    async def sync_holdings(self, holdings_df: pd.DataFrame, portfolio_id: str = 'wnbf',
+                            staging_id: int = 1, delta: bool = True) -> Dict[str, Any]:
+        """Replace a portfolio's holdings in D1 (skipped when no row changed, if delta)"""
+        if holdings_df.empty:
+            return {"success": False, "error": "Empty DataFrame provided"}
+
+        if delta:
+            return await self._delta_sync(HOLDINGS_SYNC, holdings_df, scope=f"{portfolio_id}_{staging_id}",
+                                          payload={"portfolio_id": portfolio_id, "staging_id": staging_id},
+                                          replica_scope=(portfolio_id, staging_id), timeout=60.0)
+
+        payload = {
+            "portfolio_id": portfolio_id,
+            "staging_id": staging_id,
+            "holdings": _records(holdings_df)
+        }
+        try:
+            result = await self._request('POST', f"{self.base_url}/api/holdings/sync",
+                                         json_body=payload, timeout=60.0)
+            print(f"✅ Synced {result.get('inserted', 0)} holdings to D1 (staging_id={staging_id})")
+            mark_d1_replica_dirty('holdings', (portfolio_id, staging_id))
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to sync holdings to D1: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to sync holdings to D1: {str(e)}")
+
+    async def sync_analytics(self, analytics_df: pd.DataFrame, clear_first: bool = False,
+                             delta: bool = True) -> Dict[str, Any]:
+        """Upsert bond analytics into D1 (only changed rows, if delta)"""
+        if analytics_df.empty:
+            return {"success": False, "error": "Empty DataFrame provided"}
+
+        if delta:
+            # clear_first wipes the table, so every row goes up again
+            return await self._delta_sync(ANALYTICS_SYNC, analytics_df, full=clear_first,
+                                          payload={"clear_first": False},
+                                          first_payload={"clear_first": True} if clear_first else None)
+
+        payload = {
+            "analytics": _records(analytics_df),
+            "clear_first": clear_first
+        }
+        try:
+            result = await self._request('POST', f"{self.base_url}/api/analytics/sync",
+                                         json_body=payload, timeout=120.0)
+            print(f"✅ Synced {result.get('upserted', 0)} analytics records to D1")
+            mark_d1_replica_dirty('analytics')
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to sync analytics to D1: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to sync analytics to D1: {str(e)}")
+
+    async def sync_price_history(self, prices_df: pd.DataFrame, clear_before_date: str = None,
+                                 delta: bool = True) -> Dict[str, Any]:
+        """Upsert price history into D1 (only changed rows, if delta)"""
+        if prices_df.empty:
+            return {"success": False, "error": "Empty DataFrame provided"}
+
+        if delta:
+            # Keys are "<isin>|<date>"; the Worker drops rows before clear_before_date itself
+            cleared = (lambda key: key.rsplit('|', 1)[-1][:10] < clear_before_date) if clear_before_date else None
+            return await self._delta_sync(PRICE_HISTORY_SYNC, prices_df,
+                                          first_payload={"clear_before_date": clear_before_date} if clear_before_date else None,
+                                          server_deleted=cleared)
+
+        payload = {"prices": _records(prices_df)}
+        if clear_before_date:
+            payload["clear_before_date"] = clear_before_date
+        try:
+            result = await self._request('POST', f"{self.base_url}/api/price_history/sync",
+                                         json_body=payload, timeout=120.0)
+            print(f"✅ Synced {result.get('upserted', 0)} price records to D1")
+            mark_d1_replica_dirty('price_history')
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to sync price history to D1: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to sync price history to D1: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Remote pages
+    # ------------------------------------------------------------------
+
+    async def get_remote_pages(self, enabled_only: bool = True) -> List[Dict[str, Any]]:
+        """Remote page definitions for this client"""
+        client_id = self.client_id or 'guinness'
+        params = {'client_id': client_id}
+        if enabled_only:
+            params['enabled'] = 'true'
+        try:
+            data = await self._request('GET', f"{self.base_url}/api/remote_pages",
+                                       params=params, client_id=client_id)
+        except D1HTTPError as e:
+            if e.code == 404:
+                # No remote pages table or no pages - this is fine
+                return []
+            print(f"❌ Failed to fetch remote pages from D1: {e.code} - {e.body}")
+            return []
+        except Exception as e:
+            print(f"❌ Failed to fetch remote pages from D1: {str(e)}")
+            return []
+
+        pages = data.get('pages', [])
+        print(f"✅ Fetched {len(pages)} remote pages from D1")
+        return pages
+
+    async def save_remote_page(self, page_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create or update a remote page"""
+        client_id = self.client_id or 'guinness'
+
+        # Ensure required fields
+        if 'page_id' not in page_data:
+            raise ValueError("page_id is required")
+        if 'page_code' not in page_data:
+            raise ValueError("page_code is required")
+
+        page_data['client_id'] = client_id
+
+        # Convert dependencies list to JSON if needed
+        if 'dependencies' in page_data and isinstance(page_data['dependencies'], list):
+            page_data['dependencies'] = json.dumps(page_data['dependencies'])
+
+        try:
+            result = await self._request('POST', f"{self.base_url}/api/remote_pages",
+                                         json_body=page_data, client_id=client_id)
+            print(f"✅ Saved remote page: {page_data['page_id']} (v{result.get('version', 1)})")
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to save remote page: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to save remote page: {str(e)}")
+
+    async def delete_remote_page(self, page_id: str) -> Dict[str, Any]:
+        """Delete a remote page"""
+        try:
+            result = await self._request('DELETE', f"{self.base_url}/api/remote_pages/{page_id}",
+                                         client_id=self.client_id or 'guinness')
+            print(f"✅ Deleted remote page: {page_id}")
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to delete remote page: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete remote page: {str(e)}")
+
+    async def toggle_remote_page(self, page_id: str, enabled: bool) -> Dict[str, Any]:
+        """Enable or disable a remote page"""
+        try:
+            result = await self._request('PATCH', f"{self.base_url}/api/remote_pages/{page_id}",
+                                         json_body={'enabled': enabled}, client_id=self.client_id or 'guinness')
+            status = "enabled" if enabled else "disabled"
+            print(f"✅ Remote page {page_id} {status}")
+            return result
+        except D1HTTPError as e:
+            raise RuntimeError(f"Failed to toggle remote page: {e.code} - {e.body}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to toggle remote page: {str(e)}")
+
+
+# ==============================================================================
+# Module-level API (thin wrappers over D1Client)
+# ==============================================================================
+
 def save_staging_transaction(transaction_data: Dict[str, Any], client_id: str = None) -> Dict[str, Any]:
     """
     Save a staging transaction to Cloudflare D1
@@ -83,34 +1108,7 @@ def save_staging_transaction(transaction_data: Dict[str, Any], client_id: str =
     Returns:
         Result with transaction_id
     """
-    config = get_client_config(client_id)
-
-    # Build request
-    url = f"{_get_d1_api_url()}/api/staging/transactions"
-
-    # Add client_id to transaction data
-    transaction_data['portfolio_id'] = transaction_data.get('portfolio_id', config.client_id)
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(transaction_data).encode('utf-8'),
-        headers={
-            'Content-Type': 'application/json',
-            'X-Client-ID': config.client_id
-        },
-        method='POST'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Saved staging transaction: {result.get('transaction_id')}")
-            return result
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to save staging transaction: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to save staging transaction: {str(e)}")
+    return run_sync(D1Client(client_id).save_staging_transaction(transaction_data))
 
 
 def get_staging_transactions(portfolio_id: str, client_id: str = None) -> pd.DataFrame:
@@ -124,49 +1122,7 @@ def get_staging_transactions(portfolio_id: str, client_id: str = None) -> pd.Dat
     Returns:
         DataFrame with staging transactions
     """
-    config = get_client_config(client_id)
-
-    # Build request
-    url = f"{_get_d1_api_url()}/api/staging/transactions?portfolio_id={portfolio_id}"
-
-    req = urllib.request.Request(
-        url,
-        headers={
-            'X-Client-ID': config.client_id
-        }
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            transactions = data.get('transactions', [])
-
-            if not transactions:
-                # Return empty DataFrame with expected columns
-                return pd.DataFrame(columns=[
-                    'transaction_id', 'portfolio_id', 'transaction_date', 'settlement_date',
-                    'transaction_type', 'isin', 'ticker', 'description', 'country',
-                    'par_amount', 'price', 'accrued_interest', 'dirty_price', 'market_value',
-                    'ytm', 'duration', 'spread', 'notes', 'created_at', 'created_by'
-                ])
-
-            df = pd.DataFrame(transactions)
-            print(f"✅ Fetched {len(df)} staging transactions from D1")
-            return df
-
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            # No staging transactions found - return empty DataFrame
-            return pd.DataFrame(columns=[
-                'transaction_id', 'portfolio_id', 'transaction_date', 'settlement_date',
-                'transaction_type', 'isin', 'ticker', 'description', 'country',
-                'par_amount', 'price', 'accrued_interest', 'dirty_price', 'market_value',
-                'ytm', 'duration', 'spread', 'notes', 'created_at', 'created_by'
-            ])
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to fetch staging transactions: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to fetch staging transactions: {str(e)}")
+    return run_sync(D1Client(client_id).get_staging_transactions(portfolio_id))
 
 
 def delete_staging_transaction(transaction_id: int, client_id: str = None) -> Dict[str, Any]:
@@ -180,29 +1136,7 @@ def delete_staging_transaction(transaction_id: int, client_id: str = None) -> Di
     Returns:
         Result dictionary
     """
-    config = get_client_config(client_id)
-
-    # Build request
-    url = f"{_get_d1_api_url()}/api/staging/transactions/{transaction_id}"
-
-    req = urllib.request.Request(
-        url,
-        headers={
-            'X-Client-ID': config.client_id
-        },
-        method='DELETE'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Deleted staging transaction: {transaction_id}")
-            return result
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to delete staging transaction: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to delete staging transaction: {str(e)}")
+    return run_sync(D1Client(client_id).delete_staging_transaction(transaction_id))
 
 
 def update_transaction_d1(transaction_id: int, status: str, client_id: str = None) -> Dict[str, Any]:
@@ -217,39 +1151,7 @@ def update_transaction_d1(transaction_id: int, status: str, client_id: str = Non
     Returns:
         Result dictionary with success status
     """
-    config = get_client_config(client_id)
-
-    # Build request
-    url = f"{_get_d1_api_url()}/api/transactions/{transaction_id}"
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps({'status': status}).encode('utf-8'),
-        headers={
-            'Content-Type': 'application/json',
-            'X-Client-ID': config.client_id
-        },
-        method='PATCH'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Updated transaction {transaction_id} to {status}")
-            return result
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        return {
-            'success': False,
-            'transaction_id': transaction_id,
-            'error': f"HTTP {e.code}: {error_body}"
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'transaction_id': transaction_id,
-            'error': str(e)
-        }
+    return run_sync(D1Client(client_id).update_transaction(transaction_id, status))
 
 
 def clear_all_staging_transactions(portfolio_id: str, client_id: str = None) -> Dict[str, Any]:
@@ -263,29 +1165,7 @@ def clear_all_staging_transactions(portfolio_id: str, client_id: str = None) ->
     Returns:
         Result with count of deleted transactions
     """
-    config = get_client_config(client_id)
-
-    # Build request
-    url = f"{_get_d1_api_url()}/api/staging/transactions/clear?portfolio_id={portfolio_id}"
-
-    req = urllib.request.Request(
-        url,
-        headers={
-            'X-Client-ID': config.client_id
-        },
-        method='DELETE'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Cleared {result.get('count', 0)} staging transactions")
-            return result
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to clear staging transactions: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to clear staging transactions: {str(e)}")
+    return run_sync(D1Client(client_id).clear_all_staging_transactions(portfolio_id))
 
 
 def get_watchlist(client_id: str = None) -> pd.DataFrame:
@@ -298,34 +1178,7 @@ def get_watchlist(client_id: str = None) -> pd.DataFrame:
     Returns:
         DataFrame with watchlist bonds (ISINs and metadata only)
     """
-    import os
-    # Watchlist API endpoint
-    pricing_url = os.getenv('GA10_PRICING_URL', 'https://ga10-pricing.urbancanary.workers.dev')
-    url = f"{pricing_url}/watchlist"
-
-    req = _make_request(url)
-
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-            # API returns 'watchlist' not 'bonds'
-            watchlist = data.get('watchlist', [])
-
-            if not watchlist:
-                print("⚠️ No bonds found in watchlist")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(watchlist)
-            print(f"✅ Fetched {len(df)} bonds from watchlist D1 API")
-            return df
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch watchlist: {e.code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Failed to fetch watchlist: {str(e)}")
-        return pd.DataFrame()
+    return run_sync(D1Client(client_id).get_watchlist())
 
 
 def get_holdings(portfolio_id: str = 'wnbf', staging_id: int = 1, client_id: str = None) -> pd.DataFrame:
@@ -343,30 +1196,7 @@ def get_holdings(portfolio_id: str = 'wnbf', staging_id: int = 1, client_id: str
     Returns:
         DataFrame with holdings data
     """
-    url = f"{_get_d1_api_url()}/api/holdings?portfolio_id={portfolio_id}&staging_id={staging_id}"
-
-    req = _make_request(url)
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            holdings = data.get('holdings', [])
-
-            if not holdings:
-                print(f"⚠️ No holdings found in D1 for {portfolio_id} staging_id={staging_id}")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(holdings)
-            print(f"✅ Fetched {len(df)} holdings from D1 (staging_id={staging_id})")
-            return df
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch holdings from D1: {e.code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Failed to fetch holdings from D1: {str(e)}")
-        return pd.DataFrame()
+    return run_sync(D1Client(client_id).get_holdings(portfolio_id, staging_id))
 
 
 async def get_holdings_async(portfolio_id: str = 'wnbf', staging_id: int = 1, client_id: str = None) -> pd.DataFrame:
@@ -384,34 +1214,7 @@ async def get_holdings_async(portfolio_id: str = 'wnbf', staging_id: int = 1, cl
     Returns:
         DataFrame with holdings data
     """
-    if httpx is None:
-        raise RuntimeError("httpx is required for async functions. Install with: pip install httpx")
-
-    logger = logging.getLogger(__name__)
-    url = f"{_get_d1_api_url()}/api/holdings?portfolio_id={portfolio_id}&staging_id={staging_id}"
-
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
-            holdings = data.get('holdings', [])
-
-            if not holdings:
-                logger.warning(f"No holdings found in D1 for {portfolio_id} staging_id={staging_id}")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(holdings)
-            logger.info(f"Fetched {len(df)} holdings from D1 (staging_id={staging_id})")
-            return df
-
-    except httpx.HTTPStatusError as e:
-        error_body = e.response.text
-        logger.error(f"Failed to fetch holdings from D1: {e.response.status_code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        logger.error(f"Failed to fetch holdings from D1: {str(e)}")
-        return pd.DataFrame()
+    return await D1Client(client_id).get_holdings(portfolio_id, staging_id)
 
 
 def get_holdings_summary(portfolio_id: str = 'wnbf', staging_id: int = 1, client_id: str = None) -> Dict[str, Any]:
@@ -426,23 +1229,7 @@ def get_holdings_summary(portfolio_id: str = 'wnbf', staging_id: int = 1, client
     Returns:
         Dictionary with summary stats and country breakdown
     """
-    url = f"{_get_d1_api_url()}/api/holdings/summary?portfolio_id={portfolio_id}&staging_id={staging_id}"
-
-    req = _make_request(url)
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            print(f"✅ Fetched portfolio summary from D1 (staging_id={staging_id})")
-            return data
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch holdings summary from D1: {e.code} - {error_body}")
-        return {}
-    except Exception as e:
-        print(f"❌ Failed to fetch holdings summary from D1: {str(e)}")
-        return {}
+    return run_sync(D1Client(client_id).get_holdings_summary(portfolio_id, staging_id))
 
 
 async def get_holdings_summary_async(portfolio_id: str = 'wnbf', staging_id: int = 1, client_id: str = None) -> Dict[str, Any]:
@@ -457,30 +1244,11 @@ async def get_holdings_summary_async(portfolio_id: str = 'wnbf', staging_id: int
     Returns:
         Dictionary with summary stats and country breakdown
     """
-    if httpx is None:
-        raise RuntimeError("httpx is required for async functions. Install with: pip install httpx")
-
-    logger = logging.getLogger(__name__)
-    url = f"{_get_d1_api_url()}/api/holdings/summary?portfolio_id={portfolio_id}&staging_id={staging_id}"
-
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
-            logger.info(f"Fetched portfolio summary from D1 (staging_id={staging_id})")
-            return data
-
-    except httpx.HTTPStatusError as e:
-        error_body = e.response.text
-        logger.error(f"Failed to fetch holdings summary from D1: {e.response.status_code} - {error_body}")
-        return {}
-    except Exception as e:
-        logger.error(f"Failed to fetch holdings summary from D1: {str(e)}")
-        return {}
+    return await D1Client(client_id).get_holdings_summary(portfolio_id, staging_id)
 
 
-def sync_holdings_to_d1(holdings_df: pd.DataFrame, portfolio_id: str = 'wnbf', staging_id: int = 1) -> Dict[str, Any]:
+def sync_holdings_to_d1(holdings_df: pd.DataFrame, portfolio_id: str = 'wnbf', staging_id: int = 1,
+                        delta: bool = True) -> Dict[str, Any]:
     """
     Sync holdings data from BigQuery to Cloudflare D1
 
@@ -490,48 +1258,12 @@ def sync_holdings_to_d1(holdings_df: pd.DataFrame, portfolio_id: str = 'wnbf', s
         holdings_df: DataFrame with holdings data from BigQuery
         portfolio_id: Portfolio identifier
         staging_id: 1=Live portfolio, 2=Staging portfolio
+        delta: Skip the upload when no row changed since the last sync
 
     Returns:
-        Result dictionary with sync status
+        Result dictionary with sync status (row counts and bytes saved if delta)
     """
-    if holdings_df.empty:
-        return {"success": False, "error": "Empty DataFrame provided"}
-
-    # Convert DataFrame to list of dicts
-    holdings = holdings_df.to_dict(orient='records')
-
-    # Handle NaN values
-    for h in holdings:
-        for key, value in h.items():
-            if pd.isna(value):
-                h[key] = None
-
-    url = f"{_get_d1_api_url()}/api/holdings/sync"
-
-    payload = {
-        "portfolio_id": portfolio_id,
-        "staging_id": staging_id,
-        "holdings": holdings
-    }
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode('utf-8'),
-        headers={'Content-Type': 'application/json'},
-        method='POST'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=60) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Synced {result.get('inserted', 0)} holdings to D1 (staging_id={staging_id})")
-            return result
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to sync holdings to D1: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to sync holdings to D1: {str(e)}")
+    return run_sync(D1Client().sync_holdings(holdings_df, portfolio_id, staging_id, delta))
 
 
 def get_analytics(limit: int = 5000, offset: int = 0) -> pd.DataFrame:
@@ -548,76 +1280,45 @@ def get_analytics(limit: int = 5000, offset: int = 0) -> pd.DataFrame:
     Returns:
         DataFrame with bond analytics (universe data for watchlist/search)
     """
-    url = f"{_get_d1_api_url()}/api/analytics?limit={limit}&offset={offset}"
+    return run_sync(D1Client().get_analytics(limit, offset))
 
-    req = _make_request(url)
 
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-            analytics = data.get('analytics', [])
+def iter_analytics(page_size: int = 5000, prefetch: int = 4) -> AnalyticsStream:
+    """
+    Stream the whole D1 analytics table page by page
 
-            if not analytics:
-                print(f"⚠️ No analytics found in D1")
-                return pd.DataFrame()
+    Keeps `prefetch` pages in flight, so a full load costs about one page
+    of latency instead of one per page.
 
-            df = pd.DataFrame(analytics)
-            print(f"✅ Fetched {len(df)} bonds from D1 analytics")
-            return df
+    Args:
+        page_size: Rows per page (clamped to ORCA_D1_ANALYTICS_PAGE_CAP)
+        prefetch: Pages requested concurrently
 
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch analytics from D1: {e.code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Failed to fetch analytics from D1: {str(e)}")
-        return pd.DataFrame()
+    Returns:
+        AnalyticsStream: iterate for DataFrame chunks, or .collect() for one frame
+
+    Example:
+        for chunk in iter_analytics(5000, prefetch=4):
+            process(chunk)
+        universe = iter_analytics().collect()
+    """
+    return D1Client().iter_analytics(page_size, prefetch)
 
 
 def get_analytics_batch(isins: List[str]) -> pd.DataFrame:
     """
     Get analytics for specific ISINs from Cloudflare D1 (batch query)
 
+    Lists of any size are fetched in concurrent chunks (ORCA_D1_ANALYTICS_CHUNK).
+
     Args:
         isins: List of ISINs to fetch
 
     Returns:
-        DataFrame with analytics for requested ISINs
+        DataFrame with analytics for requested ISINs;
+        df.attrs['missing_isins'] lists ISINs with no row
     """
-    if not isins:
-        return pd.DataFrame()
-
-    url = f"{_get_d1_api_url()}/api/analytics"
-
-    payload = {"isins": isins}
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode('utf-8'),
-        headers={'Content-Type': 'application/json'},
-        method='POST'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-            analytics = data.get('analytics', [])
-
-            if not analytics:
-                print(f"⚠️ No analytics found for {len(isins)} ISINs in D1")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(analytics)
-            print(f"✅ Fetched analytics for {len(df)}/{len(isins)} ISINs from D1")
-            return df
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch analytics batch from D1: {e.code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Failed to fetch analytics batch from D1: {str(e)}")
-        return pd.DataFrame()
+    return run_sync(D1Client().get_analytics_batch(isins))
 
 
 def search_bonds(
@@ -643,48 +1344,7 @@ def search_bonds(
     Returns:
         DataFrame with matching bonds (isin, description, ticker, country, etc.)
     """
-    # Build query parameters
-    params = []
-    if country:
-        params.append(f"country={urllib.parse.quote(country)}")
-    if maturity_year:
-        params.append(f"maturity_year={maturity_year}")
-    if ticker:
-        params.append(f"ticker={urllib.parse.quote(ticker)}")
-    if coupon:
-        params.append(f"coupon={coupon}")
-    params.append(f"limit={limit}")
-
-    # Need at least one filter
-    if not any([country, maturity_year, ticker, coupon]):
-        print("⚠️ search_bonds requires at least one filter")
-        return pd.DataFrame()
-
-    url = f"{_get_d1_api_url()}/api/analytics/search?{'&'.join(params)}"
-
-    req = _make_request(url)
-
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-            analytics = data.get('analytics', [])
-
-            if not analytics:
-                filters = data.get('filters', {})
-                print(f"⚠️ No bonds found matching filters: {filters}")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(analytics)
-            print(f"✅ Found {len(df)} bonds matching search criteria")
-            return df
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to search bonds in D1: {e.code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Failed to search bonds in D1: {str(e)}")
-        return pd.DataFrame()
+    return run_sync(D1Client().search_bonds(country, maturity_year, ticker, coupon, limit))
 
 
 def match_bond(
@@ -721,61 +1381,10 @@ def match_bond(
         - source: Data source used
         - total_bonds_searched: Size of search universe
     """
-    url = f"{_get_d1_api_url()}/api/bond_match"
-
-    payload = {
-        "query": query,
-        "source": source,
-        "top_n": top_n,
-        "portfolio_id": portfolio_id
-    }
-
-    if bonds:
-        payload["bonds"] = bonds
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode('utf-8'),
-        headers={'Content-Type': 'application/json'},
-        method='POST'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-
-            # Log result summary
-            matches = data.get('matches', [])
-            confident = data.get('confident_match')
-            if confident:
-                print(f"✅ Confident match: {confident.get('ticker')} {confident.get('description')}")
-            elif matches:
-                print(f"📊 Found {len(matches)} potential matches (best score: {matches[0].get('score', 0)})")
-            else:
-                print(f"⚠️ No matches found for: {query}")
-
-            return data
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Bond match failed: {e.code} - {error_body}")
-        return {
-            "error": f"HTTP {e.code}: {error_body}",
-            "intent": None,
-            "matches": [],
-            "confident_match": None
-        }
-    except Exception as e:
-        print(f"❌ Bond match failed: {str(e)}")
-        return {
-            "error": str(e),
-            "intent": None,
-            "matches": [],
-            "confident_match": None
-        }
+    return run_sync(D1Client().match_bond(query, source, top_n, portfolio_id, bonds))
 
 
-def sync_analytics_to_d1(analytics_df: pd.DataFrame, clear_first: bool = False) -> Dict[str, Any]:
+def sync_analytics_to_d1(analytics_df: pd.DataFrame, clear_first: bool = False, delta: bool = True) -> Dict[str, Any]:
     """
     Sync analytics data from BigQuery to Cloudflare D1
 
@@ -784,47 +1393,12 @@ def sync_analytics_to_d1(analytics_df: pd.DataFrame, clear_first: bool = False)
     Args:
         analytics_df: DataFrame with analytics data from BigQuery
         clear_first: If True, clear all existing analytics before insert
+        delta: Send only rows inserted/updated/deleted since the last sync
 
     Returns:
-        Result dictionary with sync status
+        Result dictionary with sync status (row counts and bytes saved if delta)
     """
-    if analytics_df.empty:
-        return {"success": False, "error": "Empty DataFrame provided"}
-
-    # Convert DataFrame to list of dicts
-    analytics = analytics_df.to_dict(orient='records')
-
-    # Handle NaN values
-    for a in analytics:
-        for key, value in a.items():
-            if pd.isna(value):
-                a[key] = None
-
-    url = f"{_get_d1_api_url()}/api/analytics/sync"
-
-    payload = {
-        "analytics": analytics,
-        "clear_first": clear_first
-    }
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode('utf-8'),
-        headers={'Content-Type': 'application/json'},
-        method='POST'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=120) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Synced {result.get('upserted', 0)} analytics records to D1")
-            return result
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to sync analytics to D1: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to sync analytics to D1: {str(e)}")
+    return run_sync(D1Client().sync_analytics(analytics_df, clear_first, delta))
 
 
 def get_watchlist_complete(client_id: str = None, use_cache: bool = True) -> pd.DataFrame:
@@ -848,43 +1422,7 @@ def get_watchlist_complete(client_id: str = None, use_cache: bool = True) -> pd.
         - Full bond details from D1 analytics
         - Ratings (rating_notches), prices, analytics (ytw, oad, oas)
     """
-    # Get watchlist ISINs from D1
-    watchlist_df = get_watchlist(client_id)
-
-    if watchlist_df.empty:
-        print("⚠️ No watchlist bonds found")
-        return pd.DataFrame()
-
-    # Extract ISINs
-    isins = watchlist_df['isin'].unique().tolist()
-
-    print(f"📊 Fetching complete data for {len(isins)} watchlist bonds from D1...")
-
-    # Get full analytics from D1 (already synced from BigQuery)
-    analytics_df = get_analytics_batch(isins)
-
-    if analytics_df.empty:
-        print("⚠️ No analytics found in D1 - returning watchlist-only data")
-        print("   Ensure analytics sync job has run: python scripts/sync_analytics_to_d1.py")
-        return watchlist_df
-
-    # Rename columns to match expected format
-    column_mapping = {
-        'yield': 'ytw',
-        'duration': 'duration',  # same
-        'spread': 'spread',      # same
-    }
-    analytics_df = analytics_df.rename(columns=column_mapping)
-
-    # Join watchlist metadata with analytics
-    complete_df = watchlist_df.merge(
-        analytics_df,
-        on='isin',
-        how='left'
-    )
-
-    print(f"✅ Fetched complete data for {len(complete_df)} watchlist bonds from D1")
-    return complete_df
+    return run_sync(D1Client(client_id).get_watchlist_complete())
 
 
 def get_period_prices(start_date: str, end_date: str, isins: List[str] = None) -> pd.DataFrame:
@@ -904,36 +1442,7 @@ def get_period_prices(start_date: str, end_date: str, isins: List[str] = None) -
         - isin, begin_date, begin_price, begin_accrued, begin_dirty
         - end_date, end_price, end_accrued, end_dirty
     """
-    url = f"{_get_d1_api_url()}/api/price_history/period"
-    params = {
-        'start_date': start_date,
-        'end_date': end_date
-    }
-    if isins:
-        params['isins'] = ','.join(isins)
-
-    req = urllib.request.Request(f"{url}?{urllib.parse.urlencode(params)}")
-
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-            period_prices = data.get('period_prices', [])
-
-            if not period_prices:
-                print(f"⚠️ No price history found for period {start_date} to {end_date}")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(period_prices)
-            print(f"✅ Fetched period prices for {len(df)} bonds from D1")
-            return df
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch period prices from D1: {e.code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Failed to fetch period prices from D1: {str(e)}")
-        return pd.DataFrame()
+    return run_sync(D1Client().get_period_prices(start_date, end_date, isins))
 
 
 def get_transactions(portfolio_id: str = 'wnbf', client_id: str = None) -> pd.DataFrame:
@@ -950,30 +1459,7 @@ def get_transactions(portfolio_id: str = 'wnbf', client_id: str = None) -> pd.Da
     Returns:
         DataFrame with historical transactions
     """
-    url = f"{_get_d1_api_url()}/api/transactions?portfolio_id={portfolio_id}"
-
-    req = _make_request(url)
-
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-            transactions = data.get('transactions', [])
-
-            if not transactions:
-                print(f"⚠️ No transactions found in D1 for {portfolio_id}")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(transactions)
-            print(f"✅ Fetched {len(df)} transactions from D1")
-            return df
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch transactions from D1: {e.code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Failed to fetch transactions from D1: {str(e)}")
-        return pd.DataFrame()
+    return run_sync(D1Client(client_id).get_transactions(portfolio_id))
 
 
 async def get_transactions_async(portfolio_id: str = 'wnbf', client_id: str = None) -> pd.DataFrame:
@@ -990,34 +1476,7 @@ async def get_transactions_async(portfolio_id: str = 'wnbf', client_id: str = No
     Returns:
         DataFrame with historical transactions
     """
-    if httpx is None:
-        raise RuntimeError("httpx is required for async functions. Install with: pip install httpx")
-
-    logger = logging.getLogger(__name__)
-    url = f"{_get_d1_api_url()}/api/transactions?portfolio_id={portfolio_id}"
-
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
-            transactions = data.get('transactions', [])
-
-            if not transactions:
-                logger.warning(f"No transactions found in D1 for {portfolio_id}")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(transactions)
-            logger.info(f"Fetched {len(df)} transactions from D1")
-            return df
-
-    except httpx.HTTPStatusError as e:
-        error_body = e.response.text
-        logger.error(f"Failed to fetch transactions from D1: {e.response.status_code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        logger.error(f"Failed to fetch transactions from D1: {str(e)}")
-        return pd.DataFrame()
+    return await D1Client(client_id).get_transactions(portfolio_id)
 
 
 def get_cashflows(portfolio_id: str = 'wnbf', client_id: str = None) -> pd.DataFrame:
@@ -1034,33 +1493,7 @@ def get_cashflows(portfolio_id: str = 'wnbf', client_id: str = None) -> pd.DataF
     Returns:
         DataFrame with cashflows (payment_date, payment_type, isin, etc.)
     """
-    url = f"{_get_d1_api_url()}/api/cashflows?portfolio_id={portfolio_id}"
-
-    req = _make_request(url)
-
-    try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-            cashflows = data.get('cashflows', [])
-
-            if not cashflows:
-                print(f"⚠️ No cashflows found in D1 for {portfolio_id}")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(cashflows)
-            # Normalise: Worker returns 'date' (aliased from payment_date), display code expects 'payment_date'
-            if 'date' in df.columns and 'payment_date' not in df.columns:
-                df['payment_date'] = df['date']
-            print(f"✅ Fetched {len(df)} cashflows from D1")
-            return df
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch cashflows from D1: {e.code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        print(f"❌ Failed to fetch cashflows from D1: {str(e)}")
-        return pd.DataFrame()
+    return run_sync(D1Client(client_id).get_cashflows(portfolio_id))
 
 
 async def get_cashflows_async(portfolio_id: str = 'wnbf', client_id: str = None) -> pd.DataFrame:
@@ -1077,40 +1510,11 @@ async def get_cashflows_async(portfolio_id: str = 'wnbf', client_id: str = None)
     Returns:
         DataFrame with cashflows (payment_date, payment_type, isin, etc.)
     """
-    if httpx is None:
-        raise RuntimeError("httpx is required for async functions. Install with: pip install httpx")
-
-    logger = logging.getLogger(__name__)
-    url = f"{_get_d1_api_url()}/api/cashflows?portfolio_id={portfolio_id}"
-
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
-            cashflows = data.get('cashflows', [])
-
-            if not cashflows:
-                logger.warning(f"No cashflows found in D1 for {portfolio_id}")
-                return pd.DataFrame()
-
-            df = pd.DataFrame(cashflows)
-            # Normalise: Worker returns 'date' (aliased from payment_date), display code expects 'payment_date'
-            if 'date' in df.columns and 'payment_date' not in df.columns:
-                df['payment_date'] = df['date']
-            logger.info(f"Fetched {len(df)} cashflows from D1")
-            return df
+    return await D1Client(client_id).get_cashflows(portfolio_id)
 
-    except httpx.HTTPStatusError as e:
-        error_body = e.response.text
-        logger.error(f"Failed to fetch cashflows from D1: {e.response.status_code} - {error_body}")
-        return pd.DataFrame()
-    except Exception as e:
-        logger.error(f"Failed to fetch cashflows from D1: {str(e)}")
-        return pd.DataFrame()
 
-
-def sync_price_history_to_d1(prices_df: pd.DataFrame, clear_before_date: str = None) -> Dict[str, Any]:
+def sync_price_history_to_d1(prices_df: pd.DataFrame, clear_before_date: str = None,
+                             delta: bool = True) -> Dict[str, Any]:
     """
     Sync price history from BigQuery to D1
 
@@ -1119,46 +1523,12 @@ def sync_price_history_to_d1(prices_df: pd.DataFrame, clear_before_date: str = N
     Args:
         prices_df: DataFrame with price history from BigQuery
         clear_before_date: Optional date to clear prices before
+        delta: Send only rows inserted/updated/deleted since the last sync
 
     Returns:
-        Result dictionary with sync status
+        Result dictionary with sync status (row counts and bytes saved if delta)
     """
-    if prices_df.empty:
-        return {"success": False, "error": "Empty DataFrame provided"}
-
-    # Convert DataFrame to list of dicts
-    prices = prices_df.to_dict(orient='records')
-
-    # Handle NaN values
-    for p in prices:
-        for key, value in p.items():
-            if pd.isna(value):
-                p[key] = None
-
-    url = f"{_get_d1_api_url()}/api/price_history/sync"
-
-    payload = {"prices": prices}
-    if clear_before_date:
-        payload["clear_before_date"] = clear_before_date
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode('utf-8'),
-        headers={'Content-Type': 'application/json'},
-        method='POST'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=120) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Synced {result.get('upserted', 0)} price records to D1")
-            return result
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to sync price history to D1: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to sync price history to D1: {str(e)}")
+    return run_sync(D1Client().sync_price_history(prices_df, clear_before_date, delta))
 
 
 # ==============================================================================
@@ -1191,32 +1561,7 @@ def get_remote_pages(client_id: str = 'guinness', enabled_only: bool = True) ->
         - created_at: Creation timestamp
         - updated_at: Last update timestamp
     """
-    url = f"{_get_d1_api_url()}/api/remote_pages?client_id={client_id}"
-    if enabled_only:
-        url += "&enabled=true"
-
-    req = urllib.request.Request(
-        url,
-        headers={'X-Client-ID': client_id}
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            pages = data.get('pages', [])
-            print(f"✅ Fetched {len(pages)} remote pages from D1")
-            return pages
-
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            # No remote pages table or no pages - this is fine
-            return []
-        error_body = e.read().decode() if e.fp else ""
-        print(f"❌ Failed to fetch remote pages from D1: {e.code} - {error_body}")
-        return []
-    except Exception as e:
-        print(f"❌ Failed to fetch remote pages from D1: {str(e)}")
-        return []
+    return run_sync(D1Client(client_id).get_remote_pages(enabled_only))
 
 
 def save_remote_page(page_data: Dict[str, Any], client_id: str = 'guinness') -> Dict[str, Any]:
@@ -1239,42 +1584,7 @@ def save_remote_page(page_data: Dict[str, Any], client_id: str = 'guinness') ->
     Returns:
         Result dictionary with page_id and version
     """
-    url = f"{_get_d1_api_url()}/api/remote_pages"
-
-    # Ensure required fields
-    if 'page_id' not in page_data:
-        raise ValueError("page_id is required")
-    if 'page_code' not in page_data:
-        raise ValueError("page_code is required")
-
-    # Add client_id
-    page_data['client_id'] = client_id
-
-    # Convert dependencies list to JSON if needed
-    if 'dependencies' in page_data and isinstance(page_data['dependencies'], list):
-        page_data['dependencies'] = json.dumps(page_data['dependencies'])
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(page_data).encode('utf-8'),
-        headers={
-            'Content-Type': 'application/json',
-            'X-Client-ID': client_id
-        },
-        method='POST'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Saved remote page: {page_data['page_id']} (v{result.get('version', 1)})")
-            return result
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to save remote page: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to save remote page: {str(e)}")
+    return run_sync(D1Client(client_id).save_remote_page(page_data))
 
 
 def delete_remote_page(page_id: str, client_id: str = 'guinness') -> Dict[str, Any]:
@@ -1288,25 +1598,7 @@ def delete_remote_page(page_id: str, client_id: str = 'guinness') -> Dict[str, A
     Returns:
         Result dictionary
     """
-    url = f"{_get_d1_api_url()}/api/remote_pages/{page_id}"
-
-    req = urllib.request.Request(
-        url,
-        headers={'X-Client-ID': client_id},
-        method='DELETE'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode())
-            print(f"✅ Deleted remote page: {page_id}")
-            return result
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to delete remote page: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to delete remote page: {str(e)}")
+    return run_sync(D1Client(client_id).delete_remote_page(page_id))
 
 
 def toggle_remote_page(page_id: str, enabled: bool, client_id: str = 'guinness') -> Dict[str, Any]:
@@ -1321,27 +1613,4 @@ def toggle_remote_page(page_id: str, enabled: bool, client_id: str = 'guinness')
     Returns:
         Result dictionary
     """
-    url = f"{_get_d1_api_url()}/api/remote_pages/{page_id}"
-
-    req = urllib.request.Request(
-        url,
-        data=json.dumps({'enabled': enabled}).encode('utf-8'),
-        headers={
-            'Content-Type': 'application/json',
-            'X-Client-ID': client_id
-        },
-        method='PATCH'
-    )
-
-    try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode())
-            status = "enabled" if enabled else "disabled"
-            print(f"✅ Remote page {page_id} {status}")
-            return result
-
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode() if e.fp else ""
-        raise RuntimeError(f"Failed to toggle remote page: {e.code} - {error_body}")
-    except Exception as e:
-        raise RuntimeError(f"Failed to toggle remote page: {str(e)}")
+    return run_sync(D1Client(client_id).toggle_remote_page(page_id, enabled))
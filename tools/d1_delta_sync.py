@@ -0,0 +1,194 @@
+"""
+Content-Hash Delta Sync for BigQuery -> D1
+
+The nightly sync used to POST every row of holdings, analytics and price
+history, although most rows are identical to what D1 already holds. Each
+row is now hashed (blake2b of its canonical JSON) and compared with the
+hashes recorded by the last successful sync, so only inserts, updates
+and deletes are sent. D1Client.sync_* does the uploading.
+
+State is one JSON file per table ({row key: hash}) in ORCA_D1_SYNC_STATE
+(default data/d1_sync/). A row's hash is only recorded once its chunk was
+accepted, so failed chunks are re-sent on the next run. State older than
+ORCA_D1_SYNC_MAX_AGE seconds (default 7 days) is ignored, giving a full
+re-upload that repairs any drift on the D1 side.
+
+Changed rows are packed into chunks of at most ORCA_D1_SYNC_CHUNK_ROWS
+rows (default 500) and ORCA_D1_SYNC_CHUNK_BYTES of JSON (default 1 MB).
+
+Usage:
+    state = DeltaState.load(ANALYTICS_SYNC)
+    plan = plan_delta(ANALYTICS_SYNC, records, state)
+    for chunk in plan.chunks(): ...
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = Path(os.getenv("ORCA_D1_SYNC_STATE", str(Path(__file__).parent.parent / "data" / "d1_sync")))
+STATE_MAX_AGE = float(os.getenv("ORCA_D1_SYNC_MAX_AGE", str(7 * 86400)))
+CHUNK_ROWS = int(os.getenv("ORCA_D1_SYNC_CHUNK_ROWS", "500"))
+CHUNK_BYTES = int(os.getenv("ORCA_D1_SYNC_CHUNK_BYTES", str(1024 * 1024)))
+
+
+class SyncTable(NamedTuple):
+    """A D1 table fed by a sync job"""
+    name: str
+    key: Tuple[str, ...]            # columns identifying a row
+    upsert_path: str                # POST endpoint taking {payload_field: [rows]}
+    payload_field: str
+    delete_path: Optional[str] = None  # POST {"keys": [{col: value}]}; None if the Worker can't delete
+    replace: bool = False           # endpoint replaces the whole set (no chunking, no partial upload)
+
+
+HOLDINGS_SYNC = SyncTable("holdings", ("isin",), "/api/holdings/sync", "holdings", replace=True)
+ANALYTICS_SYNC = SyncTable("analytics", ("isin",), "/api/analytics/sync", "analytics",
+                           delete_path="/api/analytics/delete")
+PRICE_HISTORY_SYNC = SyncTable("price_history", ("isin", "price_date"), "/api/price_history/sync", "prices",
+                               delete_path="/api/price_history/delete")
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def row_key(record: Dict[str, Any], key: Tuple[str, ...]) -> str:
+    """Row identity as one string ("XS123|2025-01-15")"""
+    return "|".join(str(record.get(column)) for column in key)
+
+
+def resolve_key(table: SyncTable, columns) -> SyncTable:
+    """
+    Check the key columns are present
+
+    Price history dates come as price_date, date or bpdate depending on
+    the source query, so the date part of that key is matched loosely.
+    """
+    key = list(table.key)
+    for i, column in enumerate(key):
+        if column in columns:
+            continue
+        alternatives = [c for c in ("price_date", "date", "bpdate") if c in columns] if column == "price_date" else []
+        if not alternatives:
+            raise ValueError(f"{table.name} sync needs key column '{column}' (got {list(columns)})")
+        key[i] = alternatives[0]
+    return table._replace(key=tuple(key))
+
+
+@dataclass
+class DeltaState:
+    """Row hashes recorded by the last sync of one table (or one portfolio's holdings)"""
+    path: Path
+    hashes: Dict[str, str] = field(default_factory=dict)
+    synced_at: float = 0.0
+
+    @classmethod
+    def load(cls, table: SyncTable, scope: str = "") -> "DeltaState":
+        name = f"{table.name}_{scope}" if scope else table.name
+        path = STATE_DIR / f"{name}.json"
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable D1 sync state {path}: {e}")
+            return cls(path)
+        if time.time() - data.get("synced_at", 0) > STATE_MAX_AGE:
+            logger.info(f"D1 sync state {path.name} is older than {STATE_MAX_AGE:.0f}s, re-uploading everything")
+            return cls(path)
+        return cls(path, data.get("hashes", {}), data.get("synced_at", 0.0))
+
+    def save(self):
+        """Write atomically, so an interrupted job leaves the previous state"""
+        self.synced_at = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"synced_at": self.synced_at, "hashes": self.hashes}))
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class DeltaPlan:
+    """What has to change in D1 to match the new rows"""
+    table: SyncTable
+    upserts: List[Tuple[str, str, Dict[str, Any], int]]  # (key, hash, record, encoded size)
+    deletes: List[str]
+    inserted: int
+    updated: int
+    unchanged: int
+    total_bytes: int   # payload size of a full upload
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.upserts or self.deletes)
+
+    def chunks(self, max_rows: Optional[int] = None,
+               max_bytes: Optional[int] = None) -> Iterator[List[Tuple[str, str, Dict[str, Any], int]]]:
+        """Upserts grouped into size-bounded chunks (a single oversized row gets its own chunk)"""
+        max_rows, max_bytes = max_rows or CHUNK_ROWS, max_bytes or CHUNK_BYTES
+        chunk, size = [], 0
+        for row in self.upserts:
+            if chunk and (len(chunk) >= max_rows or size + row[3] > max_bytes):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(row)
+            size += row[3]
+        if chunk:
+            yield chunk
+
+    def delete_keys(self) -> List[Dict[str, str]]:
+        """Deletes as {column: value} dicts for the Worker"""
+        return [dict(zip(self.table.key, key.split("|", len(self.table.key) - 1))) for key in self.deletes]
+
+
+def plan_delta(table: SyncTable, records: List[Dict[str, Any]], state: DeltaState, full: bool = False) -> DeltaPlan:
+    """
+    Compare rows with the last sync
+
+    Args:
+        table: Table being synced (key already resolved)
+        records: JSON-ready rows
+        state: Hashes from the last sync
+        full: Treat every row as changed (after clear_first, or to repair D1)
+
+    Returns:
+        DeltaPlan; for replace tables upserts hold every row whenever anything changed
+    """
+    previous = {} if full else state.hashes
+    rows: Dict[str, Tuple[str, Dict[str, Any], int]] = {}
+    for record in records:
+        encoded = _encode(record)
+        rows[row_key(record, table.key)] = (hashlib.blake2b(encoded, digest_size=12).hexdigest(), record, len(encoded))
+
+    upserts, inserted, updated = [], 0, 0
+    for key, (digest, record, size) in rows.items():
+        old = previous.get(key)
+        if old == digest:
+            continue
+        if old is None:
+            inserted += 1
+        else:
+            updated += 1
+        upserts.append((key, digest, record, size))
+    deletes = [key for key in previous if key not in rows]
+
+    if table.replace and (upserts or deletes):
+        upserts = [(key, digest, record, size) for key, (digest, record, size) in rows.items()]
+
+    return DeltaPlan(
+        table=table,
+        upserts=upserts,
+        deletes=deletes,
+        inserted=inserted,
+        updated=updated,
+        unchanged=len(rows) - inserted - updated,
+        total_bytes=sum(size for _, _, size in rows.values()),
+    )
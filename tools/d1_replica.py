@@ -0,0 +1,504 @@
+"""
+Local SQLite Mirror of Cloudflare D1 for Orca MCP
+
+Optional process-local copy of the D1 data behind the read-heavy calls
+(get_holdings, get_watchlist, get_analytics_batch, get_period_prices).
+That data changes about once a day, but every call crossed the internet
+to the Worker; served from SQLite it takes well under a millisecond.
+
+Storage:
+- SQLite file ORCA_D1_REPLICA_PATH (default data/d1_replica.sqlite) in
+  WAL mode (readers never block on the sync writer), one connection per
+  thread
+- Tables are WITHOUT ROWID, so the primary key index holds the whole
+  row: lookups by (portfolio_id, staging_id), isin and (isin, price_date)
+  are covering index scans
+
+Sync (background thread, every ORCA_D1_REPLICA_SYNC_INTERVAL seconds):
+- analytics, price_history: pages of rows with updated_at after the
+  table's watermark (?updated_since=), upserted by key. A Worker that
+  ignores the parameter just returns every row, which is still correct.
+- watchlist and holdings (per portfolio/staging_id seen): replaced whole,
+  they are small
+- Every ORCA_D1_REPLICA_FULL_REFRESH seconds a table is reloaded whole,
+  which picks up rows deleted in D1
+- Endpoints the Worker doesn't have (404) are remembered; their reads
+  keep going to the Worker
+
+Reads are served when the table (or holdings scope) was synced within
+ORCA_D1_REPLICA_MAX_STALENESS seconds; D1 writes through D1Client mark
+the table dirty, routing reads to the Worker until the next sync.
+Holdings and watchlist fetched from the Worker are written through.
+
+Offline use:
+A replica created without a client is seeded with load_records() and
+never goes stale, so tests can call the D1 read functions without a
+Worker:
+
+    replica = D1Replica()
+    replica.load_records("holdings", rows, scope=("wnbf", 1))
+    install_d1_replica(replica)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .d1_schema import records_to_frame
+from .http_pool import run_sync
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ENABLED = os.getenv("ORCA_D1_REPLICA", "false").lower() in ("1", "true", "yes")
+REPLICA_PATH = os.getenv("ORCA_D1_REPLICA_PATH", str(Path(__file__).parent.parent / "data" / "d1_replica.sqlite"))
+MAX_STALENESS = float(os.getenv("ORCA_D1_REPLICA_MAX_STALENESS", "900"))
+SYNC_INTERVAL = float(os.getenv("ORCA_D1_REPLICA_SYNC_INTERVAL", "300"))
+FULL_REFRESH_INTERVAL = float(os.getenv("ORCA_D1_REPLICA_FULL_REFRESH", "86400"))
+PAGE_SIZE = 5000
+
+
+class MirrorTable(NamedTuple):
+    """How one D1 table is mirrored"""
+    name: str
+    path: str                        # Worker endpoint (GET)
+    field: str                       # list of rows in the response
+    key: Tuple[str, ...]             # primary key (after scope columns)
+    scope: Tuple[str, ...] = ()      # query params that select a subset (stored as _<param> columns)
+    incremental: bool = False        # pulled by updated_at watermark, in pages
+    pricing: bool = False            # served by the GA10 pricing Worker
+    frame: str = ""                  # d1_schema endpoint for typed frames
+
+
+MIRROR_TABLES = {
+    'holdings': MirrorTable('holdings', '/api/holdings', 'holdings', ('isin',),
+                            scope=('portfolio_id', 'staging_id'), frame='holdings'),
+    'watchlist': MirrorTable('watchlist', '/watchlist', 'watchlist', ('isin',), pricing=True),
+    'analytics': MirrorTable('analytics', '/api/analytics', 'analytics', ('isin',),
+                             incremental=True, frame='analytics'),
+    'price_history': MirrorTable('price_history', '/api/price_history', 'prices', ('isin', 'price_date'),
+                                 incremental=True),
+}
+
+# price_history column aliases -> period_prices suffix
+_PRICE_COLUMNS = {
+    'price': ('price', 'clean_price'),
+    'accrued': ('accrued', 'accrued_interest'),
+    'dirty': ('dirty', 'dirty_price'),
+}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+class D1Replica:
+    """SQLite copy of the D1 tables behind the read-heavy Worker calls"""
+
+    def __init__(self, client=None, path: Optional[str] = None, tables: Optional[List[str]] = None,
+                 max_staleness: float = MAX_STALENESS):
+        """
+        Args:
+            client: D1Client used to pull from the Worker; None for an offline replica
+            path: SQLite database file (in-memory if None: offline/test use, no WAL)
+            tables: Subset of MIRROR_TABLES to mirror (default: all)
+            max_staleness: Seconds a synced table may be served for
+        """
+        self.client = client
+        self.path = path
+        self.max_staleness = max_staleness
+        self.tables = {t: MIRROR_TABLES[t] for t in (tables or MIRROR_TABLES)}
+
+        # A named shared-cache database keeps in-memory data visible to every thread
+        self._uri = f"file:{path}" if path else f"file:orca_d1_replica_{id(self)}?mode=memory&cache=shared"
+        self._local = threading.local()
+        self._keepalive = self._connect()  # in-memory data lives as long as one connection does
+        self._write_lock = threading.Lock()
+        self._columns: Dict[str, List[str]] = {}
+        self._dirty_at: Dict[Tuple, float] = {}       # (table, scope or None) -> time of last D1 write
+        self._scopes: set = set()                    # holdings scopes to keep synced
+        self._unsupported: set = set()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"reads": 0, "syncs": 0, "full_loads": 0, "rows_synced": 0}
+
+        self._keepalive.execute("""
+            CREATE TABLE IF NOT EXISTS _replica_state (
+                table_name TEXT,
+                scope TEXT,
+                watermark TEXT,
+                synced_at REAL,
+                full_load_at REAL,
+                row_count INTEGER,
+                PRIMARY KEY (table_name, scope)
+            ) WITHOUT ROWID
+        """)
+        for table, scope in self._keepalive.execute(
+                "SELECT table_name, scope FROM _replica_state WHERE table_name = 'holdings'").fetchall():
+            self._scopes.add(tuple(json.loads(scope)))
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self._uri, uri=True, isolation_level=None, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA busy_timeout=5000")
+        return con
+
+    @property
+    def _con(self) -> sqlite3.Connection:
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = self._local.con = self._connect()
+        return con
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scope_key(scope: Sequence = ()) -> str:
+        return json.dumps([str(s) for s in scope])
+
+    def _state(self, table: str, scope: Sequence = ()) -> Optional[Dict[str, Any]]:
+        row = self._con.execute(
+            "SELECT watermark, synced_at, full_load_at, row_count FROM _replica_state WHERE table_name = ? AND scope = ?",
+            [table, self._scope_key(scope)]
+        ).fetchone()
+        if row is None:
+            return None
+        return {"watermark": row[0], "synced_at": row[1], "full_load_at": row[2], "row_count": row[3]}
+
+    def _save_state(self, con, table: str, scope: Sequence, watermark: Optional[str], full_load: bool,
+                    now: float):
+        spec = self.tables[table]
+        where, params = self._scope_where(spec, scope)
+        count = con.execute(f"SELECT COUNT(*) FROM {_quote(table)}{where}", params).fetchone()[0]
+        previous = self._state(table, scope)
+        full_load_at = now if full_load or previous is None else previous["full_load_at"]
+        con.execute("INSERT OR REPLACE INTO _replica_state VALUES (?, ?, ?, ?, ?, ?)",
+                    [table, self._scope_key(scope), watermark, now, full_load_at, count])
+
+    def is_fresh(self, table: str, scope: Sequence = ()) -> bool:
+        """True if the table (scope) can be read within the staleness bound"""
+        if table not in self.tables or table in self._unsupported:
+            return False
+        state = self._state(table, scope)
+        if state is None or not state["row_count"]:
+            return False
+        written = max(self._dirty_at.get((table, None), 0.0), self._dirty_at.get((table, tuple(map(str, scope))), 0.0))
+        if state["synced_at"] <= written:
+            return False
+        if self.client is None:
+            return True  # offline replica: seeded data is the source of truth
+        return time.time() - state["synced_at"] <= self.max_staleness
+
+    def mark_dirty(self, table: str, scope: Optional[Sequence] = None):
+        """Send reads of `table` (one scope, or all) to the Worker until the next sync"""
+        if table not in self.tables or self.client is None:
+            return
+        self._dirty_at[(table, None if scope is None else tuple(map(str, scope)))] = time.time()
+        self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _scope_where(self, spec: MirrorTable, scope: Sequence) -> Tuple[str, List[Any]]:
+        if not spec.scope:
+            return "", []
+        return " WHERE " + " AND ".join(f"{_quote('_' + s)} = ?" for s in spec.scope), [str(s) for s in scope]
+
+    def _ensure_table(self, con, spec: MirrorTable, columns: List[str]):
+        known = self._columns.get(spec.name)
+        if known is None:
+            known = [row[1] for row in con.execute(f"PRAGMA table_info({_quote(spec.name)})")]
+        if not known:
+            scope_cols = ['_' + s for s in spec.scope]
+            known = scope_cols + list(dict.fromkeys(list(spec.key) + columns))
+            pk = ", ".join(_quote(c) for c in scope_cols + list(spec.key))
+            con.execute(f"CREATE TABLE {_quote(spec.name)} ({', '.join(_quote(c) for c in known)}, "
+                        f"PRIMARY KEY ({pk})) WITHOUT ROWID")
+        for column in columns:
+            if column not in known:
+                # Worker added a column: extend in place
+                con.execute(f"ALTER TABLE {_quote(spec.name)} ADD COLUMN {_quote(column)}")
+                known.append(column)
+        self._columns[spec.name] = known
+
+    def load_records(self, table: str, records: List[Dict[str, Any]], scope: Sequence = (),
+                     replace: bool = True, watermark: Optional[str] = None, fetched_at: Optional[float] = None):
+        """
+        Write Worker rows into the mirror
+
+        Args:
+            table: Key of MIRROR_TABLES
+            records: Rows as returned by the Worker
+            scope: Values of the table's scope params (holdings: portfolio_id, staging_id)
+            replace: Replace the table (scope) instead of upserting
+            watermark: New updated_at watermark (incremental pulls)
+            fetched_at: When the rows were requested (default now); D1 writes
+                after this keep the table routed to the Worker
+        """
+        spec = self.tables[table]
+        if 'price_date' in spec.key:
+            # Price history dates come as price_date, date or bpdate depending on the source
+            records = [r if 'price_date' in r else {**r, 'price_date': r.get('date', r.get('bpdate'))}
+                       for r in records]
+        records = [r for r in records if all(r.get(k) is not None for k in spec.key)]
+        columns = list(dict.fromkeys(c for r in records for c in r))
+
+        scope_values = [str(s) for s in scope]
+        with self._write_lock:
+            con = self._con
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                self._ensure_table(con, spec, columns)
+                if replace:
+                    where, params = self._scope_where(spec, scope)
+                    con.execute(f"DELETE FROM {_quote(table)}{where}", params)
+                if records:
+                    names = ['_' + s for s in spec.scope] + columns
+                    con.executemany(
+                        f"INSERT OR REPLACE INTO {_quote(table)} ({', '.join(_quote(c) for c in names)}) "
+                        f"VALUES ({', '.join('?' for _ in names)})",
+                        [scope_values + [_value(r.get(c)) for c in columns] for r in records]
+                    )
+                previous = self._state(table, scope)
+                if watermark is None and not replace and previous:
+                    watermark = previous["watermark"]
+                self._save_state(con, table, scope, watermark, full_load=replace, now=fetched_at or time.time())
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+
+        if spec.scope:
+            self._scopes.add(tuple(scope_values))
+        if replace:
+            self.stats["full_loads"] += 1
+        self.stats["rows_synced"] += len(records)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def _url(self, spec: MirrorTable) -> str:
+        if spec.pricing:
+            from .cloudflare_d1 import _get_pricing_url
+            return f"{_get_pricing_url()}{spec.path}"
+        return f"{self.client.base_url}{spec.path}"
+
+    async def _pull(self, spec: MirrorTable, params: Dict[str, Any], watermark: Optional[str]) -> List[Dict[str, Any]]:
+        if not spec.incremental:
+            data = await self.client._request_with_retry('GET', self._url(spec), params=params, timeout=30.0)
+            return data.get(spec.field, [])
+        rows: List[Dict[str, Any]] = []
+        while True:
+            page_params = {**params, 'limit': PAGE_SIZE, 'offset': len(rows)}
+            if watermark:
+                page_params['updated_since'] = watermark
+            data = await self.client._request_with_retry('GET', self._url(spec), params=page_params, timeout=30.0)
+            page = data.get(spec.field, [])
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+
+    def sync_table(self, table: str, scope: Sequence = ()):
+        """Bring one table (scope) up to date from the Worker"""
+        from .cloudflare_d1 import D1HTTPError
+
+        spec = self.tables[table]
+        state = self._state(table, scope)
+        full = (
+            not spec.incremental
+            or state is None
+            or state["watermark"] is None
+            or time.time() - state["full_load_at"] > FULL_REFRESH_INTERVAL
+        )
+        # Writes during the pull stay newer than synced_at, so the table stays routed to the Worker
+        started = time.time()
+        params = dict(zip(spec.scope, scope))
+        try:
+            rows = run_sync(self._pull(spec, params, None if full else state["watermark"]))
+        except D1HTTPError as e:
+            if e.code in (404, 405, 501):
+                self._unsupported.add(table)
+                logger.info(f"D1 replica: Worker has no {spec.path}, {table} reads stay remote")
+                return
+            raise
+
+        stamps = [r['updated_at'] for r in rows if r.get('updated_at')]
+        watermark = max(stamps) if stamps else (None if full else state["watermark"])
+        self.load_records(table, rows, scope=scope, replace=full, watermark=watermark, fetched_at=started)
+        if full:
+            logger.info(f"D1 replica {table}{list(scope) or ''}: full load of {len(rows)} rows")
+        elif rows:
+            logger.info(f"D1 replica {table}: +{len(rows)} rows (watermark {watermark})")
+
+    def sync(self):
+        """Sync every mirrored table and holdings scope (errors are logged per table)"""
+        if self.client is None:
+            return
+        for table, spec in self.tables.items():
+            if table in self._unsupported:
+                continue
+            for scope in (sorted(self._scopes.copy()) if spec.scope else [()]):
+                try:
+                    self.sync_table(table, scope)
+                except Exception as e:
+                    logger.warning(f"D1 replica {table} sync failed: {e}")
+        self.stats["syncs"] += 1
+
+    def start(self):
+        """Start the background sync thread (first sync runs immediately)"""
+        if self._thread is not None or self.client is None:
+            return
+
+        def run():
+            while True:
+                self.sync()
+                self._wake.wait(SYNC_INTERVAL)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name="d1-replica", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Reads (None: not fresh, ask the Worker)
+    # ------------------------------------------------------------------
+
+    def _rows(self, sql: str, params: Sequence = ()) -> List[Dict[str, Any]]:
+        cursor = self._con.execute(sql, list(params))
+        names = [d[0] for d in cursor.description]
+        keep = [i for i, n in enumerate(names) if not n.startswith('_')]
+        return [{names[i]: row[i] for i in keep} for row in cursor.fetchall()]
+
+    def _frame(self, spec: MirrorTable, rows: List[Dict[str, Any]]) -> pd.DataFrame:
+        self.stats["reads"] += 1
+        return records_to_frame(rows, spec.frame) if spec.frame else pd.DataFrame(rows)
+
+    def read(self, table: str, scope: Sequence = ()) -> Optional[pd.DataFrame]:
+        """Whole table (or one scope), if fresh"""
+        if not self.is_fresh(table, scope):
+            if scope and self.client is not None and tuple(map(str, scope)) not in self._scopes:
+                self._scopes.add(tuple(map(str, scope)))  # keep this portfolio synced from now on
+            return None
+        spec = self.tables[table]
+        where, params = self._scope_where(spec, scope)
+        return self._frame(spec, self._rows(f"SELECT * FROM {_quote(table)}{where}", params))
+
+    def read_by_isin(self, table: str, isins: List[str]) -> Optional[pd.DataFrame]:
+        """Rows for the given ISINs (primary key seeks), if fresh"""
+        if not self.is_fresh(table):
+            return None
+        spec = self.tables[table]
+        rows = self._rows(f"SELECT * FROM {_quote(table)} WHERE isin IN (SELECT value FROM json_each(?))",
+                          [json.dumps(isins)])
+        return self._frame(spec, rows)
+
+    def read_period_prices(self, start_date: str, end_date: str,
+                           isins: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Begin/end prices per ISIN: the last price on or before each date
+
+        Same columns as /api/price_history/period, if price_history is fresh.
+        """
+        if not self.is_fresh('price_history'):
+            return None
+        columns = self._columns.get('price_history') or [
+            row[1] for row in self._con.execute("PRAGMA table_info(price_history)")]
+        picked = {suffix: next((c for c in names if c in columns), None) for suffix, names in _PRICE_COLUMNS.items()}
+        if picked['price'] is None:
+            return None
+        select = ", ".join(f"{_quote(c)} AS {suffix}" for suffix, c in picked.items() if c)
+        isin_filter = "isin IN (SELECT value FROM json_each(?))" if isins else "1"
+
+        def as_of(day: str) -> Dict[str, Dict[str, Any]]:
+            # Correlated MAX is a seek on the (isin, price_date) primary key
+            params = ([json.dumps(isins)] if isins else []) + [day]
+            rows = self._rows(
+                f"SELECT isin, substr(price_date, 1, 10) AS date, {select} FROM price_history p "
+                f"WHERE {isin_filter} AND price_date = (SELECT MAX(price_date) FROM price_history q "
+                f"WHERE q.isin = p.isin AND q.price_date < date(?, '+1 day'))", params)
+            return {r['isin']: r for r in rows}
+
+        begin, end = as_of(start_date), as_of(end_date)
+        rows = []
+        for isin in dict.fromkeys(list(begin) + list(end)):
+            row = {'isin': isin}
+            for prefix, side in (('begin', begin.get(isin, {})), ('end', end.get(isin, {}))):
+                row[f"{prefix}_date"] = side.get('date')
+                for suffix in _PRICE_COLUMNS:
+                    row[f"{prefix}_{suffix}"] = side.get(suffix)
+            rows.append(row)
+        self.stats["reads"] += 1
+        return records_to_frame(rows, 'period_prices') if rows else pd.DataFrame()
+
+    def info(self) -> Dict[str, Any]:
+        tables = {}
+        for table, spec in self.tables.items():
+            for scope in (sorted(self._scopes.copy()) if spec.scope else [()]):
+                state = self._state(table, scope)
+                name = f"{table}[{','.join(scope)}]" if scope else table
+                tables[name] = {
+                    "fresh": self.is_fresh(table, scope),
+                    "rows": state["row_count"] if state else 0,
+                    "watermark": state["watermark"] if state else None,
+                    "age_seconds": round(time.time() - state["synced_at"], 1) if state else None,
+                    "supported": table not in self._unsupported,
+                }
+        return {"path": self.path or ":memory:", "max_staleness": self.max_staleness,
+                "tables": tables, **self.stats}
+
+
+# ----------------------------------------------------------------------
+# Process-wide instance
+# ----------------------------------------------------------------------
+
+_replica: Optional[D1Replica] = None
+_replica_lock = threading.Lock()
+
+
+def get_d1_replica() -> Optional[D1Replica]:
+    """
+    The D1 mirror, created (and its sync started) on first use
+
+    Returns None unless ORCA_D1_REPLICA is enabled or a replica was installed.
+    """
+    global _replica
+    if _replica is not None or not REPLICA_ENABLED:
+        return _replica
+    with _replica_lock:
+        if _replica is None:
+            from .cloudflare_d1 import D1Client
+            os.makedirs(os.path.dirname(os.path.abspath(REPLICA_PATH)), exist_ok=True)
+            tables = [t.strip() for t in os.getenv("ORCA_D1_REPLICA_TABLES", "").split(",") if t.strip()]
+            _replica = D1Replica(D1Client(), path=REPLICA_PATH, tables=tables or None)
+            _replica.start()
+        return _replica
+
+
+def install_d1_replica(replica: Optional[D1Replica]):
+    """Use `replica` for D1 reads (e.g. an offline, seeded one); None removes it"""
+    global _replica
+    with _replica_lock:
+        _replica = replica
+
+
+def mark_d1_replica_dirty(table: str, scope: Optional[Sequence] = None):
+    """Route reads of a D1 table (scope) to the Worker until the mirror has synced it"""
+    replica = _replica
+    if replica is not None:
+        replica.mark_dirty(table, scope)
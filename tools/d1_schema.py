@@ -0,0 +1,158 @@
+"""
+Declared Column Schemas for D1 Worker Responses
+
+D1 returns JSON rows; pd.DataFrame(list_of_dicts) infers every column
+from Python objects and leaves all-null or mixed columns as object, so
+display code re-coerces them row by row. Here each read endpoint declares
+its known columns, and records_to_frame builds those columns straight
+into typed arrays:
+
+- float     -> float64 (None -> NaN)
+- int       -> int64, float64 if any value is missing
+- datetime  -> datetime64[ns] (ISO strings, None/'' -> NaT, UTC offsets
+               converted and dropped)
+- category  -> pandas Categorical (low-cardinality labels)
+
+Undeclared columns are inferred by pandas as before. Bodies are decoded
+with orjson when it is installed (pip install orjson), else json.
+
+Only columns that are safe for existing callers are declared: holdings
+and analytics dates stay strings (they are echoed into JSON), and
+country/ticker/rating stay strings (they are grouped on).
+
+Usage:
+    data = loads(response.content)
+    df = records_to_frame(data["transactions"], "transactions")
+    rows = frame_to_records(df)  # back to JSON-ready rows for tool output
+"""
+
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_NUMERIC = {
+    'par_amount', 'price', 'market_value', 'accrued_interest', 'dirty_price',
+    'settlement_amount', 'cost_basis', 'avg_cost', 'purchase_price', 'coupon',
+    'ytw', 'ytm', 'yield', 'oad', 'oas', 'duration', 'spread', 'convexity',
+    'pct_nav', 'weight', 'expected_return', 'return_ytw',
+}
+
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    'holdings': {
+        **{name: 'float' for name in _NUMERIC},
+        'staging_id': 'int',
+    },
+    'analytics': {name: 'float' for name in _NUMERIC},
+    'transactions': {
+        **{name: 'float' for name in _NUMERIC},
+        'transaction_id': 'int',
+        'transaction_date': 'datetime',
+        'settlement_date': 'datetime',
+        'transaction_type': 'category',
+        'status': 'category',
+    },
+    'cashflows': {
+        'amount': 'float',
+        'payment_amount': 'float',
+        'coupon_amount': 'float',
+        'principal_amount': 'float',
+        'par_amount': 'float',
+        'date': 'datetime',
+        'payment_date': 'datetime',
+        'payment_type': 'category',
+    },
+    'period_prices': {
+        'begin_price': 'float',
+        'begin_accrued': 'float',
+        'begin_dirty': 'float',
+        'end_price': 'float',
+        'end_accrued': 'float',
+        'end_dirty': 'float',
+        'begin_date': 'datetime',
+        'end_date': 'datetime',
+    },
+}
+
+
+def loads(body: bytes) -> Any:
+    """Decode a JSON response body (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _float_column(values: List[Any]) -> np.ndarray:
+    try:
+        # None -> NaN; numbers and numeric strings convert in C
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _int_column(values: List[Any]) -> np.ndarray:
+    floats = _float_column(values)
+    if np.isnan(floats).any() or not np.equal(np.mod(floats, 1), 0).all():
+        return floats
+    return floats.astype(np.int64)
+
+
+def _datetime_column(values: List[Any]) -> pd.Series:
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', utc=True, format='ISO8601')
+    return parsed.dt.tz_localize(None)
+
+
+_BUILDERS = {
+    'float': _float_column,
+    'int': _int_column,
+    'datetime': _datetime_column,
+    'category': pd.Categorical,
+}
+
+
+def records_to_frame(records: List[Dict[str, Any]], endpoint: str) -> pd.DataFrame:
+    """
+    Build a DataFrame from Worker rows using the endpoint's declared schema
+
+    Args:
+        records: Row dicts as returned by the Worker
+        endpoint: Key of SCHEMAS (holdings, analytics, transactions, cashflows, period_prices)
+
+    Returns:
+        DataFrame with one column per key seen in the rows (first-seen order)
+    """
+    if not records:
+        return pd.DataFrame()
+    schema = SCHEMAS[endpoint]
+
+    columns = dict.fromkeys(records[0])
+    if any(record.keys() != columns.keys() for record in records):
+        for record in records:
+            columns.update(dict.fromkeys(record))
+
+    data = {}
+    for name in columns:
+        values = [record.get(name) for record in records]
+        builder = _BUILDERS.get(schema.get(name))
+        data[name] = builder(values) if builder else pd.Series(values)
+    return pd.DataFrame(data)
+
+
+def frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Rows of a typed D1 frame as JSON-ready dicts, in the Worker's format
+
+    Datetime columns go back to 'YYYY-MM-DD' strings (str() of a datetime64
+    value would add ' 00:00:00'), and NaN/NaT become None.
+    """
+    if df.empty:
+        return []
+    dates = {name: df[name].dt.strftime('%Y-%m-%d') for name in df.select_dtypes(include='datetime').columns}
+    rows = df.assign(**dates).astype(object)
+    return rows.where(rows.notna(), None).to_dict(orient='records')
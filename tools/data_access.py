@@ -11,8 +11,14 @@ import urllib.error
 import tempfile
 import os
 import re
+import time
 import base64
-from typing import Any, Dict
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
 from pathlib import Path
 import pandas as pd
 
@@ -27,6 +33,8 @@ except ImportError:
 try:
     from ..client_config import get_client_config
     from .cache_manager import get_cache_manager, CacheManager
+    from .single_flight import SingleFlight
+    from .local_replica import get_local_replica
 except ImportError:
     # When deployed standalone (not as package)
     import sys
@@ -34,6 +42,11 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from client_config import get_client_config
     from .cache_manager import get_cache_manager, CacheManager
+    from .single_flight import SingleFlight
+    from .local_replica import get_local_replica
+
+
+logger = logging.getLogger(__name__)
 
 
 def _allow_local_auth_fallback() -> bool:
@@ -197,67 +210,234 @@ def setup_bigquery_credentials():
     )
 
 
-def query_bigquery(sql: str, client_id: str = None, use_cache: bool = True, ttl: int = None) -> pd.DataFrame:
+# Process-wide BigQuery clients, one per project. A Client owns an
+# authorized HTTP session (connection pool + OAuth token that google-auth
+# refreshes before it expires), so building one per query threw away
+# hundreds of milliseconds of TLS and token setup every time.
+_bq_clients: Dict[str, Any] = {}
+_bq_lock = threading.Lock()
+
+# Credential cache: setup_bigquery_credentials() is re-run at most this often
+# (or when the credentials file disappears), and clients are rebuilt only if
+# it resolves to a different file - e.g. rotated keys from auth-mcp.
+_CREDENTIALS_RECHECK = float(os.getenv("ORCA_BQ_CREDENTIALS_RECHECK", "3600"))
+_credentials_path: Optional[str] = None
+_credentials_checked_at = 0.0
+
+
+def _ensure_credentials() -> bool:
     """
-    Query BigQuery for a specific client with optional Redis caching
+    Make sure BigQuery credentials are configured, re-checking when stale
+
+    Must be called with _bq_lock held.
+
+    Returns:
+        True if the credentials file changed since the last check
+    """
+    global _credentials_path, _credentials_checked_at
+
+    now = time.monotonic()
+    if (_credentials_path is not None
+            and now - _credentials_checked_at < _CREDENTIALS_RECHECK
+            and os.path.isfile(_credentials_path)):
+        return False
+
+    setup_bigquery_credentials()
+    path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    changed = _credentials_path is not None and path != _credentials_path
+    _credentials_path = path
+    _credentials_checked_at = now
+    return changed
+
+
+def get_bigquery_client(project: str = None, client_id: str = None):
+    """
+    Get the shared BigQuery client for a project
 
     Args:
-        sql: SQL query (use simple table names like 'transactions')
-        client_id: Client identifier (uses default if None)
-        use_cache: Whether to use Redis cache (default: True)
-        ttl: Cache TTL in seconds (default: auto-determined by query type)
+        project: GCP project (default: the client's configured BigQuery project)
+        client_id: Client identifier used to resolve the default project
 
     Returns:
-        DataFrame with results
+        bigquery.Client (thread-safe, reused across calls)
     """
     if not BIGQUERY_AVAILABLE:
         raise ImportError(
-            "BigQuery is not available. Install with: pip install google-cloud-bigquery\n"
-            "Or use local SQLite database instead."
+            "BigQuery is not available. Install with: pip install google-cloud-bigquery"
         )
 
-    # Get client config
-    config = get_client_config(client_id)
+    if project is None:
+        project = get_client_config(client_id).get_service("bigquery")['project']
 
-    # Check cache first (if enabled)
-    cache = get_cache_manager()
-    cache_key = None
+    with _bq_lock:
+        if _ensure_credentials():
+            logger.info("BigQuery credentials changed - rebuilding clients")
+            for old in _bq_clients.values():
+                try:
+                    old.close()
+                except Exception:
+                    pass
+            _bq_clients.clear()
 
-    if use_cache and cache.enabled:
-        # Generate cache key
-        query_hash = cache.query_hash(sql, {"client_id": config.client_id})
-        cache_key = f"query:{config.client_id}:{query_hash}"
+        client = _bq_clients.get(project)
+        if client is None:
+            client = bigquery.Client(project=project)
+            _bq_clients[project] = client
+        return client
 
-        # Try to get from cache
-        cached_data = cache.get(cache_key)
-        if cached_data is not None:
-            try:
-                # Reconstruct DataFrame from cached dict
-                df = pd.DataFrame(cached_data)
-                print(f"✅ Cache HIT: Returned {len(df)} rows from cache")
-                return df
-            except Exception as e:
-                print(f"⚠️  Cache deserialization error: {e}")
-                # Continue to query BigQuery
 
-    # Cache miss or caching disabled - query BigQuery
-    print(f"📊 Cache MISS: Querying BigQuery...")
+def warm_bigquery_clients(client_id: str = None) -> Dict[str, Any]:
+    """
+    Create the BigQuery client and fetch an access token ahead of the first query
 
-    # Set up credentials
-    setup_bigquery_credentials()
+    Call at server start (in a thread - it does network I/O). Failures are
+    logged, not raised: the first query will simply pay the setup cost.
+
+    Returns:
+        Dictionary with project, ok and duration_ms
+    """
+    start = time.perf_counter()
+    result = {"project": None, "ok": False}
+    try:
+        client = get_bigquery_client(client_id=client_id)
+        result["project"] = client.project
+        credentials = getattr(client, "_credentials", None)
+        if credentials is not None and not getattr(credentials, "valid", True):
+            from google.auth.transport.requests import Request
+            credentials.refresh(Request())
+        result["ok"] = True
+    except Exception as e:
+        logger.warning(f"BigQuery warm-up failed: {e}")
+        result["error"] = str(e)
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(f"BigQuery warm-up: {result}")
+    return result
+
+
+# Async queries run on their own bounded pool so a burst of slow BigQuery
+# jobs can't starve the default executor (or the event loop).
+_BQ_MAX_CONCURRENT = int(os.getenv("ORCA_BQ_MAX_CONCURRENT", "8"))
+_BQ_QUERY_TIMEOUT = float(os.getenv("ORCA_BQ_QUERY_TIMEOUT", "120"))
+_bq_executor: Optional[ThreadPoolExecutor] = None
+
+
+class _SharedJob:
+    """
+    The BigQuery job behind one in-flight query and the callers waiting on it
+
+    Coalesced callers share the job, so one caller giving up must not kill
+    it: it is cancelled only when the last waiter has left by giving up.
+    """
 
+    def __init__(self):
+        self.job = None
+        self.waiters = 0
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def attach(self, job):
+        with self._lock:
+            self.job = job
+            cancelled = self.cancelled
+        if cancelled:
+            job.cancel()
+            raise RuntimeError("BigQuery query cancelled")
+
+    def join(self):
+        with self._lock:
+            self.waiters += 1
+
+    def leave(self, gave_up: bool = False):
+        """One waiter is done; cancel the job if it gave up and was the last one"""
+        with self._lock:
+            self.waiters -= 1
+            if not gave_up or self.waiters > 0:
+                return
+            self.cancelled = True
+            job = self.job
+        if job is not None:
+            try:
+                job.cancel()
+                logger.info(f"Cancelled BigQuery job {job.job_id}")
+            except Exception as e:
+                logger.warning(f"Failed to cancel BigQuery job: {e}")
+
+
+class _QueryHandle:
+    """One caller's membership in the shared job it waits on (left exactly once)"""
+
+    def __init__(self):
+        self.shared: Optional[_SharedJob] = None
+        self.abandoned = False
+        self._lock = threading.Lock()
+
+    def join(self, shared: _SharedJob):
+        with self._lock:
+            shared.join()
+            if self.abandoned:
+                # Gave up before reaching the query: count as left already
+                shared.leave(gave_up=True)
+                return
+            self.shared = shared
+
+    def finish(self):
+        """The caller's thread is done with the job"""
+        with self._lock:
+            shared, self.shared = self.shared, None
+        if shared is not None:
+            shared.leave()
+
+    def abandon(self):
+        """The (async) caller stopped waiting"""
+        with self._lock:
+            self.abandoned = True
+            shared, self.shared = self.shared, None
+        if shared is not None:
+            shared.leave(gave_up=True)
+
+
+# Set by query_bigquery_async so the worker thread knows its caller
+_current_query: contextvars.ContextVar[Optional[_QueryHandle]] = contextvars.ContextVar(
+    "orca_current_bigquery_query", default=None
+)
+
+
+# Concurrent misses for the same cache key share one BigQuery job
+_query_flight = SingleFlight(context=_SharedJob)
+
+# Cross-worker coalescing: how long the computing worker holds the Redis
+# lock, and how long other workers wait for its result before querying
+# themselves.
+_QUERY_LOCK_TTL_MS = int(os.getenv("ORCA_QUERY_LOCK_TTL_MS", "30000"))
+_QUERY_LOCK_WAIT = float(os.getenv("ORCA_QUERY_LOCK_WAIT", "15"))
+_DISTRIBUTED_LOCK = os.getenv("ORCA_QUERY_DISTRIBUTED_LOCK", "true").lower() in ("1", "true", "yes")
+
+
+def _ttl_class(sql: str) -> str:
+    """CacheManager TTL class based on query type"""
+    if 'agg_analysis_data' in sql.lower():
+        return "universe"  # 1 hour for universe data
+    elif 'transactions' in sql.lower():
+        return "transactions"  # 15 min for transactions
+    elif 'holdings' in sql.lower():
+        return "holdings"  # 5 min for holdings
+    return "default"  # 5 min default
+
+
+def _execute_bigquery(sql: str, config, shared: Optional[_SharedJob] = None) -> pd.DataFrame:
+    """Rewrite table names to the client's dataset and run the query"""
     # Get BigQuery service config
     bq_service = config.get_service("bigquery")
 
-    # Create BigQuery client
-    client = bigquery.Client(project=bq_service['project'])
+    # Shared client (credentials checked and cached by the registry)
+    client = get_bigquery_client(bq_service['project'])
 
     # Get client's dataset
     dataset = config.get_bigquery_dataset()
 
     # Rewrite table names to full BigQuery paths
     sql_rewritten = sql
-    tables = ['staging_holdings_detail', 'staging_holdings', 'current_holdings', 'transactions', 'agg_analysis_data', 'cashflows']
+    tables = ['staging_holdings_detail', 'staging_holdings', 'current_holdings', 'transactions', 'agg_analysis_data', 'cashflows', 'portfolio_summary']
 
     # Sort by length (longest first) to avoid partial replacements
     # e.g., staging_holdings_detail before staging_holdings
@@ -273,33 +453,185 @@ def query_bigquery(sql: str, client_id: str = None, use_cache: bool = True, ttl:
 
     print(f"🔍 BigQuery SQL (client={config.client_id}): {sql_rewritten[:100]}...")
 
-    # Execute query
-    df = client.query(sql_rewritten).to_dataframe()
+    # Execute query (cancellable once every waiter gave up, see _SharedJob)
+    job = client.query(sql_rewritten)
+    if shared is not None:
+        shared.attach(job)
+    df = job.to_dataframe()
 
     print(f"✅ BigQuery returned {len(df)} rows")
+    return df
 
-    # Cache the result (if enabled)
-    if use_cache and cache.enabled and cache_key:
-        # Determine TTL based on query type
-        if ttl is None:
-            if 'agg_analysis_data' in sql.lower():
-                ttl = CacheManager.TTL_UNIVERSE  # 1 hour for universe data
-            elif 'transactions' in sql.lower():
-                ttl = CacheManager.TTL_TRANSACTIONS  # 15 min for transactions
-            elif 'holdings' in sql.lower():
-                ttl = CacheManager.TTL_HOLDINGS  # 5 min for holdings
-            else:
-                ttl = CacheManager.TTL_DEFAULT  # 5 min default
+
+def _query_and_cache(sql: str, config, cache: CacheManager, cache_key: str,
+                     cache_tags, policy, shared: _SharedJob) -> pd.DataFrame:
+    """Single-flight leader: query BigQuery once and populate the cache"""
+    token = None
+    if _DISTRIBUTED_LOCK and cache.enabled:
+        token = cache.acquire_lock(cache_key, ttl_ms=_QUERY_LOCK_TTL_MS)
+        if token is None:
+            # Another worker is running this query - wait for its result
+            df = cache.wait_for_frame(cache_key, _QUERY_LOCK_WAIT, tags=cache_tags)
+            if df is not None:
+                print(f"✅ Cache HIT (coalesced): Returned {len(df)} rows from cache")
+                return df
+
+    try:
+        start = time.perf_counter()
+        df = _execute_bigquery(sql, config, shared)
+        delta = time.perf_counter() - start
 
         try:
-            # Convert DataFrame to dict for JSON serialization
-            cache_data = df.to_dict(orient='records')
-            cache.set(cache_key, cache_data, ttl)
-            print(f"💾 Cached result (TTL: {ttl}s)")
+            cache.set_frame(cache_key, df, policy.ttl, tags=cache_tags,
+                            delta=delta, stale_ttl=policy.stale_ttl)
+            print(f"💾 Cached result (TTL: {policy.ttl}s, stale: {policy.stale_ttl}s)")
         except Exception as e:
             print(f"⚠️  Cache write error: {e}")
 
-    return df
+        return df
+    finally:
+        if token:
+            cache.release_lock(cache_key, token)
+
+
+def query_bigquery(sql: str, client_id: str = None, use_cache: bool = True, ttl: int = None) -> pd.DataFrame:
+    """
+    Query BigQuery for a specific client with optional Redis caching
+
+    Reads over tables held fresh by the local replica (see local_replica)
+    are answered by DuckDB without touching BigQuery or Redis.
+
+    Concurrent cache misses for the same query are coalesced: one caller runs
+    the BigQuery job and the others receive (a copy of) its result. Within
+    the TTL class's stale window an expired result is returned immediately
+    and refreshed in the background.
+
+    Args:
+        sql: SQL query (use simple table names like 'transactions')
+        client_id: Client identifier (uses default if None)
+        use_cache: Whether to use Redis cache (default: True)
+        ttl: Cache TTL in seconds (default: auto-determined by query type)
+
+    Returns:
+        DataFrame with results
+    """
+    # Get client config
+    config = get_client_config(client_id)
+
+    # Local DuckDB replica (ORCA_LOCAL_REPLICA) answers reads over fresh tables
+    if use_cache:
+        fetch = (lambda replica_sql: _execute_bigquery(replica_sql, config)) if BIGQUERY_AVAILABLE else None
+        replica = get_local_replica(config.client_id, fetch=fetch)
+        if replica is not None:
+            df = replica.try_query(sql)
+            if df is not None:
+                print(f"✅ Replica HIT: Returned {len(df)} rows from local replica")
+                return df
+
+    if not BIGQUERY_AVAILABLE:
+        raise ImportError(
+            "BigQuery is not available. Install with: pip install google-cloud-bigquery\n"
+            "Or use local SQLite database instead."
+        )
+
+    # Async callers that time out leave the job; sync callers wait it out
+    caller = _current_query.get() or _QueryHandle()
+
+    if not use_cache:
+        print(f"📊 Cache MISS: Querying BigQuery...")
+        shared = _SharedJob()
+        caller.join(shared)
+        try:
+            return _execute_bigquery(sql, config, shared)
+        finally:
+            caller.finish()
+
+    # Check cache first (in-process L1, then Redis L2)
+    cache = get_cache_manager()
+    query_hash = cache.query_hash(sql, {"client_id": config.client_id})
+    cache_key = f"query:{config.client_id}:{query_hash}"
+    cache_tags = cache.query_tags(sql, config.client_id)
+
+    policy = cache.ttl_policies[_ttl_class(sql)]
+    if ttl is not None:
+        policy = policy._replace(ttl=ttl)
+
+    entry = cache.get_frame_entry(cache_key, tags=cache_tags)
+    if entry is not None:
+        if entry.should_refresh():
+            # Serve what we have; refresh off the request path
+            cache.refresh_in_background(
+                cache_key, lambda: _execute_bigquery(sql, config),
+                policy.ttl, tags=cache_tags, stale_ttl=policy.stale_ttl
+            )
+            state = "STALE" if entry.is_stale() else "HIT (early refresh)"
+            print(f"✅ Cache {state}: Returned {len(entry.df)} rows from cache")
+        else:
+            print(f"✅ Cache HIT: Returned {len(entry.df)} rows from cache")
+        return entry.df
+
+    # Cache miss - query BigQuery (once per key across concurrent callers)
+    print(f"📊 Cache MISS: Querying BigQuery...")
+    try:
+        df, shared = _query_flight.do(
+            cache_key,
+            lambda job: _query_and_cache(sql, config, cache, cache_key, cache_tags, policy, job),
+            join=caller.join,
+        )
+    finally:
+        caller.finish()
+    return df.copy() if shared else df
+
+
+def _get_bq_executor() -> ThreadPoolExecutor:
+    global _bq_executor
+    if _bq_executor is None:
+        _bq_executor = ThreadPoolExecutor(max_workers=_BQ_MAX_CONCURRENT, thread_name_prefix="bigquery")
+    return _bq_executor
+
+
+async def query_bigquery_async(sql: str, client_id: str = None, use_cache: bool = True,
+                               ttl: int = None, timeout: Optional[float] = None) -> pd.DataFrame:
+    """
+    Non-blocking query_bigquery for async handlers
+
+    Runs query_bigquery on a bounded thread pool (ORCA_BQ_MAX_CONCURRENT) so
+    the event loop keeps serving other requests. On timeout or cancellation
+    this call stops waiting; the BigQuery job is cancelled server-side only
+    if no other caller (sync or async) coalesced onto it is still waiting.
+
+    Args:
+        sql: SQL query (use simple table names like 'transactions')
+        client_id: Client identifier (uses default if None)
+        use_cache: Whether to use the cache (default: True)
+        ttl: Cache TTL in seconds (default: auto-determined by query type)
+        timeout: Seconds to wait (default: ORCA_BQ_QUERY_TIMEOUT, 120)
+
+    Returns:
+        DataFrame with results
+
+    Raises:
+        TimeoutError: If the query did not finish within timeout
+    """
+    timeout = _BQ_QUERY_TIMEOUT if timeout is None else timeout
+    handle = _QueryHandle()
+    ctx = contextvars.copy_context()
+    ctx.run(_current_query.set, handle)
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_get_bq_executor(), ctx.run, query_bigquery, sql, client_id, use_cache, ttl)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        # The worker thread finishes on its own (early if the job is
+        # cancelled); consume its outcome so it isn't logged as unretrieved.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if isinstance(e, asyncio.CancelledError):
+            # Don't block cancellation on the cancel API call
+            loop.run_in_executor(None, handle.abandon)
+            raise
+        await loop.run_in_executor(None, handle.abandon)
+        raise TimeoutError(f"BigQuery query timed out after {timeout}s") from None
 
 
 def get_client_database_registry(client_id: str = None) -> Dict[str, Any]:
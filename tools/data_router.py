@@ -233,6 +233,12 @@ async def get_cashflows_async(portfolio_id: str, client_id: str = None) -> pd.Da
         return await d1_get_cashflows_async(portfolio_id, client_id)
 
 
+async def get_analytics_batch_async(isins: List[str], client_id: str = None) -> pd.DataFrame:
+    """Async version of get_analytics_batch."""
+    from .cloudflare_d1 import D1Client
+    return await D1Client(client_id).get_analytics_batch(isins)
+
+
 # Export info about routing for debugging
 def get_routing_info() -> Dict[str, Any]:
     """Get current routing configuration."""
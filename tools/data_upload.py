@@ -21,15 +21,19 @@ except ImportError:
 
 try:
     from ..client_config import get_client_config
-    from .data_access import setup_bigquery_credentials
-    from .cache_manager import get_cache_manager
+    from .data_access import get_bigquery_client
+    from .cache_manager import get_cache_manager, CacheManager
+    from .universe_snapshot import mark_universe_stale
+    from .local_replica import mark_replica_dirty
 except ImportError:
     # When deployed standalone (not as package)
     import sys
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from client_config import get_client_config
-    from .data_access import setup_bigquery_credentials
-    from .cache_manager import get_cache_manager
+    from .data_access import get_bigquery_client
+    from .cache_manager import get_cache_manager, CacheManager
+    from .universe_snapshot import mark_universe_stale
+    from .local_replica import mark_replica_dirty
 
 logger = logging.getLogger(__name__)
 
@@ -89,15 +93,12 @@ def upload_table(
             f"Must be 'WRITE_TRUNCATE' or 'WRITE_APPEND'"
         )
 
-    # Set up credentials
-    setup_bigquery_credentials()
-
     # Get client config
     config = get_client_config(client_id)
     bq_service = config.get_service("bigquery")
 
-    # Create BigQuery client
-    bq_client = bigquery.Client(project=bq_service['project'])
+    # Shared BigQuery client
+    bq_client = get_bigquery_client(bq_service['project'])
 
     # Get client's dataset
     dataset = config.get_bigquery_dataset()
@@ -195,15 +196,12 @@ def delete_records(
             "BigQuery is not available. Install with: pip install google-cloud-bigquery"
         )
 
-    # Set up credentials
-    setup_bigquery_credentials()
-
     # Get client config
     config = get_client_config(client_id)
     bq_service = config.get_service("bigquery")
 
-    # Create BigQuery client
-    bq_client = bigquery.Client(project=bq_service['project'])
+    # Shared BigQuery client
+    bq_client = get_bigquery_client(bq_service['project'])
 
     # Get client's dataset
     dataset = config.get_bigquery_dataset()
@@ -279,15 +277,12 @@ def create_table(
             "BigQuery is not available. Install with: pip install google-cloud-bigquery"
         )
 
-    # Set up credentials
-    setup_bigquery_credentials()
-
     # Get client config
     config = get_client_config(client_id)
     bq_service = config.get_service("bigquery")
 
-    # Create BigQuery client
-    bq_client = bigquery.Client(project=bq_service['project'])
+    # Shared BigQuery client
+    bq_client = get_bigquery_client(bq_service['project'])
 
     # Get client's dataset
     dataset = config.get_bigquery_dataset()
@@ -339,48 +334,55 @@ def _invalidate_cache_for_table(table_name: str, client_id: str = None) -> int:
     Returns:
         Number of cache keys deleted
     """
-    cache = get_cache_manager()
+    config = get_client_config(client_id)
+    table_name = table_name.split('.')[-1].strip('`')
 
-    if not cache.enabled:
-        logger.debug("Cache not enabled - skipping invalidation")
-        return 0
+    # Local replica: transactions are small enough to reload; analytics are
+    # picked up by the bpdate watermark and row-count check
+    if table_name == 'agg_analysis_data':
+        mark_replica_dirty(table_name)
+        # In-process universe snapshot: its probe only compares row count and
+        # max bpdate, so same-shape corrections must be flagged here
+        mark_universe_stale()
+    else:
+        mark_replica_dirty(table_name, config.client_id, full=True)
 
-    config = get_client_config(client_id)
+    cache = get_cache_manager()
 
-    # Determine cache patterns to invalidate based on table
+    # Query results are keyed by hash, so they are found through the tag
+    # index; the legacy key families are still cleared by pattern.
     patterns = []
 
     if table_name == 'agg_analysis_data':
         # Universe data - invalidate all universe queries
-        patterns = ["universe:*", f"query:*agg_analysis_data*"]
+        tags = [CacheManager.table_tag(table_name)]
+        patterns = ["universe:*"]
         logger.info("Invalidating universe data cache")
 
     elif 'transaction' in table_name.lower():
         # Transactions - invalidate for this client
-        patterns = [
-            f"transactions:{config.client_id}:*",
-            f"query:{config.client_id}:*transaction*"
-        ]
+        tags = [CacheManager.table_tag(table_name, config.client_id)]
+        patterns = [f"transactions:{config.client_id}:*"]
         logger.info(f"Invalidating transaction cache for {config.client_id}")
 
     elif 'holding' in table_name.lower():
         # Holdings - invalidate for this client
-        patterns = [
-            f"holdings:{config.client_id}:*",
-            f"query:{config.client_id}:*holding*"
-        ]
+        tags = [CacheManager.table_tag(table_name, config.client_id)]
+        patterns = [f"holdings:{config.client_id}:*"]
         logger.info(f"Invalidating holdings cache for {config.client_id}")
 
     else:
-        # Generic - invalidate any queries mentioning this table
-        patterns = [f"query:*{table_name}*"]
+        # Generic - invalidate this client's queries reading the table
+        tags = [CacheManager.table_tag(table_name, config.client_id)]
         logger.info(f"Invalidating cache for table {table_name}")
 
-    # Invalidate all matching patterns
-    total_deleted = 0
+    # Also clears the in-process L1 frame cache, which is active without Redis
+    total_deleted = cache.invalidate_tags(tags)
+    if not cache.enabled:
+        logger.debug("Redis cache not enabled - only L1 invalidated")
+        return total_deleted
     for pattern in patterns:
-        deleted = cache.invalidate(pattern)
-        total_deleted += deleted
+        total_deleted += cache.invalidate(pattern)
 
     logger.info(f"Cache invalidation complete: {total_deleted} keys deleted")
 
@@ -398,6 +400,7 @@ def invalidate_cache_pattern(pattern: str) -> Dict[str, Any]:
         {
             "pattern": "universe:*",
             "keys_deleted": 15,
+            "duration_ms": 3.2,
             "timestamp": "2025-11-20T15:30:00"
         }
     """
@@ -411,11 +414,12 @@ def invalidate_cache_pattern(pattern: str) -> Dict[str, Any]:
             "timestamp": datetime.now().isoformat()
         }
 
-    keys_deleted = cache.invalidate(pattern)
+    stats = cache.invalidate_with_stats(pattern)
 
     return {
         "pattern": pattern,
-        "keys_deleted": keys_deleted,
+        "keys_deleted": stats["keys_deleted"],
+        "duration_ms": stats["duration_ms"],
         "cache_enabled": True,
         "timestamp": datetime.now().isoformat()
     }
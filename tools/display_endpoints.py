@@ -30,10 +30,10 @@ try:
         get_transactions,
         get_cashflows,
         get_holdings_async,
-        get_holdings_summary_async,
-        get_transactions_async,
     )
     from .compliance import check_compliance, compliance_to_dict
+    from .portfolio_bundle import PortfolioBundle, get_portfolio_bundle
+    from .http_pool import run_sync
 except ImportError:
     from tools.data_router import (
         get_holdings,
@@ -41,10 +41,10 @@ except ImportError:
         get_transactions,
         get_cashflows,
         get_holdings_async,
-        get_holdings_summary_async,
-        get_transactions_async,
     )
     from tools.compliance import check_compliance, compliance_to_dict
+    from tools.portfolio_bundle import PortfolioBundle, get_portfolio_bundle
+    from tools.http_pool import run_sync
 
 
 # =============================================================================
@@ -112,7 +112,7 @@ def fmt_spread(value: float) -> str:
 
 def fmt_date(value) -> str:
     """Format date as YYYY-MM-DD"""
-    if value is None:
+    if value is None or value is pd.NaT:
         return "-"
     if isinstance(value, str):
         return value[:10] if len(value) >= 10 else value
@@ -148,6 +148,12 @@ def safe_float(value, default: float = 0.0) -> float:
         return default
 
 
+def _no_holdings_error(holdings_df: Optional[pd.DataFrame]) -> str:
+    """"No holdings found", or the fetch failure when the D1 read failed (df.attrs['error'])"""
+    error = holdings_df.attrs.get('error') if holdings_df is not None else None
+    return f"Holdings unavailable: {error}" if error else "No holdings found"
+
+
 def _calc_weighted_averages(holdings_df: pd.DataFrame) -> tuple:
     """Calculate weighted average duration and yield from holdings DataFrame.
 
@@ -254,12 +260,15 @@ def get_holdings_display(
     holdings_df = get_holdings(portfolio_id, staging_id, client_id)
 
     if holdings_df.empty:
-        return {
+        empty = {
             "holdings": [],
             "totals": {},
             "count": 0,
             "as_of": datetime.utcnow().isoformat() + "Z"
         }
+        if holdings_df.attrs.get('error'):
+            empty["error"] = _no_holdings_error(holdings_df)
+        return empty
 
     # Calculate totals for weight calculation
     total_market_value = holdings_df['market_value'].sum() if 'market_value' in holdings_df.columns else 0
@@ -405,7 +414,7 @@ def get_portfolio_dashboard(
 
     if holdings_df.empty:
         return {
-            "summary": {"error": "No holdings found"},
+            "summary": {"error": _no_holdings_error(holdings_df)},
             "allocation": {},
             "compliance_summary": {},
             "as_of": datetime.utcnow().isoformat() + "Z"
@@ -1018,9 +1027,17 @@ def get_compliance_display(
     Display-ready compliance dashboard.
     Wraps check_compliance with display-ready output including chart data.
     """
-    holdings_df = get_holdings(portfolio_id, staging_id=1, client_id=client_id)
-    summary = get_holdings_summary(portfolio_id, staging_id=1, client_id=client_id)
-    net_cash = safe_float(summary.get('cash', 0))
+    return run_sync(get_compliance_display_async(portfolio_id, client_id))
+
+
+async def get_compliance_display_async(
+    portfolio_id: str = "wnbf",
+    client_id: str = None
+) -> Dict[str, Any]:
+    """Async version of get_compliance_display (holdings + summary in one bundle fetch)."""
+    bundle = await get_portfolio_bundle(portfolio_id, ["holdings", "summary"], client_id, cash_fallback=False)
+    holdings_df = bundle.holdings
+    net_cash = safe_float(bundle.summary.get('cash', 0))
 
     if holdings_df.empty:
         return {
@@ -1586,119 +1603,20 @@ async def get_portfolio_dashboard_async(
     """
     Async version of get_portfolio_dashboard.
 
-    Fetches holdings and summary in parallel for ~2-3x speedup.
+    Holdings and summary come from one bundle fetch (transactions too when
+    the summary has no cash).
     """
-    # Fetch holdings and summary in parallel
-    holdings_df, summary = await asyncio.gather(
-        get_holdings_async(portfolio_id, staging_id=1, client_id=client_id),
-        get_holdings_summary_async(portfolio_id, staging_id=1, client_id=client_id),
-    )
+    bundle = await get_portfolio_bundle(portfolio_id, ["holdings", "summary"], client_id)
 
-    if holdings_df.empty:
+    if bundle.holdings.empty:
         return {
-            "summary": {"error": "No holdings found"},
+            "summary": {"error": _no_holdings_error(bundle.holdings)},
             "allocation": {},
             "compliance_summary": {},
             "as_of": datetime.utcnow().isoformat() + "Z"
         }
 
-    # Extract values from summary
-    total_bond_value = float(summary.get('total_market_value', 0) or 0)
-    if total_bond_value == 0 and 'market_value' in holdings_df.columns:
-        total_bond_value = float(holdings_df['market_value'].sum())
-
-    cash_balance = float(summary.get('cash', 0) or 0)
-    if cash_balance == 0:
-        txns_df = await get_transactions_async(portfolio_id, client_id)
-        if not txns_df.empty:
-            for _, row in txns_df.iterrows():
-                txn_type = safe_str(row.get('transaction_type', '')).upper()
-                status = safe_str(row.get('status', '')).lower()
-                if status not in ['confirmed', 'settled']:
-                    continue
-                amount = safe_float(row.get('settlement_amount') or row.get('market_value'))
-                if txn_type in ['INITIAL', 'SELL', 'COUPON']:
-                    cash_balance += amount
-                elif txn_type == 'BUY':
-                    cash_balance -= amount
-
-    total_value = total_bond_value + cash_balance
-    cash_pct = (cash_balance / total_value * 100) if total_value else 0
-    weighted_duration = float(summary.get('weighted_duration', 0) or 0)
-    weighted_yield = float(summary.get('weighted_yield', 0) or 0)
-    if weighted_duration == 0 or weighted_yield == 0:
-        calc_dur, calc_ytw = _calc_weighted_averages(holdings_df)
-        weighted_duration = weighted_duration or calc_dur
-        weighted_yield = weighted_yield or calc_ytw
-    num_holdings = int(summary.get('num_holdings', len(holdings_df)))
-
-    # Avg rating and price date from holdings
-    avg_rating, avg_notches = _calc_avg_rating(holdings_df)
-    price_date_fmt = _calc_price_date(holdings_df)
-
-    dashboard_summary = {
-        "total_value": total_value,
-        "total_value_fmt": fmt_money(total_value, abbreviate=True),
-        "bond_value": total_bond_value,
-        "bond_value_fmt": fmt_money(total_bond_value, abbreviate=True),
-        "cash_balance": cash_balance,
-        "cash_balance_fmt": fmt_money(cash_balance, abbreviate=True),
-        "cash_pct": cash_pct,
-        "cash_pct_fmt": fmt_pct(cash_pct),
-        "duration": weighted_duration,
-        "duration_fmt": fmt_duration(weighted_duration),
-        "yield": weighted_yield,
-        "yield_fmt": fmt_pct(weighted_yield),
-        "num_holdings": num_holdings,
-        "avg_rating": avg_rating,
-        "avg_notches": avg_notches,
-        "price_date_fmt": price_date_fmt,
-    }
-
-    allocation = {"by_country": [], "by_rating": [], "by_sector": []}
-    country_breakdown = summary.get('country_breakdown', {})
-    if country_breakdown:
-        for country, mv in sorted(country_breakdown.items(), key=lambda x: x[1], reverse=True):
-            pct = (mv / total_bond_value * 100) if total_bond_value else 0
-            allocation["by_country"].append({
-                "country": country, "pct": round(pct, 1), "pct_fmt": fmt_pct(pct),
-                "value": mv, "value_fmt": fmt_money(mv),
-            })
-    elif 'country' in holdings_df.columns and 'market_value' in holdings_df.columns:
-        country_totals = holdings_df.groupby('country')['market_value'].sum()
-        for country, mv in country_totals.sort_values(ascending=False).items():
-            pct = (mv / total_bond_value * 100) if total_bond_value else 0
-            allocation["by_country"].append({
-                "country": country, "pct": round(pct, 1), "pct_fmt": fmt_pct(pct),
-                "value": mv, "value_fmt": fmt_money(mv),
-            })
-
-    rating_col = 'rating_sp' if 'rating_sp' in holdings_df.columns else 'rating'
-    if rating_col in holdings_df.columns and 'market_value' in holdings_df.columns:
-        rating_totals = holdings_df.groupby(rating_col)['market_value'].sum()
-        for rating, mv in rating_totals.sort_values(ascending=False).items():
-            if rating:
-                pct = (mv / total_bond_value * 100) if total_bond_value else 0
-                allocation["by_rating"].append({
-                    "rating": rating, "pct": round(pct, 1), "pct_fmt": fmt_pct(pct),
-                    "value": mv, "value_fmt": fmt_money(mv),
-                    "bucket": get_rating_bucket(rating),
-                })
-
-    compliance_result = check_compliance(holdings_df, cash_balance)
-    compliance_summary = {
-        "is_compliant": compliance_result.is_compliant,
-        "hard_rules_pass": compliance_result.hard_pass,
-        "hard_rules_total": compliance_result.hard_total,
-        "soft_warnings": compliance_result.soft_total - compliance_result.soft_pass,
-    }
-
-    return {
-        "summary": dashboard_summary,
-        "allocation": allocation,
-        "compliance_summary": compliance_summary,
-        "as_of": datetime.utcnow().isoformat() + "Z"
-    }
+    return _build_dashboard_from_bundle(bundle)
 
 
 async def get_holdings_display_async(
@@ -1716,12 +1634,15 @@ async def get_holdings_display_async(
 def _format_holdings_display(holdings_df: pd.DataFrame) -> Dict[str, Any]:
     """Format holdings DataFrame into display-ready dict. Shared by sync and async paths."""
     if holdings_df.empty:
-        return {
+        empty = {
             "holdings": [],
             "totals": {},
             "count": 0,
             "as_of": datetime.utcnow().isoformat() + "Z"
         }
+        if holdings_df.attrs.get('error'):
+            empty["error"] = _no_holdings_error(holdings_df)
+        return empty
 
     total_market_value = holdings_df['market_value'].sum() if 'market_value' in holdings_df.columns else 0
     total_face_value = holdings_df['par_amount'].sum() if 'par_amount' in holdings_df.columns else 0
@@ -1816,30 +1737,25 @@ async def get_dashboard_complete_async(
     """
     Async version of get_dashboard_complete.
 
-    Fetches all data in parallel:
-    - holdings, summary, transactions all fetched concurrently
+    Fetches everything in one bundle call:
+    - holdings, summary (+ staging holdings, + transactions if cash is 0)
     - Then formats dashboard + holdings display from shared data
     """
-    staging_id = 2 if include_staging else 1
-
-    # Fetch all data in parallel (3 calls instead of ~6 sequential)
-    holdings_df, summary, holdings_display_df = await asyncio.gather(
-        get_holdings_async(portfolio_id, staging_id=1, client_id=client_id),
-        get_holdings_summary_async(portfolio_id, staging_id=1, client_id=client_id),
-        get_holdings_async(portfolio_id, staging_id=staging_id, client_id=client_id),
-    )
+    parts = ["holdings", "summary"] + (["staging_holdings"] if include_staging else [])
+    bundle = await get_portfolio_bundle(portfolio_id, parts, client_id)
+    holdings_display_df = bundle.staging_holdings if include_staging else bundle.holdings
 
     # Format dashboard from shared holdings + summary (CPU-bound, fast)
-    if holdings_df.empty:
+    if bundle.holdings.empty:
         dashboard = {
-            "summary": {"error": "No holdings found"},
+            "summary": {"error": _no_holdings_error(bundle.holdings)},
             "allocation": {},
             "compliance_summary": {},
             "as_of": datetime.utcnow().isoformat() + "Z"
         }
     else:
         # Reuse the sync dashboard logic with pre-fetched data
-        dashboard = _build_dashboard_from_data(holdings_df, summary, portfolio_id, client_id)
+        dashboard = _build_dashboard_from_bundle(bundle)
 
     # Format holdings display (CPU-bound, fast)
     holdings_data = _format_holdings_display(holdings_display_df)
@@ -1857,31 +1773,12 @@ async def get_dashboard_complete_async(
     }
 
 
-def _build_dashboard_from_data(
-    holdings_df: pd.DataFrame,
-    summary: Dict[str, Any],
-    portfolio_id: str = "wnbf",
-    client_id: str = None,
-) -> Dict[str, Any]:
-    """Build dashboard dict from pre-fetched holdings and summary data."""
-    total_bond_value = float(summary.get('total_market_value', 0) or 0)
-    if total_bond_value == 0 and 'market_value' in holdings_df.columns:
-        total_bond_value = float(holdings_df['market_value'].sum())
-
-    cash_balance = float(summary.get('cash', 0) or 0)
-    if cash_balance == 0:
-        txns_df = get_transactions(portfolio_id, client_id)
-        if not txns_df.empty:
-            for _, row in txns_df.iterrows():
-                txn_type = safe_str(row.get('transaction_type', '')).upper()
-                status = safe_str(row.get('status', '')).lower()
-                if status not in ['confirmed', 'settled']:
-                    continue
-                amount = safe_float(row.get('settlement_amount') or row.get('market_value'))
-                if txn_type in ['INITIAL', 'SELL', 'COUPON']:
-                    cash_balance += amount
-                elif txn_type == 'BUY':
-                    cash_balance -= amount
+def _build_dashboard_from_bundle(bundle: PortfolioBundle) -> Dict[str, Any]:
+    """Build dashboard dict from a pre-fetched holdings + summary bundle."""
+    holdings_df = bundle.holdings
+    summary = bundle.summary
+    total_bond_value = bundle.bond_value
+    cash_balance = bundle.cash_balance
 
     total_value = total_bond_value + cash_balance
     cash_pct = (cash_balance / total_value * 100) if total_value else 0
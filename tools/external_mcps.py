@@ -28,6 +28,9 @@ import csv
 import io
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+from .resilience import call, call_sync
 
 # Optional async HTTP client - falls back to sync if not available
 try:
@@ -132,14 +135,35 @@ def _get_auth_headers() -> Dict[str, str]:
     }
 
 
+def _service(method: str, url: str) -> str:
+    """Resilience endpoint name: one circuit breaker per external MCP service and method."""
+    return f"{method} {urlsplit(url).netloc}"
+
+
+def _failed_response(response: requests.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _transient(e: BaseException) -> bool:
+    """Transport errors, and 429/5xx answers raised by httpx."""
+    if HTTPX_AVAILABLE and isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return isinstance(e, (requests.ConnectionError, requests.Timeout)) or (
+        HTTPX_AVAILABLE and isinstance(e, httpx.TransportError))
+
+
 def _get(url: str, params: Dict = None, timeout: int = TIMEOUT) -> requests.Response:
-    """Make authenticated GET request."""
-    return requests.get(url, params=params, headers=_get_auth_headers(), timeout=timeout)
+    """Make authenticated GET request (jittered retries on 429/5xx, per-service circuit breaker)."""
+    return call_sync(_service("GET", url),
+                     lambda: requests.get(url, params=params, headers=_get_auth_headers(), timeout=timeout),
+                     idempotent=True, retryable=_transient, failed_result=_failed_response)
 
 
 def _post(url: str, json_data: Dict = None, timeout: int = TIMEOUT) -> requests.Response:
-    """Make authenticated POST request."""
-    return requests.post(url, json=json_data, headers=_get_auth_headers(), timeout=timeout)
+    """Make authenticated POST request (not retried, per-service circuit breaker)."""
+    return call_sync(_service("POST", url),
+                     lambda: requests.post(url, json=json_data, headers=_get_auth_headers(), timeout=timeout),
+                     retryable=_transient, failed_result=_failed_response)
 
 
 # ============================================================================
@@ -1077,11 +1101,14 @@ def check_country_priority(country: str) -> Dict[str, Any]:
 
 async def _async_get(client: "httpx.AsyncClient", url: str, params: Dict = None,
                      timeout: int = TIMEOUT) -> Dict[str, Any]:
-    """Make authenticated async GET request."""
-    try:
+    """Make authenticated async GET request (retried, hedged past p95, per-service circuit breaker)."""
+    async def send():
         response = await client.get(url, params=params, headers=_get_auth_headers(), timeout=timeout)
         response.raise_for_status()
         return response.json()
+
+    try:
+        return await call(_service("GET", url), send, idempotent=True, retryable=_transient)
     except Exception as e:
         logger.error(f"Async GET error for {url}: {e}")
         return {"error": str(e)}
@@ -1089,11 +1116,14 @@ async def _async_get(client: "httpx.AsyncClient", url: str, params: Dict = None,
 
 async def _async_post(client: "httpx.AsyncClient", url: str, json_data: Dict = None,
                       timeout: int = TIMEOUT) -> Dict[str, Any]:
-    """Make authenticated async POST request."""
-    try:
+    """Make authenticated async POST request (not retried, per-service circuit breaker)."""
+    async def send():
         response = await client.post(url, json=json_data, headers=_get_auth_headers(), timeout=timeout)
         response.raise_for_status()
         return response.json()
+
+    try:
+        return await call(_service("POST", url), send, retryable=_transient)
     except Exception as e:
         logger.error(f"Async POST error for {url}: {e}")
         return {"error": str(e)}
@@ -0,0 +1,120 @@
+"""
+Binary DataFrame codec for the Redis cache
+
+Cached query results used to be stored as JSON records, which turned dates
+and Decimals into strings and had to be re-parsed row by row on every hit.
+Frames are now stored as Arrow IPC streams (optionally zstd/lz4 compressed
+by Arrow itself) behind a small header:
+
+    b"ORCF" | format version (1 byte) | encoding (1 byte) | Arrow IPC stream
+
+The header lets readers tell frame payloads from legacy JSON values and
+reject payloads written by an incompatible future version.
+"""
+
+import logging
+from typing import Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pa_ipc = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ORCF"
+FORMAT_VERSION = 1
+ENCODING_ARROW_IPC = 1
+HEADER_SIZE = len(MAGIC) + 2
+
+
+class FrameCodecError(ValueError):
+    """Raised when a DataFrame cannot be encoded or a payload cannot be decoded"""
+
+
+def default_compression() -> Optional[str]:
+    """Best available Arrow IPC compression codec (zstd, then lz4, else none)"""
+    if not PYARROW_AVAILABLE:
+        return None
+    for codec in ("zstd", "lz4"):
+        if pa.Codec.is_available(codec):
+            return codec
+    return None
+
+
+def is_frame_payload(payload: bytes) -> bool:
+    """True if payload was produced by encode_frame()"""
+    return isinstance(payload, (bytes, bytearray, memoryview)) and bytes(payload[:len(MAGIC)]) == MAGIC
+
+
+def encode_frame(df: pd.DataFrame, compression: Optional[str] = "default") -> bytes:
+    """
+    Serialize a DataFrame to header + Arrow IPC stream bytes
+
+    Args:
+        df: DataFrame to encode (index is preserved)
+        compression: "zstd", "lz4", None, or "default" for the best available
+
+    Returns:
+        Encoded bytes
+
+    Raises:
+        FrameCodecError: If pyarrow is missing or the frame has columns Arrow
+            cannot represent (e.g. mixed-type object columns)
+    """
+    if not PYARROW_AVAILABLE:
+        raise FrameCodecError("pyarrow is not installed")
+
+    if compression == "default":
+        compression = default_compression()
+
+    try:
+        table = pa.Table.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        options = pa_ipc.IpcWriteOptions(compression=compression)
+        with pa_ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        body = sink.getvalue()
+    except (pa.ArrowException, TypeError, ValueError) as e:
+        raise FrameCodecError(f"Cannot encode DataFrame as Arrow: {e}") from e
+
+    return MAGIC + bytes((FORMAT_VERSION, ENCODING_ARROW_IPC)) + body.to_pybytes()
+
+
+def decode_frame(payload: bytes) -> pd.DataFrame:
+    """
+    Deserialize bytes produced by encode_frame()
+
+    Args:
+        payload: Encoded bytes
+
+    Returns:
+        DataFrame with the original dtypes and index
+
+    Raises:
+        FrameCodecError: If the payload is not a frame or uses an unknown version
+    """
+    if not PYARROW_AVAILABLE:
+        raise FrameCodecError("pyarrow is not installed")
+    if not is_frame_payload(payload):
+        raise FrameCodecError("Not a frame payload (bad magic)")
+    if len(payload) < HEADER_SIZE:
+        raise FrameCodecError("Truncated frame payload")
+
+    version, encoding = payload[len(MAGIC)], payload[len(MAGIC) + 1]
+    if version != FORMAT_VERSION or encoding != ENCODING_ARROW_IPC:
+        raise FrameCodecError(f"Unsupported frame format v{version} encoding {encoding}")
+
+    try:
+        # py_buffer + slice keeps this zero-copy up to the pandas conversion
+        buf = pa.py_buffer(payload).slice(HEADER_SIZE)
+        table = pa_ipc.open_stream(buf).read_all()
+        return table.to_pandas()
+    except pa.ArrowException as e:
+        raise FrameCodecError(f"Corrupt frame payload: {e}") from e
@@ -0,0 +1,175 @@
+"""
+Shared HTTP Connection Pools for Orca MCP
+
+One process-wide httpx client (sync) and one per event loop (async), so
+calls to the same host reuse keep-alive connections instead of paying
+DNS + TCP + TLS on every request. HTTP/2 is negotiated when the `h2`
+package is installed (pip install httpx[http2]).
+
+Tuning (env):
+- ORCA_HTTP_MAX_CONNECTIONS: total connections per pool (default 100)
+- ORCA_HTTP_MAX_KEEPALIVE: idle connections kept open (default 20)
+- ORCA_HTTP_KEEPALIVE_EXPIRY: seconds an idle connection is kept (default 30)
+- ORCA_HTTP_CONNECT_TIMEOUT: connect timeout in seconds (default 5)
+
+Per-request timeouts are passed by the caller.
+
+Sync code that needs an async API runs it with run_sync(), which drives
+coroutines on one background event loop, so sync callers share that
+loop's pool too (and it works from inside a running loop).
+
+Usage:
+    client = get_http_client()               # sync
+    client = get_async_http_client()         # inside a coroutine
+    data = run_sync(d1.get_holdings("wnbf")) # coroutine from sync code
+    await aclose_http_clients()              # app shutdown
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Awaitable, Dict, Optional, TypeVar
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_CONNECTIONS = int(os.getenv("ORCA_HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("ORCA_HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("ORCA_HTTP_KEEPALIVE_EXPIRY", "30"))
+CONNECT_TIMEOUT = float(os.getenv("ORCA_HTTP_CONNECT_TIMEOUT", "5"))
+DEFAULT_TIMEOUT = 15.0
+
+# Cloudflare bot protection blocks default library User-Agents (error 1010)
+DEFAULT_HEADERS = {
+    "User-Agent": "Orca-MCP/3.2",
+    "Accept": "application/json",
+}
+
+_sync_client: Optional["httpx.Client"] = None
+_sync_lock = threading.Lock()
+
+# AsyncClient connections belong to the loop that opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+# Background loop for run_sync()
+_runner_loop: Optional[asyncio.AbstractEventLoop] = None
+_runner_lock = threading.Lock()
+
+
+def _client_kwargs() -> Dict:
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "headers": DEFAULT_HEADERS,
+        "timeout": httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def _require_httpx():
+    if httpx is None:
+        raise RuntimeError("httpx is required for pooled HTTP. Install with: pip install httpx")
+
+
+def get_http_client() -> "httpx.Client":
+    """Process-wide pooled sync client (thread-safe)"""
+    global _sync_client
+    _require_httpx()
+    client = _sync_client
+    if client is not None and not client.is_closed:
+        return client
+    with _sync_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(**_client_kwargs())
+            logger.info(f"Opened pooled HTTP client (http2={HTTP2_AVAILABLE})")
+        return _sync_client
+
+
+def get_async_http_client() -> "httpx.AsyncClient":
+    """Pooled async client for the running event loop"""
+    _require_httpx()
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_clients[loop] = httpx.AsyncClient(**_client_kwargs())
+    return client
+
+
+def _get_runner_loop() -> asyncio.AbstractEventLoop:
+    global _runner_loop
+    with _runner_lock:
+        if _runner_loop is None or _runner_loop.is_closed():
+            _runner_loop = asyncio.new_event_loop()
+            threading.Thread(target=_runner_loop.run_forever, name="orca-http-loop", daemon=True).start()
+        return _runner_loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from sync code
+
+    Uses one shared background loop, so it is safe to call from threads and
+    from code already running inside an event loop (the caller blocks, as
+    any sync call would).
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result (exceptions propagate)
+    """
+    loop = _get_runner_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        # Blocking here would deadlock the loop the coroutine needs
+        coro.close()
+        raise RuntimeError("run_sync() called from the HTTP runner loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def _close_runner_client():
+    loop = _runner_loop
+    client = _async_clients.pop(loop, None) if loop is not None else None
+    if client is not None and not client.is_closed:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+
+
+def close_http_clients():
+    """Close the sync pool and the pool behind run_sync()"""
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
+    _close_runner_client()
+
+
+async def aclose_http_clients():
+    """Close every pool: call from the app's shutdown hook"""
+    await asyncio.to_thread(close_http_clients)
+    loop = asyncio.get_running_loop()
+    client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+    # Pools of other (finished) loops can't be awaited from here; drop them
+    _async_clients.clear()
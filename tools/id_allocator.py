@@ -0,0 +1,196 @@
+"""
+Transaction ID Allocator for Orca MCP
+
+Staging inserts used to run
+    SELECT COALESCE(MAX(transaction_id), 0) + 1 FROM transactions
+before every insert: a BigQuery scan per trade, and two concurrent
+staging calls could read the same MAX and insert duplicate ids.
+
+IDs are now reserved in blocks (ORCA_ID_BLOCK_SIZE, default 20) from a
+Redis counter with one atomic INCRBY, and handed out locally from the
+block. The counter is seeded from MAX(transaction_id) plus
+ORCA_ID_RESEED_GAP (default 10 blocks) whenever the key is missing
+(first use, or evicted/flushed), so blocks other workers still hold
+can't be issued again. A Lua guard also keeps it at or above the
+highest id this process has seen.
+
+Without Redis there is no shared counter, so nothing is reserved ahead:
+MAX(transaction_id) is re-read for every allocation and exactly the ids
+asked for are issued (never below the highest id this process issued).
+Consecutive calls from different processes (stdio pool children, SSE and
+stdio servers side by side) then see each other's inserts, as the old
+MAX+1 did.
+
+IDs are unique and increasing per process but not gap-free: unused ids in
+a block are dropped when the process exits.
+
+Usage:
+    txn_id = allocate_transaction_ids(1, client_id)[0]
+    ids = allocate_transaction_ids(25, client_id)  # bulk staging
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from ..client_config import get_client_config
+except ImportError:
+    # When deployed standalone (not as package)
+    from client_config import get_client_config
+
+from .cache_manager import CacheManager, get_cache_manager
+from .data_access import query_bigquery
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = int(os.getenv("ORCA_ID_BLOCK_SIZE", "20"))
+
+RESEED_GAP = int(os.getenv("ORCA_ID_RESEED_GAP", str(BLOCK_SIZE * 10)))
+
+SEQUENCE_PREFIX = CacheManager.SEQUENCE_PREFIX  # kept by CacheManager.flush_all
+
+# Reserve ARGV[2] ids: returns the last id of the block, or -1 if the
+# counter doesn't exist yet (caller seeds it). ARGV[1] is a floor the
+# counter is raised to first (highest id the caller has seen).
+_RESERVE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local floor = tonumber(ARGV[1])
+if tonumber(redis.call('GET', KEYS[1])) < floor then
+    redis.call('SET', KEYS[1], floor)
+end
+return redis.call('INCRBY', KEYS[1], ARGV[2])
+"""
+
+
+class IdAllocator:
+    """Hands out ids from blocks reserved atomically in Redis"""
+
+    def __init__(self, table: str = "transactions", column: str = "transaction_id",
+                 client_id: Optional[str] = None, block_size: int = BLOCK_SIZE):
+        self.table = table
+        self.column = column
+        self.client_id = client_id
+        self.block_size = block_size
+        self.key = f"{SEQUENCE_PREFIX}{client_id or 'default'}:{table}"
+
+        self._lock = threading.Lock()
+        self._next = 0   # next id to hand out
+        self._end = 0    # last id of the current block (inclusive)
+        self._floor: Optional[int] = None  # highest id known to exist or be reserved
+        self.stats = {"allocated": 0, "blocks": 0, "seeds": 0}
+
+    def _max_id(self) -> int:
+        """Highest id in the table (one BigQuery scan, bypasses cache and replica)"""
+        df = query_bigquery(
+            f"SELECT COALESCE(MAX({self.column}), 0) AS max_id FROM {self.table}",
+            self.client_id, use_cache=False
+        )
+        self.stats["seeds"] += 1
+        return int(df.iloc[0]['max_id']) if not df.empty else 0
+
+    def _reserve_locally(self, count: int) -> Tuple[int, int]:
+        """Exactly `count` ids after the table's current MAX (re-read every time)"""
+        first = max(self._max_id(), self._floor or 0) + 1
+        self._floor = first + count - 1
+        return first, self._floor
+
+    def _reserve(self, needed: int) -> Tuple[int, int]:
+        """Reserve at least `needed` ids (a whole block via Redis); returns (first, last)"""
+        cache = get_cache_manager()
+        redis_client = cache.redis_client if cache.enabled else None
+
+        if redis_client is None:
+            return self._reserve_locally(needed)
+
+        count = max(needed, self.block_size)
+
+        for _ in range(2):
+            try:
+                last = int(redis_client.eval(_RESERVE_LUA, 1, self.key, self._floor or 0, count))
+            except Exception as e:
+                # Redis down mid-flight: continue locally from what we know
+                logger.warning(f"ID reservation via Redis failed ({e}), allocating locally")
+                return self._reserve_locally(needed)
+            if last >= 0:
+                self._floor = max(self._floor or 0, last)
+                return last - count + 1, last
+            # First use, or the key was evicted: seed past the table and any
+            # blocks still held by other workers
+            seed = max(self._max_id(), self._floor or 0) + RESEED_GAP
+            redis_client.set(self.key, seed, nx=True)
+            logger.info(f"Seeded id sequence {self.key} at {seed}")
+        raise RuntimeError(f"Could not reserve ids from {self.key}")
+
+    def allocate(self, count: int = 1) -> List[int]:
+        """
+        Allocate `count` unique ids
+
+        Args:
+            count: Number of ids needed
+
+        Returns:
+            List of ids (increasing)
+        """
+        if count <= 0:
+            return []
+        with self._lock:
+            ids: List[int] = []
+            available = self._end - self._next + 1 if self._end else 0
+            if available > 0:
+                take = min(available, count)
+                ids.extend(range(self._next, self._next + take))
+                self._next += take
+            needed = count - len(ids)
+            if needed:
+                first, last = self._reserve(needed)
+                self.stats["blocks"] += 1
+                ids.extend(range(first, first + needed))
+                self._next, self._end = first + needed, last
+            self.stats["allocated"] += count
+            return ids
+
+    def available(self) -> int:
+        """Ids left in the current block (allocatable without a round-trip)"""
+        return self._end - self._next + 1 if self._end else 0
+
+
+_allocators: Dict[Tuple[Optional[str], str], IdAllocator] = {}
+_allocators_lock = threading.Lock()
+
+
+def get_id_allocator(client_id: str = None, table: str = "transactions") -> IdAllocator:
+    """Allocator for a client's table (one per process)"""
+    # Resolve the default so None and the explicit id share one sequence
+    client_id = get_client_config(client_id).client_id
+    with _allocators_lock:
+        allocator = _allocators.get((client_id, table))
+        if allocator is None:
+            allocator = _allocators[(client_id, table)] = IdAllocator(table=table, client_id=client_id)
+        return allocator
+
+
+def allocate_transaction_ids(count: int = 1, client_id: str = None) -> List[int]:
+    """
+    Allocate new transaction ids for staging inserts
+
+    Args:
+        count: Number of ids needed
+        client_id: Client identifier (uses default if None)
+
+    Returns:
+        List of unique transaction ids
+    """
+    return get_id_allocator(client_id).allocate(count)
+
+
+async def allocate_transaction_ids_async(count: int = 1, client_id: str = None) -> List[int]:
+    """Non-blocking allocate_transaction_ids (no thread hop while the block lasts)"""
+    allocator = get_id_allocator(client_id)
+    if allocator.available() >= count:
+        return allocator.allocate(count)
+    return await asyncio.to_thread(allocator.allocate, count)
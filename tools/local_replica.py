@@ -0,0 +1,433 @@
+"""
+Local DuckDB Replica for Orca MCP
+
+Optional process-local copy of the client's `transactions` and
+`agg_analysis_data` tables. The staging and summary tools run many small
+aggregates over these tables; answered by DuckDB they take milliseconds
+instead of a BigQuery job round-trip.
+
+Sync (background thread, every ORCA_REPLICA_SYNC_INTERVAL seconds):
+- transactions: rows with transaction_id above the watermark, plus every
+  remote and local 'staging' row (staging rows are updated and deleted
+  in place, so an id watermark alone would miss them)
+- agg_analysis_data: rows with bpdate >= the watermark date (the newest
+  day is re-pulled in case it was still loading)
+- A row-count check after each pass catches deletes of settled rows
+  and falls back to a full reload of the table
+
+Watermarks live in the `_replica_state` table, so a file-backed replica
+(ORCA_REPLICA_PATH) resumes incrementally after a restart.
+
+Routing:
+query_bigquery sends a SELECT here when every table it reads is
+replicated and was synced within ORCA_REPLICA_MAX_STALENESS seconds (the
+freshness SLA). Writers call mark_replica_dirty(), which routes the
+table back to BigQuery until the next sync has picked the write up.
+SQL that DuckDB can't run (BigQuery-only functions) falls back to
+BigQuery and is remembered.
+
+Offline use:
+A replica created without a fetch function is seeded with load_frame()
+and never goes stale, so tests can run tool SQL without BigQuery:
+
+    replica = LocalReplica("guinness")
+    replica.load_frame("transactions", df)
+    install_local_replica(replica)
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+    duckdb = None
+
+from .cache_manager import CacheManager
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ENABLED = os.getenv("ORCA_LOCAL_REPLICA", "false").lower() in ("1", "true", "yes")
+REPLICA_PATH = os.getenv("ORCA_REPLICA_PATH", "")  # directory for <client_id>.duckdb files; in-memory if empty
+MAX_STALENESS = float(os.getenv("ORCA_REPLICA_MAX_STALENESS", "300"))
+SYNC_INTERVAL = float(os.getenv("ORCA_REPLICA_SYNC_INTERVAL", "60"))
+FULL_REFRESH_INTERVAL = float(os.getenv("ORCA_REPLICA_FULL_REFRESH", "86400"))
+
+
+class ReplicaTable(NamedTuple):
+    """How one table is synced"""
+    name: str
+    watermark: str                 # column the incremental pull filters on
+    key: Optional[str] = None      # unique row id (None: rows are replaced by watermark range)
+    mutable: Optional[str] = None  # predicate for rows that can change after insert
+
+
+REPLICA_TABLES = {
+    'transactions': ReplicaTable('transactions', 'transaction_id', key='transaction_id',
+                                 mutable="status = 'staging'"),
+    'agg_analysis_data': ReplicaTable('agg_analysis_data', 'bpdate'),
+}
+
+_READ_SQL_RE = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Make BigQuery frames DuckDB-friendly (db-dtypes dates, NUMERIC decimals)"""
+    df = df.copy()
+    for col in df.columns:
+        dtype = str(df[col].dtype)
+        if dtype in ('dbdate', 'dbtime'):
+            df[col] = df[col].astype(object)
+        elif dtype == 'object':
+            sample = df[col].dropna()
+            if len(sample) and type(sample.iloc[0]).__name__ == 'Decimal':
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+class LocalReplica:
+    """DuckDB copy of one client's replicated tables"""
+
+    def __init__(self, client_id: Optional[str], fetch: Optional[Callable[[str], pd.DataFrame]] = None,
+                 path: Optional[str] = None, tables: Optional[List[str]] = None,
+                 max_staleness: float = MAX_STALENESS):
+        """
+        Args:
+            client_id: Client whose dataset this replicates
+            fetch: Runs SQL against BigQuery (simple table names); None for an offline replica
+            path: DuckDB database file (in-memory if None)
+            tables: Subset of REPLICA_TABLES to replicate (default: all)
+            max_staleness: Freshness SLA in seconds
+        """
+        if not DUCKDB_AVAILABLE:
+            raise ImportError("Local replica requires duckdb. Install with: pip install duckdb")
+
+        self.client_id = client_id
+        self.fetch = fetch
+        self.path = path
+        self.max_staleness = max_staleness
+        self.tables = {t: REPLICA_TABLES[t] for t in (tables or REPLICA_TABLES)}
+
+        self._con = duckdb.connect(path or ':memory:')
+        self._write_lock = threading.Lock()
+        self._dirty: Dict[str, bool] = {}       # table -> needs full reload
+        self._unsupported: set = set()          # hashes of SQL DuckDB couldn't run
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"queries": 0, "fallbacks": 0, "syncs": 0, "full_loads": 0, "rows_synced": 0}
+
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS _replica_state (
+                table_name VARCHAR PRIMARY KEY,
+                watermark VARCHAR,
+                synced_at DOUBLE,
+                full_load_at DOUBLE,
+                row_count BIGINT
+            )
+        """)
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _state(self, table: str) -> Optional[Dict[str, Any]]:
+        row = self._con.cursor().execute(
+            "SELECT watermark, synced_at, full_load_at, row_count FROM _replica_state WHERE table_name = ?",
+            [table]
+        ).fetchone()
+        if row is None:
+            return None
+        return {"watermark": row[0], "synced_at": row[1], "full_load_at": row[2], "row_count": row[3]}
+
+    def _save_state(self, con, table: str, full_load: bool):
+        spec = self.tables[table]
+        watermark, count = con.execute(
+            f"SELECT CAST(MAX({spec.watermark}) AS VARCHAR), COUNT(*) FROM {table}"
+        ).fetchone()
+        now = time.time()
+        previous = self._state(table)
+        full_load_at = now if full_load or previous is None else previous["full_load_at"]
+        con.execute(
+            "INSERT OR REPLACE INTO _replica_state VALUES (?, ?, ?, ?, ?)",
+            [table, watermark, now, full_load_at, count]
+        )
+
+    def is_fresh(self, table: str) -> bool:
+        """True if the table can be served within the freshness SLA"""
+        if table not in self.tables or table in self._dirty:
+            return False
+        state = self._state(table)
+        if state is None:
+            return False
+        if self.fetch is None:
+            return True  # offline replica: seeded data is the source of truth
+        return time.time() - state["synced_at"] <= self.max_staleness
+
+    def mark_dirty(self, table: str, full: bool = False):
+        """Route `table` to BigQuery until the next sync (full=True forces a reload)"""
+        if table in self.tables and self.fetch is not None:
+            self._dirty[table] = full or self._dirty.get(table, False)
+            self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load_frame(self, table: str, df: pd.DataFrame):
+        """Replace a table's contents with df (full load / offline seeding)"""
+        with self._write_lock:
+            con = self._con.cursor()
+            con.register('_incoming', _normalize_frame(df))
+            try:
+                con.execute("BEGIN TRANSACTION")
+                con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM _incoming")
+                self._save_state(con, table, full_load=True)
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+            finally:
+                con.unregister('_incoming')
+        self.stats["full_loads"] += 1
+        self.stats["rows_synced"] += len(df)
+
+    def _merge_frame(self, table: str, df: pd.DataFrame, delete_where: str):
+        """Delete local rows matching delete_where, then insert df, atomically"""
+        with self._write_lock:
+            con = self._con.cursor()
+            con.register('_incoming', _normalize_frame(df))
+            try:
+                con.execute("BEGIN TRANSACTION")
+                con.execute(f"DELETE FROM {table} WHERE {delete_where}")
+                if len(df):
+                    con.execute(f"INSERT INTO {table} BY NAME SELECT * FROM _incoming")
+                self._save_state(con, table, full_load=False)
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+            finally:
+                con.unregister('_incoming')
+        self.stats["rows_synced"] += len(df)
+
+    @staticmethod
+    def _literal(column: str, value: str) -> str:
+        if column in ('bpdate', 'transaction_date', 'settlement_date'):
+            return f"DATE '{value[:10]}'"
+        return str(int(value))
+
+    def sync_table(self, table: str):
+        """Bring one table up to date (incremental when a watermark exists)"""
+        # Clear the mark before fetching: a write during the sync marks it again
+        marked = self._dirty.pop(table, None)
+        try:
+            self._sync_table(table, force_full=bool(marked))
+        except Exception:
+            if marked is not None:
+                self._dirty[table] = marked or self._dirty.get(table, False)
+            raise
+
+    def _sync_table(self, table: str, force_full: bool):
+        spec = self.tables[table]
+        state = self._state(table)
+        full = (
+            force_full
+            or state is None
+            or state["watermark"] is None
+            or time.time() - state["full_load_at"] > FULL_REFRESH_INTERVAL
+        )
+
+        if full:
+            df = self.fetch(f"SELECT * FROM {table}")
+            self.load_frame(table, df)
+            logger.info(f"Replica {self.client_id}/{table}: full load of {len(df)} rows")
+            return
+
+        watermark = self._literal(spec.watermark, state["watermark"])
+        if spec.key:
+            # New rows, plus mutable rows on either side (updated or deleted remotely)
+            local_ids = [r[0] for r in self._con.cursor().execute(
+                f"SELECT {spec.key} FROM {table} WHERE {spec.mutable}"
+            ).fetchall()] if spec.mutable else []
+            conditions = [f"{spec.watermark} > {watermark}"]
+            if spec.mutable:
+                conditions.append(f"({spec.mutable})")
+            if local_ids:
+                conditions.append(f"{spec.key} IN ({', '.join(str(int(i)) for i in local_ids)})")
+            df = self.fetch(f"SELECT * FROM {table} WHERE {' OR '.join(conditions)}")
+
+            ids = set(local_ids)
+            if len(df):
+                ids.update(int(i) for i in df[spec.key].dropna())
+            delete_where = f"{spec.key} IN ({', '.join(str(int(i)) for i in ids)})" if ids else "FALSE"
+        else:
+            df = self.fetch(f"SELECT * FROM {table} WHERE {spec.watermark} >= {watermark}")
+            delete_where = f"{spec.watermark} >= {watermark}"
+
+        try:
+            self._merge_frame(table, df, delete_where)
+        except Exception as e:
+            # Schema drift (new/changed columns) - reload the table
+            logger.warning(f"Replica {self.client_id}/{table}: incremental merge failed ({e}), reloading")
+            self.load_frame(table, self.fetch(f"SELECT * FROM {table}"))
+            return
+
+        # Deletes of immutable rows don't move the watermark - catch them by count
+        remote = self.fetch(f"SELECT COUNT(*) AS row_count FROM {table}")
+        local = self._state(table)["row_count"]
+        if int(remote.iloc[0]['row_count']) != local:
+            logger.info(f"Replica {self.client_id}/{table}: row count drifted, reloading")
+            self.load_frame(table, self.fetch(f"SELECT * FROM {table}"))
+        elif len(df):
+            logger.info(f"Replica {self.client_id}/{table}: +{len(df)} rows (watermark {state['watermark']})")
+
+    def sync(self):
+        """Sync every replicated table (errors are logged per table)"""
+        if self.fetch is None:
+            return
+        for table in self.tables:
+            try:
+                self.sync_table(table)
+            except Exception as e:
+                logger.warning(f"Replica {self.client_id}/{table} sync failed: {e}")
+        self.stats["syncs"] += 1
+
+    def start(self):
+        """Start the background sync thread (first sync runs immediately)"""
+        if self._thread is not None or self.fetch is None:
+            return
+
+        def run():
+            while True:
+                self.sync()
+                self._wake.wait(SYNC_INTERVAL)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name=f"replica-{self.client_id}", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def can_serve(self, sql: str) -> bool:
+        """True if sql is a read over fresh replicated tables only"""
+        if not _READ_SQL_RE.match(sql):
+            return False
+        tables = CacheManager.extract_tables(sql)
+        return bool(tables) and all(self.is_fresh(t) for t in tables)
+
+    def query(self, sql: str) -> pd.DataFrame:
+        """Run sql against the replica (raises duckdb.Error on failure)"""
+        return self._con.cursor().execute(sql).df(date_as_object=True)
+
+    def try_query(self, sql: str) -> Optional[pd.DataFrame]:
+        """
+        Answer sql locally if possible
+
+        Returns:
+            DataFrame, or None if the caller should query BigQuery
+        """
+        if not self.can_serve(sql):
+            return None
+        sql_hash = hashlib.md5(sql.encode()).hexdigest()
+        if sql_hash in self._unsupported:
+            return None
+        try:
+            df = self.query(sql)
+        except duckdb.Error as e:
+            logger.info(f"Replica can't run query, using BigQuery: {e}")
+            if len(self._unsupported) < 10000:
+                self._unsupported.add(sql_hash)
+            self.stats["fallbacks"] += 1
+            return None
+        self.stats["queries"] += 1
+        return df
+
+    def info(self) -> Dict[str, Any]:
+        tables = {}
+        for table in self.tables:
+            state = self._state(table)
+            tables[table] = {
+                "fresh": self.is_fresh(table),
+                "rows": state["row_count"] if state else 0,
+                "watermark": state["watermark"] if state else None,
+                "age_seconds": round(time.time() - state["synced_at"], 1) if state else None,
+            }
+        return {"client_id": self.client_id, "path": self.path or ":memory:",
+                "max_staleness": self.max_staleness, "tables": tables, **self.stats}
+
+
+# ----------------------------------------------------------------------
+# Per-client registry
+# ----------------------------------------------------------------------
+
+_replicas: Dict[Optional[str], LocalReplica] = {}
+_replicas_lock = threading.Lock()
+
+
+def get_local_replica(client_id: Optional[str],
+                      fetch: Optional[Callable[[str], pd.DataFrame]] = None) -> Optional[LocalReplica]:
+    """
+    Replica for a client, created (and its sync started) on first use
+
+    Returns None unless ORCA_LOCAL_REPLICA is enabled or a replica was installed.
+
+    Args:
+        client_id: Client identifier
+        fetch: BigQuery fetch function for a new replica
+    """
+    replica = _replicas.get(client_id)
+    if replica is not None or not REPLICA_ENABLED or not DUCKDB_AVAILABLE or fetch is None:
+        return replica
+
+    with _replicas_lock:
+        replica = _replicas.get(client_id)
+        if replica is None:
+            path = None
+            if REPLICA_PATH:
+                os.makedirs(REPLICA_PATH, exist_ok=True)
+                path = os.path.join(REPLICA_PATH, f"{client_id or 'default'}.duckdb")
+            tables = [t.strip() for t in os.getenv("ORCA_REPLICA_TABLES", "").split(",") if t.strip()]
+            replica = LocalReplica(client_id, fetch, path=path, tables=tables or None)
+            replica.start()
+            _replicas[client_id] = replica
+        return replica
+
+
+def install_local_replica(replica: LocalReplica):
+    """Register a replica (e.g. an offline, seeded one) for its client"""
+    with _replicas_lock:
+        _replicas[replica.client_id] = replica
+
+
+def mark_replica_dirty(table: str, client_id: Optional[str] = None, full: bool = False):
+    """
+    Route a table back to BigQuery until the replica has synced it
+
+    Args:
+        table: Table that was written
+        client_id: Client whose data changed (None marks all clients)
+        full: Force a full reload (bulk uploads / deletes)
+    """
+    with _replicas_lock:
+        replicas = list(_replicas.values()) if client_id is None else [_replicas.get(client_id)]
+    for replica in replicas:
+        if replica is not None:
+            replica.mark_dirty(table.lower(), full=full)
+
+
+def get_local_replica_info() -> Dict[str, Any]:
+    """Freshness / watermark / row counts of every replica"""
+    with _replicas_lock:
+        replicas = dict(_replicas)
+    return {(cid or "default"): r.info() for cid, r in replicas.items()}
@@ -0,0 +1,206 @@
+"""
+Portfolio Bundle for Orca MCP
+
+One fetch for everything a display page needs about a portfolio. The
+dashboards used to issue holdings + summary (+ transactions when the
+summary's cash was 0, only after the summary came back) as separate D1
+requests; get_portfolio_bundle asks the Worker for all parts in one
+/api/portfolio/bundle call and falls back to a concurrent fan-out when the
+Worker doesn't have that endpoint (remembered for ORCA_D1_BUNDLE_RETRY
+seconds) or the portfolio is served from Supabase.
+
+Parts: holdings, staging_holdings, summary, transactions, cashflows
+
+Usage:
+    bundle = await get_portfolio_bundle("wnbf", ["holdings", "summary"], client_id="guinness")
+    bundle.holdings, bundle.cash_balance
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cloudflare_d1 import D1Client, D1HTTPError, cashflows_frame
+from .d1_schema import records_to_frame
+from .data_router import (
+    uses_supabase,
+    get_holdings_async,
+    get_holdings_summary_async,
+    get_transactions_async,
+    get_cashflows_async,
+)
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_PARTS = ("holdings", "staging_holdings", "summary", "transactions", "cashflows")
+DEFAULT_PARTS = ("holdings", "summary")
+
+BUNDLE_ENABLED = os.getenv("ORCA_D1_BUNDLE", "true").lower() in ("1", "true", "yes")
+BUNDLE_RETRY_SECONDS = float(os.getenv("ORCA_D1_BUNDLE_RETRY", "3600"))
+
+# Until when the Worker is assumed not to serve /api/portfolio/bundle
+_bundle_unsupported_until = 0.0
+
+_CASH_IN = ('INITIAL', 'SELL', 'COUPON')
+
+
+def cash_from_transactions(txns_df: Optional[pd.DataFrame]) -> float:
+    """
+    Cash implied by confirmed/settled transactions
+
+    INITIAL, SELLs and COUPONs add, BUYs subtract; each uses settlement_amount
+    (actual cash impact) where set, otherwise market_value.
+    """
+    if txns_df is None or txns_df.empty:
+        return 0.0
+
+    def column(name):
+        if name not in txns_df.columns:
+            return pd.Series(np.nan, index=txns_df.index)
+        return pd.to_numeric(txns_df[name], errors='coerce')
+
+    def labels(name):
+        if name not in txns_df.columns:
+            return pd.Series('', index=txns_df.index)
+        # object first: D1 frames carry these as categoricals
+        return txns_df[name].astype(object).fillna('').astype(str)
+
+    txn_type = labels('transaction_type').str.upper()
+    status = labels('status').str.lower()
+
+    settlement = column('settlement_amount')
+    amount = settlement.where(settlement.notna() & (settlement != 0), column('market_value')).fillna(0.0)
+
+    counted = status.isin(['confirmed', 'settled'])
+    sign = np.where(txn_type.isin(_CASH_IN), 1.0, np.where(txn_type == 'BUY', -1.0, 0.0))
+    return float((amount * sign)[counted].sum())
+
+
+@dataclass
+class PortfolioBundle:
+    """Snapshot of one portfolio's D1 data; parts not requested stay None"""
+    portfolio_id: str
+    parts: List[str]
+    holdings: Optional[pd.DataFrame] = None
+    staging_holdings: Optional[pd.DataFrame] = None
+    summary: Optional[Dict[str, Any]] = None
+    transactions: Optional[pd.DataFrame] = None
+    cashflows: Optional[pd.DataFrame] = None
+    source: str = "fanout"  # "bundle" when one Worker call served every part
+    fetched_at: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+
+    @property
+    def bond_value(self) -> float:
+        """Summary market value, else the sum over holdings"""
+        value = float((self.summary or {}).get('total_market_value', 0) or 0)
+        if value == 0 and self.holdings is not None and 'market_value' in self.holdings.columns:
+            value = float(self.holdings['market_value'].sum())
+        return value
+
+    @property
+    def summary_cash(self) -> float:
+        """Cash as reported by the summary (0 when missing)"""
+        return float((self.summary or {}).get('cash', 0) or 0)
+
+    @property
+    def cash_balance(self) -> float:
+        """Summary cash, else derived from transactions when they were fetched"""
+        return self.summary_cash or cash_from_transactions(self.transactions)
+
+
+async def _fetch_parts(portfolio_id: str, parts: Iterable[str], staging_id: int,
+                       client_id: Optional[str]) -> Dict[str, Any]:
+    """Concurrent fan-out through data_router (D1 or Supabase)"""
+    calls = {
+        "holdings": lambda: get_holdings_async(portfolio_id, staging_id, client_id),
+        "staging_holdings": lambda: get_holdings_async(portfolio_id, 2, client_id),
+        "summary": lambda: get_holdings_summary_async(portfolio_id, staging_id, client_id),
+        "transactions": lambda: get_transactions_async(portfolio_id, client_id),
+        "cashflows": lambda: get_cashflows_async(portfolio_id, client_id),
+    }
+    parts = list(parts)
+    results = await asyncio.gather(*(calls[p]() for p in parts))
+    return dict(zip(parts, results))
+
+
+async def _fetch_bundle(portfolio_id: str, parts: List[str], staging_id: int,
+                        client_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """One Worker call, or None if the endpoint isn't available"""
+    global _bundle_unsupported_until
+    try:
+        data = await D1Client(client_id).get_portfolio_bundle(portfolio_id, parts, staging_id)
+    except D1HTTPError as e:
+        if e.code in (404, 405, 501):
+            _bundle_unsupported_until = time.monotonic() + BUNDLE_RETRY_SECONDS
+            logger.info(f"D1 bundle endpoint unavailable ({e.code}), fanning out for {BUNDLE_RETRY_SECONDS:.0f}s")
+        else:
+            logger.warning(f"D1 bundle fetch failed ({e.code}), fanning out")
+        return None
+    except Exception as e:
+        logger.warning(f"D1 bundle fetch failed ({e}), fanning out")
+        return None
+
+    fetched = {}
+    for part in parts:
+        if part not in data:
+            continue
+        if part == "summary":
+            fetched[part] = data[part] or {}
+        elif part == "cashflows":
+            fetched[part] = cashflows_frame(data[part]) if data[part] else pd.DataFrame()
+        elif part == "transactions":
+            fetched[part] = records_to_frame(data[part], 'transactions')
+        else:
+            fetched[part] = records_to_frame(data[part], 'holdings')
+    return fetched
+
+
+async def get_portfolio_bundle(portfolio_id: str, parts: Iterable[str] = DEFAULT_PARTS,
+                               client_id: str = None, staging_id: int = 1,
+                               cash_fallback: bool = True) -> PortfolioBundle:
+    """
+    Fetch several parts of a portfolio at once
+
+    Args:
+        portfolio_id: Portfolio identifier
+        parts: Any of BUNDLE_PARTS
+        client_id: Client identifier (optional)
+        staging_id: staging_id for "holdings" (staging_holdings is always 2)
+        cash_fallback: If the summary reports no cash, also fetch transactions
+            so bundle.cash_balance can be derived from them
+
+    Returns:
+        PortfolioBundle with the requested parts filled in
+    """
+    parts = list(dict.fromkeys(parts))
+    unknown = [p for p in parts if p not in BUNDLE_PARTS]
+    if unknown:
+        raise ValueError(f"Unknown bundle part(s): {unknown} (expected any of {BUNDLE_PARTS})")
+
+    fetched: Optional[Dict[str, Any]] = None
+    if BUNDLE_ENABLED and time.monotonic() >= _bundle_unsupported_until and not uses_supabase(portfolio_id):
+        fetched = await _fetch_bundle(portfolio_id, parts, staging_id, client_id)
+
+    source = "bundle"
+    if fetched is None:
+        fetched, source = {}, "fanout"
+    missing = [p for p in parts if p not in fetched]
+    if missing:
+        fetched.update(await _fetch_parts(portfolio_id, missing, staging_id, client_id))
+        if source == "bundle":
+            source = "mixed"
+
+    bundle = PortfolioBundle(portfolio_id=portfolio_id, parts=parts, source=source, **fetched)
+
+    if (cash_fallback and bundle.summary is not None and bundle.transactions is None
+            and bundle.holdings is not None and not bundle.holdings.empty and bundle.summary_cash == 0):
+        bundle.transactions = (await _fetch_parts(portfolio_id, ["transactions"], staging_id, client_id))["transactions"]
+
+    return bundle
@@ -0,0 +1,141 @@
+"""
+Portfolio Summary Engine for Orca MCP
+
+Computes the portfolio_summary row (starting cash, settled bonds, staging
+buys/sells, counts, last transaction id) for any number of portfolios with
+one conditional-aggregation scan of `transactions`, and upserts it with a
+single MERGE. The MERGE and the read-back of the new rows run as one
+BigQuery script, so a refresh costs one job.
+
+Usage:
+    df = refresh_portfolio_summaries(["wnbf", "wnbf_alt"], client_id="guinness")
+"""
+
+import re
+import logging
+from typing import Iterable, List
+
+import pandas as pd
+
+from .data_access import query_bigquery, query_bigquery_async
+from .cache_manager import CacheManager, invalidate_cache_tags
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLUMNS = [
+    'portfolio_id', 'starting_cash', 'settled_bonds_value', 'staging_buy_value',
+    'staging_sell_value', 'settled_cash', 'total_cash', 'num_settled_bonds',
+    'num_staging_transactions', 'last_transaction_id',
+]
+
+_PORTFOLIO_ID_RE = re.compile(r"^[\w\-]+$")
+
+
+def _portfolio_list(portfolio_ids: Iterable[str]) -> str:
+    ids = list(dict.fromkeys(portfolio_ids))
+    if not ids:
+        raise ValueError("At least one portfolio_id is required")
+    bad = [p for p in ids if not _PORTFOLIO_ID_RE.match(str(p))]
+    if bad:
+        raise ValueError(f"Invalid portfolio_id(s): {bad}")
+    return ", ".join(f"'{p}'" for p in ids)
+
+
+def summary_sql(portfolio_ids: Iterable[str]) -> str:
+    """
+    One-scan SELECT of the summary columns, one row per portfolio
+
+    Portfolios without transactions produce no row.
+    """
+    return f"""
+    SELECT
+        portfolio_id,
+        starting_cash,
+        settled_bonds_value,
+        staging_buy_value,
+        staging_sell_value,
+        starting_cash - settled_bonds_value AS settled_cash,
+        starting_cash - settled_bonds_value - staging_buy_value + staging_sell_value AS total_cash,
+        num_settled_bonds,
+        num_staging_transactions,
+        last_transaction_id
+    FROM (
+        SELECT
+            portfolio_id,
+            COALESCE(SUM(CASE WHEN transaction_type = 'INITIAL' AND ticker = 'CASH'
+                              THEN market_value END), 0) AS starting_cash,
+            COALESCE(SUM(CASE WHEN status = 'settled' AND transaction_type = 'BUY'
+                              THEN market_value END), 0) AS settled_bonds_value,
+            COALESCE(SUM(CASE WHEN status = 'staging' AND transaction_type = 'BUY'
+                              THEN market_value END), 0) AS staging_buy_value,
+            COALESCE(SUM(CASE WHEN status = 'staging' AND transaction_type = 'SELL'
+                              THEN market_value END), 0) AS staging_sell_value,
+            COUNT(CASE WHEN status = 'settled' AND transaction_type = 'BUY' THEN 1 END) AS num_settled_bonds,
+            COUNT(CASE WHEN status = 'staging' THEN 1 END) AS num_staging_transactions,
+            COALESCE(MAX(transaction_id), 0) AS last_transaction_id
+        FROM transactions
+        WHERE portfolio_id IN ({_portfolio_list(portfolio_ids)})
+        GROUP BY portfolio_id
+    )
+    """
+
+
+def refresh_sql(portfolio_ids: Iterable[str]) -> str:
+    """BigQuery script: MERGE the fresh summaries, then read them back"""
+    portfolio_ids = list(portfolio_ids)
+    updates = ",\n            ".join(f"{c} = s.{c}" for c in SUMMARY_COLUMNS[1:])
+    columns = ", ".join(SUMMARY_COLUMNS)
+    values = ", ".join(f"s.{c}" for c in SUMMARY_COLUMNS)
+    return f"""
+    MERGE portfolio_summary t
+    USING ({summary_sql(portfolio_ids)}) s
+    ON t.portfolio_id = s.portfolio_id
+    WHEN MATCHED THEN UPDATE SET
+            {updates},
+            updated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN
+        INSERT ({columns}, updated_at)
+        VALUES ({values}, CURRENT_TIMESTAMP());
+
+    SELECT *
+    FROM portfolio_summary
+    WHERE portfolio_id IN ({_portfolio_list(portfolio_ids)})
+    ORDER BY portfolio_id;
+    """
+
+
+def _invalidate():
+    # get_portfolio_cash reads portfolio_summary through the query cache
+    invalidate_cache_tags([CacheManager.table_tag('portfolio_summary')])
+
+
+def refresh_portfolio_summaries(portfolio_ids: Iterable[str], client_id: str = None) -> pd.DataFrame:
+    """
+    Recompute and upsert portfolio_summary rows in one BigQuery job
+
+    Args:
+        portfolio_ids: Portfolios to refresh
+        client_id: Client identifier (uses default if None)
+
+    Returns:
+        DataFrame of the refreshed portfolio_summary rows
+    """
+    df = query_bigquery(refresh_sql(portfolio_ids), client_id, use_cache=False)
+    _invalidate()
+    logger.info(f"Refreshed portfolio summary for {len(df)} portfolio(s)")
+    return df
+
+
+async def refresh_portfolio_summaries_async(portfolio_ids: Iterable[str], client_id: str = None,
+                                            timeout: float = None) -> pd.DataFrame:
+    """Non-blocking refresh_portfolio_summaries for async handlers"""
+    df = await query_bigquery_async(refresh_sql(portfolio_ids), client_id, use_cache=False, timeout=timeout)
+    _invalidate()
+    logger.info(f"Refreshed portfolio summary for {len(df)} portfolio(s)")
+    return df
+
+
+def missing_portfolios(portfolio_ids: Iterable[str], summaries: pd.DataFrame) -> List[str]:
+    """Requested portfolios that got no summary row (no transactions)"""
+    found = set(summaries['portfolio_id']) if not summaries.empty else set()
+    return [p for p in dict.fromkeys(portfolio_ids) if p not in found]
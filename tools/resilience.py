@@ -0,0 +1,336 @@
+"""
+Resilience Layer for Outbound HTTP Calls
+
+D1 and external MCP calls used to make one attempt and swallow any
+failure, so a slow Worker both stretched tail latency and turned into
+"No holdings found". Calls are now wrapped per endpoint with:
+
+- Retries with full jitter (idempotent calls only): on transport errors,
+  timeouts, 429 and 5xx, sleeping uniform(0, backoff * 2**attempt)
+- Hedging (async GETs): when an attempt outlives the
+  endpoint's p95 latency, a duplicate is sent and the first success
+  wins. Needs ORCA_HEDGE_MIN_SAMPLES latencies first and is capped at
+  ORCA_HEDGE_BUDGET of calls, so a struggling endpoint isn't doubled.
+- Circuit breakers: ORCA_BREAKER_FAILURES consecutive transient
+  failures open the breaker; calls then fail fast with CircuitOpenError
+  for ORCA_BREAKER_COOLDOWN seconds, after which one probe is let
+  through (half-open) and closes it again on success.
+
+4xx answers (other than 429) mean the endpoint is up: they are neither
+retried nor counted against the breaker.
+
+Breaker state and latency percentiles per endpoint: get_endpoint_health()
+(served at /health/endpoints).
+
+Usage:
+    data = await call(endpoint_name("GET", url), lambda: client.get(url), idempotent=True)
+    response = call_sync("nfa-mcp", lambda: requests.get(url), idempotent=True,
+                         failed_result=lambda r: r.status_code >= 500)
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRIES = int(os.getenv("ORCA_RESILIENCE_RETRIES", "2"))
+BACKOFF = float(os.getenv("ORCA_RESILIENCE_BACKOFF", "0.25"))
+BREAKER_FAILURES = int(os.getenv("ORCA_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("ORCA_BREAKER_COOLDOWN", "30"))
+HEDGE_ENABLED = os.getenv("ORCA_HEDGE", "true").lower() in ("1", "true", "yes")
+HEDGE_MIN_SAMPLES = int(os.getenv("ORCA_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY = float(os.getenv("ORCA_HEDGE_MIN_DELAY", "0.05"))
+HEDGE_BUDGET = float(os.getenv("ORCA_HEDGE_BUDGET", "0.1"))
+LATENCY_WINDOW = 256
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_ID_SEGMENT_RE = re.compile(r"\d")
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's breaker is open: failing fast instead of calling it"""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"Circuit open for {endpoint} (retry in {retry_after:.0f}s)")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Breaker/stats key for a URL: "GET host/api/transactions/{id}" (segments with digits are ids)"""
+    parts = urlsplit(url)
+    path = "/".join("{id}" if _ID_SEGMENT_RE.search(segment) else segment for segment in parts.path.split("/"))
+    return f"{method.upper()} {parts.netloc}{path}"
+
+
+class Endpoint:
+    """Circuit breaker and latency window for one endpoint"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.counts = {"calls": 0, "successes": 0, "failures": 0, "retries": 0,
+                       "hedges": 0, "hedge_wins": 0, "rejected": 0}
+
+    # Breaker -------------------------------------------------------------
+
+    def acquire(self):
+        """Admit one attempt, or raise CircuitOpenError"""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + BREAKER_COOLDOWN - time.monotonic()
+                if remaining > 0:
+                    self.counts["rejected"] += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    self.counts["rejected"] += 1
+                    raise CircuitOpenError(self.name, BREAKER_COOLDOWN)
+                self._probing = True
+            self.counts["calls"] += 1
+
+    def record_success(self, latency: Optional[float] = None):
+        with self._lock:
+            if latency is not None:
+                self.latencies.append(latency)
+            self.counts["successes"] += 1
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                logger.info(f"Circuit closed for {self.name}")
+            self.state = CLOSED
+            self._probing = False
+
+    def release(self):
+        """End an attempt that produced no verdict (cancelled): frees a half-open probe slot, counts nothing"""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probing:
+                self.state = OPEN  # cooldown already elapsed: the next call probes again
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.counts["failures"] += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= BREAKER_FAILURES:
+                if self.state != OPEN:
+                    logger.warning(f"Circuit opened for {self.name} after {self.consecutive_failures} failures")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    # Latency -------------------------------------------------------------
+
+    def percentile(self, q: float) -> Optional[float]:
+        samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None (too few samples / over budget)"""
+        if not HEDGE_ENABLED or len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        if self.counts["hedges"] >= HEDGE_BUDGET * self.counts["calls"]:
+            return None
+        return max(self.percentile(0.95), HEDGE_MIN_DELAY)
+
+    def health(self) -> Dict[str, Any]:
+        def ms(q):
+            value = self.percentile(q)
+            return round(value * 1000, 1) if value is not None else None
+
+        retry_in = self.opened_at + BREAKER_COOLDOWN - time.monotonic() if self.state == OPEN else 0
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": round(max(retry_in, 0), 1),
+            "latency_ms": {"p50": ms(0.5), "p95": ms(0.95), "p99": ms(0.99), "samples": len(self.latencies)},
+            **self.counts,
+        }
+
+
+_endpoints: Dict[str, Endpoint] = {}
+_endpoints_lock = threading.Lock()
+
+
+def get_endpoint(name: str) -> Endpoint:
+    endpoint = _endpoints.get(name)
+    if endpoint is None:
+        with _endpoints_lock:
+            endpoint = _endpoints.setdefault(name, Endpoint(name))
+    return endpoint
+
+
+def get_endpoint_health() -> Dict[str, Any]:
+    """Breaker state, counters and latency percentiles of every endpoint called so far"""
+    with _endpoints_lock:
+        endpoints = dict(_endpoints)
+    return {name: endpoint.health() for name, endpoint in sorted(endpoints.items())}
+
+
+def reset_endpoints():
+    """Forget all breaker state and latency (tests)"""
+    with _endpoints_lock:
+        _endpoints.clear()
+
+
+def _jitter(backoff: float, attempt: int) -> float:
+    return random.uniform(0, backoff * 2 ** attempt)
+
+
+async def _attempt(fn: Callable[[], Awaitable[T]]) -> Tuple[T, float]:
+    started = time.perf_counter()
+    result = await fn()
+    return result, time.perf_counter() - started
+
+
+async def _hedged(endpoint: Endpoint, fn: Callable[[], Awaitable[T]]) -> Tuple[T, float]:
+    """First success of the primary and (past the p95 deadline) one duplicate"""
+    delay = endpoint.hedge_delay()
+    primary = asyncio.ensure_future(_attempt(fn))
+    tasks = {primary}
+    try:
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return primary.result()
+
+        with endpoint._lock:
+            endpoint.counts["hedges"] += 1
+        backup = asyncio.ensure_future(_attempt(fn))
+        tasks.add(backup)
+        pending, error = set(tasks), None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        with endpoint._lock:
+                            endpoint.counts["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def call(name: str, fn: Callable[[], Awaitable[T]], idempotent: bool = False,
+               hedge: Optional[bool] = None, retryable: Callable[[BaseException], bool] = lambda e: True,
+               retries: Optional[int] = None, backoff: Optional[float] = None) -> T:
+    """
+    Run an async request through the endpoint's breaker, retries and hedging
+
+    Args:
+        name: Endpoint key (see endpoint_name)
+        fn: Makes one request (called once per attempt)
+        idempotent: Allow retries
+        hedge: Allow a duplicate request past the p95 deadline (default: idempotent)
+        retryable: True for transient errors (retried, counted by the breaker)
+        retries: Extra attempts for idempotent calls (default ORCA_RESILIENCE_RETRIES)
+        backoff: Jitter base in seconds (default ORCA_RESILIENCE_BACKOFF)
+
+    Returns:
+        fn's result
+
+    Raises:
+        CircuitOpenError: breaker open
+        The last error from fn once retries are exhausted
+    """
+    endpoint = get_endpoint(name)
+    retries = RETRIES if retries is None else retries
+    backoff = BACKOFF if backoff is None else backoff
+    attempts = retries + 1 if idempotent else 1
+    hedge = idempotent if hedge is None else hedge
+
+    for attempt in range(attempts):
+        endpoint.acquire()
+        try:
+            if hedge:
+                result, latency = await _hedged(endpoint, fn)
+            else:
+                result, latency = await _attempt(fn)
+        except asyncio.CancelledError:
+            endpoint.release()  # says nothing about the endpoint
+            raise
+        except Exception as e:
+            if not retryable(e):
+                endpoint.record_success()  # the endpoint answered
+                raise
+            endpoint.record_failure()
+            if attempt == attempts - 1:
+                raise
+            delay = _jitter(backoff, attempt)
+            with endpoint._lock:
+                endpoint.counts["retries"] += 1
+            logger.info(f"Retrying {name} in {delay:.2f}s ({type(e).__name__}: {e})")
+            await asyncio.sleep(delay)
+        else:
+            endpoint.record_success(latency)
+            return result
+
+
+def call_sync(name: str, fn: Callable[[], T], idempotent: bool = False,
+              retryable: Callable[[BaseException], bool] = lambda e: True,
+              failed_result: Callable[[T], bool] = lambda result: False,
+              retries: Optional[int] = None, backoff: Optional[float] = None) -> T:
+    """
+    Blocking call() for sync clients (breaker and jittered retries, no hedging)
+
+    Args:
+        failed_result: True for results that are transient failures (e.g. a
+            5xx response); retried like errors, and returned after the last attempt
+
+    Other args as for call().
+    """
+    endpoint = get_endpoint(name)
+    retries = RETRIES if retries is None else retries
+    backoff = BACKOFF if backoff is None else backoff
+    attempts = retries + 1 if idempotent else 1
+
+    for attempt in range(attempts):
+        endpoint.acquire()
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            if not retryable(e):
+                endpoint.record_success()
+                raise
+            endpoint.record_failure()
+            if attempt == attempts - 1:
+                raise
+            reason = f"{type(e).__name__}: {e}"
+        else:
+            if not failed_result(result):
+                endpoint.record_success(time.perf_counter() - started)
+                return result
+            endpoint.record_failure()
+            if attempt == attempts - 1:
+                return result
+            reason = "failed response"
+        delay = _jitter(backoff, attempt)
+        with endpoint._lock:
+            endpoint.counts["retries"] += 1
+        logger.info(f"Retrying {name} in {delay:.2f}s ({reason})")
+        time.sleep(delay)
@@ -0,0 +1,99 @@
+"""
+Single-flight request coalescing
+
+When many callers miss the cache for the same key at once, only one of them
+(the leader) runs the expensive function; the others wait for and share its
+result or exception. It serves threads; async callers are covered too,
+since query_bigquery_async runs query_bigquery on a worker thread.
+
+Usage:
+    flight = SingleFlight()
+    df, shared = flight.do(cache_key, lambda: run_query(sql))
+    if shared:
+        df = df.copy()  # result object is shared with the other callers
+
+A flight built with a context factory gives each in-flight key one context
+object (e.g. the job being run), passed to fn and to every caller's join
+callback, so callers can track who is still waiting on it.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters", "context")
+
+    def __init__(self, context: Any = None):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.context = context
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key across threads"""
+
+    def __init__(self, context: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            context: Factory for the object shared by a key's leader and
+                followers (default: none, fn takes no arguments)
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._context = context
+
+    def do(self, key: str, fn: Callable[..., Any],
+           join: Optional[Callable[[Any], None]] = None) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers of key
+
+        Args:
+            key: Coalescing key (e.g. the cache key)
+            fn: Function to run; called with the key's context if the
+                flight has a context factory, otherwise with no arguments
+            join: Called with the key's context as this caller joins (under
+                the flight lock, so before the leader can finish); must not raise
+
+        Returns:
+            (result, shared) - shared is True if the result was (or may be)
+            handed to more than one caller
+
+        Raises:
+            Whatever fn raised, in the leader and in every follower
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call(self._context() if self._context else None)
+                leader = True
+            if join is not None:
+                join(call.context)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(call.context) if self._context else fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result, call.waiters > 0
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
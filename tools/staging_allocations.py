@@ -0,0 +1,212 @@
+"""
+Bulk Staging Allocations for Orca MCP
+
+Stages a whole basket of BUYs in one call. add_staging_allocation costs
+four BigQuery jobs per bond (portfolio value, price, next id, INSERT);
+a basket here costs two whatever its size:
+
+1. One conditional-aggregation scan for portfolio value and cash
+   (portfolio_summary.summary_sql)
+2. Prices for every ISIN from the in-memory universe snapshot
+3. Par sizing for all positions with vectorized rounding to
+   min_size / increment
+4. Transaction ids from one block reservation (id_allocator)
+5. One multi-row INSERT
+
+Usage:
+    report = await add_staging_allocations_bulk(
+        "wnbf", [{"isin": "XS1234567890", "target_pct": 3.0}, ...], client_id="guinness")
+"""
+
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .data_access import query_bigquery_async
+from .cache_manager import CacheManager, invalidate_cache_tags
+from .universe_snapshot import get_universe_snapshot_async
+from .portfolio_summary import summary_sql
+from .id_allocator import allocate_transaction_ids_async
+from .local_replica import mark_replica_dirty
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIZE = 200000
+DEFAULT_INCREMENT = 50000
+
+BOND_COLUMNS = ['isin', 'ticker', 'description', 'country', 'price', 'accrued_interest', 'ytw', 'oad']
+
+
+def size_positions(bonds: pd.DataFrame, portfolio_value: float,
+                   min_size: float = DEFAULT_MIN_SIZE, increment: float = DEFAULT_INCREMENT) -> pd.DataFrame:
+    """
+    Par sizing for every bond at once
+
+    Same rule as add_staging_allocation: par on a dirty-price basis, at
+    least min_size, otherwise rounded up to the next increment above it.
+
+    Args:
+        bonds: Frame with target_pct, price and accrued_interest columns
+        portfolio_value: Portfolio value the percentages refer to
+
+    Returns:
+        bonds with dirty_price, target_dollars, par_amount, market_value, actual_pct added
+    """
+    sized = bonds.copy()
+    clean = sized['price'].to_numpy(dtype=float)
+    accrued = np.nan_to_num(sized['accrued_interest'].to_numpy(dtype=float))
+    dirty = clean + accrued
+
+    target_dollars = portfolio_value * sized['target_pct'].to_numpy(dtype=float) / 100.0
+    par_needed = target_dollars / dirty * 100
+    par = np.where(
+        par_needed < min_size,
+        min_size,
+        np.ceil((par_needed - min_size) / increment) * increment + min_size
+    )
+    market_value = dirty * par / 100
+
+    sized['accrued_interest'] = accrued
+    sized['dirty_price'] = dirty
+    sized['target_dollars'] = target_dollars
+    sized['par_amount'] = par
+    sized['market_value'] = market_value
+    sized['actual_pct'] = np.round(market_value / portfolio_value * 100, 2)
+    return sized
+
+
+def _sql_str(value) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "NULL"
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _sql_num(value) -> str:
+    return "0" if value is None or not np.isfinite(value) else repr(float(value))
+
+
+def insert_sql(portfolio_id: str, rows: pd.DataFrame) -> str:
+    """One INSERT for all staged rows (table name rewritten per client)"""
+    values = []
+    for row in rows.itertuples(index=False):
+        values.append(
+            f"({int(row.transaction_id)}, {_sql_str(portfolio_id)}, "
+            f"FORMAT_DATE('%Y-%m-%d', CURRENT_DATE()), FORMAT_DATE('%Y-%m-%d', CURRENT_DATE()), 'BUY', "
+            f"{_sql_str(row.isin)}, {_sql_str(row.ticker)}, {_sql_str(row.description)}, {_sql_str(row.country)}, "
+            f"{_sql_num(row.par_amount)}, {_sql_num(row.price)}, {_sql_num(row.accrued_interest)}, "
+            f"{_sql_num(row.dirty_price)}, {_sql_num(row.market_value)}, {_sql_num(row.ytw)}, {_sql_num(row.oad)}, "
+            f"'staging', {_sql_str(f'Added via add_staging_allocations_bulk: target {row.target_pct}%')}, "
+            f"FORMAT_TIMESTAMP('%Y-%m-%d %H:%M:%S', CURRENT_TIMESTAMP()))"
+        )
+    values_sql = ",\n    ".join(values)
+    return f"""
+    INSERT INTO transactions
+    (transaction_id, portfolio_id, transaction_date, settlement_date,
+     transaction_type, isin, ticker, description, country,
+     par_amount, price, accrued_interest, dirty_price, market_value,
+     ytm, duration, status, notes, created_at)
+    VALUES
+    {values_sql}
+    """
+
+
+async def add_staging_allocations_bulk(portfolio_id: str, allocations: List[Dict[str, Any]],
+                                       client_id: str = None,
+                                       min_size: float = DEFAULT_MIN_SIZE,
+                                       increment: float = DEFAULT_INCREMENT,
+                                       dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Stage BUYs for a basket of bonds
+
+    Args:
+        portfolio_id: Portfolio to stage into
+        allocations: [{"isin": ..., "target_pct": ...}, ...] (repeated ISINs are summed)
+        client_id: Client identifier (uses default if None)
+        min_size: Minimum par amount
+        increment: Par increment above min_size
+        dry_run: Size and report only, write nothing
+
+    Returns:
+        Dict with transactions, not_found and a combined cash report
+    """
+    requested = pd.DataFrame(allocations, columns=['isin', 'target_pct'])
+    requested['isin'] = requested['isin'].astype(str).str.strip().str.upper()
+    requested['target_pct'] = pd.to_numeric(requested['target_pct'], errors='coerce')
+    invalid = requested[requested['target_pct'].isna() | (requested['target_pct'] <= 0)]['isin'].tolist()
+    requested = requested.dropna(subset=['target_pct'])
+    requested = requested[requested['target_pct'] > 0].groupby('isin', sort=False, as_index=False)['target_pct'].sum()
+    if requested.empty:
+        return {"success": False, "error": "No valid allocations (need isin and a positive target_pct)"}
+
+    # Uncached: a cached (or stale-while-revalidate) summary can predate staging
+    # rows just written, and the positions would be sized against old cash
+    summary = await query_bigquery_async(summary_sql([portfolio_id]), client_id, use_cache=False)
+    if summary.empty or not float(summary.iloc[0]['starting_cash']):
+        return {"success": False, "error": "Cannot find portfolio starting value"}
+    cash = summary.iloc[0]
+    portfolio_value = float(cash['starting_cash'])
+
+    universe = await get_universe_snapshot_async(client_id)
+    bonds = universe.lookup(requested['isin'], columns=BOND_COLUMNS)
+    bonds = requested.merge(bonds, on='isin', how='left')
+    priced = bonds['price'].notna() & (bonds['price'] > 0)
+    not_found = bonds.loc[~priced, 'isin'].tolist()
+    bonds = bonds[priced]
+    if bonds.empty:
+        return {"success": False, "error": "None of the ISINs have a price in agg_analysis_data",
+                "not_found": not_found}
+
+    sized = size_positions(bonds, portfolio_value, min_size, increment)
+
+    if dry_run:
+        sized['transaction_id'] = None
+    else:
+        sized['transaction_id'] = await allocate_transaction_ids_async(len(sized), client_id)
+        await query_bigquery_async(insert_sql(portfolio_id, sized), client_id, use_cache=False)
+        mark_replica_dirty("transactions", client_id)
+        invalidate_cache_tags([CacheManager.table_tag("transactions")])
+        logger.info(f"Staged {len(sized)} BUYs for {portfolio_id} in one insert")
+
+    basket_value = float(sized['market_value'].sum())
+    total_cash = float(cash['total_cash'])
+    report = {
+        "success": True,
+        "dry_run": dry_run,
+        "portfolio_id": portfolio_id,
+        "count": len(sized),
+        "transactions": [
+            {
+                "transaction_id": row.transaction_id,
+                "isin": row.isin,
+                "ticker": row.ticker,
+                "description": row.description,
+                "country": row.country,
+                "clean_price": float(row.price),
+                "accrued_interest": float(row.accrued_interest),
+                "dirty_price": float(row.dirty_price),
+                "target_pct": float(row.target_pct),
+                "target_dollars": float(row.target_dollars),
+                "par_amount": float(row.par_amount),
+                "market_value": float(row.market_value),
+                "actual_pct": float(row.actual_pct),
+            }
+            for row in sized.itertuples(index=False)
+        ],
+        "not_found": not_found,
+        "invalid": invalid,
+        "sizing": {"min_size": min_size, "increment": increment},
+        "cash": {
+            "portfolio_value": portfolio_value,
+            "settled_cash": float(cash['settled_cash']),
+            "total_cash_before": total_cash,
+            "basket_market_value": basket_value,
+            "total_cash_after": total_cash - basket_value,
+            "basket_target_pct": float(sized['target_pct'].sum()),
+            "basket_actual_pct": round(basket_value / portfolio_value * 100, 2),
+        },
+    }
+    if total_cash - basket_value < 0:
+        report["warning"] = "Basket exceeds available cash (including staging)"
+    return report
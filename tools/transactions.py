@@ -9,7 +9,13 @@ Unified API for managing portfolio transactions across both:
 from typing import Dict, Any, Literal
 import pandas as pd
 
-from .data_access import query_bigquery
+try:
+    from ..client_config import get_client_config
+except ImportError:
+    from client_config import get_client_config
+
+from .data_access import query_bigquery, get_bigquery_client
+from .local_replica import mark_replica_dirty
 from .cloudflare_d1 import (
     get_staging_transactions,
     save_staging_transaction,
@@ -222,8 +228,6 @@ def update_transaction(
     Returns:
         Result dictionary with success status
     """
-    from google.cloud import bigquery
-
     # Validate allowed fields
     allowed_fields = {
         'price', 'accrued_interest', 'dirty_price', 'market_value',
@@ -251,7 +255,7 @@ def update_transaction(
     set_clause = ", ".join(set_clauses)
 
     # Execute the update
-    client = bigquery.Client(project='future-footing-414610')
+    client = get_bigquery_client('future-footing-414610')
 
     sql = f"""
     UPDATE `future-footing-414610.portfolio_data.transactions`
@@ -262,6 +266,9 @@ def update_transaction(
     try:
         query_job = client.query(sql)
         query_job.result()  # Wait for completion
+        # In-place edits move neither the watermark nor the row count, so
+        # the local replica has to reload the table to see them
+        mark_replica_dirty("transactions", get_client_config(client_id).client_id, full=True)
 
         return {
             'success': True,
@@ -0,0 +1,337 @@
+"""
+Latest-Universe Snapshot for Orca MCP
+
+Process-resident, versioned copy of the latest agg_analysis_data row per ISIN.
+
+Screening tools used to send the same
+    WITH latest AS (SELECT isin, MAX(bpdate) ... GROUP BY isin)
+self-join to BigQuery on every request, re-scanning the full history table.
+The snapshot is loaded once with a single QUALIFY query, held as NumPy
+columns with hash indexes on isin, country and ticker, and answers lookups,
+filters and top-k sorts in-process.
+
+Freshness:
+- Every ORCA_UNIVERSE_CHECK_INTERVAL seconds (default 300) a cheap probe
+  (MAX(bpdate), COUNT(*)) runs in the background; if it changed, the new
+  snapshot is loaded and swapped in atomically while readers keep using
+  the old one.
+- mark_universe_stale() (called when agg_analysis_data is uploaded) makes
+  the next reader load synchronously.
+
+Usage:
+    snap = await get_universe_snapshot_async(client_id)
+    df = snap.lookup(["XS1234567890"])
+    idx = snap.top(snap.where(snap.col("return_ytw") > 5.0), "return_ytw", 5)
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_access import query_bigquery
+
+logger = logging.getLogger(__name__)
+
+# Columns kept per ISIN (everything the screening tools read)
+SNAPSHOT_COLUMNS = [
+    'isin', 'ticker', 'description', 'country', 'bpdate',
+    'price', 'accrued_interest', 'coupon', 'maturity',
+    'ytw', 'oas', 'oad', 'return_ytw', 'notches',
+    'rating_sp', 'rating_moody',
+]
+
+NUMERIC_COLUMNS = {'price', 'accrued_interest', 'coupon', 'ytw', 'oas', 'oad', 'return_ytw', 'notches'}
+
+_LOAD_SQL = f"""
+SELECT {', '.join(SNAPSHOT_COLUMNS)}
+FROM agg_analysis_data
+WHERE isin IS NOT NULL
+QUALIFY ROW_NUMBER() OVER (PARTITION BY isin ORDER BY bpdate DESC) = 1
+"""
+
+_PROBE_SQL = """
+SELECT MAX(bpdate) AS as_of, COUNT(*) AS row_count
+FROM agg_analysis_data
+"""
+
+CHECK_INTERVAL = float(os.getenv("ORCA_UNIVERSE_CHECK_INTERVAL", "300"))
+
+
+class UniverseSnapshot:
+    """
+    Immutable columnar snapshot of the latest analytics row per ISIN
+
+    Row positions (np.ndarray of int) are the currency between methods:
+    build them with rows()/country_rows()/ticker_rows()/where(), narrow them
+    with numpy, and materialize with frame().
+    """
+
+    def __init__(self, df: pd.DataFrame, version: int, probe: Tuple = None):
+        self.version = version
+        self.probe = probe
+        self.loaded_at = datetime.now()
+        self.size = len(df)
+
+        self.columns: Dict[str, np.ndarray] = {}
+        for col in df.columns:
+            if col in NUMERIC_COLUMNS:
+                self.columns[col] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                self.columns[col] = df[col].to_numpy(dtype=object)
+
+        isins = self.columns.get('isin', np.empty(0, dtype=object))
+        self._isin_index: Dict[str, int] = {isin: i for i, isin in enumerate(isins)}
+        self._country_index = self._build_index(self.columns.get('country'), str.lower)
+        self._ticker_index = self._build_index(self.columns.get('ticker'), str.upper)
+
+        bpdates = self.columns.get('bpdate')
+        self.as_of = max((d for d in bpdates if d is not None and d == d), default=None) if bpdates is not None else None
+
+    @staticmethod
+    def _build_index(values: Optional[np.ndarray], normalize) -> Dict[str, np.ndarray]:
+        if values is None:
+            return {}
+        groups: Dict[str, List[int]] = {}
+        for i, value in enumerate(values):
+            if value is None or value != value:  # None / NaN
+                continue
+            groups.setdefault(normalize(str(value)), []).append(i)
+        return {k: np.asarray(v, dtype=np.int64) for k, v in groups.items()}
+
+    # ------------------------------------------------------------------
+    # Row selection
+    # ------------------------------------------------------------------
+
+    def all_rows(self) -> np.ndarray:
+        return np.arange(self.size, dtype=np.int64)
+
+    def rows(self, isins: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Positions of the given ISINs (in request order)
+
+        Returns:
+            (positions, not_found)
+        """
+        positions, not_found = [], []
+        for isin in isins:
+            pos = self._isin_index.get(isin)
+            if pos is None:
+                not_found.append(isin)
+            else:
+                positions.append(pos)
+        return np.asarray(positions, dtype=np.int64), not_found
+
+    def country_rows(self, countries: Iterable[str]) -> np.ndarray:
+        """Positions of bonds in any of the countries (case-insensitive)"""
+        parts = [self._country_index.get(str(c).lower()) for c in countries]
+        parts = [p for p in parts if p is not None]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def ticker_rows(self, tickers: Iterable[str]) -> np.ndarray:
+        """Positions of bonds with any of the tickers (case-insensitive)"""
+        parts = [self._ticker_index.get(str(t).upper()) for t in tickers]
+        parts = [p for p in parts if p is not None]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def col(self, name: str) -> np.ndarray:
+        """Full column array (do not mutate)"""
+        return self.columns[name]
+
+    def where(self, mask: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Apply a boolean mask
+
+        Args:
+            mask: Boolean array over all rows, or over `rows` if given
+            rows: Candidate positions (default: all rows)
+        """
+        if rows is None:
+            return np.flatnonzero(mask)
+        return rows[mask]
+
+    def exclude(self, rows: np.ndarray, isins: Iterable[str]) -> np.ndarray:
+        """Drop positions whose ISIN is in isins"""
+        drop, _ = self.rows(isins)
+        if len(drop) == 0:
+            return rows
+        return rows[~np.isin(rows, drop)]
+
+    def top(self, rows: np.ndarray, column: str, k: int, descending: bool = True) -> np.ndarray:
+        """
+        The k best positions by column (NaN last), sorted
+
+        Uses argpartition, so cost is O(n + k log k) rather than a full sort.
+        """
+        if len(rows) == 0 or k <= 0:
+            return rows[:0]
+        values = self.columns[column][rows]
+        keys = np.where(np.isnan(values), np.inf, -values if descending else values)
+        if k < len(rows):
+            part = np.argpartition(keys, k - 1)[:k]
+        else:
+            part = np.arange(len(rows))
+        order = part[np.argsort(keys[part], kind='stable')]
+        return rows[order]
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+
+    def frame(self, rows: Optional[np.ndarray] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """DataFrame of the given positions (default: everything)"""
+        columns = columns or list(self.columns)
+        if rows is None:
+            return pd.DataFrame({c: self.columns[c] for c in columns})
+        return pd.DataFrame({c: self.columns[c][rows] for c in columns})
+
+    def lookup(self, isins: Iterable[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Latest rows for the ISINs that exist, in request order"""
+        positions, _ = self.rows(isins)
+        return self.frame(positions, columns)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "rows": self.size,
+            "as_of": str(self.as_of) if self.as_of is not None else None,
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
+class _SnapshotHolder:
+    """Per-client snapshot slot with atomic swap and background refresh"""
+
+    def __init__(self, client_id: Optional[str]):
+        self.client_id = client_id
+        self.snapshot: Optional[UniverseSnapshot] = None
+        self.checked_at = 0.0
+        self.stale = False
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+
+    def _probe(self) -> Tuple:
+        df = query_bigquery(_PROBE_SQL, self.client_id, use_cache=False)
+        if df.empty:
+            return (None, 0)
+        row = df.iloc[0]
+        return (str(row['as_of']), int(row['row_count']))
+
+    def _load(self, probe: Tuple = None) -> UniverseSnapshot:
+        start = time.perf_counter()
+        df = query_bigquery(_LOAD_SQL, self.client_id, use_cache=False)
+        version = (self.snapshot.version + 1) if self.snapshot else 1
+        snapshot = UniverseSnapshot(df, version=version, probe=probe)
+        logger.info(
+            f"Universe snapshot v{version} loaded for {self.client_id or 'default'}: "
+            f"{snapshot.size} ISINs as of {snapshot.as_of} in {time.perf_counter() - start:.2f}s"
+        )
+        return snapshot
+
+    def get(self) -> UniverseSnapshot:
+        snapshot = self.snapshot
+        if snapshot is not None and not self.stale:
+            if time.monotonic() - self.checked_at > CHECK_INTERVAL:
+                self._refresh_in_background()
+            return snapshot
+
+        with self._load_lock:
+            if self.snapshot is None or self.stale:
+                probe = None
+                try:
+                    probe = self._probe()
+                except Exception as e:
+                    logger.warning(f"Universe probe failed: {e}")
+                self.snapshot = self._load(probe)  # atomic reference swap
+                self.stale = False
+                self.checked_at = time.monotonic()
+            return self.snapshot
+
+    def _refresh_in_background(self):
+        with self._load_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self.checked_at = time.monotonic()
+
+        def run():
+            try:
+                current = self.snapshot
+                probe = self._probe()
+                if current is None or probe != current.probe:
+                    new = self._load(probe)
+                    with self._load_lock:
+                        # An upload may have marked the snapshot stale (or get()
+                        # already reloaded it) while this load ran: its data is older
+                        if self.snapshot is current and not self.stale:
+                            self.snapshot = new
+            except Exception as e:
+                logger.warning(f"Universe snapshot refresh failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="universe-refresh", daemon=True).start()
+
+
+_holders: Dict[Optional[str], _SnapshotHolder] = {}
+_holders_lock = threading.Lock()
+
+
+def _holder(client_id: Optional[str]) -> _SnapshotHolder:
+    with _holders_lock:
+        holder = _holders.get(client_id)
+        if holder is None:
+            holder = _holders[client_id] = _SnapshotHolder(client_id)
+        return holder
+
+
+def get_universe_snapshot(client_id: str = None) -> UniverseSnapshot:
+    """
+    Get the latest-universe snapshot for a client (loads it on first use)
+
+    Args:
+        client_id: Client identifier (uses default if None)
+
+    Returns:
+        UniverseSnapshot
+    """
+    return _holder(client_id).get()
+
+
+async def get_universe_snapshot_async(client_id: str = None) -> UniverseSnapshot:
+    """Non-blocking get_universe_snapshot for async handlers"""
+    holder = _holder(client_id)
+    snapshot = holder.snapshot
+    if snapshot is not None and not holder.stale:
+        return holder.get()  # fast path; at most schedules a background probe
+    return await asyncio.to_thread(holder.get)
+
+
+def mark_universe_stale(client_id: str = None):
+    """
+    Force a reload on next access (call after agg_analysis_data changes)
+
+    Args:
+        client_id: Client whose snapshot changed (None marks all clients)
+    """
+    with _holders_lock:
+        holders = list(_holders.values()) if client_id is None else [_holders.get(client_id)]
+    for holder in holders:
+        if holder is not None:
+            holder.stale = True
+
+
+def get_universe_snapshot_info() -> Dict[str, Any]:
+    """Version / size / as-of of every loaded snapshot"""
+    with _holders_lock:
+        holders = dict(_holders)
+    return {
+        (cid or "default"): (h.snapshot.info() if h.snapshot else None)
+        for cid, h in holders.items()
+    }